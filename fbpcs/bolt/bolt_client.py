@@ -31,6 +31,26 @@ class BoltState:
     server_ips: Optional[List[str]] = None
 
 
+@dataclass(frozen=True)
+class BoltStatusSnapshot:
+    """Publisher and partner states refreshed together during one polling tick
+
+    Every decision BoltRunner makes within a tick reads from the same snapshot,
+    so each instance is refreshed at most once per tick.
+    """
+
+    publisher_state: BoltState
+    partner_state: BoltState
+
+    @property
+    def publisher_status(self) -> PrivateComputationInstanceStatus:
+        return self.publisher_state.pc_instance_status
+
+    @property
+    def partner_status(self) -> PrivateComputationInstanceStatus:
+        return self.partner_state.pc_instance_status
+
+
 class BoltClient(ABC, Generic[T]):
     """
     Exposes async methods for creating instances, running stages, updating instances,
@@ -87,11 +107,25 @@ class BoltClient(ABC, Generic[T]):
         ]
 
     async def get_valid_stage(
-        self, instance_id: str, stage_flow: Type[PrivateComputationBaseStageFlow]
+        self,
+        instance_id: str,
+        stage_flow: Type[PrivateComputationBaseStageFlow],
+        state: Optional[BoltState] = None,
     ) -> Optional[PrivateComputationBaseStageFlow]:
-        status = (
-            await self.update_instance(instance_id=instance_id)
-        ).pc_instance_status
+        """Returns the stage that the instance is ready to run
+
+        Args:
+            - instance_id: the id of the instance
+            - stage_flow: the stage flow the instance is running
+            - state: an already refreshed state of the instance. If not given,
+                the instance is refreshed with update_instance.
+
+        Returns:
+            The stage the instance is ready for, or None if there isn't one
+        """
+        if state is None:
+            state = await self.update_instance(instance_id=instance_id)
+        status = state.pc_instance_status
         for stage in list(stage_flow):
             if self.ready_for_stage(status, stage):
                 return stage
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+import math
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from time import time
+from typing import DefaultDict, Dict, Iterator, List, Optional, Tuple
+
+from fbpcs.common.service.metric_service import MetricService
+
+BOLT_METRIC_ENTITY = "bolt_runner"
+SUMMARY_PERCENTILES: Tuple[int, ...] = (50, 90, 99)
+
+
+class BoltSpan(Enum):
+    # time for run_stage to return after being called
+    STAGE_START = "stage_start"
+    # time waiting for the publisher to report server ips
+    SERVER_IPS_WAIT = "server_ips_wait"
+    # time from the stage being started until each party's completion is detected
+    STAGE_RUNTIME = "stage_runtime"
+    # time from the previous stage completing until this stage is started
+    STAGE_TRANSITION = "stage_transition"
+
+
+class BoltCounter(Enum):
+    RETRY = "retry"
+    FAILURE = "failure"
+
+
+class BoltParty(Enum):
+    PUBLISHER = "publisher"
+    PARTNER = "partner"
+    # spans and counters that concern the job as a whole
+    JOB = "job"
+
+
+@dataclass(frozen=True)
+class BoltSpanStats:
+    stage: str
+    span: BoltSpan
+    party: BoltParty
+    count: int
+    total: float
+    max: float
+    percentiles: Dict[int, float]
+
+    def __str__(self) -> str:
+        percentiles = " ".join(
+            f"p{p}={value:.1f}s" for p, value in self.percentiles.items()
+        )
+        return (
+            f"{self.stage} {self.party.value} {self.span.value}: count={self.count} "
+            f"total={self.total:.1f}s {percentiles} max={self.max:.1f}s"
+        )
+
+
+class BoltMetrics:
+    """Records per-stage timing spans and counters of a Bolt run
+
+    Durations are kept per (stage, span, party) so that percentiles can be
+    computed for a summary, and every record is also emitted through the
+    metric service, if one is given.
+    """
+
+    def __init__(
+        self,
+        metric_svc: Optional[MetricService] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.metric_svc = metric_svc
+        self.logger: logging.Logger = (
+            logging.getLogger(__name__) if logger is None else logger
+        )
+        self._durations: DefaultDict[
+            Tuple[str, BoltSpan, BoltParty], List[float]
+        ] = defaultdict(list)
+        self._counters: Counter = Counter()
+
+    def record_span(
+        self, stage: str, span: BoltSpan, party: BoltParty, duration: float
+    ) -> None:
+        self._durations[(stage, span, party)].append(duration)
+        if self.metric_svc:
+            key = f"{stage}.{party.value}.{span.value}"
+            self.metric_svc.bump_entity_key(BOLT_METRIC_ENTITY, f"{key}.count")
+            self.metric_svc.bump_entity_key(
+                BOLT_METRIC_ENTITY, f"{key}.duration_ms", int(duration * 1000)
+            )
+
+    @contextmanager
+    def span(self, stage: str, span: BoltSpan, party: BoltParty) -> Iterator[None]:
+        """Records the time spent in the with block, even if it raises"""
+        start_time = time()
+        try:
+            yield
+        finally:
+            self.record_span(stage, span, party, time() - start_time)
+
+    def bump_counter(
+        self, stage: str, counter: BoltCounter, party: BoltParty, value: int = 1
+    ) -> None:
+        self._counters[(stage, counter, party)] += value
+        if self.metric_svc:
+            self.metric_svc.bump_entity_key(
+                BOLT_METRIC_ENTITY, f"{stage}.{party.value}.{counter.value}", value
+            )
+
+    def get_counter(self, stage: str, counter: BoltCounter, party: BoltParty) -> int:
+        return self._counters[(stage, counter, party)]
+
+    def get_span_stats(
+        self, stage: str, span: BoltSpan, party: BoltParty
+    ) -> Optional[BoltSpanStats]:
+        durations = self._durations.get((stage, span, party))
+        if not durations:
+            return None
+        durations = sorted(durations)
+        return BoltSpanStats(
+            stage=stage,
+            span=span,
+            party=party,
+            count=len(durations),
+            total=sum(durations),
+            max=durations[-1],
+            percentiles={
+                p: self._percentile(durations, p) for p in SUMMARY_PERCENTILES
+            },
+        )
+
+    def get_summary(self) -> List[BoltSpanStats]:
+        """Returns stats for every recorded span, largest total time first
+
+        The spans at the top of the summary are the critical path of the run.
+        """
+        summary = []
+        for stage, span, party in self._durations:
+            stats = self.get_span_stats(stage, span, party)
+            if stats:
+                summary.append(stats)
+        return sorted(summary, key=lambda stats: stats.total, reverse=True)
+
+    def log_summary(self) -> None:
+        summary = self.get_summary()
+        if not summary:
+            return
+        self.logger.info("Bolt run timing summary, by total time spent:")
+        for stats in summary:
+            self.logger.info(f"  {stats}")
+        for (stage, counter, party), value in sorted(
+            self._counters.items(), key=lambda item: str(item[0])
+        ):
+            self.logger.info(f"  {stage} {party.value} {counter.value}: {value}")
+
+    @staticmethod
+    def _percentile(sorted_durations: List[float], percentile: int) -> float:
+        # nearest-rank percentile
+        rank = math.ceil(percentile / 100 * len(sorted_durations))
+        return sorted_durations[max(rank, 1) - 1]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import random
+import statistics
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from fbpcs.bolt.constants import (
+    DEFAULT_MAX_POLL_INTERVAL_SEC,
+    DEFAULT_POLL_HISTORY_SIZE,
+    DEFAULT_POLL_JITTER,
+)
+from fbpcs.private_computation.stage_flows.private_computation_base_stage_flow import (
+    PrivateComputationBaseStageFlow,
+)
+
+# without a duration history, the time between polls grows with the time already waited
+ELAPSED_GROWTH_FACTOR = 0.1
+# with a duration history, each poll closes this fraction of the remaining expected time
+REMAINING_FRACTION = 0.5
+# a stage is never polled less often than this fraction of its timeout
+MAX_TIMEOUT_FRACTION = 0.05
+
+
+class BoltPollSchedule(ABC):
+    """Decides how long BoltRunner sleeps between two status polls"""
+
+    @abstractmethod
+    def get_poll_interval(
+        self,
+        poll_interval: float,
+        elapsed: float,
+        stage: Optional[PrivateComputationBaseStageFlow] = None,
+    ) -> float:
+        """Returns the number of seconds to sleep before the next poll
+
+        Args:
+            - poll_interval: the base interval configured for the job
+            - elapsed: seconds since the wait started
+            - stage: the stage being waited on, if any
+
+        Returns:
+            The number of seconds to sleep
+        """
+        pass
+
+    def record_stage_duration(
+        self, stage: PrivateComputationBaseStageFlow, duration: float
+    ) -> None:
+        """Records how long a stage took to complete"""
+        pass
+
+
+class BoltFixedPollSchedule(BoltPollSchedule):
+    """Polls at the job's poll_interval, regardless of the stage"""
+
+    def get_poll_interval(
+        self,
+        poll_interval: float,
+        elapsed: float,
+        stage: Optional[PrivateComputationBaseStageFlow] = None,
+    ) -> float:
+        return poll_interval
+
+
+class BoltAdaptivePollSchedule(BoltPollSchedule):
+    """Polls sparsely early in a stage and densely near its expected completion
+
+    The expected completion of a stage is the median of its recorded durations.
+    Until a stage has a history, the time between polls grows with the time
+    already waited. Intervals are bounded below by the job's poll_interval and
+    above by max_interval and a fraction of the stage timeout, then jittered so
+    that jobs launched together don't poll together.
+    """
+
+    def __init__(
+        self,
+        max_interval: float = DEFAULT_MAX_POLL_INTERVAL_SEC,
+        jitter: float = DEFAULT_POLL_JITTER,
+        history_size: int = DEFAULT_POLL_HISTORY_SIZE,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError(f"jitter must be in [0, 1), got {jitter}")
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng: random.Random = rng or random.Random()
+        self._durations: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=history_size)
+        )
+
+    def record_stage_duration(
+        self, stage: PrivateComputationBaseStageFlow, duration: float
+    ) -> None:
+        self._durations[self._get_key(stage)].append(duration)
+
+    def get_expected_duration(
+        self, stage: PrivateComputationBaseStageFlow
+    ) -> Optional[float]:
+        """Returns the median recorded duration of the stage, if there is one"""
+        durations = self._durations.get(self._get_key(stage))
+        if not durations:
+            return None
+        return statistics.median(durations)
+
+    def get_poll_interval(
+        self,
+        poll_interval: float,
+        elapsed: float,
+        stage: Optional[PrivateComputationBaseStageFlow] = None,
+    ) -> float:
+        if stage is None:
+            return self._add_jitter(poll_interval)
+
+        expected = self.get_expected_duration(stage)
+        if expected is not None and elapsed < expected:
+            interval = (expected - elapsed) * REMAINING_FRACTION
+        else:
+            # no history, or the stage is overdue
+            interval = elapsed * ELAPSED_GROWTH_FACTOR
+
+        max_interval = min(self.max_interval, stage.timeout * MAX_TIMEOUT_FRACTION)
+        interval = max(poll_interval, min(interval, max_interval))
+        return self._add_jitter(interval)
+
+    def _add_jitter(self, interval: float) -> float:
+        return interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @staticmethod
+    def _get_key(stage: PrivateComputationBaseStageFlow) -> str:
+        return f"{stage.get_cls_name()}.{stage.name}"
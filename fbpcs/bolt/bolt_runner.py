@@ -11,8 +11,10 @@ import logging
 from time import time
 from typing import Generic, List, Optional, Type, TypeVar
 
-from fbpcs.bolt.bolt_client import BoltClient
+from fbpcs.bolt.bolt_client import BoltClient, BoltStatusSnapshot
 from fbpcs.bolt.bolt_job import BoltCreateInstanceArgs, BoltJob
+from fbpcs.bolt.bolt_metrics import BoltCounter, BoltMetrics, BoltParty, BoltSpan
+from fbpcs.bolt.bolt_poll_schedule import BoltAdaptivePollSchedule, BoltPollSchedule
 from fbpcs.bolt.constants import (
     DEFAULT_MAX_PARALLEL_RUNS,
     DEFAULT_NUM_TRIES,
@@ -28,6 +30,7 @@ from fbpcs.bolt.exceptions import (
     WaitValidStatusTimeout,
 )
 from fbpcs.bolt.oss_bolt_pcs import BoltPCSCreateInstanceArgs
+from fbpcs.common.service.metric_service import MetricService
 from fbpcs.private_computation.entity.private_computation_status import (
     PrivateComputationInstanceStatus,
 )
@@ -48,6 +51,8 @@ class BoltRunner(Generic[T, U]):
         max_parallel_runs: Optional[int] = None,
         num_tries: Optional[int] = None,
         logger: Optional[logging.Logger] = None,
+        poll_schedule: Optional[BoltPollSchedule] = None,
+        metric_svc: Optional[MetricService] = None,
     ) -> None:
         self.publisher_client = publisher_client
         self.partner_client = partner_client
@@ -58,12 +63,19 @@ class BoltRunner(Generic[T, U]):
             logging.getLogger(__name__) if logger is None else logger
         )
         self.num_tries: int = num_tries or DEFAULT_NUM_TRIES
+        # shared by all jobs, so stage durations learned from one job inform the others
+        self.poll_schedule: BoltPollSchedule = (
+            poll_schedule or BoltAdaptivePollSchedule()
+        )
+        self.metrics = BoltMetrics(metric_svc=metric_svc, logger=self.logger)
 
     async def run_async(
         self,
         jobs: List[BoltJob[T, U]],
     ) -> List[bool]:
-        return list(await asyncio.gather(*[self.run_one(job=job) for job in jobs]))
+        results = list(await asyncio.gather(*[self.run_one(job=job) for job in jobs]))
+        self.metrics.log_summary()
+        return results
 
     async def run_one(self, job: BoltJob[T, U]) -> bool:
         async with self.semaphore:
@@ -83,9 +95,18 @@ class BoltRunner(Generic[T, U]):
                     timeout=WAIT_VALID_STATUS_TIMEOUT,
                 )
                 stage_flow = await self.get_stage_flow(job=job)
-                stage = await self.get_next_valid_stage(job=job, stage_flow=stage_flow)
+                # statuses are refreshed at most once per tick and the snapshot
+                # is shared by every decision made during that tick
+                snapshot = await self.get_status_snapshot(
+                    publisher_id=publisher_id, partner_id=partner_id
+                )
+                stage = await self.get_next_valid_stage(
+                    job=job, stage_flow=stage_flow, snapshot=snapshot
+                )
                 # hierarchy: BoltJob num_tries --> BoltRunner num_tries --> default
                 max_tries = job.num_tries or self.num_tries
+                # when the previous stage was detected as completed
+                stage_completed_at = None
                 while stage is not None:
                     # the following log is used by log_analyzer
                     logger.info(f"Valid stage found: {stage}")
@@ -93,8 +114,12 @@ class BoltRunner(Generic[T, U]):
                     while tries < max_tries:
                         tries += 1
                         try:
+                            if snapshot is None:
+                                snapshot = await self.get_status_snapshot(
+                                    publisher_id=publisher_id, partner_id=partner_id
+                                )
                             if await self.job_is_finished(
-                                job=job, stage_flow=stage_flow
+                                job=job, stage_flow=stage_flow, snapshot=snapshot
                             ):
                                 logger.info(f"Run for {job.job_name} completed.")
 
@@ -119,33 +144,61 @@ class BoltRunner(Generic[T, U]):
                             if not stage.is_retryable:
                                 tries = max_tries + 1
 
+                            if stage_completed_at is not None:
+                                self.metrics.record_span(
+                                    stage=stage.name,
+                                    span=BoltSpan.STAGE_TRANSITION,
+                                    party=BoltParty.JOB,
+                                    duration=time() - stage_completed_at,
+                                )
+                                stage_completed_at = None
                             await self.run_next_stage(
                                 publisher_id=publisher_id,
                                 partner_id=partner_id,
                                 stage=stage,
                                 poll_interval=job.poll_interval,
                                 logger=logger,  # pyre-ignore
+                                snapshot=snapshot,
                             )
-                            await self.wait_stage_complete(
+                            # the statuses that completed the stage are the
+                            # starting point of the next tick
+                            snapshot = await self.wait_stage_complete(
                                 publisher_id=publisher_id,
                                 partner_id=partner_id,
                                 stage=stage,
                                 poll_interval=job.poll_interval,
                                 logger=logger,  # pyre-ignore
                             )
+                            stage_completed_at = time()
                             break
                         except Exception as e:
+                            # statuses may have changed, refresh on the next try
+                            snapshot = None
                             if tries >= max_tries:
+                                self.metrics.bump_counter(
+                                    stage=stage.name,
+                                    counter=BoltCounter.FAILURE,
+                                    party=BoltParty.JOB,
+                                )
                                 logger.exception(e)
                                 return False
+                            self.metrics.bump_counter(
+                                stage=stage.name,
+                                counter=BoltCounter.RETRY,
+                                party=BoltParty.JOB,
+                            )
                             logger.error(f"Error: type: {type(e)}, message: {e}")
                             logger.info(
                                 f"Retrying stage {stage}, Retries left: {self.num_tries - tries}."
                             )
-                            await asyncio.sleep(RETRY_INTERVAL)
+                            await asyncio.sleep(
+                                self.poll_schedule.get_poll_interval(
+                                    poll_interval=RETRY_INTERVAL, elapsed=0
+                                )
+                            )
                     # update stage
                     stage = await self.get_next_valid_stage(
-                        job=job, stage_flow=stage_flow
+                        job=job, stage_flow=stage_flow, snapshot=snapshot
                     )
                 results = await asyncio.gather(
                     *[
@@ -171,37 +224,49 @@ class BoltRunner(Generic[T, U]):
         stage: PrivateComputationBaseStageFlow,
         poll_interval: int,
         logger: Optional[logging.Logger] = None,
+        snapshot: Optional[BoltStatusSnapshot] = None,
     ) -> None:
         logger = logger or self.logger
-        publisher_status = (
-            await self.publisher_client.update_instance(publisher_id)
-        ).pc_instance_status
+        if snapshot is None:
+            snapshot = await self.get_status_snapshot(
+                publisher_id=publisher_id, partner_id=partner_id
+            )
+        publisher_status = snapshot.publisher_status
         if publisher_status not in [stage.started_status, stage.completed_status]:
             # don't retry if started or completed status
             logger.info(f"Publisher {publisher_id} starting stage {stage.name}.")
-            await self.publisher_client.run_stage(instance_id=publisher_id, stage=stage)
+            with self.metrics.span(
+                stage.name, BoltSpan.STAGE_START, BoltParty.PUBLISHER
+            ):
+                await self.publisher_client.run_stage(
+                    instance_id=publisher_id, stage=stage
+                )
 
         server_ips = None
         if stage.is_joint_stage:
-            server_ips = await self.get_server_ips_after_start(
-                instance_id=publisher_id,
-                stage=stage,
-                timeout=stage.timeout,
-                poll_interval=poll_interval,
-            )
+            with self.metrics.span(
+                stage.name, BoltSpan.SERVER_IPS_WAIT, BoltParty.PUBLISHER
+            ):
+                server_ips = await self.get_server_ips_after_start(
+                    instance_id=publisher_id,
+                    stage=stage,
+                    timeout=stage.timeout,
+                    poll_interval=poll_interval,
+                )
             if server_ips is None:
                 raise NoServerIpsException(
                     f"{stage.name} requires server ips but got none."
                 )
-        partner_status = (
-            await self.partner_client.update_instance(partner_id)
-        ).pc_instance_status
+        # the publisher's actions don't change the partner status, so the
+        # partner state of this tick is still valid
+        partner_status = snapshot.partner_status
         if partner_status not in [stage.started_status, stage.completed_status]:
             # don't retry if started or completed status
             logger.info(f"Partner {partner_id} starting stage {stage.name}.")
-            await self.partner_client.run_stage(
-                instance_id=partner_id, stage=stage, server_ips=server_ips
-            )
+            with self.metrics.span(stage.name, BoltSpan.STAGE_START, BoltParty.PARTNER):
+                await self.partner_client.run_stage(
+                    instance_id=partner_id, stage=stage, server_ips=server_ips
+                )
 
     async def get_server_ips_after_start(
         self,
@@ -229,7 +294,11 @@ class BoltRunner(Generic[T, U]):
             self.logger.info(
                 f"{instance_id} current status is {status}, waiting for {stage.started_status}."
             )
-            await asyncio.sleep(poll_interval)
+            await asyncio.sleep(
+                self.poll_schedule.get_poll_interval(
+                    poll_interval=poll_interval, elapsed=time() - start_time
+                )
+            )
         raise StageTimeoutException(
             f"Poll {instance_id} status timed out after {timeout}s expecting status {stage.started_status}."
         )
@@ -241,24 +310,49 @@ class BoltRunner(Generic[T, U]):
         stage: PrivateComputationBaseStageFlow,
         poll_interval: int,
         logger: Optional[logging.Logger] = None,
-    ) -> None:
+    ) -> BoltStatusSnapshot:
+        """Polls both parties until the stage is completed
+
+        Returns:
+            The snapshot in which both parties completed the stage
+        """
         logger = logger or self.logger
         fail_status = stage.failed_status
         complete_status = stage.completed_status
         timeout = stage.timeout
 
         start_time = time()
+        pending_parties = {BoltParty.PUBLISHER, BoltParty.PARTNER}
         while time() < start_time + timeout:
-            publisher_state, partner_state = await asyncio.gather(
-                self.publisher_client.update_instance(instance_id=publisher_id),
-                self.partner_client.update_instance(instance_id=partner_id),
+            snapshot = await self.get_status_snapshot(
+                publisher_id=publisher_id, partner_id=partner_id
             )
+            publisher_state = snapshot.publisher_state
+            partner_state = snapshot.partner_state
+            for party, state in (
+                (BoltParty.PUBLISHER, publisher_state),
+                (BoltParty.PARTNER, partner_state),
+            ):
+                if (
+                    party in pending_parties
+                    and state.pc_instance_status is complete_status
+                ):
+                    pending_parties.remove(party)
+                    self.metrics.record_span(
+                        stage=stage.name,
+                        span=BoltSpan.STAGE_RUNTIME,
+                        party=party,
+                        duration=time() - start_time,
+                    )
             if (
                 publisher_state.pc_instance_status is complete_status
                 and partner_state.pc_instance_status is complete_status
             ):
                 # stages complete
-                return
+                self.poll_schedule.record_stage_duration(
+                    stage=stage, duration=time() - start_time
+                )
+                return snapshot
             if (
                 publisher_state.pc_instance_status
                 in [fail_status, PrivateComputationInstanceStatus.TIMEOUT]
@@ -284,28 +378,53 @@ class BoltRunner(Generic[T, U]):
                 f"Publisher {publisher_id} status is {publisher_state.pc_instance_status}, Partner {partner_id} status is {partner_state.pc_instance_status}. Waiting for status {complete_status}."
             )
             # keep polling
-            await asyncio.sleep(poll_interval)
+            await asyncio.sleep(
+                self.poll_schedule.get_poll_interval(
+                    poll_interval=poll_interval,
+                    elapsed=time() - start_time,
+                    stage=stage,
+                )
+            )
         raise StageTimeoutException(
             f"Stage {stage.name} timed out after {timeout}s. Publisher status: {publisher_state.pc_instance_status}. Partner status: {partner_state.pc_instance_status}."
         )
 
+    async def get_status_snapshot(
+        self,
+        publisher_id: str,
+        partner_id: str,
+    ) -> BoltStatusSnapshot:
+        """Refreshes the publisher and partner instances concurrently
+
+        Args:
+            - publisher_id: Publisher instance_id
+            - partner_id: Partner instance_id
+
+        Returns:
+            The states of both instances, to be shared by every decision in a tick
+        """
+        publisher_state, partner_state = await asyncio.gather(
+            self.publisher_client.update_instance(instance_id=publisher_id),
+            self.partner_client.update_instance(instance_id=partner_id),
+        )
+        return BoltStatusSnapshot(
+            publisher_state=publisher_state, partner_state=partner_state
+        )
+
     async def job_is_finished(
         self,
         job: BoltJob[T, U],
         stage_flow: Type[PrivateComputationBaseStageFlow],
+        snapshot: Optional[BoltStatusSnapshot] = None,
     ) -> bool:
-        publisher_id = job.publisher_bolt_args.create_instance_args.instance_id
-        partner_id = job.partner_bolt_args.create_instance_args.instance_id
-        publisher_status, partner_status = (
-            state.pc_instance_status
-            for state in await asyncio.gather(
-                self.publisher_client.update_instance(publisher_id),
-                self.partner_client.update_instance(partner_id),
+        if snapshot is None:
+            snapshot = await self.get_status_snapshot(
+                publisher_id=job.publisher_bolt_args.create_instance_args.instance_id,
+                partner_id=job.partner_bolt_args.create_instance_args.instance_id,
             )
-        )
         return job.is_finished(
-            publisher_status=publisher_status,
-            partner_status=partner_status,
+            publisher_status=snapshot.publisher_status,
+            partner_status=snapshot.partner_status,
             stage_flow=stage_flow,
         )
 
@@ -341,6 +460,7 @@ class BoltRunner(Generic[T, U]):
         self,
         job: BoltJob[T, U],
         stage_flow: Type[PrivateComputationBaseStageFlow],
+        snapshot: Optional[BoltStatusSnapshot] = None,
     ) -> Optional[PrivateComputationBaseStageFlow]:
         """Gets the next stage that should be run.
 
@@ -349,19 +469,34 @@ class BoltRunner(Generic[T, U]):
 
         Args:
             - job: the job being run
+            - stage_flow: the stage flow of the job
+            - snapshot: the statuses of the current tick. If not given, both
+                instances are refreshed once and the result is shared.
 
         Returns:
             The next stage to be run, or None if the job is finished
         """
-        if not await self.job_is_finished(job=job, stage_flow=stage_flow):
-            publisher_id = job.publisher_bolt_args.create_instance_args.instance_id
+        publisher_id = job.publisher_bolt_args.create_instance_args.instance_id
+        partner_id = job.partner_bolt_args.create_instance_args.instance_id
+        if snapshot is None:
+            snapshot = await self.get_status_snapshot(
+                publisher_id=publisher_id, partner_id=partner_id
+            )
+        if not await self.job_is_finished(
+            job=job, stage_flow=stage_flow, snapshot=snapshot
+        ):
             publisher_stage = await self.publisher_client.get_valid_stage(
-                instance_id=publisher_id, stage_flow=stage_flow
+                instance_id=publisher_id,
+                stage_flow=stage_flow,
+                state=snapshot.publisher_state,
             )
-            partner_id = job.partner_bolt_args.create_instance_args.instance_id
             partner_stage = await self.partner_client.get_valid_stage(
-                instance_id=partner_id, stage_flow=stage_flow
+                instance_id=partner_id,
+                stage_flow=stage_flow,
+                state=snapshot.partner_state,
             )
+            publisher_status = snapshot.publisher_status
+            partner_status = snapshot.partner_status
 
             # this is expected for all joint stages
             if publisher_stage is partner_stage:
@@ -373,12 +508,6 @@ class BoltRunner(Generic[T, U]):
                 return publisher_stage
 
             elif publisher_stage is partner_stage.previous_stage:
-                publisher_status = (
-                    await self.publisher_client.update_instance(publisher_id)
-                ).pc_instance_status
-                partner_status = (
-                    await self.partner_client.update_instance(partner_id)
-                ).pc_instance_status
                 # if it's not a joint stage, the statuses don't matter at all since
                 # each party operates independently
                 # Example: publisher is RESHARD_FAILED, partner is RESHARD_COMPLETED
@@ -392,12 +521,6 @@ class BoltRunner(Generic[T, U]):
                 ):
                     return publisher_stage
             elif partner_stage is publisher_stage.previous_stage:
-                publisher_status = (
-                    await self.publisher_client.update_instance(publisher_id)
-                ).pc_instance_status
-                partner_status = (
-                    await self.partner_client.update_instance(partner_id)
-                ).pc_instance_status
                 # Example: publisher is RESHARD_COMPLETED, partner is RESHARD_FAILED
                 if not partner_stage.is_joint_stage or (
                     # Example: publisher is COMPUTATION_COMPLETED, partner is COMPUTATION_STARTED
@@ -446,7 +569,11 @@ class BoltRunner(Generic[T, U]):
                 self.logger.info(
                     f"Publisher instance status {status} invalid for calculation.\nPolling publisher instance expecting valid status."
                 )
-                await asyncio.sleep(poll_interval)
+                await asyncio.sleep(
+                    self.poll_schedule.get_poll_interval(
+                        poll_interval=poll_interval, elapsed=time() - start_time
+                    )
+                )
             raise WaitValidStatusTimeout(
                 f"Timed out waiting for publisher {instance_id} valid status. Status: {status}"
             )
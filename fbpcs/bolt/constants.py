@@ -19,6 +19,9 @@ from fbpcs.private_computation.stage_flows.private_computation_stage_flow import
 )
 
 DEFAULT_POLL_INTERVAL_SEC = 5
+DEFAULT_MAX_POLL_INTERVAL_SEC = 120
+DEFAULT_POLL_JITTER = 0.2
+DEFAULT_POLL_HISTORY_SIZE = 20
 DEFAULT_ATTRIBUTION_STAGE_FLOW = PrivateComputationPCF2StageFlow
 DEFAULT_LIFT_STAGE_FLOW = PrivateComputationStageFlow
 DEFAULT_MAX_PARALLEL_RUNS = 10
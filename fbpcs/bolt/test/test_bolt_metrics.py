@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+from unittest import mock
+
+from fbpcs.bolt.bolt_metrics import (
+    BOLT_METRIC_ENTITY,
+    BoltCounter,
+    BoltMetrics,
+    BoltParty,
+    BoltSpan,
+)
+
+
+class TestBoltMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.metric_svc = mock.MagicMock()
+        self.metrics = BoltMetrics(metric_svc=self.metric_svc)
+
+    def test_span_stats(self) -> None:
+        for duration in range(1, 101):
+            self.metrics.record_span(
+                "COMPUTE", BoltSpan.STAGE_RUNTIME, BoltParty.PUBLISHER, duration
+            )
+        stats = self.metrics.get_span_stats(
+            "COMPUTE", BoltSpan.STAGE_RUNTIME, BoltParty.PUBLISHER
+        )
+        self.assertIsNotNone(stats)
+        self.assertEqual(stats.count, 100)
+        self.assertEqual(stats.total, 5050)
+        self.assertEqual(stats.max, 100)
+        self.assertEqual(stats.percentiles, {50: 50, 90: 90, 99: 99})
+        self.assertIsNone(
+            self.metrics.get_span_stats(
+                "COMPUTE", BoltSpan.STAGE_RUNTIME, BoltParty.PARTNER
+            )
+        )
+
+    def test_emits_to_metric_service(self) -> None:
+        self.metrics.record_span(
+            "ID_MATCH", BoltSpan.STAGE_START, BoltParty.PARTNER, 1.5
+        )
+        self.metrics.bump_counter("ID_MATCH", BoltCounter.RETRY, BoltParty.JOB)
+        self.metric_svc.bump_entity_key.assert_has_calls(
+            [
+                mock.call(BOLT_METRIC_ENTITY, "ID_MATCH.partner.stage_start.count"),
+                mock.call(
+                    BOLT_METRIC_ENTITY, "ID_MATCH.partner.stage_start.duration_ms", 1500
+                ),
+                mock.call(BOLT_METRIC_ENTITY, "ID_MATCH.job.retry", 1),
+            ]
+        )
+        self.assertEqual(
+            self.metrics.get_counter("ID_MATCH", BoltCounter.RETRY, BoltParty.JOB), 1
+        )
+
+    @mock.patch("fbpcs.bolt.bolt_metrics.time", side_effect=[10, 13])
+    def test_span_context_records_on_error(self, mock_time) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.metrics.span(
+                "ID_MATCH", BoltSpan.SERVER_IPS_WAIT, BoltParty.PUBLISHER
+            ):
+                raise RuntimeError()
+        stats = self.metrics.get_span_stats(
+            "ID_MATCH", BoltSpan.SERVER_IPS_WAIT, BoltParty.PUBLISHER
+        )
+        self.assertEqual(stats.total, 3)
+
+    def test_summary_sorted_by_total_time(self) -> None:
+        self.metrics.record_span("A", BoltSpan.STAGE_RUNTIME, BoltParty.PUBLISHER, 1)
+        self.metrics.record_span("B", BoltSpan.STAGE_RUNTIME, BoltParty.PUBLISHER, 5)
+        self.metrics.record_span("C", BoltSpan.STAGE_START, BoltParty.PARTNER, 3)
+        self.assertEqual(
+            [stats.stage for stats in self.metrics.get_summary()], ["B", "C", "A"]
+        )
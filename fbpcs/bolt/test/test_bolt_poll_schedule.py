@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import random
+import unittest
+from typing import Tuple
+
+from fbpcs.bolt.bolt_poll_schedule import (
+    BoltAdaptivePollSchedule,
+    BoltFixedPollSchedule,
+    BoltPollSchedule,
+)
+from fbpcs.private_computation.stage_flows.private_computation_stage_flow import (
+    PrivateComputationStageFlow,
+)
+
+
+class TestBoltPollSchedule(unittest.TestCase):
+    def setUp(self) -> None:
+        self.stage = PrivateComputationStageFlow.COMPUTE
+        self.schedule = BoltAdaptivePollSchedule(
+            max_interval=120, jitter=0, rng=random.Random(0)
+        )
+
+    def test_fixed_schedule(self) -> None:
+        schedule = BoltFixedPollSchedule()
+        self.assertEqual(schedule.get_poll_interval(5, 1000, self.stage), 5)
+
+    def test_no_history_backs_off(self) -> None:
+        self.assertEqual(self.schedule.get_poll_interval(5, 0, self.stage), 5)
+        self.assertEqual(self.schedule.get_poll_interval(5, 300, self.stage), 30)
+        # bounded by max_interval
+        self.assertEqual(self.schedule.get_poll_interval(5, 3000, self.stage), 120)
+
+    def test_history_polls_densely_near_expected_completion(self) -> None:
+        for duration in (900, 1000, 1100):
+            self.schedule.record_stage_duration(self.stage, duration)
+        self.assertEqual(self.schedule.get_expected_duration(self.stage), 1000)
+        self.assertIsNone(
+            self.schedule.get_expected_duration(PrivateComputationStageFlow.AGGREGATE)
+        )
+
+        self.assertEqual(self.schedule.get_poll_interval(5, 0, self.stage), 120)
+        self.assertEqual(self.schedule.get_poll_interval(5, 900, self.stage), 50)
+        self.assertEqual(self.schedule.get_poll_interval(5, 995, self.stage), 5)
+
+    def test_bounded_by_stage_timeout(self) -> None:
+        stage = PrivateComputationStageFlow.PID_SHARD
+        schedule = BoltAdaptivePollSchedule(max_interval=1000, jitter=0)
+        self.assertEqual(
+            schedule.get_poll_interval(5, 10_000, stage),
+            stage.timeout * 0.05,
+        )
+
+    def test_jitter(self) -> None:
+        schedule = BoltAdaptivePollSchedule(jitter=0.2, rng=random.Random(0))
+        intervals = {schedule.get_poll_interval(10, 0) for _ in range(100)}
+        self.assertGreater(len(intervals), 1)
+        for interval in intervals:
+            self.assertGreaterEqual(interval, 8)
+            self.assertLessEqual(interval, 12)
+
+        with self.assertRaises(ValueError):
+            BoltAdaptivePollSchedule(jitter=1)
+
+    def test_fewer_polls_with_low_lag(self) -> None:
+        duration = 1800
+        fixed_polls, fixed_lag = self._simulate(BoltFixedPollSchedule(), duration)
+
+        schedule = BoltAdaptivePollSchedule(rng=random.Random(0))
+        schedule.record_stage_duration(self.stage, duration)
+        adaptive_polls, adaptive_lag = self._simulate(schedule, duration)
+
+        self.assertLessEqual(adaptive_polls * 5, fixed_polls)
+        self.assertLessEqual(adaptive_lag, 10)
+        self.assertLessEqual(fixed_lag, 5)
+
+    def _simulate(
+        self, schedule: BoltPollSchedule, duration: float
+    ) -> Tuple[int, float]:
+        """Returns the number of polls and the detection lag of a stage wait"""
+        elapsed = 0.0
+        polls = 1
+        while elapsed < duration:
+            elapsed += schedule.get_poll_interval(5, elapsed, self.stage)
+            polls += 1
+        return polls, elapsed - duration
@@ -6,11 +6,13 @@
 
 
 import unittest
-from typing import List, Optional, Tuple
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Type
 from unittest import mock
 
-from fbpcs.bolt.bolt_client import BoltState
-from fbpcs.bolt.bolt_job import BoltJob
+from fbpcs.bolt.bolt_client import BoltClient, BoltState
+from fbpcs.bolt.bolt_job import BoltCreateInstanceArgs, BoltJob, BoltPlayerArgs
+from fbpcs.bolt.bolt_metrics import BOLT_METRIC_ENTITY, BoltParty, BoltSpan
 from fbpcs.bolt.bolt_runner import BoltRunner
 from fbpcs.bolt.constants import DEFAULT_NUM_TRIES
 from fbpcs.bolt.exceptions import IncompatibleStageError, StageFailedException
@@ -458,6 +460,80 @@ class TestBoltRunner(unittest.IsolatedAsyncioTestCase):
                         stage_flow=PrivateComputationStageFlow,
                     )
 
+    async def test_status_refreshed_once_per_tick(self) -> None:
+        publisher_client = FakeBoltClient(DummyNonJointStageFlow)
+        partner_client = FakeBoltClient(DummyNonJointStageFlow)
+        runner = BoltRunner(
+            publisher_client=publisher_client,
+            partner_client=partner_client,
+        )
+        test_job = BoltJob(
+            job_name="test",
+            publisher_bolt_args=BoltPlayerArgs(
+                create_instance_args=BoltCreateInstanceArgs(instance_id="pub_id")
+            ),
+            partner_bolt_args=BoltPlayerArgs(
+                create_instance_args=BoltCreateInstanceArgs(instance_id="part_id")
+            ),
+        )
+
+        with self.subTest("get_next_valid_stage"):
+            next_stage = await runner.get_next_valid_stage(
+                job=test_job, stage_flow=DummyNonJointStageFlow
+            )
+            self.assertEqual(next_stage, DummyNonJointStageFlow.NON_JOINT_STAGE)
+            self.assertEqual(publisher_client.update_calls["pub_id"], 1)
+            self.assertEqual(partner_client.update_calls["part_id"], 1)
+
+        publisher_client.update_calls.clear()
+        partner_client.update_calls.clear()
+        with self.subTest("run_async"):
+            self.assertEqual(await runner.run_async([test_job]), [True])
+            # publisher: get_or_create_instance, wait_valid_publisher_status,
+            # first tick, stage completion tick
+            self.assertEqual(publisher_client.update_calls["pub_id"], 4)
+            # partner: get_or_create_instance, first tick, stage completion tick
+            self.assertEqual(partner_client.update_calls["part_id"], 3)
+
+    async def test_run_records_stage_metrics(self) -> None:
+        mock_metric_svc = mock.MagicMock()
+        runner = BoltRunner(
+            publisher_client=FakeBoltClient(DummyNonJointStageFlow),
+            partner_client=FakeBoltClient(DummyNonJointStageFlow),
+            metric_svc=mock_metric_svc,
+        )
+        test_job = BoltJob(
+            job_name="test",
+            publisher_bolt_args=BoltPlayerArgs(
+                create_instance_args=BoltCreateInstanceArgs(instance_id="pub_id")
+            ),
+            partner_bolt_args=BoltPlayerArgs(
+                create_instance_args=BoltCreateInstanceArgs(instance_id="part_id")
+            ),
+        )
+        self.assertEqual(await runner.run_async([test_job]), [True])
+
+        stage = DummyNonJointStageFlow.NON_JOINT_STAGE.name
+        for span, party in (
+            (BoltSpan.STAGE_START, BoltParty.PUBLISHER),
+            (BoltSpan.STAGE_START, BoltParty.PARTNER),
+            (BoltSpan.STAGE_RUNTIME, BoltParty.PUBLISHER),
+            (BoltSpan.STAGE_RUNTIME, BoltParty.PARTNER),
+        ):
+            with self.subTest(span=span, party=party):
+                stats = runner.metrics.get_span_stats(stage, span, party)
+                self.assertIsNotNone(stats)
+                self.assertEqual(stats.count, 1)
+        # non joint stages don't wait for server ips
+        self.assertIsNone(
+            runner.metrics.get_span_stats(
+                stage, BoltSpan.SERVER_IPS_WAIT, BoltParty.PUBLISHER
+            )
+        )
+        mock_metric_svc.bump_entity_key.assert_any_call(
+            BOLT_METRIC_ENTITY, f"{stage}.publisher.stage_runtime.count"
+        )
+
     @mock.patch("fbpcs.bolt.bolt_job.BoltPlayerArgs")
     @mock.patch("fbpcs.bolt.bolt_job.BoltPlayerArgs")
     def _prepare_one_sided_failure_retry(
@@ -866,6 +942,51 @@ class TestBoltRunner(unittest.IsolatedAsyncioTestCase):
         ]
 
 
+class FakeBoltClient(BoltClient[BoltCreateInstanceArgs]):
+    """Local BoltClient that counts instance refreshes
+
+    A started stage is reported as completed on the next refresh.
+    """
+
+    def __init__(self, stage_flow: Type[PrivateComputationBaseStageFlow]) -> None:
+        super().__init__()
+        self.stage_flow = stage_flow
+        self.statuses: Dict[str, PrivateComputationInstanceStatus] = {}
+        self.update_calls: Counter = Counter()
+
+    async def create_instance(self, instance_args: BoltCreateInstanceArgs) -> str:
+        return instance_args.instance_id
+
+    async def get_stage_flow(
+        self, instance_id: str
+    ) -> Optional[Type[PrivateComputationBaseStageFlow]]:
+        return self.stage_flow
+
+    async def run_stage(
+        self,
+        instance_id: str,
+        stage: Optional[PrivateComputationBaseStageFlow] = None,
+        server_ips: Optional[List[str]] = None,
+    ) -> None:
+        if stage is not None:
+            self.statuses[instance_id] = stage.started_status
+
+    async def update_instance(self, instance_id: str) -> BoltState:
+        self.update_calls[instance_id] += 1
+        status = self.statuses.get(
+            instance_id, self.stage_flow.get_first_stage().completed_status
+        )
+        if self.stage_flow.is_started_status(status):
+            status = self.stage_flow.get_stage_from_status(status).completed_status
+        self.statuses[instance_id] = status
+        return BoltState(status)
+
+    async def validate_results(
+        self, instance_id: str, expected_result_path: Optional[str] = None
+    ) -> bool:
+        return True
+
+
 class DummyJointStageFlow(PrivateComputationBaseStageFlow):
     CREATED = PrivateComputationStageFlowData(
         initialized_status=PrivateComputationInstanceStatus.CREATION_INITIALIZED,
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Compiled encoders and decoders for dataclasses_json dataclasses
+
+Serializing through the marshmallow schema of a dataclasses_json dataclass
+rebuilds the schema classes on every call, and deserializing runs every value
+through marshmallow and then again through dataclasses_json. The functions in
+this module compile a plain python function per dataclass once instead:
+
+    - encoders are compiled from the marshmallow schema itself, so dump()
+      returns exactly what schema().dump() would, with the keys in the same
+      order, and produces byte-identical json
+    - decoders are compiled from the dataclass type hints, the same way
+      dataclasses_json decodes after marshmallow has run
+
+Only well-formed values are handled. Anything that the marshmallow path
+would coerce, warn about or reject raises InstanceCodecError, so callers can
+fall back to the schema, which stays the reference for validation.
+"""
+
+import dataclasses
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    get_type_hints,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from dataclasses_json.core import _user_overrides_or_exts
+from dataclasses_json.mm import _UnionField
+from fbpcs.common.entity.exceptions import InstanceCodecError
+from marshmallow import fields, Schema
+from marshmallow_enum import EnumField
+
+T = TypeVar("T")
+
+# key that dataclasses_json adds to dataclasses serialized in a Union field
+UNION_TYPE_KEY = "__type"
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+# marshmallow fields that dump the value as is
+_RAW_FIELDS: Tuple[Type[fields.Field], ...] = (fields.Raw, fields.Field)
+# marshmallow fields that dump values of these exact types as is
+_PRIMITIVE_FIELDS: Dict[Type[fields.Field], Type[Any]] = {
+    fields.String: str,
+    fields.Integer: int,
+    fields.Float: float,
+    fields.Boolean: bool,
+}
+_SET_TYPES = (set, frozenset, Set, FrozenSet)
+
+_encoders: Dict[Type[Any], Encoder] = {}
+_decoders: Dict[Type[Any], "_DataclassDecoder"] = {}
+
+
+def dump(obj: Any, cls: Optional[Type[Any]] = None) -> Dict[str, Any]:
+    """Returns the same dict as cls.schema().dump(obj)
+
+    Args:
+        - obj: the dataclass instance to serialize
+        - cls: the dataclass whose schema is used, defaults to type(obj)
+
+    Raises:
+        InstanceCodecError: the schema or a value isn't supported
+    """
+    cls = type(obj) if cls is None else cls
+    encoder = _encoders.get(cls)
+    if encoder is None:
+        encoder = _encoders[cls] = _compile_schema_encoder(cls.schema())
+    return encoder(obj)
+
+
+def load(cls: Type[T], json_object: Any, exclude_unknown: bool = False) -> T:
+    """Decodes a dict produced by dump() or cls.schema().dump()
+
+    Args:
+        - cls: the dataclass to decode
+        - json_object: the serialized dataclass
+        - exclude_unknown: ignore keys that aren't fields of cls, like
+            marshmallow.EXCLUDE. Unknown keys in nested dataclasses are
+            always an error.
+
+    Raises:
+        InstanceCodecError: the dataclass or a value isn't supported, e.g.
+            a value the marshmallow schema would coerce or reject
+    """
+    return _get_decoder(cls).decode(json_object, exclude_unknown)
+
+
+def _compile_schema_encoder(schema: Schema) -> Encoder:
+    field_encoders = [
+        (
+            attr_name,
+            attr_name if field.data_key is None else field.data_key,
+            _compile_field_encoder(field),
+        )
+        for attr_name, field in schema.dump_fields.items()
+    ]
+
+    def encode(obj: Any) -> Dict[str, Any]:
+        try:
+            return {
+                key: encoder(getattr(obj, attr_name))
+                for attr_name, key, encoder in field_encoders
+            }
+        except AttributeError as e:
+            raise InstanceCodecError(str(e)) from e
+
+    return encode
+
+
+def _compile_field_encoder(field: fields.Field) -> Encoder:
+    field_type = type(field)
+    if field_type in _PRIMITIVE_FIELDS:
+        return _compile_primitive_encoder(_PRIMITIVE_FIELDS[field_type])
+    if field_type in _RAW_FIELDS:
+        return _encode_raw
+    if isinstance(field, EnumField):
+        return _encode_enum
+    if field_type is fields.Nested:
+        schema_encoder = _compile_schema_encoder(field.schema)
+        if field.many or field.schema.many:
+            return _compile_list_encoder(schema_encoder)
+        return _compile_optional(schema_encoder)
+    if field_type is fields.List:
+        return _compile_list_encoder(_compile_field_encoder(field.inner))
+    if field_type is fields.Dict:
+        return _compile_dict_encoder(field)
+    if field_type is _UnionField:
+        return _compile_union_encoder(field)
+    raise InstanceCodecError(f"Unsupported marshmallow field {field_type.__name__}")
+
+
+def _encode_raw(value: Any) -> Any:
+    return value
+
+
+def _encode_enum(value: Any) -> Any:
+    if value is None:
+        return None
+    if not isinstance(value, Enum):
+        raise InstanceCodecError(f"{value!r} is not an Enum")
+    return value.value
+
+
+def _compile_optional(encoder: Encoder) -> Encoder:
+    def encode(value: Any) -> Any:
+        return None if value is None else encoder(value)
+
+    return encode
+
+
+def _compile_primitive_encoder(expected_type: Type[Any]) -> Encoder:
+    def encode(value: Any) -> Any:
+        # other types would be coerced by the marshmallow field (e.g. str(value))
+        if value is not None and type(value) is not expected_type:
+            raise InstanceCodecError(f"{value!r} is not a {expected_type.__name__}")
+        return value
+
+    return encode
+
+
+def _compile_list_encoder(inner: Encoder) -> Encoder:
+    def encode(value: Any) -> Any:
+        if value is None:
+            return None
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            raise InstanceCodecError(f"{value!r} is not a collection")
+        return [inner(item) for item in value]
+
+    return encode
+
+
+def _compile_dict_encoder(field: fields.Dict) -> Encoder:
+    if field.key_field is None and field.value_field is None:
+        return _encode_raw
+    if field.key_field is not None and type(field.key_field) is not fields.String:
+        raise InstanceCodecError(f"Unsupported dict key field {field.key_field}")
+    value_encoder = (
+        _encode_raw
+        if field.value_field is None
+        else _compile_field_encoder(field.value_field)
+    )
+
+    def encode(value: Any) -> Any:
+        if value is None:
+            return None
+        result = {}
+        for k, v in value.items():
+            if type(k) is not str:
+                raise InstanceCodecError(f"{k!r} is not a str")
+            result[k] = value_encoder(v)
+        return result
+
+    return encode
+
+
+def _compile_union_encoder(field: _UnionField) -> Encoder:
+    variants = []
+    for variant, variant_field in field.desc.items():
+        if not dataclasses.is_dataclass(variant):
+            raise InstanceCodecError(f"Unsupported union variant {variant}")
+        variants.append((variant, _compile_field_encoder(variant_field)))
+
+    def encode(value: Any) -> Any:
+        if value is None:
+            return None
+        # like dataclasses_json, the first variant the value is an instance of wins
+        for variant, encoder in variants:
+            if issubclass(type(value), variant):
+                result = encoder(value)
+                result[UNION_TYPE_KEY] = variant.__name__
+                return result
+        raise InstanceCodecError(f"{type(value).__name__} is not in {field.desc}")
+
+    return encode
+
+
+class _DataclassDecoder:
+    def __init__(self, cls: Type[Any]) -> None:
+        self.cls = cls
+        # field name -> (decoder, whether it's passed to __init__)
+        self.fields: Dict[str, Tuple[Decoder, bool]] = {}
+
+    def compile(self) -> None:
+        overrides = _user_overrides_or_exts(self.cls)
+        type_hints = get_type_hints(self.cls)
+        for field in dataclasses.fields(self.cls):
+            override = overrides.get(field.name)
+            if override is not None and (
+                override.decoder is not None or override.letter_case is not None
+            ):
+                raise InstanceCodecError(
+                    f"{self.cls.__name__}.{field.name} has a custom decoder"
+                )
+            self.fields[field.name] = (
+                _compile_decoder(type_hints[field.name]),
+                field.init,
+            )
+
+    def decode(self, json_object: Any, exclude_unknown: bool = False) -> Any:
+        if type(json_object) is not dict:
+            raise InstanceCodecError(f"{json_object!r} is not a dict")
+        kwargs = {}
+        for key, value in json_object.items():
+            field = self.fields.get(key)
+            if field is None:
+                if exclude_unknown:
+                    continue
+                raise InstanceCodecError(f"Unknown field {key} of {self.cls.__name__}")
+            decoder, init = field
+            # values of fields that aren't init arguments are still validated
+            value = decoder(value)
+            if init:
+                kwargs[key] = value
+        try:
+            return self.cls(**kwargs)
+        except TypeError as e:
+            # e.g. a missing required field
+            raise InstanceCodecError(str(e)) from e
+
+
+def _get_decoder(cls: Type[Any]) -> _DataclassDecoder:
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = _DataclassDecoder(cls)
+        # registered before compiling so recursive types find it
+        _decoders[cls] = decoder
+        try:
+            decoder.compile()
+        except Exception:
+            del _decoders[cls]
+            raise
+    return decoder
+
+
+def _compile_decoder(type_: Any) -> Decoder:
+    # NewType
+    while hasattr(type_, "__supertype__"):
+        type_ = type_.__supertype__
+
+    if type_ is Any:
+        return _decode_raw
+    if type_ in (str, int, float, bool):
+        return _compile_primitive_decoder(type_)
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return _compile_enum_decoder(type_)
+    if dataclasses.is_dataclass(type_):
+        decoder = _get_decoder(type_)
+        return lambda value: decoder.decode(value)
+
+    origin = getattr(type_, "__origin__", None)
+    args = getattr(type_, "__args__", ())
+    if origin is Union:
+        variants = [arg for arg in args if arg is not type(None)]
+        if len(variants) < len(args):
+            if len(variants) == 1:
+                return _compile_optional_decoder(_compile_decoder(variants[0]))
+            return _compile_optional_decoder(_compile_union_decoder(variants))
+        return _compile_union_decoder(variants)
+    if origin in (list, List):
+        return _compile_collection_decoder(_compile_decoder(args[0]), list)
+    if origin in _SET_TYPES:
+        return _compile_collection_decoder(
+            _compile_decoder(args[0]), frozenset if origin is frozenset else set
+        )
+    if origin in (dict, Dict):
+        if args and args[0] not in (str, Any):
+            raise InstanceCodecError(f"Unsupported dict key type {args[0]}")
+        return _compile_dict_decoder(_compile_decoder(args[1]) if args else _decode_raw)
+    raise InstanceCodecError(f"Unsupported type {type_}")
+
+
+def _decode_raw(value: Any) -> Any:
+    return value
+
+
+def _compile_optional_decoder(decoder: Decoder) -> Decoder:
+    def decode(value: Any) -> Any:
+        return None if value is None else decoder(value)
+
+    return decode
+
+
+def _compile_primitive_decoder(expected_type: Type[Any]) -> Decoder:
+    def decode(value: Any) -> Any:
+        # marshmallow would coerce e.g. "1" or 1.0 to an int
+        if type(value) is not expected_type:
+            raise InstanceCodecError(f"{value!r} is not a {expected_type.__name__}")
+        return value
+
+    return decode
+
+
+def _compile_enum_decoder(enum_cls: Type[Enum]) -> Decoder:
+    def decode(value: Any) -> Any:
+        try:
+            return enum_cls(value)
+        except ValueError as e:
+            raise InstanceCodecError(str(e)) from e
+
+    return decode
+
+
+def _compile_collection_decoder(inner: Decoder, collection_type: Type[Any]) -> Decoder:
+    def decode(value: Any) -> Any:
+        if type(value) is not list:
+            raise InstanceCodecError(f"{value!r} is not a list")
+        return collection_type([inner(item) for item in value])
+
+    return decode
+
+
+def _compile_dict_decoder(value_decoder: Decoder) -> Decoder:
+    def decode(value: Any) -> Any:
+        if type(value) is not dict:
+            raise InstanceCodecError(f"{value!r} is not a dict")
+        return {k: value_decoder(v) for k, v in value.items()}
+
+    return decode
+
+
+def _compile_union_decoder(variants: List[Any]) -> Decoder:
+    decoders = {}
+    for variant in variants:
+        if not dataclasses.is_dataclass(variant):
+            raise InstanceCodecError(f"Unsupported union variant {variant}")
+        # like dataclasses_json, the first variant with the serialized name wins
+        decoders.setdefault(variant.__name__, _get_decoder(variant))
+
+    def decode(value: Any) -> Any:
+        if type(value) is not dict:
+            raise InstanceCodecError(f"{value!r} is not a dict")
+        decoder = decoders.get(value.get(UNION_TYPE_KEY))
+        if decoder is None:
+            # e.g. a variant that was removed from the union, which
+            # dataclasses_json leaves as a dict
+            raise InstanceCodecError(
+                f"Unknown union variant {value.get(UNION_TYPE_KEY)}"
+            )
+        value = dict(value)
+        del value[UNION_TYPE_KEY]
+        return decoder.decode(value)
+
+    return decode
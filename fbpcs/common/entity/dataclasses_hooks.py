@@ -7,7 +7,19 @@
 from abc import abstractmethod
 from dataclasses import dataclass
 from enum import auto, Enum
-from typing import Any, ClassVar, Dict, Generic, Iterable, List, Optional, TypeVar
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from weakref import WeakSet
 
 
 class HookEventType(Enum):
@@ -40,23 +52,68 @@ class DataclassHook(Generic[T]):
         ...
 
 
+@dataclass
+class FieldTable:
+    """The hooks of every field of a dataclass, compiled from the field metadata
+
+    Public attributes:
+        cls: the dataclass the table was compiled for
+        hooks: field name -> hook event -> hooks, in field metadata order
+        base_setattr: the __setattr__ that DataclassHookMixin extends
+    """
+
+    cls: Type[Any]
+    hooks: Dict[str, Dict[HookEventType, Tuple[DataclassHook, ...]]]
+    base_setattr: Callable[[Any, str, Any], None]
+
+
+# classes that have a compiled field table
+_compiled_classes: "WeakSet[Type[Any]]" = WeakSet()
+
+
+def invalidate_field_tables() -> None:
+    """Drops the compiled field tables, so they are rebuilt on next use
+
+    This must be called when field metadata is replaced after the class has
+    been created, like FrozenFieldHook does.
+    """
+    for cls in list(_compiled_classes):
+        cls._field_table = None
+    _compiled_classes.clear()
+
+
 @dataclass
 class DataclassHookMixin:
     HOOK_METADATA_STR: ClassVar[str] = "DataclassHook_metadata_str"
+    # compiled by _get_field_table on first use, per class
+    _field_table: ClassVar[Optional[FieldTable]] = None
 
     def __setattr__(self, name: str, value: Any) -> None:
+        table = self._field_table
+        if table is None or table.cls is not type(self):
+            table = self._get_field_table()
+        self._setattr_with_hooks(table, name, value)
+
+    def _setattr_with_hooks(self, table: FieldTable, name: str, value: Any) -> None:
+        # raises KeyError if name isn't a field, like __dataclass_fields__[name]
+        hooks = table.hooks[name]
+        if not hooks:
+            # no hooks to run, whatever the previous value
+            table.base_setattr(self, name, value)
+            return
+
         old_value = getattr(self, name, None)
         # if the field was previously defined
         if old_value:
             # If so, run the PRE_UPDATE hooks, set the field, then run the POST_UPDATE hooks
             self._run_hooks(HookEventType.PRE_UPDATE, name, old_value, value)
-            super().__setattr__(name, value)
+            table.base_setattr(self, name, value)
             self._run_hooks(HookEventType.POST_UPDATE, name, old_value, value)
         else:
             # If not, run the PRE_INIT hooks, set the field, then run the POST_INIT hooks
             self._run_hooks(HookEventType.PRE_INIT, name, None, value)
-            # use super here to avoid calling self.setter, which causes stack overflow
-            super().__setattr__(name, value)
+            # use the base setattr here to avoid calling self.setter, which causes stack overflow
+            table.base_setattr(self, name, value)
             self._run_hooks(HookEventType.POST_INIT, name, None, value)
 
     def __delattr__(self, name: str) -> None:
@@ -72,22 +129,46 @@ class DataclassHookMixin:
         del self.__dict__[name]
         self._run_hooks(HookEventType.POST_DELETE, name, old_value)
 
+    @classmethod
+    def _get_field_table(cls) -> FieldTable:
+        """Returns the field table of cls, compiling it on first use
+
+        Fields are only known once the dataclass decorator has run, which is
+        after the class is created, so the table can't be built any earlier.
+        """
+        table = cls._field_table
+        # a table inherited from a base class doesn't know the subclass fields
+        if table is None or table.cls is not cls:
+            table = cls._field_table = cls._compile_field_table()
+            _compiled_classes.add(cls)
+        return table
+
+    @classmethod
+    def _compile_field_table(cls) -> FieldTable:
+        hooks = {}
+        # pyre-fixme Undefined attribute [16]: DataclassHookMixin has no attribute __dataclass_fields__
+        for field_name, field_obj in cls.__dataclass_fields__.items():
+            hook_pool: Iterable[DataclassHook] = (
+                field_obj.metadata.get(DataclassHookMixin.HOOK_METADATA_STR) or ()
+            )
+            hooks_by_event = {}
+            for hook_type in HookEventType:
+                event_hooks = tuple(h for h in hook_pool if hook_type in h.triggers)
+                if event_hooks:
+                    hooks_by_event[hook_type] = event_hooks
+            hooks[field_name] = hooks_by_event
+        return FieldTable(
+            cls=cls,
+            hooks=hooks,
+            base_setattr=super(DataclassHookMixin, cls).__setattr__,
+        )
+
     def _get_hooks(
         self,
         hook_type: HookEventType,
         field_name: str,
     ) -> Iterable[DataclassHook]:
-        hooks: List[DataclassHook] = []
-        # pyre-fixme Undefined attribute [16]: DataclassHookMixin has no attribute __dataclass_fields__
-        hook_pool: Iterable[DataclassHook] = self.__dataclass_fields__[
-            field_name
-        ].metadata.get(DataclassHookMixin.HOOK_METADATA_STR)
-        if hook_pool is not None:
-            for h in hook_pool:
-                triggers: Iterable[HookEventType] = h.triggers
-                if hook_type in triggers:
-                    hooks.append(h)
-        return hooks
+        return self._get_field_table().hooks[field_name].get(hook_type, ())
 
     def _run_hooks(
         self,
@@ -7,9 +7,9 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import partial
-from typing import Any, TypeVar
+from typing import Any, FrozenSet, TypeVar
 
-from fbpcs.common.entity.dataclasses_hooks import DataclassHookMixin
+from fbpcs.common.entity.dataclasses_hooks import DataclassHookMixin, FieldTable
 from fbpcs.common.entity.exceptions import InstanceFrozenFieldError
 
 
@@ -40,20 +40,43 @@ class DataclassMutabilityMixin(DataclassHookMixin):
         self.initialized = True
 
     def __setattr__(self, name: str, value: Any) -> None:
-        # if setattr is called after initialization
-        if self.initialized:
+        table = self._field_table
+        if table is None or table.cls is not type(self):
+            table = self._get_field_table()
+        # if setattr is called after initialization on an immutable field
+        # pyre-ignore Undefined attribute [16]: compiled by _compile_field_table
+        if self.initialized and name in table.frozen_fields:
             # if we cannot find it, this field has not been initialized yet
             try:
                 self.__getattribute__(name)
             except AttributeError:
-                DataclassHookMixin.__setattr__(self, name, value)
+                pass
             else:
-                # if this field has been initialized and it is immutable
-                # pyre-fixme Undefined attribute [16]: InstanceBase has no attribute __dataclass_fields__
-                if self.__dataclass_fields__[name].metadata.get(IS_FROZEN_FIELD, False):
-                    raise InstanceFrozenFieldError(name)
-                else:
-                    DataclassHookMixin.__setattr__(self, name, value)
+                raise InstanceFrozenFieldError(name)
+        if table.hooks[name]:
+            self._setattr_with_hooks(table, name, value)
         else:
-            # if setattr is called during initialization
-            DataclassHookMixin.__setattr__(self, name, value)
+            # fast path of _setattr_with_hooks
+            table.base_setattr(self, name, value)
+
+    @classmethod
+    def _compile_field_table(cls) -> "MutabilityFieldTable":
+        table = super()._compile_field_table()
+        return MutabilityFieldTable(
+            cls=table.cls,
+            hooks=table.hooks,
+            base_setattr=table.base_setattr,
+            frozen_fields=frozenset(
+                field_name
+                # pyre-fixme Undefined attribute [16]: DataclassMutabilityMixin has no attribute __dataclass_fields__
+                for field_name, field_obj in cls.__dataclass_fields__.items()
+                if field_obj.metadata.get(IS_FROZEN_FIELD, False)
+            ),
+        )
+
+
+@dataclass
+class MutabilityFieldTable(FieldTable):
+    """FieldTable that also lists the immutable fields"""
+
+    frozen_fields: FrozenSet[str] = frozenset()
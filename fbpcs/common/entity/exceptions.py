@@ -34,3 +34,9 @@ class MissingRangeHookError(RuntimeError, HookError):
     def __init__(self, name: str) -> None:
         msg = f"Cannot create a range hook of {name} because min and max value are both missing."
         super().__init__(msg)
+
+
+class InstanceCodecError(RuntimeError, InstanceBaseError):
+    """Raised when a value or type isn't handled by the compiled instance codec"""
+
+    pass
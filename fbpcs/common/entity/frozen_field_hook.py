@@ -11,6 +11,7 @@ from fbpcs.common.entity.dataclasses_hooks import (
     DataclassHook,
     DataclassHookMixin,
     HookEventType,
+    invalidate_field_tables,
 )
 from fbpcs.common.entity.dataclasses_mutability import (
     IS_FROZEN_FIELD,
@@ -72,5 +73,7 @@ class FrozenFieldHook(DataclassHook[T]):
                 # it is a "mappingproxy" object, not a real dict)
                 field_obj.metadata = {
                     **MutabilityMetadata.IMMUTABLE.value,
-                    **DataclassHookMixin.get_metadata(hooks),
+                    **DataclassHookMixin.get_metadata(*hooks),
                 }
+            # the immutable fields are compiled per class from the metadata
+            invalidate_field_tables()
@@ -16,6 +16,7 @@ from fbpcp.service.onedocker import OneDockerService
 from fbpcp.util.typing import checked_cast
 from fbpcs.common.entity.instance_base import InstanceBase
 from fbpcs.common.entity.pcs_container_instance import PCSContainerInstance
+from fbpcs.common.service.container_refresh import refresh_containers
 
 
 class StageStateInstanceStatus(Enum):
@@ -81,21 +82,8 @@ class StageStateInstance(InstanceBase):
     def _update_containers(
         self, onedocker_svc: OneDockerService
     ) -> List[ContainerInstance]:
-        return [
-            self._update_container(onedocker_svc, container)
-            for container in self.containers
-        ]
-
-    def _update_container(
-        self, onedocker_svc: OneDockerService, container: ContainerInstance
-    ) -> ContainerInstance:
         # Stop updating from OneDocker, when the container is already stopped.
-        if container.status in (
-            ContainerInstanceStatus.COMPLETED,
-            ContainerInstanceStatus.FAILED,
-        ):
-            return container
-        return onedocker_svc.get_container(container.instance_id) or container
+        return refresh_containers(onedocker_svc, self.containers)
 
     def stop_containers(self, onedocker_svc: OneDockerService) -> None:
         container_ids = [instance.instance_id for instance in self.containers]
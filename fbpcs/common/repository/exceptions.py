@@ -0,0 +1,12 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+
+class InstanceVersionConflictError(RuntimeError):
+    def __init__(self, instance_id: str, expected_version: int) -> None:
+        msg = f"{instance_id} was updated by someone else since version {expected_version} was read"
+        super().__init__(msg)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from time import time
+from typing import Iterator, List, Optional, Tuple
+
+from fbpcs.common.entity.instance_base import InstanceBase
+from fbpcs.common.repository.exceptions import InstanceVersionConflictError
+
+DEFAULT_TABLE = "instances"
+# seconds to wait for a lock held by another connection
+DEFAULT_BUSY_TIMEOUT = 30
+
+
+class SqliteInstanceRepository:
+    """Stores serialized instances in a SQLite database in WAL mode
+
+    Every write is its own transaction, so concurrent writers from threads,
+    coroutines or processes never see or leave a partially written instance.
+    Each row carries a version that is bumped on every update, which callers
+    can pass back to detect lost updates. The status and stage columns are
+    indexed so instances can be listed without parsing them.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        table: str = DEFAULT_TABLE,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name {table}")
+        self.db_path = Path(db_path)
+        self.table = table
+        self.busy_timeout = busy_timeout
+        self._create_schema()
+
+    def create(
+        self,
+        instance: InstanceBase,
+        status: Optional[str] = None,
+        stage: Optional[str] = None,
+    ) -> int:
+        """Inserts a new instance and returns its version"""
+        instance_id = instance.get_instance_id()
+        with self._transaction() as conn:
+            try:
+                conn.execute(
+                    f"INSERT INTO {self.table} "
+                    "(instance_id, data, status, stage, version, updated_ts) "
+                    "VALUES (?, ?, ?, ?, 1, ?)",
+                    (instance_id, instance.dumps_schema(), status, stage, time()),
+                )
+            except sqlite3.IntegrityError:
+                raise RuntimeError(f"{instance_id} already exists") from None
+        return 1
+
+    def read(self, instance_id: str) -> str:
+        return self.read_with_version(instance_id)[0]
+
+    def read_with_version(self, instance_id: str) -> Tuple[str, int]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT data, version FROM {self.table} WHERE instance_id = ?",
+                (instance_id,),
+            ).fetchone()
+        if row is None:
+            raise RuntimeError(f"{instance_id} does not exist")
+        return row[0], row[1]
+
+    def update(
+        self,
+        instance: InstanceBase,
+        status: Optional[str] = None,
+        stage: Optional[str] = None,
+        expected_version: Optional[int] = None,
+    ) -> int:
+        """Replaces an instance and returns its new version
+
+        Raises:
+            InstanceVersionConflictError: expected_version was given and the
+                stored instance has been updated since that version
+        """
+        instance_id = instance.get_instance_id()
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT version FROM {self.table} WHERE instance_id = ?",
+                (instance_id,),
+            ).fetchone()
+            if row is None:
+                raise RuntimeError(f"{instance_id} does not exist")
+            version = row[0]
+            if expected_version is not None and version != expected_version:
+                raise InstanceVersionConflictError(instance_id, expected_version)
+            conn.execute(
+                f"UPDATE {self.table} "
+                "SET data = ?, status = ?, stage = ?, version = ?, updated_ts = ? "
+                "WHERE instance_id = ?",
+                (
+                    instance.dumps_schema(),
+                    status,
+                    stage,
+                    version + 1,
+                    time(),
+                    instance_id,
+                ),
+            )
+        return version + 1
+
+    def delete(self, instance_id: str) -> None:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM {self.table} WHERE instance_id = ?", (instance_id,)
+            )
+            if cursor.rowcount == 0:
+                raise RuntimeError(f"{instance_id} does not exist")
+
+    def list_instance_ids(
+        self, status: Optional[str] = None, stage: Optional[str] = None
+    ) -> List[str]:
+        """Lists instance ids, optionally only those with a status and/or stage"""
+        query = f"SELECT instance_id FROM {self.table}"
+        conditions = []
+        args = []
+        if status is not None:
+            conditions.append("status = ?")
+            args.append(status)
+        if stage is not None:
+            conditions.append("stage = ?")
+            args.append(stage)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY instance_id"
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(query, args)]
+
+    def exists(self, instance_id: str) -> bool:
+        """Checks if an instance with this id is stored"""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE instance_id = ?", (instance_id,)
+            ).fetchone()
+        return row is not None
+
+    def _create_schema(self) -> None:
+        with self._connect() as conn:
+            # WAL lets readers proceed while a write is in progress and
+            # survives crashes without corrupting committed instances
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "instance_id TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, "
+                "status TEXT, "
+                "stage TEXT, "
+                "version INTEGER NOT NULL, "
+                "updated_ts REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_status_idx "
+                f"ON {self.table} (status)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_stage_idx "
+                f"ON {self.table} (stage)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # a connection per operation keeps the repository safe to share
+        # between threads
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=self.busy_timeout, isolation_level=None
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            # take the write lock up front so the read-check-write of an
+            # update can't interleave with another writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
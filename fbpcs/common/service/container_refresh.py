@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Batched lookups of OneDocker container statuses
+
+A stage fans out to dozens of containers. Looking them up one at a time costs a
+round-trip per container, so these helpers send the ids in chunks through
+OneDockerService.get_containers and run a bounded number of chunks at once.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
+from fbpcp.service.onedocker import OneDockerService
+
+# AWS describe_tasks accepts up to 100 task ids per call
+DEFAULT_CONTAINER_BATCH_SIZE = 100
+DEFAULT_CONTAINER_MAX_CONCURRENCY = 8
+
+CONTAINER_END_STATES = frozenset(
+    {ContainerInstanceStatus.COMPLETED, ContainerInstanceStatus.FAILED}
+)
+
+
+def get_containers_batched(
+    onedocker_svc: OneDockerService,
+    instance_ids: Sequence[str],
+    batch_size: int = DEFAULT_CONTAINER_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_CONTAINER_MAX_CONCURRENCY,
+) -> List[Optional[ContainerInstance]]:
+    """Looks up containers with one get_containers call per chunk of ids
+
+    Args:
+        - onedocker_svc: service used to look up the containers
+        - instance_ids: ids of the containers to look up
+        - batch_size: max number of ids sent in one get_containers call
+        - max_concurrency: max number of get_containers calls in flight
+
+    Returns:
+        A list in the same order as instance_ids, with None for the containers
+        that could not be found
+    """
+    if batch_size < 1 or max_concurrency < 1:
+        raise ValueError(
+            f"batch_size and max_concurrency must be positive, got {batch_size=} and {max_concurrency=}"
+        )
+
+    batches = [
+        list(instance_ids[i : i + batch_size])
+        for i in range(0, len(instance_ids), batch_size)
+    ]
+    if not batches:
+        return []
+    if len(batches) == 1 or max_concurrency == 1:
+        results = [onedocker_svc.get_containers(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(batches))
+        ) as executor:
+            results = list(executor.map(onedocker_svc.get_containers, batches))
+
+    containers = []
+    for batch, result in zip(batches, results):
+        if len(result) != len(batch):
+            raise RuntimeError(
+                f"get_containers returned {len(result)} containers for {len(batch)} ids"
+            )
+        containers.extend(result)
+    return containers
+
+
+async def get_containers_batched_async(
+    onedocker_svc: OneDockerService,
+    instance_ids: Sequence[str],
+    batch_size: int = DEFAULT_CONTAINER_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_CONTAINER_MAX_CONCURRENCY,
+) -> List[Optional[ContainerInstance]]:
+    """Same as get_containers_batched, without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(
+            get_containers_batched,
+            onedocker_svc,
+            instance_ids,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+        ),
+    )
+
+
+def refresh_containers(
+    onedocker_svc: OneDockerService,
+    containers: Sequence[ContainerInstance],
+    batch_size: int = DEFAULT_CONTAINER_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_CONTAINER_MAX_CONCURRENCY,
+) -> List[ContainerInstance]:
+    """Returns the latest state of the containers that have not stopped yet
+
+    Containers that already completed or failed are not looked up again, and
+    containers that could not be found are returned unchanged.
+
+    Args:
+        - onedocker_svc: service used to look up the containers
+        - containers: containers to refresh
+        - batch_size: max number of ids sent in one get_containers call
+        - max_concurrency: max number of get_containers calls in flight
+
+    Returns:
+        The refreshed containers, in the same order as containers
+    """
+    updated_containers = list(containers)
+    pending = [
+        i
+        for i, container in enumerate(updated_containers)
+        if container.status not in CONTAINER_END_STATES
+    ]
+    if not pending:
+        return updated_containers
+
+    latest = get_containers_batched(
+        onedocker_svc,
+        [updated_containers[i].instance_id for i in pending],
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+    )
+    for i, container in zip(pending, latest):
+        if container is not None:
+            updated_containers[i] = container
+    return updated_containers
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fbpcp.entity.cluster_instance import Cluster
+from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
+from fbpcp.entity.container_type import ContainerType
+from fbpcp.error.pcp import PcpError
+from fbpcp.service.container import ContainerService
+
+
+class FakeContainerService(ContainerService):
+    """In memory container service that sleeps for latency on every lookup
+
+    Each container is STARTED until it has been looked up lookups_to_stop
+    times, then it has its final status. It also counts the lookups and how
+    many of them ran at the same time.
+    """
+
+    def __init__(self, latency: float = 0.0, lookups_to_stop: int = 1) -> None:
+        self.latency = latency
+        self.lookups_to_stop = lookups_to_stop
+        self.final_statuses: Dict[str, ContainerInstanceStatus] = {}
+        self.lookups: Dict[str, int] = {}
+        self.get_instances_calls: List[List[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def add_container(
+        self,
+        instance_id: str,
+        final_status: ContainerInstanceStatus = ContainerInstanceStatus.COMPLETED,
+    ) -> ContainerInstance:
+        self.final_statuses[instance_id] = final_status
+        self.lookups[instance_id] = 0
+        return ContainerInstance(instance_id, status=ContainerInstanceStatus.STARTED)
+
+    def get_region(self) -> str:
+        return "us-west-2"
+
+    def get_cluster(self) -> str:
+        return "fake-cluster"
+
+    def create_instance(
+        self,
+        container_definition: str,
+        cmd: str,
+        env_vars: Optional[Dict[str, str]] = None,
+        container_type: Optional[ContainerType] = None,
+    ) -> ContainerInstance:
+        return self.add_container(f"container_{len(self.final_statuses)}")
+
+    def create_instances(
+        self,
+        container_definition: str,
+        cmds: List[str],
+        env_vars: Optional[Dict[str, str]] = None,
+        container_type: Optional[ContainerType] = None,
+    ) -> List[ContainerInstance]:
+        return [
+            self.create_instance(container_definition, cmd, env_vars, container_type)
+            for cmd in cmds
+        ]
+
+    def get_instance(self, instance_id: str) -> Optional[ContainerInstance]:
+        return self.get_instances([instance_id])[0]
+
+    def get_instances(
+        self, instance_ids: List[str]
+    ) -> List[Optional[ContainerInstance]]:
+        with self._lock:
+            self.get_instances_calls.append(list(instance_ids))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            return [self._lookup(instance_id) for instance_id in instance_ids]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def cancel_instance(self, instance_id: str) -> None:
+        self.final_statuses[instance_id] = ContainerInstanceStatus.FAILED
+
+    def cancel_instances(self, instance_ids: List[str]) -> List[Optional[PcpError]]:
+        for instance_id in instance_ids:
+            self.cancel_instance(instance_id)
+        return [None] * len(instance_ids)
+
+    def get_current_instances_count(self) -> int:
+        return len(self.final_statuses)
+
+    def get_cluster_instance(self) -> Cluster:
+        raise NotImplementedError
+
+    def _lookup(self, instance_id: str) -> Optional[ContainerInstance]:
+        if instance_id not in self.final_statuses:
+            return None
+        with self._lock:
+            self.lookups[instance_id] += 1
+            stopped = self.lookups[instance_id] >= self.lookups_to_stop
+        status = (
+            self.final_statuses[instance_id]
+            if stopped
+            else ContainerInstanceStatus.STARTED
+        )
+        return ContainerInstance(instance_id, status=status)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
+from fbpcp.service.onedocker import OneDockerService
+from fbpcs.common.service.container_refresh import (
+    get_containers_batched,
+    get_containers_batched_async,
+    refresh_containers,
+)
+from fbpcs.common.service.test.fake_container_service import FakeContainerService
+
+LATENCY = 0.05
+
+
+class TestContainerRefresh(TestCase):
+    def setUp(self) -> None:
+        self.container_svc = FakeContainerService(latency=LATENCY)
+        self.onedocker_svc = OneDockerService(self.container_svc, "task_def")
+        self.containers = [
+            self.container_svc.add_container(f"container_{i}") for i in range(10)
+        ]
+        self.instance_ids = [c.instance_id for c in self.containers]
+
+    def test_get_containers_batched(self) -> None:
+        start = time.monotonic()
+        containers = get_containers_batched(
+            self.onedocker_svc, self.instance_ids, batch_size=3, max_concurrency=2
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(self.instance_ids, [c.instance_id for c in containers])
+        self.assertEqual(
+            [3, 3, 3, 1], [len(ids) for ids in self.container_svc.get_instances_calls]
+        )
+        self.assertEqual(2, self.container_svc.max_in_flight)
+        # 4 chunks with at most 2 in flight take 2 round-trips instead of 4
+        self.assertLess(elapsed, 4 * LATENCY)
+
+    def test_get_containers_batched_missing_container(self) -> None:
+        containers = get_containers_batched(
+            self.onedocker_svc, ["container_0", "removed", "container_1"]
+        )
+        self.assertIsNone(containers[1])
+        self.assertEqual(1, len(self.container_svc.get_instances_calls))
+
+    def test_get_containers_batched_invalid_args(self) -> None:
+        with self.assertRaises(ValueError):
+            get_containers_batched(self.onedocker_svc, self.instance_ids, batch_size=0)
+
+    def test_refresh_containers_skips_stopped_containers(self) -> None:
+        self.containers[0] = ContainerInstance(
+            "container_0", status=ContainerInstanceStatus.FAILED
+        )
+        removed = ContainerInstance("removed", status=ContainerInstanceStatus.STARTED)
+
+        containers = refresh_containers(
+            self.onedocker_svc, self.containers + [removed], batch_size=4
+        )
+
+        self.assertIs(self.containers[0], containers[0])
+        self.assertIs(removed, containers[-1])
+        self.assertTrue(
+            all(c.status is ContainerInstanceStatus.COMPLETED for c in containers[1:-1])
+        )
+        self.assertEqual(
+            self.instance_ids[1:] + ["removed"],
+            sum(self.container_svc.get_instances_calls, []),
+        )
+
+
+class TestContainerRefreshAsync(IsolatedAsyncioTestCase):
+    async def test_get_containers_batched_async(self) -> None:
+        container_svc = FakeContainerService(latency=LATENCY)
+        onedocker_svc = OneDockerService(container_svc, "task_def")
+        instance_ids = [
+            container_svc.add_container(f"container_{i}").instance_id for i in range(5)
+        ]
+
+        containers = await get_containers_batched_async(
+            onedocker_svc, instance_ids, batch_size=1, max_concurrency=5
+        )
+
+        self.assertEqual(instance_ids, [c.instance_id for c in containers])
+        self.assertEqual(5, container_svc.max_in_flight)
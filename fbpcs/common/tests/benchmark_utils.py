@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Helpers shared by the microbenchmark scripts"""
+
+import timeit
+from typing import Callable
+
+
+def time_per_call(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Returns the best time of one call of fn in seconds, over repeat runs of as many calls as take 0.2s"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
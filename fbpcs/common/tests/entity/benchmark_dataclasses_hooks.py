@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Microbenchmark of attribute access on hooked, mutability checked dataclasses
+
+Usage: python -m fbpcs.common.tests.entity.benchmark_dataclasses_hooks
+"""
+
+from typing import Callable, Tuple
+
+from fbpcs.common.tests.benchmark_utils import time_per_call
+from fbpcs.private_computation.entity.infra_config import InfraConfig
+from fbpcs.private_computation.entity.private_computation_status import (
+    PrivateComputationInstanceStatus,
+)
+from fbpcs.private_computation.test.entity.generate_instance_json import (
+    gen_dummy_pc_instance,
+)
+
+
+def frozen_field_set(infra_config: InfraConfig) -> None:
+    try:
+        infra_config.instance_id = "other_id"
+    except RuntimeError:
+        pass
+
+
+def main() -> None:
+    infra_config = gen_dummy_pc_instance().infra_config
+    statuses = (
+        PrivateComputationInstanceStatus.COMPUTATION_STARTED,
+        PrivateComputationInstanceStatus.COMPUTATION_COMPLETED,
+    )
+    benchmarks: Tuple[Tuple[str, Callable[[], object]], ...] = (
+        ("get field", lambda: infra_config.retry_counter),
+        ("set field", lambda: setattr(infra_config, "retry_counter", 1)),
+        (
+            "set field with hooks",
+            lambda: setattr(infra_config, "num_mpc_containers", 1),
+        ),
+        ("set frozen field", lambda: frozen_field_set(infra_config)),
+        (
+            "set status (update hooks run)",
+            lambda: setattr(infra_config, "status", statuses[0]),
+        ),
+    )
+    for name, fn in benchmarks:
+        print(f"{name:>30}: {time_per_call(fn) * 1e9:8.0f} ns")
+        # keep the status update hook from growing status_updates forever
+        infra_config.status_updates.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import json
+import unittest
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Union
+
+from dataclasses_json import config, dataclass_json, DataClassJsonMixin
+from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
+from fbpcs.common.entity import dataclasses_codec
+from fbpcs.common.entity.exceptions import InstanceCodecError
+from fbpcs.common.entity.pcs_container_instance import PCSContainerInstance
+from marshmallow import fields
+from marshmallow_enum import EnumField
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass_json
+@dataclass
+class Leaf:
+    name: str
+    weight: int = 1
+
+
+@dataclass
+class Tree(DataClassJsonMixin):
+    tree_id: str
+    color: Color
+    leaves: List[Leaf]
+    containers: List[Union[PCSContainerInstance, ContainerInstance]]
+    tags: Set[Color] = field(
+        default_factory=set,
+        metadata=config(mm_field=fields.List(EnumField(enum=Color, by_value=True))),
+    )
+    extras: Optional[Dict[str, Any]] = None
+    ratio: Optional[float] = None
+    root: Optional[Leaf] = None
+    done: bool = False
+
+
+class TestDataclassesCodec(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = Tree(
+            tree_id="tree",
+            color=Color.RED,
+            leaves=[Leaf("a"), Leaf("b", weight=2)],
+            containers=[
+                ContainerInstance("c0", "1.1.1.1", ContainerInstanceStatus.STARTED),
+                PCSContainerInstance("c1", log_url="url"),
+            ],
+            tags={Color.BLUE},
+            extras={"nested": {"list": [1, 2]}},
+            ratio=0.5,
+            done=True,
+        )
+
+    def test_dump_matches_schema(self) -> None:
+        json_object = dataclasses_codec.dump(self.tree)
+        schema_json_object = Tree.schema().dump(self.tree)
+
+        self.assertEqual(json_object, schema_json_object)
+        # key order is part of the byte-identical json
+        self.assertEqual(json.dumps(json_object), json.dumps(schema_json_object))
+        self.assertEqual(
+            [c["__type"] for c in json_object["containers"]],
+            ["ContainerInstance", "PCSContainerInstance"],
+        )
+
+    def test_load_matches_schema(self) -> None:
+        json_object = Tree.schema().dump(self.tree)
+
+        tree = dataclasses_codec.load(Tree, json_object)
+
+        self.assertEqual(tree, Tree.schema().load(json_object))
+        self.assertEqual(tree, self.tree)
+        self.assertIsInstance(tree.tags, set)
+        self.assertIs(type(tree.containers[1]), PCSContainerInstance)
+
+    def test_load_uses_defaults(self) -> None:
+        tree = dataclasses_codec.load(
+            Tree,
+            {"tree_id": "tree", "color": "blue", "leaves": [], "containers": []},
+        )
+        self.assertEqual(tree.tags, set())
+        self.assertIsNone(tree.root)
+
+    def test_load_unknown_fields(self) -> None:
+        json_object = Tree.schema().dump(self.tree)
+        json_object["removed_field"] = 1
+
+        with self.assertRaises(InstanceCodecError):
+            dataclasses_codec.load(Tree, json_object)
+        tree = dataclasses_codec.load(Tree, json_object, exclude_unknown=True)
+        self.assertEqual(tree, self.tree)
+
+        # unknown fields of nested dataclasses are rejected by marshmallow
+        del json_object["removed_field"]
+        json_object["leaves"][0]["removed_field"] = 1
+        with self.assertRaises(InstanceCodecError):
+            dataclasses_codec.load(Tree, json_object, exclude_unknown=True)
+
+    def test_unsupported_values(self) -> None:
+        valid = Tree.schema().dump(self.tree)
+        for name, field_name, value in (
+            # coerced by marshmallow
+            ("int as str", "tree_id", 1),
+            ("float as int", "ratio", 1),
+            ("bool as int", "done", 1),
+            # None for a non-optional field
+            ("null", "tree_id", None),
+            ("unknown enum value", "color", "green"),
+            ("unknown union variant", "containers", [{"__type": "Removed"}]),
+            ("union without type", "containers", [{"instance_id": "c"}]),
+        ):
+            with self.subTest(name):
+                json_object = dict(valid)
+                json_object[field_name] = value
+                with self.assertRaises(InstanceCodecError):
+                    dataclasses_codec.load(Tree, json_object)
+
+        with self.subTest("missing required field"):
+            json_object = dict(valid)
+            del json_object["tree_id"]
+            with self.assertRaises(InstanceCodecError):
+                dataclasses_codec.load(Tree, json_object)
+
+        with self.subTest("dump coerced value"):
+            self.tree.done = 1
+            with self.assertRaises(InstanceCodecError):
+                dataclasses_codec.dump(self.tree)
@@ -0,0 +1,84 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+from dataclasses import dataclass, field
+
+from fbpcs.common.entity.dataclasses_hooks import DataclassHookMixin, HookEventType
+from fbpcs.common.entity.dataclasses_mutability import immutable_field, mutable_field
+from fbpcs.common.entity.exceptions import InstanceFrozenFieldError
+from fbpcs.common.entity.frozen_field_hook import FrozenFieldHook
+from fbpcs.common.entity.generic_hook import GenericHook
+from fbpcs.common.entity.instance_base import InstanceBase
+
+# counts how many times the hook ran
+update_counter_hook: GenericHook["BaseInstance"] = GenericHook(
+    hook_function=lambda obj: setattr(obj, "updates", obj.updates + 1),
+    triggers=[HookEventType.POST_UPDATE],
+)
+
+# freeze the frozen_later field when status changes
+frozen_later_hook: FrozenFieldHook = FrozenFieldHook(other_field="frozen_later")
+
+
+@dataclass
+class BaseInstance(InstanceBase):
+    instance_id: str = immutable_field()
+    status: str = field(
+        default="created",
+        metadata=DataclassHookMixin.get_metadata(
+            update_counter_hook, frozen_later_hook
+        ),
+    )
+    frozen_later: str = mutable_field(default="mutable")
+    updates: int = 0
+
+    def get_instance_id(self) -> str:
+        return self.instance_id
+
+
+@dataclass
+class SubInstance(BaseInstance):
+    sub_status: str = field(
+        default="created",
+        metadata=DataclassHookMixin.get_metadata(update_counter_hook),
+    )
+    sub_id: str = immutable_field(default="sub")
+
+
+class TestDataclassesFieldTable(unittest.TestCase):
+    def test_subclass_has_its_own_table(self) -> None:
+        # compile the base class table first
+        base = BaseInstance("base")
+        base.status = "started"
+        sub = SubInstance("sub")
+        updates = sub.updates
+
+        sub.sub_status = "started"
+        self.assertEqual(sub.updates, updates + 1)
+        with self.assertRaises(InstanceFrozenFieldError):
+            sub.sub_id = "other"
+        self.assertIs(BaseInstance._get_field_table().cls, BaseInstance)
+        self.assertIs(SubInstance._get_field_table().cls, SubInstance)
+
+    def test_frozen_field_hook_updates_table(self) -> None:
+        instance = SubInstance("instance")
+        instance.frozen_later = "still mutable"
+        updates = instance.updates
+
+        # the hook replaces the field metadata to freeze frozen_later
+        instance.status = "started"
+
+        with self.assertRaises(InstanceFrozenFieldError):
+            instance.frozen_later = "frozen"
+        # the hooks of status still run after the tables are rebuilt
+        self.assertEqual(instance.updates, updates + 1)
+        instance.status = "completed"
+        self.assertEqual(instance.updates, updates + 2)
+
+    def test_setting_unknown_attribute_raises(self) -> None:
+        instance = BaseInstance("instance")
+        with self.assertRaises(KeyError):
+            instance.not_a_field = 1
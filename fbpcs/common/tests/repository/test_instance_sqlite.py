@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fbpcp.entity.mpc_instance import MPCInstanceStatus, MPCParty
+from fbpcs.common.entity.pcs_mpc_instance import PCSMPCInstance
+from fbpcs.common.repository.exceptions import InstanceVersionConflictError
+from fbpcs.common.repository.instance_sqlite import SqliteInstanceRepository
+
+TEST_INSTANCE_ID = "test-instance-id"
+ERROR_MSG_ALREADY_EXISTS = f"{TEST_INSTANCE_ID} already exists"
+ERROR_MSG_NOT_EXISTS = f"{TEST_INSTANCE_ID} does not exist"
+
+
+class TestSqliteInstanceRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "instances.db")
+        self.repo = SqliteInstanceRepository(self.db_path)
+        self.mpc_instance = self._get_mpc_instance(TEST_INSTANCE_ID)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_create_read(self) -> None:
+        self.assertEqual(self.repo.create(self.mpc_instance), 1)
+        self.assertEqual(
+            PCSMPCInstance.loads_schema(self.repo.read(TEST_INSTANCE_ID)),
+            self.mpc_instance,
+        )
+        with self.assertRaisesRegex(RuntimeError, ERROR_MSG_ALREADY_EXISTS):
+            self.repo.create(self.mpc_instance)
+
+    def test_missing_instance(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, ERROR_MSG_NOT_EXISTS):
+            self.repo.read(TEST_INSTANCE_ID)
+        with self.assertRaisesRegex(RuntimeError, ERROR_MSG_NOT_EXISTS):
+            self.repo.update(self.mpc_instance)
+        with self.assertRaisesRegex(RuntimeError, ERROR_MSG_NOT_EXISTS):
+            self.repo.delete(TEST_INSTANCE_ID)
+
+    def test_update_bumps_version(self) -> None:
+        self.repo.create(self.mpc_instance)
+        new_mpc_instance = copy.deepcopy(self.mpc_instance)
+        new_mpc_instance.game_name = "aggregator"
+        self.assertEqual(self.repo.update(new_mpc_instance, expected_version=1), 2)
+        data, version = self.repo.read_with_version(TEST_INSTANCE_ID)
+        self.assertEqual(PCSMPCInstance.loads_schema(data), new_mpc_instance)
+        self.assertEqual(version, 2)
+
+        # an update based on version 1 would lose the update above
+        with self.assertRaises(InstanceVersionConflictError):
+            self.repo.update(self.mpc_instance, expected_version=1)
+        self.assertEqual(
+            PCSMPCInstance.loads_schema(self.repo.read(TEST_INSTANCE_ID)),
+            new_mpc_instance,
+        )
+
+    def test_delete(self) -> None:
+        self.repo.create(self.mpc_instance)
+        self.repo.delete(TEST_INSTANCE_ID)
+        self.assertFalse(self.repo.exists(TEST_INSTANCE_ID))
+
+    def test_list_instance_ids(self) -> None:
+        for instance_id, status, stage in (
+            ("a", "CREATED", None),
+            ("b", "STARTED", "ID_MATCH"),
+            ("c", "STARTED", "COMPUTE"),
+        ):
+            self.repo.create(
+                self._get_mpc_instance(instance_id), status=status, stage=stage
+            )
+        self.assertEqual(self.repo.list_instance_ids(), ["a", "b", "c"])
+        self.assertEqual(self.repo.list_instance_ids(status="STARTED"), ["b", "c"])
+        self.assertEqual(self.repo.list_instance_ids(stage="COMPUTE"), ["c"])
+        self.assertEqual(
+            self.repo.list_instance_ids(status="STARTED", stage="ID_MATCH"), ["b"]
+        )
+
+    def test_concurrent_updates(self) -> None:
+        self.repo.create(self.mpc_instance)
+        num_updates = 50
+
+        def update(i: int) -> None:
+            # each writer uses its own repository, like separate processes would
+            repo = SqliteInstanceRepository(self.db_path)
+            instance = copy.deepcopy(self.mpc_instance)
+            instance.game_name = f"game_{i}"
+            repo.update(instance)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(update, range(num_updates)))
+
+        data, version = self.repo.read_with_version(TEST_INSTANCE_ID)
+        self.assertEqual(version, num_updates + 1)
+        self.assertTrue(PCSMPCInstance.loads_schema(data).game_name.startswith("game_"))
+
+    def _get_mpc_instance(self, instance_id: str) -> PCSMPCInstance:
+        return PCSMPCInstance.create_instance(
+            instance_id=instance_id,
+            game_name="lift",
+            mpc_party=MPCParty.SERVER,
+            num_workers=1,
+            server_ips=["192.0.2.0"],
+            status=MPCInstanceStatus.CREATED,
+            game_args=[{}],
+        )
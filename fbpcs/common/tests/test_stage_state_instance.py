@@ -170,11 +170,11 @@ class TestStageStateInstance(unittest.TestCase):
         updated_container.status = ContainerInstanceStatus.FAILED
 
         mock_onedocker_svc.reset_mock()
-        mock_onedocker_svc.get_container = MagicMock(return_value=updated_container)
+        mock_onedocker_svc.get_containers = MagicMock(return_value=[updated_container])
         self.stage_state_instance.update_status(mock_onedocker_svc)
 
-        mock_onedocker_svc.get_container.assert_called_once_with(
-            started_container.instance_id
+        mock_onedocker_svc.get_containers.assert_called_once_with(
+            [started_container.instance_id]
         )
         self.assertEqual(
             [o.status for o in self.stage_state_instance.containers],
@@ -30,6 +30,10 @@ DEFINE_bool(
     false,
     "Log cost info into cloud which will be used for dashboard");
 DEFINE_int32(max_id_column_cnt, 1, "Maximum number of id columns to use as id");
+DEFINE_int64(
+    max_sort_buffer_bytes,
+    1073741824,
+    "Bytes of rows each sort keeps in memory before spilling to tmp_directory");
 DEFINE_string(log_cost_s3_bucket, "cost-estimation-logs", "s3 bucket name");
 DEFINE_string(
     log_cost_s3_region,
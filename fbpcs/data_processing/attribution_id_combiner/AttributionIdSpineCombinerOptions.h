@@ -20,5 +20,6 @@ DECLARE_bool(log_cost);
 DECLARE_string(log_cost_s3_bucket);
 DECLARE_string(log_cost_s3_region);
 DECLARE_int32(max_id_column_cnt);
+DECLARE_int64(max_sort_buffer_bytes);
 DECLARE_string(protocol_type);
 DECLARE_string(run_id);
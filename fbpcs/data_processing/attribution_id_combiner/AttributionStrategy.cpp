@@ -16,13 +16,12 @@
 #include "fbpcs/data_processing/id_combiner/AddPaddingToCols.h"
 #include "fbpcs/data_processing/id_combiner/DataPreparationHelpers.h"
 #include "fbpcs/data_processing/id_combiner/DataValidation.h"
-#include "fbpcs/data_processing/id_combiner/GroupBy.h"
-#include "fbpcs/data_processing/id_combiner/SortIds.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 
 namespace pid::combiner {
 
 void AttributionStrategy::aggregate(
-    std::stringstream& idSwapOutFile,
+    std::istream& idSwapOutFile,
     FileMetaData& meta,
     std::string outputPath) {
   std::filesystem::path tmpDirectory{FLAGS_tmp_directory};
@@ -35,30 +34,42 @@ void AttributionStrategy::aggregate(
   XLOG(INFO) << "Writing temporary file to " << tmpFilepath;
   std::ofstream outFile{tmpFilepath};
 
-  std::vector<int32_t> colPaddingSize(
-      meta.aggregatedCols.size(), FLAGS_padding_size);
-  std::stringstream groupByOutFile;
-  std::stringstream groupByUnsortedOutFile;
-  if (FLAGS_sort_strategy == "sort") {
-    groupBy(idSwapOutFile, "id_", meta.aggregatedCols, groupByUnsortedOutFile);
-    sortIds(groupByUnsortedOutFile, groupByOutFile);
-  } else if (FLAGS_sort_strategy == "keep_original") {
-    groupBy(idSwapOutFile, "id_", meta.aggregatedCols, groupByOutFile);
-  } else {
+  if (FLAGS_sort_strategy != "sort" && FLAGS_sort_strategy != "keep_original") {
     XLOG(FATAL) << "Invalid sort strategy '" << FLAGS_sort_strategy
                 << "'. Expected 'sort' or 'keep_original'.";
   }
 
-  std::stringstream paddedOutFile;
-  addPaddingToCols(
-      groupByOutFile, meta.aggregatedCols, colPaddingSize, true, paddedOutFile);
-
+  std::vector<int32_t> colPaddingSize(
+      meta.aggregatedCols.size(), FLAGS_padding_size);
   std::vector<std::string> partnerColsToConvert = {
       "conversion_timestamp", "conversion_value"};
   std::vector<std::string> publisherColsToConvert = {"ad_id", "timestamp"};
   std::vector<std::string> columnsToConvert =
       meta.isPublisherDataset ? publisherColsToConvert : partnerColsToConvert;
-  headerColumnsToPlural(paddedOutFile, columnsToConvert, outFile);
+
+  // Group the rows in batches of whole ids, spilling to the tmp directory, so
+  // that only a batch at a time goes through padding and renaming
+  bool isFirstBatch = true;
+  groupByInBatches(
+      idSwapOutFile,
+      "id_",
+      meta.aggregatedCols,
+      FLAGS_sort_strategy == "sort",
+      tmpDirectory,
+      FLAGS_max_sort_buffer_bytes,
+      [&](std::istream& groupByOutFile) {
+        std::stringstream paddedOutFile;
+        addPaddingToCols(
+            groupByOutFile,
+            meta.aggregatedCols,
+            colPaddingSize,
+            true,
+            paddedOutFile);
+
+        std::stringstream pluralOutFile;
+        headerColumnsToPlural(paddedOutFile, columnsToConvert, pluralOutFile);
+        appendBatch(pluralOutFile, isFirstBatch, outFile);
+      });
 
   outFile.close();
   if (outputPath != tmpFilepath) {
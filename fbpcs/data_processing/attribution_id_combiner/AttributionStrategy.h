@@ -9,6 +9,7 @@
 #include <folly/logging/xlog.h>
 #include <filesystem>
 #include <fstream>
+#include <istream>
 #include <ostream>
 #include <string>
 #include <vector>
@@ -56,7 +57,7 @@ class AttributionStrategy {
    * @return idSwapOutFile output stream of private-id file
    **/
   virtual void aggregate(
-      std::stringstream& idSwapOutFile,
+      std::istream& idSwapOutFile,
       FileMetaData& meta,
       std::string outputPath);
   /**
@@ -18,6 +18,7 @@
 #include <unordered_map>
 
 #include "fbpcs/data_processing/id_combiner/IdSwapMultiKey.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 
 namespace pid::combiner {
 MrPidAttributionIdCombiner::MrPidAttributionIdCombiner()
@@ -38,20 +39,28 @@ MrPidAttributionIdCombiner::~MrPidAttributionIdCombiner() {
   spineIdFile->close();
 }
 
-std::stringstream MrPidAttributionIdCombiner::idSwap(std::string headerLine) {
-  std::stringstream idSwapOutFile;
+void MrPidAttributionIdCombiner::idSwap(
+    std::string headerLine,
+    std::ostream& idSwapOutFile) {
   idSwapOutFile << headerLine << "\n";
   while (!spineIdFile->eof()) {
     auto spineRow = spineIdFile->readLine();
     idSwapOutFile << spineRow << "\n";
   }
-  return idSwapOutFile;
 }
 
 void MrPidAttributionIdCombiner::run() {
   auto meta = processHeader(spineIdFile);
-  std::stringstream idSwapOutFile = idSwap(meta.headerLine);
-  aggregate(idSwapOutFile, meta, outputPath);
+  // The spine file goes through a tmp file rather than memory, so that
+  // aggregate() only holds a batch of it at a time
+  throughTmpFile(
+      FLAGS_tmp_directory,
+      [&](std::ostream& idSwapOutFile) {
+        idSwap(meta.headerLine, idSwapOutFile);
+      },
+      [&](std::istream& idSwapOutFile) {
+        aggregate(idSwapOutFile, meta, outputPath);
+      });
 }
 
 } // namespace pid::combiner
@@ -58,13 +58,13 @@ class MrPidAttributionIdCombiner : public AttributionStrategy {
   explicit MrPidAttributionIdCombiner();
   virtual ~MrPidAttributionIdCombiner() override;
   /**
-   * idSwap() will change the spine file reader into a stringstream as the input
-   * for aggregate step.
+   * idSwap() will copy the spine file into idSwapOutFile as the input for
+   * aggregate step.
    *
    * @param headerLine header line
-   * @return stringstream output stream of mr pid matching result
+   * @param idSwapOutFile where the mr pid matching result is written
    **/
-  std::stringstream idSwap(std::string headerLine);
+  void idSwap(std::string headerLine, std::ostream& idSwapOutFile);
   /**
    * run() has three steps
    * 1. process header, get file type and other meta data
@@ -16,6 +16,7 @@
 #include <unordered_map>
 
 #include "fbpcs/data_processing/id_combiner/IdSwapMultiKey.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 
 namespace pid::combiner {
 PidAttributionIdCombiner::PidAttributionIdCombiner()
@@ -39,8 +40,9 @@ PidAttributionIdCombiner::~PidAttributionIdCombiner() {
   spineIdFile->close();
 }
 
-std::stringstream PidAttributionIdCombiner::idSwap(std::string headerLine) {
-  std::stringstream idSwapOutFile;
+void PidAttributionIdCombiner::idSwap(
+    std::string headerLine,
+    std::ostream& idSwapOutFile) {
   idSwapMultiKey(
       dataFile,
       spineIdFile,
@@ -48,13 +50,20 @@ std::stringstream PidAttributionIdCombiner::idSwap(std::string headerLine) {
       FLAGS_max_id_column_cnt,
       headerLine,
       spineIdFilePath);
-  return idSwapOutFile;
 }
 
 void PidAttributionIdCombiner::run() {
   auto meta = processHeader(dataFile);
-  std::stringstream idSwapOutFile = idSwap(meta.headerLine);
-  aggregate(idSwapOutFile, meta, outputPath);
+  // The idSwap output goes through a tmp file rather than memory, so that
+  // aggregate() only holds a batch of it at a time
+  throughTmpFile(
+      FLAGS_tmp_directory,
+      [&](std::ostream& idSwapOutFile) {
+        idSwap(meta.headerLine, idSwapOutFile);
+      },
+      [&](std::istream& idSwapOutFile) {
+        aggregate(idSwapOutFile, meta, outputPath);
+      });
 }
 
 } // namespace pid::combiner
@@ -59,7 +59,7 @@ class PidAttributionIdCombiner : public AttributionStrategy {
 
  public:
   explicit PidAttributionIdCombiner();
-  std::stringstream idSwap(std::string headerLine);
+  void idSwap(std::string headerLine, std::ostream& idSwapOutFile);
   void run() override;
   virtual ~PidAttributionIdCombiner() override;
 };
@@ -29,9 +29,6 @@ void addPaddingToCols(
     const std::vector<int32_t>& padSizePerCol,
     bool enforceMax,
     std::ostream& outFile) {
-  const std::string kCommaSplitRegex = R"(([^,]+),?)";
-  const std::string kCommaWithBracketSplitRegex = R"((\[[^\]]+\]|[^,]+),?)";
-
   XLOG(INFO) << "Starting AddPaddingToCols run for columns: "
              << vectorToString(cols)
              << " with paddings of: " << vectorToString(padSizePerCol);
@@ -41,7 +38,7 @@ void addPaddingToCols(
 
   getline(dataFile, headerline);
   boost::algorithm::trim_if(headerline, boost::is_any_of("\r"));
-  std::vector<std::string> header = split(kCommaSplitRegex, headerline);
+  std::vector<std::string> header = splitByComma(headerline, false);
 
   // Output the header as is
   outFile << vectorToString(header) << "\n";
@@ -52,8 +49,7 @@ void addPaddingToCols(
   }
 
   while (getline(dataFile, row)) {
-    std::vector<std::string> curr_cols =
-        split(kCommaWithBracketSplitRegex, row);
+    std::vector<std::string> curr_cols = splitByComma(row, true);
 
     // for each row, go through the columns that we want to pad
     // and add the missing padding at the beginning of the vector
@@ -62,7 +58,7 @@ void addPaddingToCols(
       boost::erase_all(curr_cols.at(c_i), "[");
       boost::erase_all(curr_cols.at(c_i), "]");
       std::vector<std::string> curr_vec =
-          split(kCommaSplitRegex, curr_cols.at(c_i));
+          splitByComma(curr_cols.at(c_i), false);
 
       if (curr_vec.size() > static_cast<std::size_t>(padSizePerCol.at(i)) &&
           enforceMax) {
@@ -8,6 +8,7 @@
 #include "DataPreparationHelpers.h"
 
 #include <folly/logging/xlog.h>
+#include <algorithm>
 #include <cstdint>
 #include <filesystem>
 #include <iomanip>
@@ -19,7 +20,7 @@
 #include <unordered_map>
 #include <vector>
 
-#include <re2/re2.h>
+#include "fbpcs/emp_games/common/Csv.h"
 
 namespace pid::combiner {
 
@@ -30,13 +31,11 @@ void headerColumnsToPlural(
   XLOG(INFO) << "Started converting columns to plural. Columns to convert: <"
              << vectorToString(columnsToConvert) << ">";
 
-  const std::string kCommaSplitRegex = R"(([^,]+),?)";
-
   std::string line;
   std::string row;
 
   getline(dataFile, line);
-  std::vector<std::string> header = split(kCommaSplitRegex, line);
+  std::vector<std::string> header = splitByComma(line, false);
   std::vector<std::string> newHeader;
   for (std::size_t i = 0; i < header.size(); i++) {
     auto useOriginalColumn = true;
@@ -59,37 +58,16 @@ void headerColumnsToPlural(
   }
   XLOG(INFO) << "Finished converting header";
 }
+
+// The csv scanning is shared with the emp games, which parse the same rows
 std::vector<std::string> split(const std::string& delim, std::string& str) {
-  // Preprocessing step: Remove spaces if any
-  str.erase(std::remove(str.begin(), str.end(), ' '), str.end());
-  std::vector<std::string> tokens;
-  re2::RE2 rgx{delim};
-  re2::StringPiece input{str}; // Wrap a StringPiece around it
-
-  std::string token;
-  while (RE2::Consume(&input, rgx, &token)) {
-    tokens.push_back(token);
-  }
-  return tokens;
+  return private_measurement::csv::split(str, delim);
 }
 
 std::vector<std::string> splitByComma(
     std::string& str,
     bool supportInnerBrackets) {
-  if (supportInnerBrackets) {
-    // The pattern here indicates that it's looking for a \[, gets all
-    // non-brackets [^\]], then the \]. Otherwise |,
-    // it will get all the non commas [^,]. The surrounding () makes it
-    // a capture group. ,? means there may or may not be a comma
-    return split(R"((\[[^\]]+\]|[^,]+),?)", str);
-  } else {
-    // split internally uses RE2 which relies on
-    // consuming patterns. The pattern here indicates
-    // it will get all the non commas [^,]. The surrounding () makes it
-    // a capture group. ,? means there may or may not be a comma
-
-    return split("([^,]+),?", str);
-  }
+  return private_measurement::csv::splitByComma(str, supportInnerBrackets);
 }
 
 size_t headerIndex(
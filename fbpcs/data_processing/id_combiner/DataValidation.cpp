@@ -37,20 +37,18 @@ bool verifyHeaderContainsCols(
 }
 
 void validateCsvData(std::istream& dataFile) {
-  const std::string kCommaSplitRegex = R"(([^,]+),?)";
-
   XLOG(INFO) << "Started.";
   std::string line;
   std::string row;
   size_t row_i = 0;
 
   getline(dataFile, line);
-  std::vector<std::string> header = split(kCommaSplitRegex, line);
+  std::vector<std::string> header = splitByComma(line, false);
   size_t headerSize = header.size();
 
   while (getline(dataFile, row)) {
     row_i++;
-    std::vector<std::string> rowVec = split(kCommaSplitRegex, row);
+    std::vector<std::string> rowVec = splitByComma(row, false);
     if (headerSize != rowVec.size()) {
       XLOG(FATAL) << "Row at index <" << row_i
                   << "> and header sizes mismatch. "
@@ -0,0 +1,368 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#include "StreamingGroupBy.h"
+
+#include <algorithm>
+#include <fstream>
+#include <queue>
+#include <sstream>
+#include <tuple>
+#include <utility>
+
+#include <folly/Random.h>
+#include <folly/String.h>
+#include <folly/logging/xlog.h>
+
+#include "DataPreparationHelpers.h"
+#include "GroupBy.h"
+#include "SortIds.h"
+
+namespace pid::combiner {
+namespace {
+// A batch is at most this fraction of the sort buffer, so that a batch and the
+// copies the per row steps make of it fit next to the buffer of a sort
+constexpr std::size_t kBatchesPerBuffer = 8;
+// Wide enough for any uint64_t, so that row number keys sort as numbers
+constexpr std::size_t kRowNumberKeyWidth = 20;
+
+std::string rowNumberKey(uint64_t rowNumber) {
+  auto key = std::to_string(rowNumber);
+  key.insert(0, kRowNumberKeyWidth - key.size(), '0');
+  return key;
+}
+
+// The value of the column at columnIndex, or an empty string if the row is too
+// short. groupBy and sortIds fail on such rows once they reach them.
+std::string columnValue(const std::string& row, std::size_t columnIndex) {
+  std::vector<folly::StringPiece> cols;
+  folly::split(',', row, cols);
+  if (columnIndex >= cols.size()) {
+    return "";
+  }
+  return cols.at(columnIndex).str();
+}
+
+// sortIds compares the ids after removing the spaces of the row
+void removeSpaces(std::string& s) {
+  s.erase(std::remove(s.begin(), s.end(), ' '), s.end());
+}
+
+// Calls processBatch with batches of the sorted rows of sorter, each batch
+// starting with headerLine and holding whole groups of rows with the same key.
+// processBatch also gets the row number of the first row of each group.
+void sortedBatches(
+    ExternalSorter& sorter,
+    const std::string& headerLine,
+    std::size_t maxBufferBytes,
+    const std::function<void(
+        std::istream& batch,
+        const std::vector<uint64_t>& groupFirstRows)>& processBatch) {
+  auto maxBatchBytes =
+      std::max<std::size_t>(maxBufferBytes / kBatchesPerBuffer, 1);
+
+  std::stringstream batch;
+  batch << headerLine << '\n';
+  std::size_t batchBytes = 0;
+  std::vector<uint64_t> groupFirstRows;
+  std::string groupKey;
+
+  sorter.forEachSorted(
+      [&](const std::string& key, uint64_t rowNumber, const std::string& row) {
+        if (groupFirstRows.empty() || key != groupKey) {
+          if (batchBytes >= maxBatchBytes) {
+            processBatch(batch, groupFirstRows);
+            batch = std::stringstream{};
+            batch << headerLine << '\n';
+            batchBytes = 0;
+            groupFirstRows.clear();
+          }
+          groupFirstRows.push_back(rowNumber);
+          groupKey = key;
+        }
+        batch << row << '\n';
+        batchBytes += row.size() + 1;
+      });
+  processBatch(batch, groupFirstRows);
+}
+} // namespace
+
+ExternalSorter::ExternalSorter(
+    std::filesystem::path tmpDirectory,
+    std::size_t maxBufferBytes)
+    : tmpDirectory_{std::move(tmpDirectory)},
+      maxBufferBytes_{maxBufferBytes},
+      // Get a random ID to avoid potential name collisions if multiple
+      // runs at the same time use the same tmp directory
+      runPrefix_{
+          "sort_run_" + std::to_string(folly::Random::secureRand64()) + "_"} {}
+
+ExternalSorter::~ExternalSorter() {
+  removeRuns();
+}
+
+void ExternalSorter::add(std::string key, uint64_t rowNumber, std::string row) {
+  bufferBytes_ += sizeof(Entry) + key.size() + row.size();
+  buffer_.push_back(Entry{std::move(key), rowNumber, std::move(row)});
+  if (bufferBytes_ >= maxBufferBytes_) {
+    spill();
+  }
+}
+
+void ExternalSorter::spill() {
+  std::sort(buffer_.begin(), buffer_.end(), [](const auto& a, const auto& b) {
+    return std::tie(a.key, a.rowNumber) < std::tie(b.key, b.rowNumber);
+  });
+
+  auto runPath =
+      tmpDirectory_ / (runPrefix_ + std::to_string(runPaths_.size()));
+  runPaths_.push_back(runPath);
+  std::ofstream runFile{runPath};
+  for (const auto& entry : buffer_) {
+    runFile << entry.key << '\n'
+            << entry.rowNumber << '\n'
+            << entry.row << '\n';
+  }
+  runFile.close();
+  if (runFile.fail()) {
+    XLOG(FATAL) << "Failed to write sorted run to " << runPath;
+  }
+  XLOG(INFO) << "Spilled " << buffer_.size() << " rows to " << runPath;
+
+  buffer_.clear();
+  bufferBytes_ = 0;
+}
+
+void ExternalSorter::removeRuns() {
+  for (const auto& runPath : runPaths_) {
+    std::error_code ec;
+    std::filesystem::remove(runPath, ec);
+  }
+  runPaths_.clear();
+}
+
+void ExternalSorter::forEachSorted(const std::function<void(
+                                       const std::string& key,
+                                       uint64_t rowNumber,
+                                       const std::string& row)>& onRow) {
+  if (runPaths_.empty()) {
+    // Everything fit in memory
+    std::sort(buffer_.begin(), buffer_.end(), [](const auto& a, const auto& b) {
+      return std::tie(a.key, a.rowNumber) < std::tie(b.key, b.rowNumber);
+    });
+    for (const auto& entry : buffer_) {
+      onRow(entry.key, entry.rowNumber, entry.row);
+    }
+    buffer_.clear();
+    bufferBytes_ = 0;
+    return;
+  }
+
+  if (!buffer_.empty()) {
+    spill();
+  }
+
+  // Merge the runs, always reading the smallest (key, rowNumber) next
+  std::vector<std::ifstream> runFiles;
+  std::vector<Entry> heads(runPaths_.size());
+  auto readHead = [&](std::size_t run) {
+    auto& head = heads.at(run);
+    std::string rowNumber;
+    if (!getline(runFiles.at(run), head.key) ||
+        !getline(runFiles.at(run), rowNumber) ||
+        !getline(runFiles.at(run), head.row)) {
+      return false;
+    }
+    head.rowNumber = std::stoull(rowNumber);
+    return true;
+  };
+  auto isAfter = [&](std::size_t a, std::size_t b) {
+    return std::tie(heads.at(a).key, heads.at(a).rowNumber) >
+        std::tie(heads.at(b).key, heads.at(b).rowNumber);
+  };
+  std::priority_queue<std::size_t, std::vector<std::size_t>, decltype(isAfter)>
+      nextRuns{isAfter};
+
+  for (std::size_t run = 0; run < runPaths_.size(); ++run) {
+    runFiles.emplace_back(runPaths_.at(run));
+    if (!runFiles.back()) {
+      XLOG(FATAL) << "Failed to open sorted run " << runPaths_.at(run);
+    }
+    if (readHead(run)) {
+      nextRuns.push(run);
+    }
+  }
+  XLOG(INFO) << "Merging " << runPaths_.size() << " sorted runs";
+
+  while (!nextRuns.empty()) {
+    auto run = nextRuns.top();
+    nextRuns.pop();
+    const auto& head = heads.at(run);
+    onRow(head.key, head.rowNumber, head.row);
+    if (readHead(run)) {
+      nextRuns.push(run);
+    }
+  }
+
+  runFiles.clear();
+  removeRuns();
+}
+
+void groupByInBatches(
+    std::istream& inFile,
+    const std::string& groupByColumn,
+    const std::vector<std::string>& columnsToAggregate,
+    bool sortById,
+    const std::filesystem::path& tmpDirectory,
+    std::size_t maxBufferBytes,
+    const std::function<void(std::istream& batch)>& processBatch) {
+  std::string headerLine;
+  getline(inFile, headerLine);
+  std::vector<std::string> header;
+  folly::split(",", headerLine, header);
+  auto groupByColumnIndex = headerIndex(header, groupByColumn);
+
+  // Rows are sorted by the id groupBy groups them by, with the empty id
+  // converted to 0 like groupBy does
+  ExternalSorter rowSorter{tmpDirectory, maxBufferBytes};
+  std::string row;
+  uint64_t rowNumber = 0;
+  while (getline(inFile, row)) {
+    auto key = columnValue(row, groupByColumnIndex);
+    if (key.empty()) {
+      key = "0";
+    }
+    if (sortById) {
+      removeSpaces(key);
+    }
+    rowSorter.add(std::move(key), rowNumber++, std::move(row));
+  }
+
+  if (sortById) {
+    // The batches are in id order, and so are the groups of each batch after
+    // sortIds
+    sortedBatches(
+        rowSorter, headerLine, maxBufferBytes, [&](std::istream& batch, auto&) {
+          std::stringstream groupByUnsortedOutFile;
+          std::stringstream groupByOutFile;
+          groupBy(
+              batch,
+              groupByColumn,
+              columnsToAggregate,
+              groupByUnsortedOutFile);
+          sortIds(groupByUnsortedOutFile, groupByOutFile);
+          processBatch(groupByOutFile);
+        });
+    return;
+  }
+
+  // groupBy outputs the groups in order of their first row. The groups of a
+  // batch are output in id order, so they are sorted again by the row number of
+  // their first row.
+  ExternalSorter groupSorter{tmpDirectory, maxBufferBytes};
+  std::string groupByHeaderLine;
+  sortedBatches(
+      rowSorter,
+      headerLine,
+      maxBufferBytes,
+      [&](std::istream& batch, const std::vector<uint64_t>& groupFirstRows) {
+        std::stringstream groupByOutFile;
+        groupBy(batch, groupByColumn, columnsToAggregate, groupByOutFile);
+        getline(groupByOutFile, groupByHeaderLine);
+        std::string groupRow;
+        for (auto firstRow : groupFirstRows) {
+          if (!getline(groupByOutFile, groupRow)) {
+            XLOG(FATAL) << "groupBy output fewer groups than the batch has";
+          }
+          groupSorter.add(
+              rowNumberKey(firstRow), firstRow, std::move(groupRow));
+        }
+      });
+  sortedBatches(
+      groupSorter,
+      groupByHeaderLine,
+      maxBufferBytes,
+      [&](std::istream& batch, auto&) { processBatch(batch); });
+}
+
+void sortIdsInBatches(
+    std::istream& inFile,
+    const std::filesystem::path& tmpDirectory,
+    std::size_t maxBufferBytes,
+    const std::function<void(std::istream& batch)>& processBatch) {
+  std::string headerLine;
+  getline(inFile, headerLine);
+  std::vector<std::string> header;
+  folly::split(",", headerLine, header);
+  auto idColumnIdx = headerIndex(header, "id_");
+
+  ExternalSorter rowSorter{tmpDirectory, maxBufferBytes};
+  std::string row;
+  uint64_t rowNumber = 0;
+  while (getline(inFile, row)) {
+    auto key = columnValue(row, idColumnIdx);
+    removeSpaces(key);
+    rowSorter.add(std::move(key), rowNumber++, std::move(row));
+  }
+
+  // sortIds keeps the last row of an id for every row of the id, so all the
+  // rows of an id need to be in the same batch
+  sortedBatches(
+      rowSorter, headerLine, maxBufferBytes, [&](std::istream& batch, auto&) {
+        std::stringstream sortedOutFile;
+        sortIds(batch, sortedOutFile);
+        processBatch(sortedOutFile);
+      });
+}
+
+void throughTmpFile(
+    const std::filesystem::path& tmpDirectory,
+    const std::function<void(std::ostream& outFile)>& write,
+    const std::function<void(std::istream& inFile)>& read) {
+  // Get a random ID to avoid potential name collisions if multiple
+  // runs at the same time use the same tmp directory
+  auto tmpFilepath = tmpDirectory /
+      ("intermediate_" + std::to_string(folly::Random::secureRand64()));
+  // Removes the file however read and write return
+  struct FileRemover {
+    const std::filesystem::path& path;
+    ~FileRemover() {
+      std::error_code ec;
+      std::filesystem::remove(path, ec);
+    }
+  } remover{tmpFilepath};
+
+  std::ofstream outFile{tmpFilepath};
+  write(outFile);
+  outFile.close();
+  if (outFile.fail()) {
+    XLOG(FATAL) << "Failed to write intermediate file " << tmpFilepath;
+  }
+  XLOG(INFO) << "Wrote intermediate file " << tmpFilepath;
+
+  std::ifstream inFile{tmpFilepath};
+  if (!inFile) {
+    XLOG(FATAL) << "Failed to open intermediate file " << tmpFilepath;
+  }
+  read(inFile);
+}
+
+void appendBatch(
+    std::istream& batch,
+    bool& isFirstBatch,
+    std::ostream& outFile) {
+  if (!isFirstBatch) {
+    std::string headerLine;
+    getline(batch, headerLine);
+  }
+  isFirstBatch = false;
+  // Inserting an empty stream buffer would set the failbit of outFile
+  if (batch.peek() != std::char_traits<char>::eof()) {
+    outFile << batch.rdbuf();
+  }
+}
+} // namespace pid::combiner
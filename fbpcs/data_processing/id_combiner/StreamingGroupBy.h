@@ -0,0 +1,172 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#pragma once
+
+#include <cstdint>
+#include <filesystem>
+#include <functional>
+#include <istream>
+#include <ostream>
+#include <string>
+#include <vector>
+
+namespace pid::combiner {
+/*
+This file implements groupBy and sortIds over datasets that do not fit in
+memory. The rows are grouped with an external sort: they are buffered until the
+buffer holds maxBufferBytes, then sorted by id and spilled to a run file in the
+tmp directory, and the runs are merged back. The merged rows are passed on in
+batches that hold whole groups of ids, so that groupBy and sortIds of a batch
+output exactly the rows they would output for the whole dataset. The rows of
+each batch can then go through the per row steps (addPaddingToCols,
+sortIntegralValues, ...) before the next batch is read.
+
+For example, with a tiny buffer and this input file content:
+id_       val1
+2           x
+1           y
+2           z
+
+groupByInBatches(..., sortById = true, ...) spills each row to its own run and
+calls processBatch with batches like:
+id_       val1
+1          [y]
+
+id_       val1
+2         [x,z]
+*/
+
+/**
+ * Sorts rows by key with at most about maxBufferBytes of rows in memory,
+ * spilling sorted runs to files in tmpDirectory. Rows with the same key are
+ * read back in order of their row number.
+ */
+class ExternalSorter {
+ public:
+  ExternalSorter(
+      std::filesystem::path tmpDirectory,
+      std::size_t maxBufferBytes);
+
+  ~ExternalSorter();
+
+  ExternalSorter(const ExternalSorter&) = delete;
+  ExternalSorter& operator=(const ExternalSorter&) = delete;
+
+  /**
+   * Adds a row, spilling the buffered rows to a run file if the buffer is full
+   *
+   * @param key the key to sort the row by. It must not contain a newline
+   * @param rowNumber the position of the row in the input, to order the rows
+   * with the same key
+   * @param row the row. It must not contain a newline
+   */
+  void add(std::string key, uint64_t rowNumber, std::string row);
+
+  /**
+   * Calls onRow for every row added, in order of key and row number, and
+   * removes the rows and the run files
+   *
+   * @param onRow called with the key, the row number and the row
+   */
+  void forEachSorted(const std::function<void(
+                         const std::string& key,
+                         uint64_t rowNumber,
+                         const std::string& row)>& onRow);
+
+  /**
+   * @returns how many runs were spilled to files since the last forEachSorted
+   */
+  std::size_t getRunCount() const {
+    return runPaths_.size();
+  }
+
+ private:
+  struct Entry {
+    std::string key;
+    uint64_t rowNumber;
+    std::string row;
+  };
+
+  void spill();
+  void removeRuns();
+
+  std::filesystem::path tmpDirectory_;
+  std::size_t maxBufferBytes_;
+  std::string runPrefix_;
+  std::vector<Entry> buffer_;
+  std::size_t bufferBytes_ = 0;
+  std::vector<std::filesystem::path> runPaths_;
+};
+
+/**
+ * Runs groupBy, followed by sortIds when sortById is true, in batches that
+ * hold whole groups. Concatenating the rows of the batches gives the output of
+ * groupBy (and sortIds) over the whole file.
+ *
+ * @param inFile the csv to group, header included
+ * @param groupByColumn the column to group by
+ * @param columnsToAggregate the columns aggregated into lists
+ * @param sortById whether the output is sorted by id like sortIds, instead of
+ * keeping the order of the first row of each group
+ * @param tmpDirectory where the sorted runs are spilled
+ * @param maxBufferBytes how many bytes of rows are kept in memory by each sort
+ * @param processBatch called at least once, with a csv of the output rows of a
+ * batch, each batch starting with the output header
+ */
+void groupByInBatches(
+    std::istream& inFile,
+    const std::string& groupByColumn,
+    const std::vector<std::string>& columnsToAggregate,
+    bool sortById,
+    const std::filesystem::path& tmpDirectory,
+    std::size_t maxBufferBytes,
+    const std::function<void(std::istream& batch)>& processBatch);
+
+/**
+ * Runs sortIds in batches that hold all the rows of their ids. Concatenating
+ * the rows of the batches gives the output of sortIds over the whole file.
+ *
+ * @param inFile the csv to sort, header included
+ * @param tmpDirectory where the sorted runs are spilled
+ * @param maxBufferBytes how many bytes of rows are kept in memory
+ * @param processBatch called at least once, with a csv of the output rows of a
+ * batch, each batch starting with the output header
+ */
+void sortIdsInBatches(
+    std::istream& inFile,
+    const std::filesystem::path& tmpDirectory,
+    std::size_t maxBufferBytes,
+    const std::function<void(std::istream& batch)>& processBatch);
+
+/**
+ * Writes a file in tmpDirectory with write, then reads it back with read and
+ * removes it, so that an intermediate output like the idSwap output is held
+ * on disk instead of in memory
+ *
+ * @param tmpDirectory where the file is written
+ * @param write called with the file to write
+ * @param read called with the file written, opened for reading
+ */
+void throughTmpFile(
+    const std::filesystem::path& tmpDirectory,
+    const std::function<void(std::ostream& outFile)>& write,
+    const std::function<void(std::istream& inFile)>& read);
+
+/**
+ * Appends the rows of a batch to outFile, with the header of the batch only
+ * for the first batch
+ *
+ * @param batch a csv starting with a header
+ * @param isFirstBatch whether this is the first batch, set to false afterwards
+ * @param outFile the combined output
+ */
+void appendBatch(
+    std::istream& batch,
+    bool& isFirstBatch,
+    std::ostream& outFile);
+} // namespace pid::combiner
@@ -0,0 +1,149 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+/**
+ * Rows per second and peak memory of the lift partner aggregation (groupBy,
+ * sortIds, addPaddingToCols and sortIntegralValues) on synthetic conversions,
+ * either on the whole dataset in memory or streamed in batches with
+ * groupByInBatches, reading the input from a tmp file like the combiners do.
+ * The peak memory is the maximum resident set size of the process, so run
+ * each mode in its own process:
+ *
+ *   StreamingGroupByBenchmark --streaming=false
+ *   StreamingGroupByBenchmark --streaming=true --max_sort_buffer_bytes=...
+ */
+
+#include <sys/resource.h>
+
+#include <chrono>
+#include <cstdint>
+#include <fstream>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include <folly/Format.h>
+#include <folly/Random.h>
+#include <folly/init/Init.h>
+#include <gflags/gflags.h>
+
+#include "fbpcs/data_processing/id_combiner/AddPaddingToCols.h"
+#include "fbpcs/data_processing/id_combiner/GroupBy.h"
+#include "fbpcs/data_processing/id_combiner/SortIds.h"
+#include "fbpcs/data_processing/id_combiner/SortIntegralValues.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
+
+DEFINE_int64(num_rows, 1000000, "Number of conversion rows to aggregate");
+DEFINE_int64(num_ids, 250000, "Number of distinct ids of the conversions");
+DEFINE_bool(streaming, true, "Aggregate in batches instead of in memory");
+DEFINE_int64(
+    max_sort_buffer_bytes,
+    64 * 1024 * 1024,
+    "Bytes of rows each sort keeps in memory before spilling");
+DEFINE_string(tmp_directory, "/tmp", "Directory of the spilled runs");
+DEFINE_string(output_path, "/dev/null", "Where the aggregated rows go");
+
+namespace pid::combiner {
+namespace {
+const std::vector<std::string> kAggregatedCols = {"event_timestamp", "value"};
+const std::vector<std::string> kRenamedAggregatedCols = {
+    "event_timestamps",
+    "values"};
+constexpr int32_t kPaddingSize = 4;
+
+void genData(int64_t numRows, int64_t numIds, std::ostream& data) {
+  data << "id_,event_timestamp,value\n";
+  for (int64_t i = 0; i < numRows; ++i) {
+    data << folly::sformat(
+        "{:016x},{},{}\n",
+        folly::Random::rand64(numIds) * 0x9E3779B97F4A7C15,
+        folly::Random::rand32(1000000),
+        folly::Random::rand32(10000));
+  }
+}
+
+// Rename, pad and sort the conversions of grouped rows, like LiftStrategy
+void aggregateGroups(std::istream& groupByOutFile, std::ostream& outFile) {
+  std::string line;
+  std::stringstream renamedColsFile;
+  renamedColsFile << "id_,event_timestamps,values\n";
+  getline(groupByOutFile, line);
+  renamedColsFile << groupByOutFile.rdbuf();
+
+  std::vector<int32_t> colPaddingSize(
+      kRenamedAggregatedCols.size(), kPaddingSize);
+  std::stringstream paddingOutFile;
+  addPaddingToCols(
+      renamedColsFile,
+      kRenamedAggregatedCols,
+      colPaddingSize,
+      true,
+      paddingOutFile);
+  sortIntegralValues(
+      paddingOutFile, outFile, "event_timestamps", kRenamedAggregatedCols);
+}
+
+void run() {
+  std::ofstream outFile{FLAGS_output_path};
+  std::chrono::duration<double> elapsed{0};
+
+  if (FLAGS_streaming) {
+    // The input goes through a tmp file, like the idSwap output of the
+    // combiners, so only the batches are held in memory
+    throughTmpFile(
+        FLAGS_tmp_directory,
+        [](std::ostream& data) {
+          genData(FLAGS_num_rows, FLAGS_num_ids, data);
+        },
+        [&](std::istream& data) {
+          auto start = std::chrono::steady_clock::now();
+          bool isFirstBatch = true;
+          groupByInBatches(
+              data,
+              "id_",
+              kAggregatedCols,
+              true,
+              FLAGS_tmp_directory,
+              FLAGS_max_sort_buffer_bytes,
+              [&](std::istream& groupByOutFile) {
+                std::stringstream sortingOutFile;
+                aggregateGroups(groupByOutFile, sortingOutFile);
+                appendBatch(sortingOutFile, isFirstBatch, outFile);
+              });
+          elapsed = std::chrono::steady_clock::now() - start;
+        });
+  } else {
+    std::stringstream data;
+    genData(FLAGS_num_rows, FLAGS_num_ids, data);
+    auto start = std::chrono::steady_clock::now();
+    std::stringstream groupByUnsortedOutFile;
+    std::stringstream groupByOutFile;
+    groupBy(data, "id_", kAggregatedCols, groupByUnsortedOutFile);
+    sortIds(groupByUnsortedOutFile, groupByOutFile);
+    aggregateGroups(groupByOutFile, outFile);
+    elapsed = std::chrono::steady_clock::now() - start;
+  }
+
+  struct rusage usage;
+  getrusage(RUSAGE_SELF, &usage);
+  std::cout << folly::sformat(
+      "{:>10} {:>14} {:>14}\n", "mode", "rows/s", "peak RSS MB");
+  std::cout << folly::sformat(
+      "{:>10} {:>14.0f} {:>14.1f}\n",
+      FLAGS_streaming ? "streaming" : "in memory",
+      FLAGS_num_rows / elapsed.count(),
+      usage.ru_maxrss / 1024.0);
+}
+} // namespace
+} // namespace pid::combiner
+
+int main(int argc, char** argv) {
+  folly::init(&argc, &argv);
+  pid::combiner::run();
+  return 0;
+}
@@ -0,0 +1,235 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#include "../StreamingGroupBy.h"
+
+#include <filesystem>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include <folly/Random.h>
+#include <gtest/gtest.h>
+
+#include "../GroupBy.h"
+#include "../SortIds.h"
+
+class StreamingGroupByTest : public testing::Test {
+ public:
+  void SetUp() override {
+    tmpDirectory_ = std::filesystem::path{"/tmp"} /
+        ("StreamingGroupByTest" +
+         std::to_string(folly::Random::secureRand64()));
+    std::filesystem::create_directories(tmpDirectory_);
+  }
+
+  void TearDown() override {
+    // Every run file is removed once the rows are read back
+    EXPECT_TRUE(std::filesystem::is_empty(tmpDirectory_));
+    std::filesystem::remove_all(tmpDirectory_);
+  }
+
+  std::string vectorToCsv(const std::vector<std::string>& rows) {
+    std::stringstream out;
+    for (auto const& row : rows) {
+      out << row << '\n';
+    }
+    return out.str();
+  }
+
+  std::string groupByInMemory(const std::string& data, bool sortById) {
+    std::stringstream inFile{data};
+    std::stringstream groupByOutFile;
+    pid::combiner::groupBy(inFile, "id_", columnsToAggregate_, groupByOutFile);
+    if (!sortById) {
+      return groupByOutFile.str();
+    }
+    std::stringstream sortedOutFile;
+    pid::combiner::sortIds(groupByOutFile, sortedOutFile);
+    return sortedOutFile.str();
+  }
+
+  std::string groupByStreaming(
+      const std::string& data,
+      bool sortById,
+      std::size_t maxBufferBytes) {
+    std::stringstream inFile{data};
+    std::stringstream outFile;
+    bool isFirstBatch = true;
+    pid::combiner::groupByInBatches(
+        inFile,
+        "id_",
+        columnsToAggregate_,
+        sortById,
+        tmpDirectory_,
+        maxBufferBytes,
+        [&](std::istream& batch) {
+          ++batchCount_;
+          pid::combiner::appendBatch(batch, isFirstBatch, outFile);
+        });
+    return outFile.str();
+  }
+
+  std::string sortIdsStreaming(
+      const std::string& data,
+      std::size_t maxBufferBytes) {
+    std::stringstream inFile{data};
+    std::stringstream outFile;
+    bool isFirstBatch = true;
+    pid::combiner::sortIdsInBatches(
+        inFile, tmpDirectory_, maxBufferBytes, [&](std::istream& batch) {
+          ++batchCount_;
+          pid::combiner::appendBatch(batch, isFirstBatch, outFile);
+        });
+    return outFile.str();
+  }
+
+  std::vector<std::string> genRows(int32_t numRows, int32_t numIds) {
+    std::vector<std::string> rows = {"id_,event_timestamp,value,cohort_id"};
+    for (auto i = 0; i < numRows; ++i) {
+      auto id = folly::Random::oneIn(10)
+          ? ""
+          : "id_" + std::to_string(folly::Random::rand32(numIds));
+      rows.push_back(
+          id + "," + std::to_string(folly::Random::rand32(1000)) + "," +
+          std::to_string(folly::Random::rand32(100)) + "," +
+          std::to_string(folly::Random::rand32(3)));
+    }
+    return rows;
+  }
+
+ protected:
+  std::filesystem::path tmpDirectory_;
+  std::vector<std::string> columnsToAggregate_ = {"event_timestamp", "value"};
+  int32_t batchCount_ = 0;
+};
+
+TEST_F(StreamingGroupByTest, TestExternalSorterSpillsAndMerges) {
+  pid::combiner::ExternalSorter sorter{tmpDirectory_, 64};
+  std::vector<std::string> keys = {"b", "a", "c", "a", "b", "a"};
+  for (std::size_t i = 0; i < keys.size(); ++i) {
+    sorter.add(keys.at(i), i, keys.at(i) + std::to_string(i));
+  }
+  EXPECT_GT(sorter.getRunCount(), 1);
+
+  std::vector<std::string> rows;
+  sorter.forEachSorted(
+      [&](const std::string&, uint64_t, const std::string& row) {
+        rows.push_back(row);
+      });
+  std::vector<std::string> expectedRows = {"a1", "a3", "a5", "b0", "b4", "c2"};
+  EXPECT_EQ(rows, expectedRows);
+  EXPECT_EQ(sorter.getRunCount(), 0);
+}
+
+TEST_F(StreamingGroupByTest, TestGroupBySorted) {
+  auto data = vectorToCsv(
+      {"id_,event_timestamp,value",
+       "id_2,200,20",
+       "id_1,100,10",
+       "id_2,300,30",
+       "id_3,400,40"});
+  auto expected = vectorToCsv(
+      {"id_,event_timestamp,value",
+       "id_1,[100],[10]",
+       "id_2,[200,300],[20,30]",
+       "id_3,[400],[40]"});
+
+  // Each row is spilled to its own run, and each group is a batch
+  EXPECT_EQ(groupByStreaming(data, true, 1), expected);
+  EXPECT_EQ(batchCount_, 3);
+}
+
+TEST_F(StreamingGroupByTest, TestGroupByKeepOriginal) {
+  auto data = vectorToCsv(
+      {"id_,event_timestamp,value",
+       "id_2,200,20",
+       "id_1,100,10",
+       "id_2,300,30",
+       "id_3,400,40"});
+  auto expected = vectorToCsv(
+      {"id_,event_timestamp,value",
+       "id_2,[200,300],[20,30]",
+       "id_1,[100],[10]",
+       "id_3,[400],[40]"});
+
+  EXPECT_EQ(groupByStreaming(data, false, 1), expected);
+}
+
+TEST_F(StreamingGroupByTest, TestGroupByNoRows) {
+  auto data = vectorToCsv({"id_,event_timestamp,value"});
+  EXPECT_EQ(groupByStreaming(data, true, 1), data);
+  EXPECT_EQ(groupByStreaming(data, false, 1), data);
+}
+
+TEST_F(StreamingGroupByTest, TestGroupByMatchesInMemory) {
+  for (auto maxBufferBytes : {1, 500, 1 << 20}) {
+    auto data = vectorToCsv(genRows(1000, 100));
+    for (auto sortById : {true, false}) {
+      EXPECT_EQ(
+          groupByStreaming(data, sortById, maxBufferBytes),
+          groupByInMemory(data, sortById));
+    }
+  }
+}
+
+TEST_F(StreamingGroupByTest, TestSortIdsMatchesInMemory) {
+  std::vector<std::string> rows = {"id_,value"};
+  for (auto i = 0; i < 1000; ++i) {
+    rows.push_back(
+        "id_" + std::to_string(folly::Random::rand32(100)) + "," +
+        std::to_string(i));
+  }
+  auto data = vectorToCsv(rows);
+
+  for (auto maxBufferBytes : {1, 500, 1 << 20}) {
+    std::stringstream inFile{data};
+    std::stringstream sortedOutFile;
+    pid::combiner::sortIds(inFile, sortedOutFile);
+    EXPECT_EQ(sortIdsStreaming(data, maxBufferBytes), sortedOutFile.str());
+  }
+}
+
+TEST_F(StreamingGroupByTest, TestThroughTmpFile) {
+  auto data = vectorToCsv(genRows(1000, 100));
+  std::string readData;
+  pid::combiner::throughTmpFile(
+      tmpDirectory_,
+      [&](std::ostream& outFile) { outFile << data; },
+      [&](std::istream& inFile) {
+        // TearDown checks the file is removed afterwards
+        EXPECT_FALSE(std::filesystem::is_empty(tmpDirectory_));
+        std::stringstream readFile;
+        readFile << inFile.rdbuf();
+        readData = readFile.str();
+      });
+  EXPECT_EQ(readData, data);
+}
+
+TEST_F(StreamingGroupByTest, TestGroupByThroughTmpFileMatchesInMemory) {
+  auto data = vectorToCsv(genRows(1000, 100));
+  for (auto sortById : {true, false}) {
+    std::stringstream outFile;
+    bool isFirstBatch = true;
+    pid::combiner::throughTmpFile(
+        tmpDirectory_,
+        [&](std::ostream& idSwapOutFile) { idSwapOutFile << data; },
+        [&](std::istream& idSwapOutFile) {
+          pid::combiner::groupByInBatches(
+              idSwapOutFile,
+              "id_",
+              columnsToAggregate_,
+              sortById,
+              tmpDirectory_,
+              500,
+              [&](std::istream& batch) {
+                pid::combiner::appendBatch(batch, isFirstBatch, outFile);
+              });
+        });
+    EXPECT_EQ(outFile.str(), groupByInMemory(data, sortById));
+  }
+}
@@ -29,6 +29,10 @@ DEFINE_string(
     "sort",
     "Sorting strategy selected for the output data - options: (sort|keep_original)");
 DEFINE_int32(max_id_column_cnt, 1, "Maximum number of id columns to use as id");
+DEFINE_int64(
+    max_sort_buffer_bytes,
+    1073741824,
+    "Bytes of rows each sort keeps in memory before spilling to tmp_directory");
 DEFINE_string(protocol_type, "PID", "protocol type");
 DEFINE_string(
     run_id,
@@ -16,5 +16,6 @@ DECLARE_string(tmp_directory);
 DECLARE_int32(multi_conversion_limit);
 DECLARE_string(sort_strategy);
 DECLARE_int32(max_id_column_cnt);
+DECLARE_int64(max_sort_buffer_bytes);
 DECLARE_string(protocol_type);
 DECLARE_string(run_id);
@@ -14,15 +14,14 @@
 #include "fbpcs/data_processing/id_combiner/AddPaddingToCols.h"
 #include "fbpcs/data_processing/id_combiner/DataPreparationHelpers.h"
 #include "fbpcs/data_processing/id_combiner/DataValidation.h"
-#include "fbpcs/data_processing/id_combiner/GroupBy.h"
 #include "fbpcs/data_processing/id_combiner/IdSwapMultiKey.h"
-#include "fbpcs/data_processing/id_combiner/SortIds.h"
 #include "fbpcs/data_processing/id_combiner/SortIntegralValues.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 #include "fbpcs/data_processing/lift_id_combiner/LiftIdSpineCombinerOptions.h"
 
 namespace pid::combiner {
 void LiftStrategy::aggregate(
-    std::stringstream& idSwapOutFile,
+    std::istream& idSwapOutFile,
     bool isPublisherDataset,
     std::string outputPath,
     std::string tmpDirectory,
@@ -45,24 +44,21 @@ void LiftStrategy::aggregate(
   idSwapOutFile.seekg(0);
   std::string line;
 
+  if (sortStrategy != "sort" && sortStrategy != "keep_original") {
+    XLOG(FATAL) << "Invalid sort strategy '" << sortStrategy
+                << "'. Expected 'sort' or 'keep_original'.";
+  }
+
+  // The rows are grouped and sorted in batches of whole ids, spilling to the
+  // tmp directory, so that only a batch at a time goes through the remaining
+  // steps
+
   // if partner data, we want to aggregate over remaining columns,
   // add padding, and rename the aggregated columns
 
   // if its publisher, we want to add the opportunity column based on
   // opportunity_timestamp
   if (isPublisherDataset) {
-    // There is no grouping for publisher side,
-    // so we can do ID sorting directly.
-    std::stringstream sortedOutFile;
-    if (sortStrategy == "sort") {
-      pid::combiner::sortIds(idSwapOutFile, sortedOutFile);
-    } else if (sortStrategy == "keep_original") {
-      sortedOutFile << idSwapOutFile.rdbuf();
-    } else {
-      XLOG(FATAL) << "Invalid sort strategy '" << sortStrategy
-                  << "'. Expected 'sort' or 'keep_original'.";
-    }
-
     // We need to get the timestamp index *before* we add the new column
     // Otherwise, we'll get a std::out_of_range exception
     auto timestampIndex =
@@ -74,16 +70,27 @@ void LiftStrategy::aggregate(
     // add opportunity value.
     // if timestamp is 0, opportunity is 0
     // if timestamp is not 0, opportunity is 1
-    getline(sortedOutFile, line); // skip header
-    while (getline(sortedOutFile, line)) {
-      std::vector<std::string> row;
-      folly::split(",", line, row);
-      if (row.at(timestampIndex) == "0") {
-        row.insert(row.end() - 1, "0");
-      } else {
-        row.insert(row.end() - 1, "1");
+    auto addOpportunity = [&](std::istream& sortedOutFile) {
+      getline(sortedOutFile, line); // skip header
+      while (getline(sortedOutFile, line)) {
+        std::vector<std::string> row;
+        folly::split(",", line, row);
+        if (row.at(timestampIndex) == "0") {
+          row.insert(row.end() - 1, "0");
+        } else {
+          row.insert(row.end() - 1, "1");
+        }
+        outFile << combiner::vectorToString(row) << "\n";
       }
-      outFile << combiner::vectorToString(row) << "\n";
+    };
+
+    // There is no grouping for publisher side,
+    // so we can do ID sorting directly.
+    if (sortStrategy == "sort") {
+      pid::combiner::sortIdsInBatches(
+          idSwapOutFile, tempDir, FLAGS_max_sort_buffer_bytes, addOpportunity);
+    } else {
+      addOpportunity(idSwapOutFile);
     }
   } else {
     // get all columns that are not id_, these are the columns we want to
@@ -100,42 +107,20 @@ void LiftStrategy::aggregate(
         std::remove(aggregatedCols.begin(), aggregatedCols.end(), "cohort_id"),
         aggregatedCols.end());
 
-    std::stringstream groupByOutFile;
-    std::stringstream groupByUnsortedOutFile;
-    if (sortStrategy == "sort") {
-      pid::combiner::groupBy(
-          idSwapOutFile, "id_", aggregatedCols, groupByUnsortedOutFile);
-      pid::combiner::sortIds(groupByUnsortedOutFile, groupByOutFile);
-    } else if (sortStrategy == "keep_original") {
-      pid::combiner::groupBy(
-          idSwapOutFile, "id_", aggregatedCols, groupByOutFile);
-    } else {
-      XLOG(FATAL) << "Invalid sort strategy '" << sortStrategy
-                  << "'. Expected 'sort' or 'keep_original'.";
-    }
-
     // add "s" to all aggregated column headers
-    std::stringstream renamedColsFile;
+    std::vector<std::string> renamedAggregatedCols = aggregatedCols;
     std::vector<std::string> renamedColsVec = idSwapOutFileHeader;
-    for (auto& colName : aggregatedCols) {
+    for (auto& colName : renamedAggregatedCols) {
       auto it = find(renamedColsVec.begin(), renamedColsVec.end(), colName);
       colName.append("s");
       *it = colName;
     }
-    renamedColsFile << combiner::vectorToString(renamedColsVec) << "\n";
-    getline(groupByOutFile, line);
-    renamedColsFile << groupByOutFile.rdbuf();
 
-    // define padding size and add padding to aggregated columns
+    // define padding size for the aggregated columns
     std::vector<int32_t> colPaddingSize(
-        aggregatedCols.size(), FLAGS_multi_conversion_limit);
-    std::stringstream paddingOutFile;
-
-    pid::combiner::addPaddingToCols(
-        renamedColsFile, aggregatedCols, colPaddingSize, true, paddingOutFile);
+        renamedAggregatedCols.size(), FLAGS_multi_conversion_limit);
 
     // ensure conversions are sorted by timestamp
-    std::stringstream sortingOutFile;
     std::string sortBy = "event_timestamps";
     std::vector<std::string> listColumns = {"event_timestamps"};
     // It's possible that this is a "valueless" run
@@ -146,10 +131,35 @@ void LiftStrategy::aggregate(
         idSwapOutFileHeader.end()) {
       listColumns.push_back("values");
     }
-    pid::combiner::sortIntegralValues(
-        paddingOutFile, sortingOutFile, sortBy, listColumns);
 
-    outFile << sortingOutFile.rdbuf();
+    bool isFirstBatch = true;
+    pid::combiner::groupByInBatches(
+        idSwapOutFile,
+        "id_",
+        aggregatedCols,
+        sortStrategy == "sort",
+        tempDir,
+        FLAGS_max_sort_buffer_bytes,
+        [&](std::istream& groupByOutFile) {
+          std::stringstream renamedColsFile;
+          renamedColsFile << combiner::vectorToString(renamedColsVec) << "\n";
+          getline(groupByOutFile, line);
+          renamedColsFile << groupByOutFile.rdbuf();
+
+          std::stringstream paddingOutFile;
+          pid::combiner::addPaddingToCols(
+              renamedColsFile,
+              renamedAggregatedCols,
+              colPaddingSize,
+              true,
+              paddingOutFile);
+
+          std::stringstream sortingOutFile;
+          pid::combiner::sortIntegralValues(
+              paddingOutFile, sortingOutFile, sortBy, listColumns);
+
+          pid::combiner::appendBatch(sortingOutFile, isFirstBatch, outFile);
+        });
   }
 
   XLOG(INFO) << "Now copying combined data to final output path";
@@ -27,6 +27,7 @@
 #include "fbpcs/data_processing/common/FilepathHelpers.h"
 #include "fbpcs/data_processing/id_combiner/DataPreparationHelpers.h"
 #include "fbpcs/data_processing/id_combiner/IdSwapMultiKey.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 #include "fbpcs/data_processing/lift_id_combiner/LiftIdSpineCombinerOptions.h"
 
 namespace pid::combiner {
@@ -59,13 +60,13 @@ MrPidLiftIdCombiner::~MrPidLiftIdCombiner() {
   spineIdFile->close();
 }
 
-std::stringstream MrPidLiftIdCombiner::idSwap(FileMetaData meta) {
+void MrPidLiftIdCombiner::idSwap(
+    FileMetaData meta,
+    std::ostream& idSwapOutFile) {
   auto spineReader = std::make_unique<fbpcf::io::FileReader>(spineIdFilePath);
   auto spineIdFileDup =
       std::make_shared<fbpcf::io::BufferedReader>(std::move(spineReader));
 
-  std::stringstream idSwapOutFile;
-
   if (meta.isPublisherDataset) {
     const std::string kCommaSplitRegex = ",";
     const std::string kIdColumnPrefix = "id_";
@@ -131,19 +132,23 @@ std::stringstream MrPidLiftIdCombiner::idSwap(FileMetaData meta) {
       idSwapOutFile << spineRow << "\n";
     }
   }
-
-  return idSwapOutFile;
 }
 
 void MrPidLiftIdCombiner::run() {
   auto meta = processHeader(spineIdFile);
-  std::stringstream idSwapOutFile = idSwap(meta);
-  aggregate(
-      idSwapOutFile,
-      meta.isPublisherDataset,
-      outputPath,
+  // The idSwap output goes through a tmp file rather than memory, so that
+  // aggregate() only holds a batch of it at a time
+  throughTmpFile(
       tmpDirectory,
-      sortStrategy);
+      [&](std::ostream& idSwapOutFile) { idSwap(meta, idSwapOutFile); },
+      [&](std::istream& idSwapOutFile) {
+        aggregate(
+            idSwapOutFile,
+            meta.isPublisherDataset,
+            outputPath,
+            tmpDirectory,
+            sortStrategy);
+      });
 }
 
 } // namespace pid::combiner
@@ -47,9 +47,9 @@ class MrPidLiftIdCombiner : public LiftStrategy {
    *by line
    * @param meta meta data which has headerline and isPublisherDataset to run
    *idSwapMultiKey()
-   * @return stringstream output stream of mr pid matching result
+   * @param idSwapOutFile where the mr pid matching result is written
    **/
-  std::stringstream idSwap(FileMetaData meta);
+  void idSwap(FileMetaData meta, std::ostream& idSwapOutFile);
   /**
    * run() has three steps
    * 1. process header, get file type and other meta data
@@ -24,6 +24,7 @@
 #include "fbpcs/data_processing/common/FilepathHelpers.h"
 #include "fbpcs/data_processing/id_combiner/DataPreparationHelpers.h"
 #include "fbpcs/data_processing/id_combiner/IdSwapMultiKey.h"
+#include "fbpcs/data_processing/id_combiner/StreamingGroupBy.h"
 #include "fbpcs/data_processing/lift_id_combiner/LiftIdSpineCombinerOptions.h"
 
 namespace pid::combiner {
@@ -59,8 +60,9 @@ PidLiftIdCombiner::~PidLiftIdCombiner() {
   spineIdFile->close();
 }
 
-std::stringstream PidLiftIdCombiner::idSwap(FileMetaData meta) {
-  std::stringstream idSwapOutFile;
+void PidLiftIdCombiner::idSwap(
+    FileMetaData meta,
+    std::ostream& idSwapOutFile) {
   if (meta.isPublisherDataset) {
     pid::combiner::idSwapMultiKey(
         dataFile,
@@ -79,19 +81,23 @@ std::stringstream PidLiftIdCombiner::idSwap(FileMetaData meta) {
         meta.headerLine,
         spineIdFilePath);
   }
-
-  return idSwapOutFile;
 }
 
 void PidLiftIdCombiner::run() {
   auto meta = processHeader(dataFile);
-  std::stringstream idSwapOutFile = idSwap(meta);
-  aggregate(
-      idSwapOutFile,
-      meta.isPublisherDataset,
-      outputPath,
+  // The idSwap output goes through a tmp file rather than memory, so that
+  // aggregate() only holds a batch of it at a time
+  throughTmpFile(
       tmpDirectory,
-      sortStrategy);
+      [&](std::ostream& idSwapOutFile) { idSwap(meta, idSwapOutFile); },
+      [&](std::istream& idSwapOutFile) {
+        aggregate(
+            idSwapOutFile,
+            meta.isPublisherDataset,
+            outputPath,
+            tmpDirectory,
+            sortStrategy);
+      });
 }
 
 } // namespace pid::combiner
@@ -51,9 +51,9 @@ class PidLiftIdCombiner : public LiftStrategy {
    *
    * @param meta meta data which has headerline and isPublisherDataset to run
    *idSwapMultiKey()
-   * @return stringstream output stream of mr pid matching result
+   * @param idSwapOutFile where the pid output is written
    **/
-  std::stringstream idSwap(FileMetaData meta);
+  void idSwap(FileMetaData meta, std::ostream& idSwapOutFile);
   /**
    * run() has three steps
    * 1. process header, get file type and other meta data
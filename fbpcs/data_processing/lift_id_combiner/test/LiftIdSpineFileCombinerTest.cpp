@@ -358,6 +358,32 @@ TEST_F(LiftIdSpineFileCombinerTest, ValidMrPidSpinePartner) {
   runTest(dataInput, spineInput, expectedOutput, PROTOCOL_MRPID);
 }
 
+// Same as ValidSpinePartner, with every row spilled to disk by the sorts
+TEST_F(LiftIdSpineFileCombinerTest, ValidSpinePartnerSpilledToDisk) {
+  FLAGS_multi_conversion_limit = 4;
+  auto maxSortBufferBytes = FLAGS_max_sort_buffer_bytes;
+  FLAGS_max_sort_buffer_bytes = 1;
+  std::vector<std::string> dataInput = {
+      "id_,event_timestamp,value",
+      "123,125,100",
+      "111,200,200",
+      "123,100,50",
+      "222,375,300",
+      "333,400,400"};
+  std::vector<std::string> spineInput = {
+      "1,123", "2,", "10,111", "DDDD,", "EEEE,222", "FFFF,333"};
+  std::vector<std::string> expectedOutput = {
+      "id_,event_timestamps,values",
+      "1,[0,0,100,125],[0,0,50,100]",
+      "10,[0,0,0,200],[0,0,0,200]",
+      "2,[0,0,0,0],[0,0,0,0]",
+      "DDDD,[0,0,0,0],[0,0,0,0]",
+      "EEEE,[0,0,0,375],[0,0,0,300]",
+      "FFFF,[0,0,0,400],[0,0,0,400]"};
+  runTest(dataInput, spineInput, expectedOutput);
+  FLAGS_max_sort_buffer_bytes = maxSortBufferBytes;
+}
+
 // Valid spine with some amount of overlap for partner, using hashed ids
 // No opp_flag flag needed at the output level
 TEST_F(LiftIdSpineFileCombinerTest, ValidSpinePartnerWithHashedId) {
@@ -0,0 +1,90 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#include "IdDigestSet.h"
+
+#include <utility>
+
+#include <folly/hash/SpookyHashV2.h>
+
+namespace measurement::pid {
+
+namespace {
+constexpr std::size_t kMinSlotCount = 1024;
+// The table grows once it is this full, so that probe sequences stay short
+constexpr std::size_t kMaxLoadNumerator = 3;
+constexpr std::size_t kMaxLoadDenominator = 4;
+// Seeds of the two 64 bit halves of the digest
+constexpr uint64_t kDigestSeedHigh = 0x9E3779B97F4A7C15;
+constexpr uint64_t kDigestSeedLow = 0xC2B2AE3D27D4EB4F;
+} // namespace
+
+IdDigestSet::IdDigestSet(std::size_t expectedSize) {
+  auto slotCount = kMinSlotCount;
+  while (slotCount * kMaxLoadNumerator / kMaxLoadDenominator < expectedSize) {
+    slotCount *= 2;
+  }
+  slots_.resize(slotCount, Digest{0, 0});
+}
+
+IdDigestSet::Digest IdDigestSet::getDigest(std::string_view id) {
+  uint64_t high = kDigestSeedHigh;
+  uint64_t low = kDigestSeedLow;
+  folly::hash::SpookyHashV2::Hash128(id.data(), id.size(), &high, &low);
+  return Digest{high, low};
+}
+
+std::size_t IdDigestSet::findSlot(const Digest& digest) const {
+  // The slot count is a power of 2, and the digest bits are uniform
+  auto mask = slots_.size() - 1;
+  auto slot = digest.high & mask;
+  while (!slots_[slot].isEmpty() && !(slots_[slot] == digest)) {
+    slot = (slot + 1) & mask;
+  }
+  return slot;
+}
+
+bool IdDigestSet::contains(std::string_view id) const {
+  auto digest = getDigest(id);
+  if (digest.isEmpty()) {
+    return hasEmptyDigest_;
+  }
+  return !slots_[findSlot(digest)].isEmpty();
+}
+
+bool IdDigestSet::insert(std::string_view id) {
+  auto digest = getDigest(id);
+  if (digest.isEmpty()) {
+    auto inserted = !hasEmptyDigest_;
+    hasEmptyDigest_ = true;
+    size_ += inserted;
+    return inserted;
+  }
+
+  auto slot = findSlot(digest);
+  if (!slots_[slot].isEmpty()) {
+    return false;
+  }
+  slots_[slot] = digest;
+  ++size_;
+  if (size_ * kMaxLoadDenominator > slots_.size() * kMaxLoadNumerator) {
+    grow();
+  }
+  return true;
+}
+
+void IdDigestSet::grow() {
+  std::vector<Digest> oldSlots(slots_.size() * 2, Digest{0, 0});
+  std::swap(slots_, oldSlots);
+  for (const auto& digest : oldSlots) {
+    if (!digest.isEmpty()) {
+      slots_[findSlot(digest)] = digest;
+    }
+  }
+}
+
+} // namespace measurement::pid
@@ -0,0 +1,87 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#pragma once
+
+#include <cstdint>
+#include <string_view>
+#include <vector>
+
+namespace measurement::pid {
+
+/**
+ * A set of ids that stores a 128 bit digest of each id instead of the id, in
+ * an open addressing table with linear probing. Each slot takes 16 bytes and
+ * the table is at most 3/4 full, so an id takes at most about 43 bytes however
+ * long it is, where a std::unordered_set<std::string> takes a node, a bucket
+ * and usually a heap allocation for the string. Two different ids have the
+ * same digest with probability 2^-128, so the set behaves like a set of the
+ * ids themselves.
+ */
+class IdDigestSet {
+ public:
+  /**
+   * @param expectedSize how many ids to make room for up front
+   */
+  explicit IdDigestSet(std::size_t expectedSize = 0);
+
+  /**
+   * @returns whether id was inserted before
+   */
+  bool contains(std::string_view id) const;
+
+  /**
+   * Inserts id if it isn't in the set yet
+   *
+   * @returns whether id was inserted, i.e. it wasn't in the set
+   */
+  bool insert(std::string_view id);
+
+  /**
+   * @returns how many distinct ids were inserted
+   */
+  std::size_t size() const {
+    return size_;
+  }
+
+  /**
+   * @returns how many bytes the table takes
+   */
+  std::size_t getMemoryBytes() const {
+    return slots_.capacity() * sizeof(Digest);
+  }
+
+ private:
+  struct Digest {
+    uint64_t high;
+    uint64_t low;
+
+    bool operator==(const Digest& other) const {
+      return high == other.high && low == other.low;
+    }
+
+    // The digest of no id: a slot holding it is empty
+    bool isEmpty() const {
+      return high == 0 && low == 0;
+    }
+  };
+
+  static Digest getDigest(std::string_view id);
+
+  // The slot holding digest, or the empty slot where it would be inserted
+  std::size_t findSlot(const Digest& digest) const;
+
+  void grow();
+
+  std::vector<Digest> slots_;
+  std::size_t size_ = 0;
+  // Whether an id with the all zero digest, which marks empty slots, was
+  // inserted
+  bool hasEmptyDigest_ = false;
+};
+
+} // namespace measurement::pid
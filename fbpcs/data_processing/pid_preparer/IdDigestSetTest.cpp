@@ -0,0 +1,57 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#include <string>
+#include <unordered_set>
+
+#include <folly/Random.h>
+#include <gtest/gtest.h>
+
+#include "IdDigestSet.h"
+
+namespace measurement::pid {
+
+TEST(IdDigestSetTest, InsertAndContains) {
+  IdDigestSet ids;
+  EXPECT_FALSE(ids.contains("123"));
+  EXPECT_TRUE(ids.insert("123"));
+  EXPECT_TRUE(ids.contains("123"));
+  EXPECT_FALSE(ids.insert("123"));
+  EXPECT_FALSE(ids.contains("1234"));
+  EXPECT_FALSE(ids.contains(""));
+  EXPECT_TRUE(ids.insert(""));
+  EXPECT_TRUE(ids.contains(""));
+  EXPECT_EQ(2, ids.size());
+}
+
+TEST(IdDigestSetTest, MatchesUnorderedSetWhileGrowing) {
+  IdDigestSet ids;
+  std::unordered_set<std::string> expectedIds;
+  auto initialMemoryBytes = ids.getMemoryBytes();
+  for (auto i = 0; i < 100'000; ++i) {
+    auto id = std::to_string(folly::Random::rand32(50'000));
+    EXPECT_EQ(expectedIds.count(id) > 0, ids.contains(id));
+    EXPECT_EQ(expectedIds.insert(id).second, ids.insert(id));
+  }
+  EXPECT_EQ(expectedIds.size(), ids.size());
+  EXPECT_GT(ids.getMemoryBytes(), initialMemoryBytes);
+  for (const auto& id : expectedIds) {
+    EXPECT_TRUE(ids.contains(id));
+  }
+}
+
+TEST(IdDigestSetTest, ExpectedSizeAvoidsGrowing) {
+  IdDigestSet ids{100'000};
+  auto memoryBytes = ids.getMemoryBytes();
+  for (auto i = 0; i < 100'000; ++i) {
+    ids.insert(std::to_string(i));
+  }
+  EXPECT_EQ(100'000, ids.size());
+  EXPECT_EQ(memoryBytes, ids.getMemoryBytes());
+}
+
+} // namespace measurement::pid
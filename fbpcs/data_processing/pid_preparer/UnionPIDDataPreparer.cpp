@@ -17,7 +17,6 @@
 #include <memory>
 #include <sstream>
 #include <string>
-#include <unordered_set>
 #include <vector>
 
 #include <re2/re2.h>
@@ -31,6 +30,7 @@
 // TODO: Rewrite for OSS?
 #include "../common/FilepathHelpers.h"
 #include "../common/Logging.h"
+#include "IdDigestSet.h"
 #include "fbpcf/io/api/FileIOWrappers.h"
 
 namespace measurement::pid {
@@ -43,6 +43,10 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
   auto bufferedReader =
       std::make_unique<fbpcf::io::BufferedReader>(std::move(reader));
 
+  // The output path may be in the cloud, so the prepared ids go to a local
+  // temporary file first and are only published once every row is written.
+  // A run that dies halfway then leaves no partial output behind.
+  //
   // Get a random ID to avoid potential name collisions if multiple
   // runs at the same time point to the same input file
   auto randomId = std::to_string(folly::Random::secureRand64());
@@ -50,7 +54,7 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
       private_lift::filepath_helpers::getBaseFilename(inputPath_) + "_prepared";
   auto tmpFilepath = (tmpDirectory_ / tmpFilename).string();
   std::cout << "\t\tCreated temporary filepath --> " << tmpFilepath << '\n';
-  auto tmpFile = std::make_unique<std::ofstream>(tmpFilename);
+  auto tmpFile = std::make_unique<std::ofstream>(tmpFilepath);
 
   std::vector<std::string> header;
 
@@ -73,25 +77,35 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
   if (0 == idColumnIndices.size()) {
     // note: it's not *essential* to clean up tmpfile here, but it will
     // pollute our test directory otherwise, which is just somewhat annoying.
-    std::remove(tmpFilename.c_str());
+    std::remove(tmpFilepath.c_str());
     XLOG(FATAL) << kIdColumnPrefix
                 << " prefixed-column missing from input header"
                 << "Header: [" << folly::join(",", header) << "]";
   }
 
-  std::unordered_set<std::string> seenIds;
+  // seenIds keeps a fixed size digest per distinct id, whatever the id length,
+  // so hundreds of millions of ids fit in memory. There is no external sort
+  // fallback for larger inputs: whether a row is kept depends on every id of
+  // the rows kept before it, which a sort by id cannot decide in one pass.
+  //
+  // The columns and ids point into line, and the vectors and outputLine are
+  // reused across rows, so that splitting a row doesn't allocate
+  IdDigestSet seenIds;
+  std::vector<folly::StringPiece> cols;
+  std::vector<folly::StringPiece> ids;
+  std::string outputLine;
   while (!bufferedReader->eof()) {
     line = bufferedReader->readLine();
-    std::vector<std::string> cols;
     line.erase(std::remove(line.begin(), line.end(), ' '), line.end());
-    folly::split(",", line, cols);
+    cols.clear();
+    folly::split(',', line, cols);
     auto rowSize = cols.size();
     auto headerSize = header.size();
 
     if (rowSize != headerSize) {
       // note: it's not *essential* to clean up tmpfile here, but it will
       // pollute our test directory otherwise, which is just somewhat annoying.
-      std::remove(tmpFilename.c_str());
+      std::remove(tmpFilepath.c_str());
       XLOG(FATAL) << "Mismatch between header and row at index "
                   << res.linesProcessed << '\n'
                   << "Header has size " << headerSize << " while row has size "
@@ -103,13 +117,13 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
     // Stores non-null id values in vector ids.
     // Duplicate ids are not allowed. If we find duplicates, we skip this row.
     bool isDuplicateRow = false;
-    std::vector<std::string> ids;
+    ids.clear();
     for (std::int64_t idColumnIdx : idColumnIndices) {
       auto id = cols.at(idColumnIdx);
-      if (id == "") {
+      if (id.empty()) {
         continue;
       }
-      if (seenIds.find(id) != seenIds.end()) {
+      if (seenIds.contains(id)) {
         isDuplicateRow = true;
         ++res.duplicateIdCount;
         break;
@@ -128,7 +142,10 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
       }
 
       // join all the ids with delimiter ","
-      *tmpFile << folly::join(",", ids) << '\n';
+      outputLine.clear();
+      folly::join(",", ids, outputLine);
+      outputLine += '\n';
+      *tmpFile << outputLine;
     }
 
     ++res.linesProcessed;
@@ -141,7 +158,11 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
   bufferedReader->close();
   XLOG(INFO) << "Processed with "
              << private_lift::logging::formatNumber(res.duplicateIdCount)
-             << " duplicate ids.";
+             << " duplicate ids, keeping "
+             << private_lift::logging::formatNumber(seenIds.size())
+             << " distinct ids in "
+             << private_lift::logging::formatNumber(seenIds.getMemoryBytes())
+             << " bytes.";
 
   if (res.linesProcessed == 0) {
     XLOG(INFO) << "The file is empty. Adding random dummy row";
@@ -153,10 +174,10 @@ UnionPIDDataPreparerResults UnionPIDDataPreparer::prepare() const {
   XLOG(INFO) << "Now copying prepared data to final output path";
   // Reset underlying unique_ptr to ensure buffer gets flushed
   tmpFile.reset();
-  XLOG(INFO) << "Writing " << tmpFilename << " -> " << outputPath_;
-  fbpcf::io::FileIOWrappers::transferFileInParts(tmpFilename, outputPath_);
+  XLOG(INFO) << "Writing " << tmpFilepath << " -> " << outputPath_;
+  fbpcf::io::FileIOWrappers::transferFileInParts(tmpFilepath, outputPath_);
   // We need to make sure we clean up the tmpfiles now
-  std::remove(tmpFilename.c_str());
+  std::remove(tmpFilepath.c_str());
   XLOG(INFO) << "File write successful.";
 
   return res;
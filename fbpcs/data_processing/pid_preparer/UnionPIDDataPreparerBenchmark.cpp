@@ -0,0 +1,148 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+/**
+ * Rows per second and peak memory of the union PID data preparer on synthetic
+ * base64 ids. The string_set and digest_set modes only dedup the ids, with a
+ * std::unordered_set<std::string> like prepare did before or with IdDigestSet,
+ * and the prepare mode runs UnionPIDDataPreparer::prepare on a generated
+ * input file. The peak memory is the maximum resident set size of the
+ * process, the generated ids included, so run each mode in its own process:
+ *
+ *   UnionPIDDataPreparerBenchmark --mode=string_set
+ *   UnionPIDDataPreparerBenchmark --mode=digest_set
+ *   UnionPIDDataPreparerBenchmark --mode=prepare
+ */
+
+#include <sys/resource.h>
+
+#include <chrono>
+#include <cstdint>
+#include <filesystem>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <unordered_set>
+#include <vector>
+
+#include <folly/Format.h>
+#include <folly/Random.h>
+#include <folly/init/Init.h>
+#include <gflags/gflags.h>
+
+#include "fbpcs/data_processing/pid_preparer/IdDigestSet.h"
+#include "fbpcs/data_processing/pid_preparer/UnionPIDDataPreparer.h"
+
+DEFINE_int64(num_rows, 10'000'000, "Number of rows to prepare");
+DEFINE_int64(num_ids, 8'000'000, "Number of distinct ids of the rows");
+DEFINE_string(mode, "digest_set", "One of string_set, digest_set or prepare");
+DEFINE_string(tmp_directory, "/tmp", "Directory of the generated input");
+
+namespace measurement::pid {
+namespace {
+constexpr char kBase64Chars[] =
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+
+// Looks like the base64 of a 32 byte hash, like the hashed ids the preparer
+// gets, with numIds distinct values
+std::string genId(int64_t numIds) {
+  auto seed = folly::Random::rand64(numIds);
+  std::string id;
+  for (auto i = 0; i < 43; ++i) {
+    seed = seed * 0x5851F42D4C957F2D + 0x14057B7EF767814F;
+    id += kBase64Chars[seed >> 58];
+  }
+  return id + "=";
+}
+
+std::vector<std::string> genIds(int64_t numRows, int64_t numIds) {
+  std::vector<std::string> ids;
+  ids.reserve(numRows);
+  for (int64_t i = 0; i < numRows; ++i) {
+    ids.push_back(genId(numIds));
+  }
+  return ids;
+}
+
+template <typename Set>
+int64_t countDuplicates(const std::vector<std::string>& ids, Set& seenIds) {
+  int64_t duplicateIdCount = 0;
+  for (const auto& id : ids) {
+    duplicateIdCount += !seenIds.insert(id).second;
+  }
+  return duplicateIdCount;
+}
+
+int64_t countDuplicates(
+    const std::vector<std::string>& ids,
+    IdDigestSet& seenIds) {
+  int64_t duplicateIdCount = 0;
+  for (const auto& id : ids) {
+    duplicateIdCount += !seenIds.insert(id);
+  }
+  return duplicateIdCount;
+}
+
+void run() {
+  int64_t duplicateIdCount = 0;
+  std::chrono::duration<double> elapsed{0};
+
+  if (FLAGS_mode == "prepare") {
+    auto inputPath = std::filesystem::path{FLAGS_tmp_directory} /
+        folly::sformat("union_pid_benchmark_{}", folly::Random::rand64());
+    auto outputPath = inputPath.string() + "_prepared";
+    {
+      std::ofstream inputFile{inputPath};
+      inputFile << "id_,value\n";
+      for (int64_t i = 0; i < FLAGS_num_rows; ++i) {
+        inputFile << genId(FLAGS_num_ids) << ','
+                  << folly::Random::rand32(10000) << '\n';
+      }
+    }
+    UnionPIDDataPreparer preparer{
+        inputPath, outputPath, FLAGS_tmp_directory, 1, FLAGS_num_rows};
+    auto start = std::chrono::steady_clock::now();
+    duplicateIdCount = preparer.prepare().duplicateIdCount;
+    elapsed = std::chrono::steady_clock::now() - start;
+    std::filesystem::remove(inputPath);
+    std::filesystem::remove(outputPath);
+  } else {
+    auto ids = genIds(FLAGS_num_rows, FLAGS_num_ids);
+    auto start = std::chrono::steady_clock::now();
+    if (FLAGS_mode == "string_set") {
+      std::unordered_set<std::string> seenIds;
+      duplicateIdCount = countDuplicates(ids, seenIds);
+    } else {
+      IdDigestSet seenIds;
+      duplicateIdCount = countDuplicates(ids, seenIds);
+    }
+    elapsed = std::chrono::steady_clock::now() - start;
+  }
+
+  struct rusage usage;
+  getrusage(RUSAGE_SELF, &usage);
+  std::cout << folly::sformat(
+      "{:>12} {:>14} {:>14} {:>14}\n",
+      "mode",
+      "rows/s",
+      "duplicates",
+      "peak RSS MB");
+  std::cout << folly::sformat(
+      "{:>12} {:>14.0f} {:>14} {:>14.1f}\n",
+      FLAGS_mode,
+      FLAGS_num_rows / elapsed.count(),
+      duplicateIdCount,
+      usage.ru_maxrss / 1024.0);
+}
+} // namespace
+} // namespace measurement::pid
+
+int main(int argc, char** argv) {
+  folly::init(&argc, &argv);
+  measurement::pid::run();
+  return 0;
+}
@@ -10,13 +10,16 @@
 #include <algorithm>
 #include <cstddef>
 #include <cstdint>
+#include <deque>
 #include <exception>
 #include <filesystem>
 #include <fstream>
 #include <memory>
+#include <optional>
 #include <sstream>
 #include <stdexcept>
 #include <string>
+#include <string_view>
 #include <vector>
 
 #include <fbpcf/aws/S3Util.h>
@@ -26,6 +29,7 @@
 #include <fbpcf/io/api/FileWriter.h>
 #include <folly/Random.h>
 #include <folly/executors/CPUThreadPoolExecutor.h>
+#include <folly/futures/Future.h>
 #include <folly/logging/xlog.h>
 #include <re2/re2.h>
 
@@ -60,6 +64,71 @@ void strReplaceNullColumnWithEmpty(std::string& str) {
     re2::RE2::Replace(&str, Regex, "\\1\\2");
   }
 }
+
+namespace {
+bool isNullColumn(std::string_view column) {
+  // ORing 0x20 lowercases the ASCII letters, and maps no other byte to them
+  return column.size() == 4 && (column[0] | 0x20) == 'n' &&
+      (column[1] | 0x20) == 'u' && (column[2] | 0x20) == 'l' &&
+      (column[3] | 0x20) == 'l';
+}
+
+void endColumn(std::string& out, std::size_t columnStart) {
+  if (isNullColumn(std::string_view{out}.substr(columnStart))) {
+    out.resize(columnStart);
+  }
+}
+
+std::optional<std::string_view> nthColumn(
+    std::string_view line,
+    std::size_t n) {
+  std::size_t start = 0;
+  for (; n > 0; --n) {
+    auto comma = line.find(',', start);
+    if (comma == std::string_view::npos) {
+      return std::nullopt;
+    }
+    start = comma + 1;
+  }
+  // When there is no comma left, npos - start clamps to the end of the line
+  return line.substr(start, line.find(',', start) - start);
+}
+} // namespace
+
+void normalizeLine(std::string_view line, std::string& out) {
+  out.clear();
+  out.reserve(line.size());
+  // Characters are copied in spans between the characters to drop
+  std::size_t spanStart = 0;
+  std::size_t columnStart = 0;
+  for (std::size_t i = 0; i < line.size(); ++i) {
+    char c = line[i];
+    if (c != '"' && c != '\'' && c != '\r' && c != ' ' && c != ',') {
+      continue;
+    }
+    out.append(line.data() + spanStart, i - spanStart);
+    spanStart = i + 1;
+    if (c == ',') {
+      endColumn(out, columnStart);
+      out.push_back(',');
+      columnStart = out.size();
+    }
+  }
+  out.append(line.data() + spanStart, line.size() - spanStart);
+  endColumn(out, columnStart);
+}
+
+std::optional<std::string_view> firstNonEmptyColumn(
+    std::string_view line,
+    const std::vector<int32_t>& columnIndices) {
+  for (auto columnIdx : columnIndices) {
+    auto column = nthColumn(line, columnIdx);
+    if (!column.has_value() || !column->empty()) {
+      return column;
+    }
+  }
+  return std::string_view{};
+}
 } // namespace detail
 
 static const std::string kIdColumnPrefix = "id_";
@@ -73,6 +142,15 @@ static const std::string kIdColumnPrefix = "id_";
 */
 static const uint64_t kBufferedWriterChunkSize = 5'242'880;
 
+namespace {
+// A block of input lines after normalizeLine and prepareLine. The id of a line
+// to drop is empty.
+struct PreparedBlock {
+  std::vector<std::string> lines;
+  std::vector<std::string> ids;
+};
+} // namespace
+
 std::vector<std::string> GenericSharder::genOutputPaths(
     const std::string& outputBasePath,
     std::size_t startIndex,
@@ -134,21 +212,95 @@ void GenericSharder::shard() {
   }
   XLOG(INFO) << "Got header line: '" << line << "'";
 
-  // Read lines and send to appropriate outFile repeatedly
+  // Read blocks of lines and prepare them on the worker threads. The blocks
+  // are then sharded in input order: getShardFor may depend on the order, e.g.
+  // in RoundRobinBasedSharder, and the rows of a shard keep the input order.
+  // The executor is destroyed, finishing its tasks, before the objects the
+  // tasks reference: the sharder, the id column indices and the writers.
+  folly::CPUThreadPoolExecutor executor(getNumThreads());
+  auto prepareBlock = [this, &idColumnIndices](
+                          std::vector<std::string> lines) {
+    PreparedBlock block;
+    block.ids.resize(lines.size());
+    // The raw line is swapped in, so that its memory is reused
+    std::string normalizedLine;
+    for (std::size_t i = 0; i < lines.size(); ++i) {
+      detail::normalizeLine(lines[i], normalizedLine);
+      std::swap(lines[i], normalizedLine);
+      if (!prepareLine(lines[i], idColumnIndices, block.ids[i])) {
+        block.ids[i].clear();
+      }
+    }
+    block.lines = std::move(lines);
+    return block;
+  };
+
+  // The writes of the previous block, one per shard, run in parallel with
+  // each other and with the preparation of the next blocks
+  std::vector<folly::Future<folly::Unit>> writes;
   uint64_t lineIdx = 0;
-  while (!bufferedReader->eof()) {
-    line = bufferedReader->readLine();
-    detail::stripQuotes(line);
-    detail::dos2Unix(line);
-    detail::strRemoveBlanks(line);
-    detail::strReplaceNullColumnWithEmpty(line);
-    shardLine(std::move(line), outFiles, idColumnIndices);
-    ++lineIdx;
-    if (lineIdx % getLogRate() == 0) {
+  auto writeBlock = [&](PreparedBlock block) {
+    std::vector<std::string> shardContents(numShards);
+    std::vector<int> shardRows(numShards);
+    for (std::size_t i = 0; i < block.lines.size(); ++i) {
+      if (block.ids[i].empty()) {
+        continue;
+      }
+      auto shard = getShardFor(block.ids[i], numShards);
+      shardContents.at(shard) += block.lines[i];
+      shardContents.at(shard) += '\n';
+      ++shardRows.at(shard);
+    }
+    for (std::size_t shard = 0; shard < numShards; ++shard) {
+      if (shardRows[shard] > 0) {
+        logRowsToShard(shard, shardRows[shard]);
+      }
+    }
+
+    folly::collect(std::move(writes)).get();
+    writes.clear();
+    for (std::size_t shard = 0; shard < numShards; ++shard) {
+      if (!shardContents[shard].empty()) {
+        writes.push_back(folly::via(
+            &executor,
+            [&outFiles,
+             shard,
+             contents = std::move(shardContents[shard])]() mutable {
+              outFiles.at(shard)->writeString(contents);
+            }));
+      }
+    }
+
+    auto previousLineIdx = lineIdx;
+    lineIdx += block.lines.size();
+    if (lineIdx / getLogRate() != previousLineIdx / getLogRate()) {
       XLOG(INFO) << "Processed line "
                  << private_lift::logging::formatNumber(lineIdx);
     }
+  };
+
+  // Blocks being prepared, in input order. At most two per thread are read
+  // ahead, which bounds the memory.
+  std::deque<folly::Future<PreparedBlock>> blocks;
+  while (!bufferedReader->eof()) {
+    std::vector<std::string> lines;
+    lines.reserve(LINES_PER_BLOCK);
+    while (lines.size() < LINES_PER_BLOCK && !bufferedReader->eof()) {
+      lines.push_back(bufferedReader->readLine());
+    }
+    blocks.push_back(folly::via(
+        &executor, [prepareBlock, lines = std::move(lines)]() mutable {
+          return prepareBlock(std::move(lines));
+        }));
+    if (blocks.size() >= 2 * getNumThreads()) {
+      writeBlock(std::move(blocks.front()).get());
+      blocks.pop_front();
+    }
   }
+  for (; !blocks.empty(); blocks.pop_front()) {
+    writeBlock(std::move(blocks.front()).get());
+  }
+  folly::collect(std::move(writes)).get();
 
   // Log number of rows in each shard to the
   // "<filepath_for_0th_shard>_shardDistribution" file.
@@ -167,34 +319,36 @@ void GenericSharder::shard() {
   XLOG(INFO) << "All file writes successful";
 }
 
+bool GenericSharder::prepareLine(
+    std::string& line,
+    const std::vector<int32_t>& idColumnIndices,
+    std::string& id) const {
+  auto column = detail::firstNonEmptyColumn(line, idColumnIndices);
+  if (!column.has_value()) {
+    XLOG_EVERY_MS(INFO, 5000) << "Discrepancy with header:" << line
+                              << " does not have all the id columns.\n";
+    return false;
+  }
+  if (column->empty()) {
+    XLOG_EVERY_MS(INFO, 5000) << "All the id values are empty in this row";
+    return false;
+  }
+  id.assign(column->data(), column->size());
+  return true;
+}
+
 void GenericSharder::shardLine(
-    std::string line,
+    const std::string& line,
     const std::vector<std::unique_ptr<fbpcf::io::BufferedWriter>>& outFiles,
     const std::vector<int32_t>& idColumnIndices) {
-  std::vector<std::string> cols;
-  folly::split(",", line, cols);
-
-  std::string id = "";
-  for (auto idColumnIdx : idColumnIndices) {
-    if (idColumnIdx >= cols.size()) {
-      XLOG_EVERY_MS(INFO, 5000)
-          << "Discrepancy with header:" << line << " does not have "
-          << idColumnIdx << "th column.\n";
-      return;
-    }
-    id = cols.at(idColumnIdx);
-    if (!id.empty()) {
-      break;
-    }
-  }
-  if (id.empty()) {
-    XLOG_EVERY_MS(INFO, 5000) << "All the id values are empty in this row";
+  std::string lineToWrite = line;
+  if (!prepareLine(lineToWrite, idColumnIndices, id_)) {
     return;
   }
-  auto shard = getShardFor(id, outFiles.size());
+  auto shard = getShardFor(id_, outFiles.size());
   logRowsToShard(shard);
   std::string newLine = "\n";
-  outFiles.at(shard)->writeString(line);
+  outFiles.at(shard)->writeString(lineToWrite);
   outFiles.at(shard)->writeString(newLine);
 }
 
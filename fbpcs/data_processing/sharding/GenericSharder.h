@@ -7,10 +7,14 @@
 
 #pragma once
 
+#include <algorithm>
 #include <exception>
 #include <memory>
+#include <optional>
 #include <sstream>
 #include <string>
+#include <string_view>
+#include <thread>
 #include <unordered_map>
 #include <vector>
 
@@ -32,10 +36,53 @@ void stripQuotes(std::string& s);
  * @param s the string from which to remove dos line ending characters
  */
 void dos2Unix(std::string& s);
+
+/**
+ * Remove blanks from a string in place. Example: "a b" -> ab
+ *
+ * @param str the string from which to remove blank characters
+ */
+void strRemoveBlanks(std::string& str);
+
+/**
+ * Replace the null columns (case insensitive) of a comma separated line with
+ * empty columns, modifying in place. Example: "a,NULL,null" -> "a,,"
+ *
+ * @param str the line in which to replace the null columns
+ */
+void strReplaceNullColumnWithEmpty(std::string& str);
+
+/**
+ * Normalize a data line in a single pass: quotes, carriage returns and blanks
+ * are removed, and the null columns are replaced with empty columns. This is
+ * the same as stripQuotes, dos2Unix, strRemoveBlanks and then
+ * strReplaceNullColumnWithEmpty, without a regex or a pass per character
+ * class. The result is written to out, whose memory is reused across lines.
+ *
+ * @param line the line to normalize
+ * @param out the string the normalized line is written to
+ */
+void normalizeLine(std::string_view line, std::string& out);
+
+/**
+ * Find the first non-empty column among the given column indices of a comma
+ * separated line, in the order of the indices, without splitting the line.
+ *
+ * @param line the line to search
+ * @param columnIndices the indices of the columns to search
+ * @returns a view of the first non-empty column, an empty view if all the
+ *     columns are empty, or nullopt if the line is missing a column before a
+ *     non-empty one is found
+ */
+std::optional<std::string_view> firstNonEmptyColumn(
+    std::string_view line,
+    const std::vector<int32_t>& columnIndices);
 } // namespace detail
 
 constexpr int THREAD_POOL_SIZE = 20;
 constexpr size_t BUFFER_SIZE = 1073741824; // 2^30
+// Lines read into a block, which a worker thread normalizes and prepares
+constexpr size_t LINES_PER_BLOCK = 16384;
 
 /**
  * A class which can shard data from one file into many sub-files.
@@ -128,11 +175,32 @@ class GenericSharder {
     return logEveryN_;
   }
 
-  void logRowsToShard(std::size_t shard) {
+  /**
+   * Get the number of threads normalizing and preparing the lines.
+   *
+   * @returns the number of threads preparing the lines
+   */
+  std::size_t getNumThreads() const {
+    return numThreads_;
+  }
+
+  /**
+   * Set the number of threads normalizing and preparing the lines. The output
+   * is the same for any number of threads.
+   *
+   * @param numThreads the number of threads, 0 for one per core
+   */
+  void setNumThreads(std::size_t numThreads) {
+    numThreads_ = numThreads > 0
+        ? numThreads
+        : std::max(1u, std::thread::hardware_concurrency());
+  }
+
+  void logRowsToShard(std::size_t shard, int count = 1) {
     std::stringstream ss;
     ss << shard;
     std::string key = ss.str();
-    rowsInShard[key]++;
+    rowsInShard[key] += count;
   }
 
   int getRowsForShard(std::size_t shard) {
@@ -143,10 +211,29 @@ class GenericSharder {
   }
 
   /**
-   * Run the sharder.
+   * Run the sharder. Blocks of lines are normalized and prepared on
+   * getNumThreads() threads, while the lines are assigned to shards in input
+   * order on the calling thread, and the shards are written in parallel. The
+   * output is the same as sharding the lines one by one with shardLine.
    */
   void shard();
 
+  /**
+   * Prepare a normalized input line for sharding: find the id it is sharded
+   * by, and rewrite the line if needed. This is called from several threads
+   * at the same time, so it must not modify the sharder. If the line needs
+   * modified for some reason, the derived class must override this method.
+   *
+   * @param line the line to be sharded, which may be rewritten in place
+   * @param idColumnIndices the indices of the id columns, in order
+   * @param id the string the id of the line is written to
+   * @returns false if the line has no id and must be dropped
+   */
+  virtual bool prepareLine(
+      std::string& line,
+      const std::vector<int32_t>& idColumnIndices,
+      std::string& id) const;
+
   /**
    * Determine which shard a line should go to given an id. This is how derived
    * classes will override sharding behavior in certain contexts.
@@ -160,15 +247,14 @@ class GenericSharder {
       std::size_t numShards) = 0;
 
   /**
-   * Shard an individual input line. Internally calls `getShardFor` to detect
-   * the correct shard. If the input line needs modified for some reason, the
-   * derived class must override this method.
+   * Shard an individual input line. Internally calls `prepareLine` and then
+   * `getShardFor` to detect the correct shard.
 
    * @param line the line to be sharded
    * @param outFiles the list of output files to be sharded into
    */
   virtual void shardLine(
-      std::string line,
+      const std::string& line,
       const std::vector<std::unique_ptr<fbpcf::io::BufferedWriter>>& outFiles,
       const std::vector<int32_t>& idColumnIndices);
 
@@ -186,6 +272,9 @@ class GenericSharder {
   std::string inputPath_;
   std::vector<std::string> outputPaths_;
   int32_t logEveryN_;
+  std::size_t numThreads_ = std::max(1u, std::thread::hardware_concurrency());
   std::unordered_map<std::string, int> rowsInShard;
+  // Reused for the id of every line, so that it is not allocated per line
+  std::string id_;
 };
 } // namespace data_processing::sharder
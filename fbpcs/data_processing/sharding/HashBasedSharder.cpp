@@ -52,20 +52,20 @@ std::size_t HashBasedSharder::getShardFor(
   return toInt % numShards;
 }
 
-void HashBasedSharder::shardLine(
-    std::string line,
-    const std::vector<std::unique_ptr<fbpcf::io::BufferedWriter>>& outFiles,
-    const std::vector<int32_t>& idColumnIndices) {
+bool HashBasedSharder::prepareLine(
+    std::string& line,
+    const std::vector<int32_t>& idColumnIndices,
+    std::string& id) const {
   std::vector<std::string> cols;
   folly::split(",", line, cols);
 
-  std::string id = "";
+  id.clear();
   for (auto idColumnIdx : idColumnIndices) {
     if (idColumnIdx >= cols.size()) {
       XLOG_EVERY_MS(INFO, 5000)
           << "Discrepancy with header:" << line << " does not have "
           << idColumnIdx << "th column.\n";
-      return;
+      return false;
     }
     auto& col = cols.at(idColumnIdx);
     if (!col.empty()) {
@@ -83,15 +83,11 @@ void HashBasedSharder::shardLine(
   }
   if (id.empty()) {
     XLOG_EVERY_MS(INFO, 5000) << "All the id values are empty in this row";
-    return;
+    return false;
   }
-  auto numShards = outFiles.size();
-  std::size_t shard;
-  shard = getShardFor(id, numShards);
-  std::string lineToWrite = folly::join(",", cols);
-  std::string newLine = "\n";
-  outFiles.at(shard)->writeString(lineToWrite);
-  outFiles.at(shard)->writeString(newLine);
-  logRowsToShard(shard);
+  if (!hmacKey_.empty()) {
+    line = folly::join(",", cols);
+  }
+  return true;
 }
 } // namespace data_processing::sharder
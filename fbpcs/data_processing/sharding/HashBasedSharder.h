@@ -95,16 +95,20 @@ class HashBasedSharder final : public GenericSharder {
   std::size_t getShardFor(const std::string& id, std::size_t numShards) final;
 
   /**
-   * Shard an input line by hashing each identifier into an int32_t first using
-   * a hashing method that works on both big- and little-endian machines.
+   * Prepare an input line for sharding by hashing each identifier with the
+   * HMAC key, if there is one. The line is sharded by the first non-empty
+   * identifier, which getShardFor interprets as an int32_t using a method that
+   * works on both big- and little-endian machines.
    *
-   * @param line the line to be sharded
-   * @param outFiles the list of output files to be sharded into
+   * @param line the line to be sharded, rewritten with the hashed identifiers
+   * @param idColumnIndices the indices of the id columns, in order
+   * @param id the string the id of the line is written to
+   * @returns false if the line has no id and must be dropped
    */
-  void shardLine(
-      std::string line,
-      const std::vector<std::unique_ptr<fbpcf::io::BufferedWriter>>& outFiles,
-      const std::vector<int32_t>& idColumnIndices) final;
+  bool prepareLine(
+      std::string& line,
+      const std::vector<int32_t>& idColumnIndices,
+      std::string& id) const final;
 
  private:
   std::string hmacKey_;
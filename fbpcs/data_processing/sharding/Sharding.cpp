@@ -16,23 +16,36 @@
 #include "fbpcs/data_processing/common/FilepathHelpers.h"
 #include "fbpcs/data_processing/common/Logging.h"
 namespace data_processing::sharder {
+namespace {
+void checkNumThreads(int32_t numThreads) {
+  if (numThreads < 0) {
+    XLOG(FATAL) << "Error: --num_threads must not be negative, got "
+                << numThreads;
+  }
+}
+} // namespace
+
 void runShard(
     const std::string& inputFilename,
     const std::string& outputFilenames,
     const std::string& outputBasePath,
     int32_t fileStartIndex,
     int32_t numOutputFiles,
-    int32_t logEveryN) {
+    int32_t logEveryN,
+    int32_t numThreads) {
+  checkNumThreads(numThreads);
   if (!outputFilenames.empty()) {
     std::vector<std::string> outputFilepaths;
     folly::split(',', outputFilenames, outputFilepaths);
     RoundRobinBasedSharder sharder{inputFilename, outputFilepaths, logEveryN};
+    sharder.setNumThreads(numThreads);
     sharder.shard();
   } else if (!outputBasePath.empty() && numOutputFiles > 0) {
     std::size_t startIndex = static_cast<std::size_t>(fileStartIndex);
     std::size_t endIndex = startIndex + numOutputFiles;
     RoundRobinBasedSharder sharder{
         inputFilename, outputBasePath, startIndex, endIndex, logEveryN};
+    sharder.setNumThreads(numThreads);
     sharder.shard();
   } else {
     XLOG(FATAL) << "Error: specify --output_filenames or --output_base_path, "
@@ -47,12 +60,15 @@ void runShardPid(
     int32_t fileStartIndex,
     int32_t numOutputFiles,
     int32_t logEveryN,
-    const std::string& hmacBase64Key) {
+    const std::string& hmacBase64Key,
+    int32_t numThreads) {
+  checkNumThreads(numThreads);
   if (!outputFilenames.empty()) {
     std::vector<std::string> outputFilepaths;
     folly::split(',', outputFilenames, outputFilepaths);
     HashBasedSharder sharder{
         inputFilename, outputFilepaths, logEveryN, hmacBase64Key};
+    sharder.setNumThreads(numThreads);
     sharder.shard();
   } else if (!outputBasePath.empty() && numOutputFiles > 0) {
     std::size_t startIndex = static_cast<std::size_t>(fileStartIndex);
@@ -64,6 +80,7 @@ void runShardPid(
         endIndex,
         logEveryN,
         hmacBase64Key};
+    sharder.setNumThreads(numThreads);
     sharder.shard();
   } else {
     XLOG(FATAL) << "Error: specify --output_filenames or --output_base_path, "
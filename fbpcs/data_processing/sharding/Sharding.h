@@ -16,7 +16,8 @@ void runShard(
     const std::string& outputBasePath,
     int32_t fileStartIndex,
     int32_t numOutputFiles,
-    int32_t logEveryN);
+    int32_t logEveryN,
+    int32_t numThreads = 0);
 
 void runShardPid(
     const std::string& inputFilename,
@@ -25,5 +26,6 @@ void runShardPid(
     int32_t fileStartIndex,
     int32_t numOutputFiles,
     int32_t logEveryN,
-    const std::string& hmacBase64Key);
+    const std::string& hmacBase64Key,
+    int32_t numThreads = 0);
 } // namespace data_processing::sharder
@@ -32,6 +32,10 @@ DEFINE_string(
     "/tmp/",
     "[Deprecated] Unused argument kept for historical purposes");
 DEFINE_int32(log_every_n, 1000000, "How frequently to log updates");
+DEFINE_int32(
+    num_threads,
+    0,
+    "Number of threads normalizing and hashing the rows, 0 for one per core");
 
 int main(int argc, char** argv) {
   folly::init(&argc, &argv);
@@ -46,6 +50,7 @@ int main(int argc, char** argv) {
       FLAGS_output_base_path,
       FLAGS_file_start_index,
       FLAGS_num_output_files,
-      FLAGS_log_every_n);
+      FLAGS_log_every_n,
+      FLAGS_num_threads);
   return 0;
 }
@@ -0,0 +1,141 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+/**
+ * Rows per second of the GenericSharder line processing: the single-pass
+ * normalizeLine and firstNonEmptyColumn, against the previous processing with
+ * one pass per removed character class, the null column regex and a split of
+ * the line into a vector of strings. The rows are generated in memory and
+ * nothing is written, so only the per-line processing is measured.
+ */
+
+#include <chrono>
+#include <cstdint>
+#include <iostream>
+#include <string>
+#include <vector>
+
+#include <folly/Format.h>
+#include <folly/Random.h>
+#include <folly/String.h>
+#include <folly/init/Init.h>
+#include <gflags/gflags.h>
+
+#include "fbpcs/data_processing/sharding/GenericSharder.h"
+
+DEFINE_int64(num_rows, 1000000, "Number of rows to process");
+DEFINE_int32(num_shards, 16, "Number of shards the ids are mapped to");
+
+namespace data_processing::sharder {
+namespace {
+std::vector<std::string> genRows(int64_t numRows) {
+  static const std::string kBase64Chars =
+      "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+  std::vector<std::string> rows;
+  rows.reserve(numRows);
+  for (int64_t i = 0; i < numRows; ++i) {
+    // Hashed ids look like base64 encoded SHA256 digests
+    std::string id;
+    for (auto j = 0; j < 43; ++j) {
+      id += kBase64Chars[folly::Random::rand32(kBase64Chars.size())];
+    }
+    id += '=';
+    auto hasSecondId = folly::Random::oneIn(2);
+    rows.push_back(folly::sformat(
+        "\"{}\",{},{},NULL,{}, {}\r",
+        i % 10 == 0 ? "" : id,
+        hasSecondId ? id : "null",
+        folly::Random::rand32(1000000),
+        folly::Random::rand32(1000),
+        folly::Random::rand32(100)));
+  }
+  return rows;
+}
+
+std::size_t shardOf(const std::string& id, std::size_t numShards) {
+  return std::hash<std::string>{}(id) % numShards;
+}
+
+// The line processing of GenericSharder::shard and shardLine before the
+// single-pass scanner
+uint64_t processRowsPerPass(
+    const std::vector<std::string>& rows,
+    const std::vector<int32_t>& idColumnIndices) {
+  uint64_t checksum = 0;
+  for (const auto& row : rows) {
+    std::string line = row;
+    detail::stripQuotes(line);
+    detail::dos2Unix(line);
+    detail::strRemoveBlanks(line);
+    detail::strReplaceNullColumnWithEmpty(line);
+
+    std::vector<std::string> cols;
+    folly::split(",", line, cols);
+    std::string id = "";
+    for (auto idColumnIdx : idColumnIndices) {
+      if (idColumnIdx >= cols.size()) {
+        break;
+      }
+      id = cols.at(idColumnIdx);
+      if (!id.empty()) {
+        break;
+      }
+    }
+    if (!id.empty()) {
+      checksum += shardOf(id, FLAGS_num_shards) + line.size();
+    }
+  }
+  return checksum;
+}
+
+uint64_t processRowsSinglePass(
+    const std::vector<std::string>& rows,
+    const std::vector<int32_t>& idColumnIndices) {
+  uint64_t checksum = 0;
+  std::string line;
+  std::string id;
+  for (const auto& row : rows) {
+    detail::normalizeLine(row, line);
+    auto column = detail::firstNonEmptyColumn(line, idColumnIndices);
+    if (column.has_value() && !column->empty()) {
+      id.assign(column->data(), column->size());
+      checksum += shardOf(id, FLAGS_num_shards) + line.size();
+    }
+  }
+  return checksum;
+}
+
+void run() {
+  auto rows = genRows(FLAGS_num_rows);
+  std::vector<int32_t> idColumnIndices{0, 1};
+
+  std::cout << folly::sformat("{:>24} {:>14}\n", "line processing", "rows/s");
+  uint64_t expectedChecksum = 0;
+  for (auto [name, processRows] :
+       {std::make_pair("one pass per step", &processRowsPerPass),
+        std::make_pair("single pass", &processRowsSinglePass)}) {
+    auto start = std::chrono::steady_clock::now();
+    auto checksum = processRows(rows, idColumnIndices);
+    std::chrono::duration<double> elapsed =
+        std::chrono::steady_clock::now() - start;
+    if (expectedChecksum != 0 && checksum != expectedChecksum) {
+      std::cerr << "The rows were sharded differently\n";
+    }
+    expectedChecksum = checksum;
+    std::cout << folly::sformat(
+        "{:>24} {:>14.0f}\n", name, FLAGS_num_rows / elapsed.count());
+  }
+}
+} // namespace
+} // namespace data_processing::sharder
+
+int main(int argc, char** argv) {
+  folly::init(&argc, &argv);
+  gflags::ParseCommandLineFlags(&argc, &argv, true);
+  data_processing::sharder::run();
+  return 0;
+}
@@ -6,6 +6,8 @@
  */
 
 #include <memory>
+#include <mutex>
+#include <optional>
 #include <string>
 #include <vector>
 
@@ -30,20 +32,20 @@ class GenericSharderTest final : public GenericSharder {
     return shardFor_;
   }
 
-  void shardLine(
-      std::string line,
-      const std::vector<
-          std::unique_ptr<fbpcf::io::BufferedWriter>>& /* unused */,
-      const std::vector<int32_t>& /* unused */) final {
+  bool prepareLine(
+      std::string& line,
+      const std::vector<int32_t>& /* unused */,
+      std::string& id) const final {
+    // prepareLine is called from the worker threads
+    std::lock_guard<std::mutex> lock{mutex_};
     linesCalledWith_.push_back(line);
-    // shardLine is overwritten here so we should mannually call the
-    // logRowsToShard to make changes to rowsInShard.
-    std::size_t s = {0};
-    logRowsToShard(s);
+    id = line;
+    return true;
   }
 
   std::size_t shardFor_ = 123;
-  std::vector<std::string> linesCalledWith_;
+  mutable std::mutex mutex_;
+  mutable std::vector<std::string> linesCalledWith_;
 };
 
 TEST(GenericSharderTest, TestStripQuotes) {
@@ -72,6 +74,43 @@ TEST(GenericSharderTest, TestDos2Unix) {
   EXPECT_EQ(lineNoNewline, "hello world");
 }
 
+TEST(GenericSharderTest, TestNormalizeLine) {
+  std::vector<std::string> lines{
+      "abcd,1,2,3",
+      "\"ab cd\",'1', 2 ,3\r",
+      "null,NULL,nUlL,a",
+      "a,null",
+      "null",
+      "nu ll,\"null\",nulll,nul",
+      "",
+      ",,",
+  };
+  std::string normalized;
+  for (const auto& line : lines) {
+    std::string expected = line;
+    detail::stripQuotes(expected);
+    detail::dos2Unix(expected);
+    detail::strRemoveBlanks(expected);
+    detail::strReplaceNullColumnWithEmpty(expected);
+
+    detail::normalizeLine(line, normalized);
+    EXPECT_EQ(normalized, expected) << "line: " << line;
+  }
+  detail::normalizeLine("NULL,a b,null", normalized);
+  EXPECT_EQ(normalized, ",ab,");
+}
+
+TEST(GenericSharderTest, TestFirstNonEmptyColumn) {
+  std::vector<int32_t> idColumnIndices{1, 2};
+  EXPECT_EQ(detail::firstNonEmptyColumn("a,b,c", idColumnIndices), "b");
+  EXPECT_EQ(detail::firstNonEmptyColumn("a,,c,d", idColumnIndices), "c");
+  EXPECT_EQ(detail::firstNonEmptyColumn("a,,", idColumnIndices), "");
+  // The second id column is only needed when the first one is empty
+  EXPECT_EQ(detail::firstNonEmptyColumn("a,b", idColumnIndices), "b");
+  EXPECT_EQ(detail::firstNonEmptyColumn("a,", idColumnIndices), std::nullopt);
+  EXPECT_EQ(detail::firstNonEmptyColumn("a", idColumnIndices), std::nullopt);
+}
+
 TEST(GenericSharderTest, TestGenOutputPaths) {
   std::string basePath = "/tmp";
   std::size_t start = 0;
@@ -117,8 +156,8 @@ TEST(GenericSharderTest, TestGetShardFor) {
 }
 
 TEST(GenericSharderTest, TestShardLine) {
-  // This test is just ensuring that internally, shardLine is being called for
-  // each line of input except the header.
+  // This test is just ensuring that internally, prepareLine is being called
+  // for each line of input except the header.
   auto randStart = folly::Random::secureRand64();
   std::string inputPath =
       "/tmp/GenericSharderTestShardLineInput" + std::to_string(randStart);
@@ -128,6 +167,7 @@ TEST(GenericSharderTest, TestShardLine) {
   };
   int32_t logEveryN = 123;
   GenericSharderTest actual{inputPath, outputPaths, logEveryN};
+  actual.shardFor_ = 0;
   std::vector<std::string> rows{
       "id_,a,b,c",
       "abcd,1,2,3",
@@ -158,6 +198,7 @@ TEST(GenericSharderTest, TestGetShardDistributionJson) {
   };
   int32_t logEveryN = 123;
   GenericSharderTest actual{inputPath, outputPaths, logEveryN};
+  actual.shardFor_ = 0;
   std::vector<std::string> rows{
       "id_,a,b,c",
       "abcd,1,2,3",
@@ -168,8 +209,8 @@ TEST(GenericSharderTest, TestGetShardDistributionJson) {
   data_processing::test_utils::writeVecToFile(rows, inputPath);
   actual.shard();
   // There are 2 output paths, so there will be two shards.
-  // Since there are 4 rows in the input file, the shardLine() is called for 4
-  // times. logRowsToShard(0) is also called for 4 times. Thus, the first pair
+  // Since there are 4 rows in the input file and getShardFor() returns 0, all
+  // 4 rows are logged to shard 0. Thus, the first pair
   // in json should be "0":4. As rowsInShard[1] is never specified, it should be
   // a default 0, thus the second pair should be "1":0.
   std::string expected{
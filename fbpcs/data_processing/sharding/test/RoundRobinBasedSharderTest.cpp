@@ -9,9 +9,11 @@
 #include <string>
 #include <vector>
 
+#include <folly/Random.h>
 #include <gtest/gtest.h>
 
 #include "fbpcs/data_processing/sharding/RoundRobinBasedSharder.h"
+#include "fbpcs/data_processing/test_utils/FileIOTestUtils.h"
 
 namespace data_processing::sharder {
 TEST(RoundRobinBasedSharderTest, TestGetShardFor) {
@@ -21,4 +23,44 @@ TEST(RoundRobinBasedSharderTest, TestGetShardFor) {
   EXPECT_EQ(0, sharder.getShardFor("baz", 2));
   EXPECT_EQ(1, sharder.getShardFor("quux", 2));
 }
+
+TEST(RoundRobinBasedSharderTest, TestShardKeepsOrderAcrossThreads) {
+  // Several blocks of lines are prepared at the same time, but the rows are
+  // still assigned round robin in input order, and keep it within each shard
+  std::size_t numShards = 3;
+  std::vector<std::string> rows{"id_,a"};
+  std::vector<std::vector<std::string>> expected(numShards, rows);
+  std::size_t nextShard = 0;
+  for (std::size_t i = 0; i < 3 * LINES_PER_BLOCK + 5; ++i) {
+    if (i % 7 == 0) {
+      // Rows without an id are dropped, and don't take a turn
+      rows.push_back("," + std::to_string(i));
+      continue;
+    }
+    rows.push_back("\"id" + std::to_string(i) + "\"," + std::to_string(i));
+    expected.at(nextShard).push_back(
+        "id" + std::to_string(i) + "," + std::to_string(i));
+    nextShard = (nextShard + 1) % numShards;
+  }
+
+  std::string inputPath = "/tmp/RoundRobinBasedSharderTestShardInput" +
+      std::to_string(folly::Random::secureRand64());
+  data_processing::test_utils::writeVecToFile(rows, inputPath);
+  auto randStart = folly::Random::secureRand64();
+  std::vector<std::string> outputPaths;
+  for (std::size_t i = 0; i < numShards; ++i) {
+    outputPaths.push_back(
+        "/tmp/RoundRobinBasedSharderTestShardOutput" +
+        std::to_string(randStart + i));
+  }
+  RoundRobinBasedSharder sharder{inputPath, outputPaths, 1'000'000};
+  sharder.setNumThreads(4);
+  sharder.shard();
+
+  for (std::size_t i = 0; i < numShards; ++i) {
+    data_processing::test_utils::expectFileRowsEqual(
+        outputPaths.at(i), expected.at(i));
+    EXPECT_EQ(expected.at(i).size() - 1, sharder.getRowsForShard(i));
+  }
+}
 } // namespace data_processing::sharder
@@ -134,6 +134,12 @@ TEST(ShardTest, RunWithNoOutputFatal) {
   ASSERT_DEATH(runShard("/test/input", "", "", 0, 0, 0), "Error");
 }
 
+TEST(ShardTest, RunWithNegativeNumThreadsFatal) {
+  ASSERT_DEATH(
+      runShard("/test/input", "/test/output", "", 0, 0, 0, -1),
+      "--num_threads must not be negative");
+}
+
 TEST(ShardPidTest, RunWithOutputFilenames) {
   auto rand =
       folly::Random::secureRand64() % std::numeric_limits<int32_t>::max();
@@ -184,3 +190,9 @@ TEST(ShardPidTest, RunWithOutputBasePath) {
 TEST(ShardPidTest, RunWithNoOutputFatal) {
   ASSERT_DEATH(runShardPid("/test/input", "", "", 0, 0, 0, ""), "Error");
 }
+
+TEST(ShardPidTest, RunWithNegativeNumThreadsFatal) {
+  ASSERT_DEATH(
+      runShardPid("/test/input", "/test/output", "", 0, 0, 0, "", -1),
+      "--num_threads must not be negative");
+}
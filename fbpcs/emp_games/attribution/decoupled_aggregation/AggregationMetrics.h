@@ -7,8 +7,10 @@
 
 #pragma once
 
+#include <algorithm>
 #include <filesystem>
 #include <string>
+#include <string_view>
 #include <unordered_map>
 #include <vector>
 
@@ -22,23 +24,25 @@ namespace aggregation::private_aggregation {
 // utility method used for parsing string information to vector of type T.
 template <typename T>
 static const std::vector<T> getInnerArray(std::string& str) {
-  // Strip the brackets [] before splitting into individual timestamp values
+  // Strip the brackets [] and spaces before splitting into individual values
   auto innerString = str;
   innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), '['),
+      std::remove_if(
+          innerString.begin(),
+          innerString.end(),
+          [](char c) { return c == '[' || c == ']' || c == ' '; }),
       innerString.end());
-  innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), ']'),
-      innerString.end());
-  auto innerVals = private_measurement::csv::splitByComma(innerString, false);
+  std::vector<std::string_view> innerVals;
+  private_measurement::csv::tokenizeByComma(innerString, false, innerVals);
 
   std::vector<T> out;
 
-  for (const auto& innerVal : innerVals) {
+  out.reserve(innerVals.size());
+
+  for (auto innerVal : innerVals) {
     if (!innerVal.empty()) {
       T parsed = 0;
-      std::istringstream iss{innerVal};
-      iss >> parsed;
+      private_measurement::csv::parseInteger(innerVal, parsed);
       out.push_back(parsed);
     }
   }
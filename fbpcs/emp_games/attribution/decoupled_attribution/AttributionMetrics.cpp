@@ -11,6 +11,7 @@
 #include <fstream>
 #include <map>
 #include <string>
+#include <string_view>
 
 #include <re2/re2.h>
 
@@ -25,23 +26,25 @@
 namespace aggregation::private_attribution {
 
 static const std::vector<int64_t> getInnerArray(std::string& str) {
-  // Strip the brackets [] before splitting into individual timestamp values
+  // Strip the brackets [] and spaces before splitting into individual values
   auto innerString = str;
   innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), '['),
+      std::remove_if(
+          innerString.begin(),
+          innerString.end(),
+          [](char c) { return c == '[' || c == ']' || c == ' '; }),
       innerString.end());
-  innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), ']'),
-      innerString.end());
-  auto innerVals = private_measurement::csv::splitByComma(innerString, false);
+  std::vector<std::string_view> innerVals;
+  private_measurement::csv::tokenizeByComma(innerString, false, innerVals);
 
   std::vector<int64_t> out;
 
-  for (const auto& innerVal : innerVals) {
+  out.reserve(innerVals.size());
+
+  for (auto innerVal : innerVals) {
     if (!innerVal.empty()) {
       int64_t parsed = 0;
-      std::istringstream iss{innerVal};
-      iss >> parsed;
+      private_measurement::csv::parseInteger(innerVal, parsed);
       out.push_back(parsed);
     }
   }
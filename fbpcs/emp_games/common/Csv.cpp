@@ -6,8 +6,11 @@
  */
 
 #include <folly/String.h>
+#include <algorithm>
 #include <functional>
+#include <memory>
 #include <string>
+#include <unordered_map>
 #include <vector>
 
 #include "fbpcf/io/api/BufferedReader.h"
@@ -20,13 +23,54 @@
 
 namespace private_measurement::csv {
 
+namespace {
+// Compiling a regex takes much longer than matching a line with it, so each
+// thread keeps the regexes it compiled
+const re2::RE2& getRegex(const std::string& pattern) {
+  thread_local std::unordered_map<std::string, std::unique_ptr<re2::RE2>>
+      regexes;
+  auto& regex = regexes[pattern];
+  if (!regex) {
+    regex = std::make_unique<re2::RE2>(pattern);
+  }
+  return *regex;
+}
+
+// Calls onPart with each part of str, matching what RE2::Consume returns for
+// the patterns of splitByComma: a part is a run of non commas or, with inner
+// brackets, a non empty [...] array. An empty part ends the split.
+template <typename F>
+void forEachPart(std::string_view str, bool supportInnerBrackets, F&& onPart) {
+  std::size_t start = 0;
+  while (start < str.size() && str[start] != ',') {
+    std::size_t end = std::string_view::npos;
+    if (supportInnerBrackets && str[start] == '[' && start + 1 < str.size() &&
+        str[start + 1] != ']') {
+      end = str.find(']', start + 1);
+      if (end != std::string_view::npos) {
+        ++end;
+      }
+    }
+    if (end == std::string_view::npos) {
+      end = std::min(str.find(',', start), str.size());
+    }
+    onPart(str.substr(start, end - start));
+
+    start = end;
+    if (start < str.size() && str[start] == ',') {
+      ++start;
+    }
+  }
+}
+} // namespace
+
 const std::vector<std::string> split(
     std::string& str,
     const std::string& delim) {
   // Preprocessing step: Remove spaces if any
   str.erase(std::remove(str.begin(), str.end(), ' '), str.end());
   std::vector<std::string> tokens;
-  re2::RE2 rgx{delim};
+  const re2::RE2& rgx = getRegex(delim);
   re2::StringPiece input{str}; // Wrap a StringPiece around it
 
   std::string token;
@@ -39,20 +83,38 @@ const std::vector<std::string> split(
 const std::vector<std::string> splitByComma(
     std::string& str,
     bool supportInnerBrackets) {
-  if (supportInnerBrackets) {
-    // The pattern here indicates that it's looking for a \[, gets all
-    // non-brackets [^\]], then the \]. Otherwise |,
-    // it will get all the non commas [^,]. The surrounding () makes it
-    // a capture group. ,? means there may or may not be a comma
-    return split(str, R"((\[[^\]]+\]|[^,]+),?)");
-  } else {
-    // split internally uses RE2 which relies on
-    // consuming patterns. The pattern here indicates
-    // it will get all the non commas [^,]. The surrounding () makes it
-    // a capture group. ,? means there may or may not be a comma
-
-    return split(str, "([^,]+),?");
-  }
+  std::vector<std::string> parts;
+  splitByComma(str, supportInnerBrackets, parts);
+  return parts;
+}
+
+void splitByComma(
+    std::string& str,
+    bool supportInnerBrackets,
+    std::vector<std::string>& parts) {
+  // Preprocessing step: Remove spaces if any
+  str.erase(std::remove(str.begin(), str.end(), ' '), str.end());
+
+  std::size_t numParts = 0;
+  forEachPart(str, supportInnerBrackets, [&](std::string_view part) {
+    if (numParts < parts.size()) {
+      parts[numParts].assign(part.data(), part.size());
+    } else {
+      parts.emplace_back(part);
+    }
+    ++numParts;
+  });
+  parts.resize(numParts);
+}
+
+void tokenizeByComma(
+    std::string_view str,
+    bool supportInnerBrackets,
+    std::vector<std::string_view>& parts) {
+  parts.clear();
+  forEachPart(str, supportInnerBrackets, [&](std::string_view part) {
+    parts.push_back(part);
+  });
 }
 
 bool readCsv(
@@ -69,11 +131,13 @@ bool readCsv(
   auto header = splitByComma(line, false);
   processHeader(header);
 
+  // The parts are reused from line to line
+  std::vector<std::string> parts;
   while (!inlineBufferedReader->eof()) {
     // Split on commas, but if it looks like we're reading an array
     // like `[1, 2, 3]`, take the whole array
     line = inlineBufferedReader->readLine();
-    auto parts = splitByComma(line, true);
+    splitByComma(line, true, parts);
     readLine(header, parts);
   }
   inlineBufferedReader->close();
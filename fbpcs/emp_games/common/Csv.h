@@ -7,7 +7,14 @@
 
 #pragma once
 
+#include <cctype>
+#include <charconv>
+#include <cstdint>
+#include <functional>
+#include <limits>
 #include <string>
+#include <string_view>
+#include <type_traits>
 #include <vector>
 
 #include <re2/re2.h>
@@ -24,6 +31,63 @@ const std::vector<std::string> splitByComma(
     std::string& str,
     bool supportInnerBrackets);
 
+// Same as splitByComma, but writes the parts to the given vector, reusing the
+// strings it already holds
+void splitByComma(
+    std::string& str,
+    bool supportInnerBrackets,
+    std::vector<std::string>& parts);
+
+// Same as splitByComma, but without removing spaces first, and the parts are
+// views of str
+void tokenizeByComma(
+    std::string_view str,
+    bool supportInnerBrackets,
+    std::vector<std::string_view>& parts);
+
+// Parses the integer at the start of str like `std::istream >> value` does:
+// leading whitespace and a '+' sign are skipped, parsing stops at the first
+// character that isn't part of the number, out of range numbers are clamped
+// and numbers other than 0 and 1 are true for bool. Unlike std::istream, a
+// negative number isn't a valid unsigned integer.
+// Returns true on success, false on failure
+template <typename T>
+bool parseInteger(std::string_view str, T& value) {
+  std::size_t start = 0;
+  while (start < str.size() &&
+         std::isspace(static_cast<unsigned char>(str[start]))) {
+    ++start;
+  }
+  if (start < str.size() && str[start] == '+') {
+    ++start;
+    if (start == str.size() ||
+        !std::isdigit(static_cast<unsigned char>(str[start]))) {
+      value = 0;
+      return false;
+    }
+  }
+
+  if constexpr (std::is_same_v<T, bool>) {
+    int64_t parsed = 0;
+    auto success = parseInteger(str.substr(start), parsed);
+    value = parsed != 0;
+    return success && (parsed == 0 || parsed == 1);
+  } else {
+    const char* begin = str.data() + start;
+    auto [ptr, ec] = std::from_chars(begin, str.data() + str.size(), value);
+    if (ec == std::errc::result_out_of_range) {
+      value = *begin == '-' ? std::numeric_limits<T>::min()
+                            : std::numeric_limits<T>::max();
+      return false;
+    }
+    if (ec != std::errc{}) {
+      value = 0;
+      return false;
+    }
+    return true;
+  }
+}
+
 // Reads a csv from the given file, calling the given function for each line
 // Returns true on success, false on failure
 bool readCsv(
@@ -7,7 +7,9 @@
 
 #pragma once
 
+#include <algorithm>
 #include <sstream>
+#include <string_view>
 
 #include "folly/dynamic.h"
 #include "folly/logging/xlog.h"
@@ -22,30 +24,31 @@ namespace common {
 // utility method used for parsing string information to vector of type T.
 template <typename T>
 static const std::vector<T> getInnerArray(const std::string& str) {
-  // Strip the brackets [] before splitting into individual timestamp values
+  // Strip the brackets [] and spaces before splitting into individual values
   auto innerString = str;
   innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), '['),
+      std::remove_if(
+          innerString.begin(),
+          innerString.end(),
+          [](char c) { return c == '[' || c == ']' || c == ' '; }),
       innerString.end());
-  innerString.erase(
-      std::remove(innerString.begin(), innerString.end(), ']'),
-      innerString.end());
-  auto innerVals = private_measurement::csv::splitByComma(innerString, false);
+  std::vector<std::string_view> innerVals;
+  private_measurement::csv::tokenizeByComma(innerString, false, innerVals);
 
   std::vector<T> out;
+  out.reserve(innerVals.size());
 
-  for (const auto& innerVal : innerVals) {
+  for (auto innerVal : innerVals) {
     if (!innerVal.empty()) {
       T parsed = 0;
-      std::istringstream iss{innerVal};
-      if (std::is_unsigned<T>::value & (iss.peek() == '-')) {
+      if (std::is_unsigned<T>::value & (innerVal.front() == '-')) {
         // convert negative inputs to zero
-        iss.ignore();
         T parsedNegative = 0;
-        iss >> parsedNegative;
+        private_measurement::csv::parseInteger(
+            innerVal.substr(1), parsedNegative);
         XLOGF(ERR, "Error: input is negative {}", parsedNegative);
       } else {
-        iss >> parsed;
+        private_measurement::csv::parseInteger(innerVal, parsed);
       }
       out.push_back(parsed);
     }
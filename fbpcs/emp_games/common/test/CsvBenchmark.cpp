@@ -0,0 +1,152 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ *
+ * This source code is licensed under the MIT license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+/**
+ * Rows per second of splitting and parsing lift style csv rows, comparing a
+ * regex compiled for every split and std::istringstream parsing, like the csv
+ * helpers did before, with the comma tokenizer and csv::parseInteger.
+ */
+
+#include <chrono>
+#include <cstdint>
+#include <functional>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <string_view>
+#include <vector>
+
+#include <folly/Format.h>
+#include <folly/Random.h>
+#include <folly/init/Init.h>
+#include <gflags/gflags.h>
+#include <re2/re2.h>
+
+#include "fbpcs/emp_games/common/Csv.h"
+
+DEFINE_int64(num_rows, 200000, "Number of rows to split and parse");
+DEFINE_int32(num_conversions, 4, "Number of conversions of each row");
+
+namespace private_measurement::csv {
+namespace {
+std::vector<std::string> genRows(int64_t numRows, int32_t numConversions) {
+  std::vector<std::string> rows;
+  for (int64_t i = 0; i < numRows; ++i) {
+    std::string timestamps;
+    std::string values;
+    for (int32_t j = 0; j < numConversions; ++j) {
+      auto separator = j == 0 ? "" : ",";
+      timestamps += folly::sformat(
+          "{}{}", separator, 1600000000 + folly::Random::rand32(1000000));
+      values += folly::sformat("{}{}", separator, folly::Random::rand32(10000));
+    }
+    rows.push_back(folly::sformat(
+        "{:016x},{},1,[{}],[{}]",
+        folly::Random::rand64(),
+        1600000000 + folly::Random::rand32(1000000),
+        timestamps,
+        values));
+  }
+  return rows;
+}
+
+std::vector<std::string> regexSplit(
+    const std::string& pattern,
+    std::string& str) {
+  std::vector<std::string> tokens;
+  re2::RE2 rgx{pattern};
+  re2::StringPiece input{str};
+  std::string token;
+  while (RE2::Consume(&input, rgx, &token)) {
+    tokens.push_back(token);
+  }
+  return tokens;
+}
+
+// Splits each row and its arrays and sums their integers, with a regex
+// compiled for every split and std::istringstream
+int64_t parseWithRegex(const std::vector<std::string>& rows) {
+  int64_t sum = 0;
+  for (auto row : rows) {
+    auto parts = regexSplit(R"((\[[^\]]+\]|[^,]+),?)", row);
+    for (std::size_t i = 1; i < parts.size(); ++i) {
+      auto innerString = parts.at(i);
+      if (innerString.front() == '[') {
+        innerString = innerString.substr(1, innerString.size() - 1);
+      }
+      for (const auto& value : regexSplit("([^,]+),?", innerString)) {
+        int64_t parsed = 0;
+        std::istringstream iss{value};
+        iss >> parsed;
+        sum += parsed;
+      }
+    }
+  }
+  return sum;
+}
+
+// Same as parseWithRegex, with the comma tokenizer and parseInteger
+int64_t parseWithTokenizer(const std::vector<std::string>& rows) {
+  int64_t sum = 0;
+  std::vector<std::string_view> parts;
+  std::vector<std::string_view> values;
+  for (const auto& row : rows) {
+    tokenizeByComma(row, true, parts);
+    for (std::size_t i = 1; i < parts.size(); ++i) {
+      auto innerString = parts.at(i);
+      if (innerString.front() == '[') {
+        innerString = innerString.substr(1, innerString.size() - 1);
+      }
+      tokenizeByComma(innerString, false, values);
+      for (auto value : values) {
+        int64_t parsed = 0;
+        parseInteger(value, parsed);
+        sum += parsed;
+      }
+    }
+  }
+  return sum;
+}
+
+double rowsPerSecond(
+    const std::vector<std::string>& rows,
+    const std::function<int64_t(const std::vector<std::string>&)>& parse,
+    int64_t& sum) {
+  auto start = std::chrono::steady_clock::now();
+  sum = parse(rows);
+  std::chrono::duration<double> elapsed =
+      std::chrono::steady_clock::now() - start;
+  return rows.size() / elapsed.count();
+}
+
+void run() {
+  auto rows = genRows(FLAGS_num_rows, FLAGS_num_conversions);
+
+  int64_t regexSum = 0;
+  int64_t tokenizerSum = 0;
+  auto regexRowsPerSecond = rowsPerSecond(rows, parseWithRegex, regexSum);
+  auto tokenizerRowsPerSecond =
+      rowsPerSecond(rows, parseWithTokenizer, tokenizerSum);
+  if (regexSum != tokenizerSum) {
+    std::cerr << "The tokenizer parsed " << tokenizerSum << " instead of "
+              << regexSum << "\n";
+  }
+
+  std::cout << folly::sformat("{:>12} {:>14}\n", "parser", "rows/s");
+  std::cout << folly::sformat(
+      "{:>12} {:>14.0f}\n", "regex", regexRowsPerSecond);
+  std::cout << folly::sformat(
+      "{:>12} {:>14.0f}\n", "tokenizer", tokenizerRowsPerSecond);
+}
+} // namespace
+} // namespace private_measurement::csv
+
+int main(int argc, char** argv) {
+  folly::init(&argc, &argv);
+  private_measurement::csv::run();
+  return 0;
+}
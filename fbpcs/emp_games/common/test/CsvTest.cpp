@@ -6,7 +6,10 @@
  */
 
 #include <gtest/gtest.h>
+#include <cstdint>
 #include <fstream>
+#include <limits>
+#include <string_view>
 #include "folly/Format.h"
 #include "folly/Random.h"
 
@@ -54,6 +57,82 @@ TEST_F(CsvTest, TestSplitByCommaSupportInnerBrackets) {
   EXPECT_EQ(expOutput, output);
 }
 
+TEST_F(CsvTest, TestSplitByCommaMatchesRegexSplit) {
+  // splitByComma tokenizes by hand what split does with these patterns
+  for (auto supportInnerBrackets : {false, true}) {
+    auto pattern =
+        supportInnerBrackets ? R"((\[[^\]]+\]|[^,]+),?)" : "([^,]+),?";
+    for (std::string inputStr :
+         {"",
+          "a",
+          "a,b,",
+          "a,,b",
+          ",a",
+          "[1,2],[3]",
+          "[],a",
+          "[1,2",
+          "a[1,2],b",
+          "[1,2]x,b"}) {
+      auto regexInput = inputStr;
+      EXPECT_EQ(
+          csv::splitByComma(inputStr, supportInnerBrackets),
+          csv::split(regexInput, pattern))
+          << inputStr;
+    }
+  }
+}
+
+TEST_F(CsvTest, TestSplitByCommaReusesParts) {
+  std::vector<std::string> parts = {"x", "y", "z", "w"};
+  std::string inputStr = " a , [1, 2] ";
+  csv::splitByComma(inputStr, true, parts);
+  std::vector<std::string> expOutput = {"a", "[1,2]"};
+  EXPECT_EQ(expOutput, parts);
+
+  inputStr = "b,c,d";
+  csv::splitByComma(inputStr, true, parts);
+  expOutput = {"b", "c", "d"};
+  EXPECT_EQ(expOutput, parts);
+}
+
+TEST_F(CsvTest, TestTokenizeByComma) {
+  std::vector<std::string_view> parts;
+  csv::tokenizeByComma("a, [1, 2],b", true, parts);
+  std::vector<std::string_view> expOutput = {"a", " [1", " 2]", "b"};
+  EXPECT_EQ(expOutput, parts);
+
+  csv::tokenizeByComma("a,[1, 2],b", true, parts);
+  expOutput = {"a", "[1, 2]", "b"};
+  EXPECT_EQ(expOutput, parts);
+}
+
+TEST_F(CsvTest, TestParseInteger) {
+  int64_t parsed = -1;
+  EXPECT_TRUE(csv::parseInteger(" +42]", parsed));
+  EXPECT_EQ(parsed, 42);
+  EXPECT_TRUE(csv::parseInteger("-1600000330", parsed));
+  EXPECT_EQ(parsed, -1600000330);
+
+  EXPECT_FALSE(csv::parseInteger("abc", parsed));
+  EXPECT_EQ(parsed, 0);
+  EXPECT_FALSE(csv::parseInteger("", parsed));
+  EXPECT_FALSE(csv::parseInteger("+-1", parsed));
+  EXPECT_FALSE(csv::parseInteger("99999999999999999999", parsed));
+  EXPECT_EQ(parsed, std::numeric_limits<int64_t>::max());
+
+  uint64_t unsignedParsed = 1;
+  EXPECT_FALSE(csv::parseInteger("-1", unsignedParsed));
+  EXPECT_EQ(unsignedParsed, 0);
+
+  bool flag = false;
+  EXPECT_TRUE(csv::parseInteger("1", flag));
+  EXPECT_TRUE(flag);
+  EXPECT_TRUE(csv::parseInteger("0", flag));
+  EXPECT_FALSE(flag);
+  EXPECT_FALSE(csv::parseInteger("2", flag));
+  EXPECT_TRUE(flag);
+}
+
 TEST_F(CsvTest, TestReadCsv) {
   std::string baseDir = test_util::getBaseDirFromPath(__FILE__);
   std::string inputPath = baseDir + "test_data/input.csv";
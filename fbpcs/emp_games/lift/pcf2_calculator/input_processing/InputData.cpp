@@ -51,11 +51,9 @@ void InputData::setTimestamps(
   // Take up to numConversionsPerUser_ elements and ignore the rest
   for (std::size_t i = 0; i < timestamps.size() && i < numConversionsPerUser_;
        ++i) {
-    std::istringstream iss{timestamps[i]};
     int64_t parsed = 0;
-    iss >> parsed;
-    if (iss.fail()) {
-      LOG(FATAL) << "Failed to parse '" << iss.str() << "' to int64_t";
+    if (!private_measurement::csv::parseInteger(timestamps[i], parsed)) {
+      LOG(FATAL) << "Failed to parse '" << timestamps[i] << "' to int64_t";
     }
     // secret-share-lift can have negative input timestamps
     if (liftMpcType_ == LiftMPCType::Standard && parsed < epoch_ &&
@@ -79,10 +77,8 @@ void InputData::setValuesFields(std::string& str) {
   for (std::size_t i = 0; i < values.size() && i < numConversionsPerUser_;
        ++i) {
     int64_t parsed = 0;
-    std::istringstream iss{values[i]};
-    iss >> parsed;
-    if (iss.fail()) {
-      LOG(FATAL) << "Failed to parse '" << iss.str() << "' to int64_t";
+    if (!private_measurement::csv::parseInteger(values[i], parsed)) {
+      LOG(FATAL) << "Failed to parse '" << values[i] << "' to int64_t";
     }
     purchaseValueArrays_.back().push_back(parsed);
     totalValue_ += parsed;
@@ -128,14 +124,11 @@ void InputData::addFromCSV(
     auto column = header[i];
     auto value = parts[i];
     int64_t parsed = 0;
-    std::istringstream iss{value};
     // Array columns and features may be parsed differently
     if (!(column == "opportunity_timestamps" || column == "event_timestamps" ||
           column == "values" || column == "id_")) {
-      iss >> parsed;
-
-      if (iss.fail()) {
-        LOG(FATAL) << "Failed to parse '" << iss.str() << "' to int64_t";
+      if (!private_measurement::csv::parseInteger(value, parsed)) {
+        LOG(FATAL) << "Failed to parse '" << value << "' to int64_t";
       }
     }
 
@@ -7,7 +7,7 @@
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
 import botocore
@@ -17,9 +17,11 @@ from fbpcs.infra.logging_service.download_logs.cloud.cloud_baseclass import (
     CloudBaseClass,
 )
 from fbpcs.infra.logging_service.download_logs.cloud_error.cloud_error import (
+    AwsAthenaThrottlingException,
     AwsCloudwatchLogGroupFetchException,
     AwsCloudwatchLogsFetchException,
     AwsCloudwatchLogStreamFetchException,
+    AwsCloudwatchThrottlingException,
     AwsInvalidCredentials,
     AwsKinesisFirehoseDeliveryStreamFetchException,
     AwsS3BucketVerificationException,
@@ -37,6 +39,9 @@ class AwsCloud(CloudBaseClass):
     """
 
     DEFAULT_RETRIES_LIMIT = 3
+    THROTTLING_ERROR_CODES = frozenset(
+        ("ThrottlingException", "Throttling", "TooManyRequestsException")
+    )
 
     def __init__(
         self,
@@ -161,42 +166,78 @@ class AwsCloud(CloudBaseClass):
             List[string]
         """
         messages = []
-        message_events = []
 
         if not log_group_name or not log_stream_name:
             return messages
 
-        try:
-            self.log.info(
-                f"Getting logs from cloudwatch for log group {log_group_name} and stream name {log_stream_name}"
-            )
+        self.log.info(
+            f"Getting logs from cloudwatch for log group {log_group_name} and stream name {log_stream_name}"
+        )
 
-            response = self.cloudwatch_client.get_log_events(
-                logGroupName=log_group_name,
-                logStreamName=log_stream_name,
-                startFromHead=True,
+        messages, next_token = self.get_cloudwatch_log_page(
+            log_group_name=log_group_name,
+            log_stream_name=log_stream_name,
+            container_arn=container_arn,
+        )
+
+        # Loop through to get the all the logs
+        while True:
+            prev_token = next_token
+            page_messages, next_token = self.get_cloudwatch_log_page(
+                log_group_name=log_group_name,
+                log_stream_name=log_stream_name,
+                next_token=prev_token,
+                container_arn=container_arn,
             )
-            message_events = response["events"]
+            # same token then break
+            if next_token == prev_token:
+                break
+            messages.extend(page_messages)
 
-            # Loop through to get the all the logs
+        return messages
 
-            while True:
-                prev_token = response["nextForwardToken"]
+    def get_cloudwatch_log_page(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        next_token: Optional[str] = None,
+        container_arn: Optional[str] = None,
+    ) -> Tuple[List[str], str]:
+        """
+        Fetches one page of cloudwatch logs for a given log group and log stream
+        Args:
+            log_group_name (string): Name of the log group
+            log_stream_name (string): Name of the log stream
+            next_token (string): nextForwardToken of the previous page, None for the first page
+            container_arn (string): Container arn to get log group and log stream names
+        Returns:
+            The messages of the page and its nextForwardToken. The end of the
+            stream is reached when the token of the next page is the same.
+        Raises:
+            AwsCloudwatchThrottlingException: when the request is throttled, and can be retried
+            AwsCloudwatchLogsFetchException: when the request fails
+        """
+        try:
+            if next_token:
                 response = self.cloudwatch_client.get_log_events(
                     logGroupName=log_group_name,
                     logStreamName=log_stream_name,
-                    nextToken=prev_token,
+                    nextToken=next_token,
+                )
+            else:
+                response = self.cloudwatch_client.get_log_events(
+                    logGroupName=log_group_name,
+                    logStreamName=log_stream_name,
+                    startFromHead=True,
                 )
-                # same token then break
-                if response["nextForwardToken"] == prev_token:
-                    break
-                message_events.extend(response["events"])
-
-            messages = self._parse_log_events(message_events)
-
         except ClientError as error:
             error_code = error.response.get("Error", {}).get("Code")
-            if error_code == "InvalidParameterException":
+            if error_code in self.THROTTLING_ERROR_CODES:
+                raise AwsCloudwatchThrottlingException(
+                    f"Throttled while fetching the log events for log group {log_group_name} and log stream {log_stream_name}\n"
+                    f"{error}\n"
+                )
+            elif error_code == "InvalidParameterException":
                 error_message = (
                     f"Couldn't fetch the log events for log group {log_group_name} and log stream {log_stream_name}.\n"
                     f"Please check if the container arn {container_arn} is correct.\n"
@@ -215,7 +256,7 @@ class AwsCloud(CloudBaseClass):
                 )
             raise AwsCloudwatchLogsFetchException(f"{error_message}")
 
-        return messages
+        return self._parse_log_events(response["events"]), response["nextForwardToken"]
 
     def create_s3_folder(self, bucket_name: str, folder_name: str) -> None:
         """
@@ -638,6 +679,7 @@ class AwsCloud(CloudBaseClass):
     ) -> Dict[str, Any]:
         """
         Returns Athena query execution details
+        Raises AwsAthenaThrottlingException when the request is throttled, and can be retried
         """
         response = {}
         if not query_execution_id:
@@ -648,6 +690,13 @@ class AwsCloud(CloudBaseClass):
                 QueryExecutionId=query_execution_id
             )
         except ClientError as error:
+            if (
+                error.response.get("Error", {}).get("Code")
+                in self.THROTTLING_ERROR_CODES
+            ):
+                raise AwsAthenaThrottlingException(
+                    f"Throttled while fetching query details with execution ID {query_execution_id}: {error}"
+                )
             error_message = f"Failed to fetch query details with execution ID {query_execution_id}: {error}"
             self.log.error(f"{error_message}")
             response = {"Get_Query_Execution_Error": error_message}
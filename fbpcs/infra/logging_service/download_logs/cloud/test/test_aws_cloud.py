@@ -15,6 +15,9 @@ import boto3
 
 from botocore.exceptions import ClientError, NoCredentialsError, NoRegionError
 from fbpcs.infra.logging_service.download_logs.cloud.aws_cloud import AwsCloud
+from fbpcs.infra.logging_service.download_logs.cloud_error.cloud_error import (
+    AwsCloudwatchThrottlingException,
+)
 
 
 class TestAwsCloud(unittest.TestCase):
@@ -86,6 +89,18 @@ class TestAwsCloud(unittest.TestCase):
             ("ResourceNotFoundException", "Couldn't find.*"),
             ("SomethingElseHappenedException", "Unexpected error.*"),
         ]
+        with self.subTest("get_log_events.ThrottlingException"):
+            self.aws_container_logs.cloudwatch_client.get_log_events.side_effect = (
+                ClientError(
+                    error_response={"Error": {"Code": "ThrottlingException"}},
+                    operation_name="get_log_events",
+                )
+            )
+            with self.assertRaisesRegex(
+                AwsCloudwatchThrottlingException, "Throttled.*"
+            ):
+                self.aws_container_logs.get_cloudwatch_logs("foo", "bar")
+
         for error_code, exc_regex in error_cases:
             with self.subTest(f"get_log_events.{error_code}"):
                 self.aws_container_logs.cloudwatch_client.get_log_events.reset_mock()
@@ -26,6 +26,18 @@ class AwsKinesisException(AwsException):
     pass
 
 
+class AwsAthenaException(AwsException):
+    pass
+
+
+class AwsThrottlingException(AwsException):
+    """
+    A request was throttled, and can be retried later
+    """
+
+    pass
+
+
 class AwsCloudwatchLogsFetchException(AwsCloudwatchException):
     pass
 
@@ -56,3 +68,13 @@ class AwsS3BucketVerificationException(AwsS3Exception):
 
 class AwsKinesisFirehoseDeliveryStreamFetchException(AwsKinesisException):
     pass
+
+
+class AwsCloudwatchThrottlingException(
+    AwsCloudwatchLogsFetchException, AwsThrottlingException
+):
+    pass
+
+
+class AwsAthenaThrottlingException(AwsAthenaException, AwsThrottlingException):
+    pass
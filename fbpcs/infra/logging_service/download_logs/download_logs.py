@@ -5,15 +5,24 @@
 
 # pyre-strict
 
+import json
 import os
+import random
 import tempfile
+import time
 from concurrent.futures import as_completed, ThreadPoolExecutor
 from pathlib import Path
-from threading import Lock
 
-from typing import Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from fbpcs.infra.logging_service.download_logs.cloud.aws_cloud import AwsCloud
+from fbpcs.infra.logging_service.download_logs.cloud_error.cloud_error import (
+    AwsAthenaThrottlingException,
+    AwsThrottlingException,
+)
+from fbpcs.infra.logging_service.download_logs.utils.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+)
 from fbpcs.infra.logging_service.download_logs.utils.utils import (
     ContainerDetails,
     DataInfraLambda,
@@ -22,6 +31,8 @@ from fbpcs.infra.logging_service.download_logs.utils.utils import (
     Utils,
 )
 
+T = TypeVar("T")
+
 
 class AwsContainerLogs(AwsCloud):
     """
@@ -43,6 +54,18 @@ class AwsContainerLogs(AwsCloud):
     DEFAULT_DOWNLOAD_LOCATION = "/tmp"
     MAX_THREADS = 500
     THREADS_PER_CORE = 20
+    # Suffix of the file next to a container log which is being downloaded,
+    # with the nextForwardToken of the next page and the size of the log
+    CHECKPOINT_SUFFIX = ".checkpoint"
+    # Suffix of the checkpoint being written, before it replaces the checkpoint
+    CHECKPOINT_TEMP_SUFFIX = ".tmp"
+    # Suffix the log of a container gets when its download failed for good, so
+    # that it can't be mistaken for the whole log
+    INCOMPLETE_LOG_SUFFIX = ".incomplete"
+    THROTTLING_RETRIES_LIMIT = 10
+    THROTTLING_BACKOFF_IN_SECONDS = 0.5
+    MAX_THROTTLING_BACKOFF_IN_SECONDS = 20.0
+    ATHENA_MAX_THREADS = 10
 
     def __init__(
         self,
@@ -62,7 +85,9 @@ class AwsContainerLogs(AwsCloud):
         self.deployment_tag = deployment_tag
         self.containers_without_logs: List[str] = []
         self.containers_download_logs_failed: List[str] = []
-        self.write_to_file_lock = Lock()
+        # Shared by the threads downloading container logs
+        self.cloudwatch_concurrency = AdaptiveConcurrencyLimiter(self.MAX_THREADS)
+        self.athena_concurrency = AdaptiveConcurrencyLimiter(self.ATHENA_MAX_THREADS)
 
     def upload_logs_to_s3_from_cloudwatch(
         self,
@@ -194,12 +219,55 @@ class AwsContainerLogs(AwsCloud):
             local_folder_location=computaion_run_container_log_folder,
         )
 
+        # Retry the failed downloads, they resume from their checkpoint
+        for _ in range(self.DEFAULT_RETRIES_LIMIT - 1):
+            if not self.containers_download_logs_failed:
+                break
+            failed_container_arn_list = self.containers_download_logs_failed.copy()
+            self.containers_download_logs_failed.clear()
+            self.log.info(
+                f"Retrying to download logs of {len(failed_container_arn_list)} containers"
+            )
+            self.run_threaded_download(
+                func=self.store_container_logs_locally,
+                container_arn_list=failed_container_arn_list,
+                local_folder_location=computaion_run_container_log_folder,
+            )
+
         # List all the containers with no cloudwatch logs
         self.log_containers_without_logs()
 
-        # List all containers for which download failed because of thread crash
-        # TODO: T123687467: add retry logic to download logs for the failed cases of download
+        # List all containers for which download failed after all the retries
         self.log_containers_download_log_failed()
+        self._mark_incomplete_container_logs(computaion_run_container_log_folder)
+
+    def _mark_incomplete_container_logs(self, local_folder_location: str) -> None:
+        """
+        Renames the partial logs of the containers whose download failed after
+        all the retries, and removes their checkpoints, so that neither is
+        compressed and uploaded as if it were a complete log
+        """
+        for container_arn in self.containers_download_logs_failed:
+            try:
+                container_id = self._parse_container_arn(container_arn).container_id
+            except Exception:
+                # The download failed before any file was written
+                continue
+            local_file_location = self.utils.string_formatter(
+                StringFormatter.FILE_LOCATION, local_folder_location, container_id
+            )
+            checkpoint_location = local_file_location + self.CHECKPOINT_SUFFIX
+            for location in (
+                checkpoint_location,
+                checkpoint_location + self.CHECKPOINT_TEMP_SUFFIX,
+            ):
+                if os.path.exists(location):
+                    os.remove(location)
+            if os.path.exists(local_file_location):
+                os.replace(
+                    local_file_location,
+                    local_file_location + self.INCOMPLETE_LOG_SUFFIX,
+                )
 
     def _upload_deployment_logs(self, local_log_folder_location: str) -> None:
         # check if file exists
@@ -428,12 +496,14 @@ class AwsContainerLogs(AwsCloud):
         athena_details_dict.update({"Query_Result": []})
 
         query_execution_id_list = self.get_athena_query_executions()
-        # TODO: Add threading for get each query execution details
-        for query_execution_id in query_execution_id_list:
-            response = self.get_athena_query_execution_details(
-                query_execution_id=query_execution_id
+        # map keeps the order of the query execution IDs
+        with ThreadPoolExecutor(max_workers=self.ATHENA_MAX_THREADS) as executor:
+            athena_details_dict["Query_Result"].extend(
+                executor.map(
+                    self._get_athena_query_execution_details_with_retries,
+                    query_execution_id_list,
+                )
             )
-            athena_details_dict["Query_Result"].append(response)
 
         # copy glue etl config
         athena_config_logs_file_location = self.utils.string_formatter(
@@ -531,8 +601,8 @@ class AwsContainerLogs(AwsCloud):
             self.log.info("Downloaded logs for all the available containers")
             return
 
-        arns = ", ".join(self.containers_without_logs)
-        self.log.error(f"Couldn't find logs for the following_containers: {arns}")
+        arns = ", ".join(self.containers_download_logs_failed)
+        self.log.error(f"Couldn't download logs for the following containers: {arns}")
 
     def store_container_logs_locally(
         self, local_folder_location: str, container_arn: str
@@ -564,21 +634,146 @@ class AwsContainerLogs(AwsCloud):
         ):
             self.containers_without_logs.append(container_arn)
         else:
-            message_events = self.get_cloudwatch_logs(
+            self.log.info(
+                f"Creating file to store log locally in location {local_file_location}"
+            )
+            self._stream_cloudwatch_logs_to_file(
                 log_group_name=log_group_name,
                 log_stream_name=log_stream_name,
+                local_file_location=local_file_location,
                 container_arn=container_arn,
             )
 
-            self.log.info(
-                f"Creating file to store log locally in location {local_file_location}"
-            )
-            with self.write_to_file_lock:
-                self.utils.create_file(
-                    file_location=local_file_location,
-                    content=message_events,
+    def _stream_cloudwatch_logs_to_file(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        local_file_location: str,
+        container_arn: Optional[str] = None,
+    ) -> None:
+        """
+        Writes the cloudwatch log pages to a local file as they are fetched.
+        After every page the nextForwardToken is checkpointed, so that a download
+        which was interrupted resumes after the last written page.
+        Args:
+            log_group_name (string): Name of the log group
+            log_stream_name (string): Name of the log stream
+            local_file_location (string): Full path of the local file
+            container_arn (string): Container arn to get log group and log stream names
+        Returns:
+            None
+        """
+        checkpoint_location = local_file_location + self.CHECKPOINT_SUFFIX
+        next_token, size = self._read_checkpoint(checkpoint_location)
+        if next_token:
+            self.log.info(f"Resuming download of {local_file_location} at {size} bytes")
+
+        with open(local_file_location, "a" if next_token else "w") as file_object:
+            # Drop what was written after the checkpoint
+            file_object.truncate(size)
+            while True:
+                messages, page_token = self._call_with_throttling_retries(
+                    self.cloudwatch_concurrency,
+                    lambda: self.get_cloudwatch_log_page(
+                        log_group_name=log_group_name,
+                        log_stream_name=log_stream_name,
+                        next_token=next_token,
+                        container_arn=container_arn,
+                    ),
+                    f"logs of log stream {log_stream_name}",
+                )
+                # same token then the end of the stream is reached
+                if next_token and page_token == next_token:
+                    break
+                self.utils.write_to_file(file_object, messages)
+                file_object.flush()
+                next_token = page_token
+                self._write_checkpoint(
+                    checkpoint_location,
+                    next_token,
+                    os.fstat(file_object.fileno()).st_size,
                 )
 
+        os.remove(checkpoint_location)
+
+    def _get_athena_query_execution_details_with_retries(
+        self, query_execution_id: str
+    ) -> Dict[str, Any]:
+        try:
+            return self._call_with_throttling_retries(
+                self.athena_concurrency,
+                lambda: self.get_athena_query_execution_details(
+                    query_execution_id=query_execution_id
+                ),
+                f"query details with execution ID {query_execution_id}",
+            )
+        except AwsAthenaThrottlingException as error:
+            error_message = f"Failed to fetch query details with execution ID {query_execution_id}: {error}"
+            self.log.error(f"{error_message}")
+            return {"Get_Query_Execution_Error": error_message}
+
+    def _call_with_throttling_retries(
+        self,
+        concurrency: AdaptiveConcurrencyLimiter,
+        request: Callable[[], T],
+        description: str,
+    ) -> T:
+        """
+        Makes a request, retrying with an exponential backoff when throttled.
+        The requests of all the threads sharing the concurrency limiter are
+        bounded by it, and the bound is lowered when they are throttled.
+        Args:
+            concurrency (AdaptiveConcurrencyLimiter): Limiter of the requests to the same service
+            request (Callable): Makes the request, raises AwsThrottlingException when throttled
+            description (string): What is requested, for the logs
+        Returns:
+            What the request returns
+        """
+        attempt = 0
+        while True:
+            with concurrency:
+                try:
+                    response = request()
+                except AwsThrottlingException:
+                    concurrency.throttled()
+                    attempt += 1
+                    if attempt >= self.THROTTLING_RETRIES_LIMIT:
+                        raise
+                else:
+                    concurrency.succeeded()
+                    return response
+
+            backoff = min(
+                self.MAX_THROTTLING_BACKOFF_IN_SECONDS,
+                self.THROTTLING_BACKOFF_IN_SECONDS * 2 ** (attempt - 1),
+            )
+            self.log.warning(
+                f"Throttled fetching {description}, retrying in up to {backoff:.1f}s"
+            )
+            # Full jitter spreads the retries of the threads throttled together
+            time.sleep(random.uniform(0, backoff))
+
+    def _read_checkpoint(self, checkpoint_location: str) -> Tuple[Optional[str], int]:
+        """
+        Returns the nextForwardToken and the log size in the checkpoint, or
+        None and 0 when there is no checkpoint
+        """
+        try:
+            with open(checkpoint_location) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None, 0
+        return checkpoint["next_token"], checkpoint["size"]
+
+    def _write_checkpoint(
+        self, checkpoint_location: str, next_token: str, size: int
+    ) -> None:
+        # Replace the checkpoint at once, so a crash can't leave half of it
+        temp_location = checkpoint_location + self.CHECKPOINT_TEMP_SUFFIX
+        with open(temp_location, "w") as checkpoint_file:
+            json.dump({"next_token": next_token, "size": size}, checkpoint_file)
+        os.replace(temp_location, checkpoint_location)
+
     def run_threaded_download(
         self,
         func: Callable[[str, str], None],
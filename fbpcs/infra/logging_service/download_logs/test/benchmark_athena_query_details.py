@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Time to collect the Athena query details against a local Athena stand-in
+
+Every GetQueryExecution request to the stand-in sleeps for a fixed latency.
+The sequential rows fetch the details one query after the other, like
+_prepare_athena_logs did before it fetched them concurrently.
+
+Usage: python -m fbpcs.infra.logging_service.download_logs.test.benchmark_athena_query_details
+"""
+
+import tempfile
+import time
+from typing import Callable
+from unittest.mock import patch
+
+from fbpcs.infra.logging_service.download_logs.download_logs import AwsContainerLogs
+from fbpcs.infra.logging_service.download_logs.test.local_athena_client import (
+    LocalAthenaClient,
+)
+
+LATENCY = 0.05
+
+
+def measure(fn: Callable[[], None]) -> float:
+    start = time.monotonic()
+    fn()
+    return time.monotonic() - start
+
+
+def fetch_sequentially(aws_container_logs: AwsContainerLogs) -> None:
+    for query_execution_id in aws_container_logs.get_athena_query_executions():
+        aws_container_logs.get_athena_query_execution_details(query_execution_id)
+
+
+def main() -> None:
+    with patch("fbpcs.infra.logging_service.download_logs.cloud.aws_cloud.boto3"):
+        aws_container_logs = AwsContainerLogs("benchmark", deployment_tag="benchmark")
+
+    print(f"{'queries':>8} {'fetch':>12} {'seconds':>8}")
+    for query_count in (10, 50, 200):
+        aws_container_logs.athena_client = LocalAthenaClient(query_count, LATENCY)
+        with tempfile.TemporaryDirectory() as folder:
+            for name, fn in (
+                ("sequential", lambda: fetch_sequentially(aws_container_logs)),
+                (
+                    "concurrent",
+                    lambda: aws_container_logs._prepare_athena_logs(folder),
+                ),
+            ):
+                print(f"{query_count:>8} {name:>12} {measure(fn):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
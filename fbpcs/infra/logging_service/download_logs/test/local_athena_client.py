@@ -0,0 +1,53 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from botocore.exceptions import ClientError
+
+
+class LocalAthenaClient:
+    """
+    In memory stand-in for the boto3 Athena client calls of AwsContainerLogs
+
+    Every get_query_execution request sleeps for latency seconds, and the next
+    throttled_request_count requests are throttled. It counts how many
+    requests ran at the same time.
+    """
+
+    def __init__(self, query_count: int, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.query_execution_ids: List[str] = [f"query_{i}" for i in range(query_count)]
+        self.throttled_request_count = 0
+        self.requests: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_database(self, CatalogName: str, DatabaseName: str) -> Dict[str, Any]:
+        return {"Database": {"Name": DatabaseName}}
+
+    def list_query_executions(self) -> Dict[str, Any]:
+        return {"QueryExecutionIds": self.query_execution_ids}
+
+    def get_query_execution(self, QueryExecutionId: str) -> Dict[str, Any]:
+        with self._lock:
+            self.requests.append(QueryExecutionId)
+            if self.throttled_request_count > 0:
+                self.throttled_request_count -= 1
+                raise ClientError(
+                    error_response={"Error": {"Code": "ThrottlingException"}},
+                    operation_name="GetQueryExecution",
+                )
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return {"QueryExecution": {"QueryExecutionId": QueryExecutionId}}
@@ -0,0 +1,86 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+
+class LocalCloudwatchLogsClient:
+    """
+    In memory stand-in for the boto3 CloudWatch Logs client calls of AwsContainerLogs
+
+    The log streams are served in pages of page_size events, and every request
+    sleeps for latency seconds. The next throttled_request_count requests are
+    throttled, and a request with a token in failing_tokens fails once.
+    """
+
+    def __init__(self, page_size: int = 2, latency: float = 0.0) -> None:
+        self.page_size = page_size
+        self.latency = latency
+        # (log group name, log stream name) -> messages
+        self.streams: Dict[Tuple[str, str], List[str]] = {}
+        self.throttled_request_count = 0
+        self.failing_tokens: Set[str] = set()
+        # nextToken of every get_log_events request, None from the head
+        self.requested_tokens: List[Optional[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def describe_log_groups(self, logGroupNamePrefix: str) -> Dict[str, Any]:
+        groups = {group for group, _ in self.streams if group == logGroupNamePrefix}
+        return {"logGroups": [{"logGroupName": group} for group in groups]}
+
+    def describe_log_streams(
+        self, logGroupName: str, logStreamNamePrefix: str
+    ) -> Dict[str, Any]:
+        return {
+            "logStreams": [
+                {"logStreamName": stream}
+                for group, stream in self.streams
+                if group == logGroupName and stream == logStreamNamePrefix
+            ]
+        }
+
+    def get_log_events(
+        self,
+        logGroupName: str,
+        logStreamName: str,
+        startFromHead: bool = False,
+        nextToken: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            self.requested_tokens.append(nextToken)
+            if self.throttled_request_count > 0:
+                self.throttled_request_count -= 1
+                raise self._error("ThrottlingException")
+            if nextToken in self.failing_tokens:
+                self.failing_tokens.remove(nextToken)
+                raise self._error("ServiceUnavailableException")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        messages = self.streams[(logGroupName, logStreamName)]
+        # Tokens look like "f/<index of the first event of the page>"
+        start = int(nextToken.split("/")[1]) if nextToken else 0
+        end = min(start + self.page_size, len(messages))
+        return {
+            "events": [{"message": message} for message in messages[start:end]],
+            "nextForwardToken": f"f/{end}",
+        }
+
+    @staticmethod
+    def _error(code: str) -> ClientError:
+        return ClientError(
+            error_response={"Error": {"Code": code}}, operation_name="GetLogEvents"
+        )
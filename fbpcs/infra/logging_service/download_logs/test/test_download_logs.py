@@ -7,15 +7,33 @@
 # pyre-strict
 
 import os
+import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 from botocore.exceptions import ClientError
 
+from fbpcs.infra.logging_service.download_logs.cloud_error.cloud_error import (
+    AwsCloudwatchThrottlingException,
+)
 from fbpcs.infra.logging_service.download_logs.download_logs import AwsContainerLogs
 from fbpcs.infra.logging_service.download_logs.download_logs_cli import DownloadLogsCli
-from fbpcs.infra.logging_service.download_logs.utils.utils import ContainerDetails
+from fbpcs.infra.logging_service.download_logs.test.local_athena_client import (
+    LocalAthenaClient,
+)
+from fbpcs.infra.logging_service.download_logs.test.local_cloudwatch_logs_client import (
+    LocalCloudwatchLogsClient,
+)
+from fbpcs.infra.logging_service.download_logs.utils.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+)
+from fbpcs.infra.logging_service.download_logs.utils.utils import (
+    ContainerDetails,
+    Utils,
+)
 
 
 class TestDownloadLogs(unittest.TestCase):
@@ -220,8 +238,254 @@ class TestDownloadLogs(unittest.TestCase):
         # T124216294
         pass
 
+    def test_store_container_logs_locally(self) -> None:
+        client = self._use_local_cloudwatch_logs_client(latency=0.01)
+        messages = [f"message {i}" for i in range(7)]
+        client.streams[("/ecs/fake-container", "ecs/fake-container/abc123")] = messages
+
+        with tempfile.TemporaryDirectory() as folder:
+            self.aws_container_logs.store_container_logs_locally(
+                folder, "arn:aws:ecs:fake-region:123456789:task/fake-cluster/abc123"
+            )
+            with open(f"{folder}/abc123") as f:
+                self.assertEqual("".join(m + "\n" for m in messages), f.read())
+            # The checkpoint is removed once the download is complete
+            self.assertEqual(["abc123"], os.listdir(folder))
+
+        # 4 pages of 2 events, and the last page with the same token
+        self.assertEqual([None, "f/2", "f/4", "f/6", "f/7"], client.requested_tokens)
+
+    def test_store_container_logs_locally_retries_throttling(self) -> None:
+        client = self._use_local_cloudwatch_logs_client(latency=0.01)
+        self.aws_container_logs.cloudwatch_concurrency = AdaptiveConcurrencyLimiter(8)
+        throttled = patch.object(
+            self.aws_container_logs.cloudwatch_concurrency,
+            "throttled",
+            wraps=self.aws_container_logs.cloudwatch_concurrency.throttled,
+        )
+        arns = []
+        for i in range(20):
+            client.streams[("/ecs/fake-container", f"ecs/fake-container/id{i}")] = [
+                f"{i}.{j}" for j in range(5)
+            ]
+            arns.append(f"arn:aws:ecs:fake-region:123456789:task/fake-cluster/id{i}")
+        client.throttled_request_count = 6
+
+        with tempfile.TemporaryDirectory() as folder, throttled as throttled_mock:
+            res = self.aws_container_logs.run_threaded_download(
+                self.aws_container_logs.store_container_logs_locally,
+                arns,
+                folder,
+                num_threads=8,
+            )
+            self.assertEqual(20, len(res))
+            self.assertEqual(
+                [], self.aws_container_logs.containers_download_logs_failed
+            )
+            for i in range(20):
+                with open(f"{folder}/id{i}") as f:
+                    self.assertEqual([f"{i}.{j}" for j in range(5)], f.read().split())
+
+        # The concurrency was lowered every time a request was throttled
+        self.assertEqual(6, throttled_mock.call_count)
+        # 4 requests per container, and the 6 throttled requests again
+        self.assertEqual(20 * 4 + 6, len(client.requested_tokens))
+        self.assertLessEqual(client.max_in_flight, 8)
+
+    def test_store_container_logs_locally_gives_up_when_throttled(self) -> None:
+        client = self._use_local_cloudwatch_logs_client()
+        client.streams[("/ecs/fake-container", "ecs/fake-container/abc123")] = ["a"]
+        client.throttled_request_count = 100
+
+        with tempfile.TemporaryDirectory() as folder:
+            with self.assertRaises(AwsCloudwatchThrottlingException):
+                self.aws_container_logs.store_container_logs_locally(
+                    folder, "arn:aws:ecs:fake-region:123456789:task/fake-cluster/abc123"
+                )
+        self.assertEqual(
+            self.aws_container_logs.THROTTLING_RETRIES_LIMIT,
+            len(client.requested_tokens),
+        )
+
+    def test_upload_computation_run_container_logs_resumes_failed_downloads(
+        self,
+    ) -> None:
+        client = self._use_local_cloudwatch_logs_client()
+        messages = [f"message {i}" for i in range(7)]
+        client.streams[("/ecs/fake-container", "ecs/fake-container/abc123")] = messages
+        client.failing_tokens.add("f/4")
+        self.aws_container_logs.containers_download_logs_failed.clear()
+
+        with tempfile.TemporaryDirectory() as folder:
+            self.aws_container_logs._upload_computation_run_container_logs(
+                ["arn:aws:ecs:fake-region:123456789:task/fake-cluster/abc123"],
+                folder,
+            )
+            with open(f"{folder}/container_logs/abc123") as f:
+                self.assertEqual("".join(m + "\n" for m in messages), f.read())
+
+        self.assertEqual([], self.aws_container_logs.containers_download_logs_failed)
+        # The retry resumed after the last page written
+        self.assertEqual(
+            [None, "f/2", "f/4", "f/4", "f/6", "f/7"], client.requested_tokens
+        )
+
+    def test_upload_computation_run_container_logs_marks_failed_downloads(
+        self,
+    ) -> None:
+        client = self._use_local_cloudwatch_logs_client()
+        client.streams[("/ecs/fake-container", "ecs/fake-container/abc123")] = [
+            f"message {i}" for i in range(7)
+        ]
+        client.failing_tokens.add("f/4")
+        self.aws_container_logs.containers_download_logs_failed.clear()
+        self.aws_container_logs.DEFAULT_RETRIES_LIMIT = 1
+
+        with tempfile.TemporaryDirectory() as folder:
+            self.aws_container_logs._upload_computation_run_container_logs(
+                ["arn:aws:ecs:fake-region:123456789:task/fake-cluster/abc123"],
+                folder,
+            )
+            # Only the partial log is left, under a name marking it incomplete
+            self.assertEqual(
+                ["abc123.incomplete"], os.listdir(f"{folder}/container_logs")
+            )
+            with open(f"{folder}/container_logs/abc123.incomplete") as f:
+                self.assertEqual("".join(f"message {i}\n" for i in range(4)), f.read())
+
+        self.assertEqual(
+            ["arn:aws:ecs:fake-region:123456789:task/fake-cluster/abc123"],
+            self.aws_container_logs.containers_download_logs_failed,
+        )
+
+    def test_resume_drops_data_after_the_checkpoint(self) -> None:
+        client = self._use_local_cloudwatch_logs_client()
+        client.streams[("/group", "stream")] = ["a", "b", "c"]
+
+        with tempfile.TemporaryDirectory() as folder:
+            log_file = f"{folder}/log"
+            with open(log_file, "w") as f:
+                f.write("a\nb\npartial page")
+            self.aws_container_logs._write_checkpoint(
+                log_file + self.aws_container_logs.CHECKPOINT_SUFFIX, "f/2", 4
+            )
+            self.aws_container_logs._stream_cloudwatch_logs_to_file(
+                "/group", "stream", log_file
+            )
+            with open(log_file) as f:
+                self.assertEqual("a\nb\nc\n", f.read())
+
+        self.assertEqual(["f/2", "f/3"], client.requested_tokens)
+
+    def test_prepare_athena_logs(self) -> None:
+        client = LocalAthenaClient(query_count=30, latency=0.02)
+        client.throttled_request_count = 3
+        self.aws_container_logs.athena_client = client
+        self.aws_container_logs.utils = Utils()
+        self.aws_container_logs.deployment_tag = "my_deployment"
+        self.aws_container_logs.THROTTLING_BACKOFF_IN_SECONDS = 0.001
+
+        with tempfile.TemporaryDirectory() as folder, patch.object(
+            self.aws_container_logs.utils, "create_file"
+        ) as create_file:
+            start = time.monotonic()
+            self.aws_container_logs._prepare_athena_logs(folder)
+            elapsed = time.monotonic() - start
+
+        content = create_file.call_args.kwargs["content"]
+        self.assertEqual({"Name": "mpc-events-db-my_deployment"}, content["Database"])
+        # The details are in the order of the query execution IDs
+        self.assertEqual(
+            client.query_execution_ids,
+            [
+                query["QueryExecution"]["QueryExecutionId"]
+                for query in content["Query_Result"]
+            ],
+        )
+        # The throttled requests were retried
+        self.assertEqual(33, len(client.requests))
+        self.assertLessEqual(
+            client.max_in_flight, self.aws_container_logs.ATHENA_MAX_THREADS
+        )
+        # 30 queries of 0.02s with up to 10 at the same time, instead of 0.6s
+        self.assertLess(elapsed, 0.3)
+
+    def test_prepare_athena_logs_gives_up_when_throttled(self) -> None:
+        client = LocalAthenaClient(query_count=1)
+        client.throttled_request_count = 100
+        self.aws_container_logs.athena_client = client
+        self.aws_container_logs.utils = Utils()
+        self.aws_container_logs.deployment_tag = "my_deployment"
+        self.aws_container_logs.THROTTLING_BACKOFF_IN_SECONDS = 0.001
+
+        with tempfile.TemporaryDirectory() as folder, patch.object(
+            self.aws_container_logs.utils, "create_file"
+        ) as create_file:
+            self.aws_container_logs._prepare_athena_logs(folder)
+
+        (query_result,) = create_file.call_args.kwargs["content"]["Query_Result"]
+        self.assertRegex(
+            query_result["Get_Query_Execution_Error"], "^Failed to fetch.*Throttled"
+        )
+        self.assertEqual(
+            self.aws_container_logs.THROTTLING_RETRIES_LIMIT, len(client.requests)
+        )
+
+    def _use_local_cloudwatch_logs_client(
+        self, latency: float = 0.0
+    ) -> LocalCloudwatchLogsClient:
+        client = LocalCloudwatchLogsClient(latency=latency)
+        self.aws_container_logs.cloudwatch_client = client
+        self.aws_container_logs.utils = Utils()
+        self.aws_container_logs.THROTTLING_BACKOFF_IN_SECONDS = 0.001
+        return client
+
     def _get_sample_log_path(
         self,
         log_file: str,
     ) -> Path:
         return self.test_dir / "sample_log" / log_file
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def test_bounds_concurrency(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(3)
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def request() -> None:
+            nonlocal max_in_flight
+            with limiter:
+                with lock:
+                    max_in_flight = max(max_in_flight, limiter.in_flight)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(3, max_in_flight)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_adapts_to_throttling(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(8, min_concurrency=2)
+        limiter.throttled()
+        self.assertEqual(4, limiter.limit)
+        limiter.throttled()
+        limiter.throttled()
+        self.assertEqual(2, limiter.limit)
+
+        # Grows by one after as many successes as the limit
+        limiter.succeeded()
+        self.assertEqual(2, limiter.limit)
+        limiter.succeeded()
+        self.assertEqual(3, limiter.limit)
+        for _ in range(100):
+            limiter.succeeded()
+        self.assertEqual(8, limiter.limit)
+
+    def test_invalid_bounds(self) -> None:
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(2, min_concurrency=3)
@@ -0,0 +1,63 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import threading
+from types import TracebackType
+from typing import Optional, Type
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Bounds how many requests run at the same time, adapting the bound to throttling.
+
+    The bound is halved every time a request is throttled, and grows by one after
+    as many successful requests as the bound, up to max_concurrency. A request
+    runs inside `with limiter:`, and reports its outcome with throttled() or
+    succeeded().
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1) -> None:
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(
+                f"Expected 1 <= min_concurrency <= max_concurrency, got {min_concurrency} and {max_concurrency}"
+            )
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit: int = max_concurrency
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> "AdaptiveConcurrencyLimiter":
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def throttled(self) -> None:
+        with self._condition:
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self._successes = 0
+
+    def succeeded(self) -> None:
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify()
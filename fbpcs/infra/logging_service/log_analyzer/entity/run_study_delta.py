@@ -0,0 +1,26 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+from dataclasses import dataclass, field
+from typing import List
+
+from dataclasses_json import dataclass_json
+
+
+@dataclass_json
+@dataclass
+class RunStudyDelta:
+    # Count of the lines parsed since the previous delta
+    new_line_num: int
+    total_line_num: int
+    # IDs of the instances found in the new lines
+    new_instances: List[str] = field(default_factory=list)
+    # Stages found in the new lines, e.g. "7540993020268572: PID_SHARD"
+    new_stages: List[str] = field(default_factory=list)
+    # Log lines at ERROR level in the new lines, of any instance flow or none
+    new_error_lines: List[str] = field(default_factory=list)
+    # The items of RunStudy.summary_instances which changed
+    changed_summary_instances: List[str] = field(default_factory=list)
@@ -19,12 +19,20 @@ Options:
     --log_path=<path>               Override the default path where logs are saved
     --out=<output_json_file>        Output the digest to a JSON file. By default the summary is written to the log.
     --validate_one_runner_logs      Validate the logs from one_command_runner test, for regression test
+    --num_processes=<n>             Number of processes scanning the logs. By default one per CPU.
+    --follow                        Keep analyzing the lines appended to the logs file and log the changes, until interrupted
+    --follow_interval=<seconds>     Seconds between two reads of a followed logs file [default: 10]
     --verbose                       Set logging level to DEBUG
 """
 
 from __future__ import annotations
 
+import functools
+import io
+import itertools
 import logging
+import mmap
+import os
 import re
 import sys
 import time
@@ -32,7 +40,17 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, List, Match, Optional, Pattern, Set
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Match,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
 
 import schema
 from docopt import docopt
@@ -44,7 +62,14 @@ from fbpcs.infra.logging_service.log_analyzer.entity.flow_stage import FlowStage
 from fbpcs.infra.logging_service.log_analyzer.entity.instance_flow import InstanceFlow
 from fbpcs.infra.logging_service.log_analyzer.entity.log_context import LogContext
 from fbpcs.infra.logging_service.log_analyzer.entity.run_study import RunStudy
+from fbpcs.infra.logging_service.log_analyzer.entity.run_study_delta import (
+    RunStudyDelta,
+)
 from fbpcs.infra.logging_service.log_analyzer.log_validation import LogValidation
+from fbpcs.utils.process_map import ordered_process_map
+
+# The logs file is scanned in line-aligned chunks of at least this size
+CHUNK_SIZE_IN_BYTES = 16 * 1024 * 1024
 
 
 @dataclass
@@ -63,6 +88,76 @@ class MatcherAndHandler:
         [LogContext, Match[str], Optional[List[str]]],
         Optional[ParsingState],
     ]
+    # Every line matched by the matcher contains this literal. It is checked
+    # before running the matcher, which most lines don't match.
+    literal: str
+
+
+@dataclass(frozen=True)
+class ScannedChunk:
+    # Offset of the chunk in the logs file, in bytes
+    start: int
+    line_count: int
+    # The lines which might have to be parsed, with their index in the chunk
+    candidate_lines: List[Tuple[int, str]]
+
+
+def _line_aligned_ranges(
+    mm: mmap.mmap,
+    start: int,
+    end: int,
+    chunk_size: int,
+) -> Iterator[Tuple[int, int]]:
+    while start < end:
+        # A range ends after a newline, or at the end
+        range_end = mm.find(b"\n", start + chunk_size - 1, end) + 1 or end
+        yield start, range_end
+        start = range_end
+
+
+def _read_lines(logs_file: Path, start: int, end: int) -> Iterator[str]:
+    """Yields the lines of the logs file between two line-aligned offsets
+
+    The lines are decoded like open() decodes the logs file, so they are the same.
+    """
+    if start >= end:
+        return
+    with open(logs_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for range_start, range_end in _line_aligned_ranges(
+            mm, start, end, CHUNK_SIZE_IN_BYTES
+        ):
+            with io.TextIOWrapper(io.BytesIO(mm[range_start:range_end])) as infile:
+                yield from infile
+
+
+def _scan_chunk(
+    logs_file: Path,
+    prefilters: List[Tuple[str, Pattern[str]]],
+    chunk_range: Tuple[int, int],
+) -> ScannedChunk:
+    """Finds the lines of a chunk of the logs file which match any of the prefilters
+
+    The first line of the logs file is always a candidate line.
+
+    Args:
+        - logs_file: the logs file
+        - prefilters: the literal and the pattern of every line that has to be parsed
+        - chunk_range: offsets of the start of a line and of the end of a line
+    """
+    start, end = chunk_range
+    line_count = 0
+    candidate_lines = []
+    for index, log_line in enumerate(_read_lines(logs_file, start, end)):
+        line_count += 1
+        log_line = log_line.rstrip()
+        if (start == 0 and index == 0) or any(
+            literal in log_line and pattern.search(log_line)
+            for literal, pattern in prefilters
+        ):
+            candidate_lines.append((index, log_line))
+    return ScannedChunk(start, line_count, candidate_lines)
 
 
 class LogDigest:
@@ -70,9 +165,17 @@ class LogDigest:
         self,
         logs_file: Path,
         logger: logging.Logger,
+        num_processes: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE_IN_BYTES,
     ) -> None:
         self.logger = logger
         self.logs_file = logs_file
+        self.num_processes = num_processes
+        self.chunk_size = chunk_size
+        # The logs file is parsed up to this offset, in bytes
+        self.offset = 0
+        # The state of the parser after the line at offset
+        self.parser_state: Optional[ParsingState] = None
         self.run_study: RunStudy = RunStudy(0)
         self.start_epoch_time: str = ""
         self.container_ids: Dict[str, Dict[str, ContainerInfo]] = {}
@@ -118,6 +221,7 @@ class LogDigest:
                     r"Created instance ([^ ]+) for cell ([^ ]+) and objective ([^ ]+)$"
                 ),
                 self._add_created_instance_objective_cell,
+                "Created instance ",
             ),
             MatcherAndHandler(
                 # E.g.: ... Instances to run for cell-obj pairs:
@@ -134,6 +238,7 @@ class LogDigest:
                 # }
                 re.compile(r"Instances to run for cell-obj pairs:"),
                 self._add_existing_instance,
+                "Instances to run for cell-obj pairs:",
             ),
             MatcherAndHandler(
                 # E.g. [252502207342908] Valid stage found: PrivateComputationStageFlow.PID_SHARD
@@ -141,11 +246,13 @@ class LogDigest:
                     r"\[([^ ]+)\] Valid stage found: PrivateComputationStageFlow\.([^ ]+)$"
                 ),
                 self._add_flow_stage,
+                "] Valid stage found: PrivateComputationStageFlow.",
             ),
             MatcherAndHandler(
                 # E.g. [31602208955937] Partner 31602208955937 starting stage PC_PRE_VALIDATION.
                 re.compile(r" ! \[([^ ]+)\] Partner [^ ]+ starting stage ([_A-Z]+)"),
                 self._add_flow_stage_bolt,
+                "] Partner ",
             ),
             MatcherAndHandler(
                 # E.g. [4547351303806882] {"input_path": ... "status_update_ts": 1648146505, ... }
@@ -154,35 +261,193 @@ class LogDigest:
                     r"\[([^ ]+)\] {(?=.*\"role\": \"PARTNER\".*)(\".*status_update_ts\": (\d+).+)}$"
                 ),
                 self._add_containers_from_status_update,
+                '"role": "PARTNER"',
             ),
         ]
 
     def analyze_logs(
         self,
     ) -> RunStudy:
-        line_num = 0
-        parser_state: Optional[ParsingState] = None
-        with open(self.logs_file) as infile:
-            for log_line in infile:
-                # Read a line and remove any trailing whitespace or newline chars
-                line_num += 1
-                parser_state = self._parse_one_line(
-                    line_num, log_line.rstrip(), parser_state
-                )
+        """Parses the logs file up to its end, incomplete last line included
 
-        self.run_study.total_line_num = line_num
+        After analyze_new_logs, only the lines it did not parse yet are parsed.
+        """
+        self._parse_new_lines(self._end_offset(complete_lines_only=False))
         self._aggregate_summary()
         return self.run_study
 
+    def analyze_new_logs(
+        self,
+    ) -> RunStudyDelta:
+        """Parses the complete lines appended to the logs file since the previous call
+
+        This follows the logs of a run in progress: the run study is updated in
+        place, and the cost of a call is proportional to the size of the new lines.
+
+        Returns:
+            What changed in the run study with the new lines
+        """
+        instance_ids = set(self.run_study.instances)
+        stage_counts = {
+            instance_id: len(instance_flow.stages)
+            for instance_id, instance_flow in self.run_study.instances.items()
+        }
+        error_line_counts = {
+            instance_id: len(instance_flow.instance_error_lines)
+            for instance_id, instance_flow in self.run_study.instances.items()
+        }
+        error_line_count = len(self.run_study.error_lines)
+        summary_instances = set(self.run_study.summary_instances)
+        line_num = self.run_study.total_line_num
+
+        self._parse_new_lines(self._end_offset(complete_lines_only=True))
+        self._aggregate_summary()
+
+        delta = RunStudyDelta(
+            new_line_num=self.run_study.total_line_num - line_num,
+            total_line_num=self.run_study.total_line_num,
+        )
+        new_error_lines = self.run_study.error_lines[error_line_count:]
+        for instance_id, instance_flow in self.run_study.instances.items():
+            if instance_id not in instance_ids:
+                delta.new_instances.append(instance_id)
+            delta.new_stages.extend(
+                f"{instance_id}: {stage.stage_id}"
+                for stage in instance_flow.stages[stage_counts.get(instance_id, 0) :]
+            )
+            new_error_lines.extend(
+                instance_flow.instance_error_lines[
+                    error_line_counts.get(instance_id, 0) :
+                ]
+            )
+        # Error lines look like "<line_num>: <log line>"
+        delta.new_error_lines = sorted(
+            new_error_lines, key=lambda error_line: int(error_line.split(":", 1)[0])
+        )
+        delta.changed_summary_instances = [
+            summary
+            for summary in self.run_study.summary_instances
+            if summary not in summary_instances
+        ]
+        return delta
+
+    def _end_offset(self, complete_lines_only: bool) -> int:
+        with open(self.logs_file, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset:
+                raise RuntimeError(
+                    f"{self.logs_file} was truncated below the parsed offset {self.offset}"
+                )
+            if not complete_lines_only or size == self.offset:
+                return size
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return max(mm.rfind(b"\n", self.offset) + 1, self.offset)
+
+    def _parse_new_lines(self, end: int) -> None:
+        # Worker processes find the few lines which match a pattern, then they
+        # are parsed here in order, so the digest is the same as when parsing
+        # every line.
+        line_num = self.run_study.total_line_num
+        # The lines up to this one were parsed
+        last_parsed_line_num = line_num
+        if self.parser_state:
+            # A multi-line log continues in the new lines
+            last_parsed_line_num, self.parser_state = self._parse_following_lines(
+                self.offset, 0, line_num, self.parser_state, end
+            )
+        for chunk in self._scan_chunks(self.offset, end):
+            for index, log_line in chunk.candidate_lines:
+                candidate_line_num = line_num + index + 1
+                if candidate_line_num <= last_parsed_line_num:
+                    # Already parsed with the lines following a multi-line log
+                    continue
+                self.parser_state = self._parse_one_line(
+                    candidate_line_num, log_line, None
+                )
+                last_parsed_line_num = candidate_line_num
+                if self.parser_state:
+                    (
+                        last_parsed_line_num,
+                        self.parser_state,
+                    ) = self._parse_following_lines(
+                        chunk.start,
+                        index + 1,
+                        candidate_line_num,
+                        self.parser_state,
+                        end,
+                    )
+            line_num += chunk.line_count
+
+        self.run_study.total_line_num = line_num
+        self.offset = end
+
+    def _prefilters(self) -> List[Tuple[str, Pattern[str]]]:
+        return [("ERROR", self.re_error)] + [
+            (matcher_handler.literal, matcher_handler.matcher)
+            for matcher_handler in self.matcher_handlers
+        ]
+
+    def _chunk_ranges(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        if start >= end:
+            return
+        with open(self.logs_file, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            yield from _line_aligned_ranges(mm, start, end, self.chunk_size)
+
+    def _scan_chunks(self, start: int, end: int) -> Iterator[ScannedChunk]:
+        """Scans the chunks of the logs file in worker processes and yields them in order"""
+        scan_chunk = functools.partial(_scan_chunk, self.logs_file, self._prefilters())
+        for _, chunk in ordered_process_map(
+            scan_chunk, self._chunk_ranges(start, end), self.num_processes
+        ):
+            yield chunk
+
+    def _parse_following_lines(
+        self,
+        start: int,
+        skipped_line_count: int,
+        line_num: int,
+        parser_state: ParsingState,
+        end: int,
+    ) -> Tuple[int, Optional[ParsingState]]:
+        """Parses the lines after a parsed line until the parser has no state
+
+        A multi-line log continues in lines which don't match any pattern, and
+        maybe in the next chunks, so they are read again from the logs file.
+
+        Args:
+            - start: offset of a line before the next line to parse
+            - skipped_line_count: count of the parsed lines from start
+            - line_num: line number of the last parsed line
+            - parser_state: the state after parsing the last parsed line
+            - end: offset where the parsing stops, even with a parser state
+
+        Returns:
+            The line number of the last parsed line and the parser state after it
+        """
+        lines = _read_lines(self.logs_file, start, end)
+        for log_line in itertools.islice(lines, skipped_line_count, None):
+            line_num += 1
+            parser_state = self._parse_one_line(
+                line_num, log_line.rstrip(), parser_state
+            )
+            if not parser_state:
+                break
+        return line_num, parser_state
+
     def _aggregate_summary(
         self,
     ) -> None:
+        # The summary is made again after new lines are parsed
+        self.run_study.summary_instances = []
         for instance_id in self.container_ids:
             instance_flow = self.run_study.instances[instance_id]
             instance_flow.instance_container_count = len(
                 self.container_ids[instance_id]
             )
             # Make the summary of the stages in the instance
+            instance_flow.summary_stages = []
             stage_ids = []
             for stage in instance_flow.stages:
                 elapsed_hms = "n/a"
@@ -552,6 +817,9 @@ def log_analyzer_main(argv: Optional[List[str]] = None) -> None:
             "--log_path": schema.Or(None, schema.Use(Path)),
             "--out": schema.Or(None, schema.Use(Path)),
             "--validate_one_runner_logs": bool,
+            "--num_processes": schema.Or(None, schema.Use(int)),
+            "--follow": bool,
+            "--follow_interval": schema.Use(float),
             "--verbose": bool,
             "--help": bool,
         }
@@ -579,7 +847,20 @@ def log_analyzer_main(argv: Optional[List[str]] = None) -> None:
     # E.g. Command line: log_analyzer 'sample_log/intern-output.txt' '--log_path=a.intern.log' ...
     logger.info(f"Command line: {Path(__file__).stem} {all_options}")
 
-    digest = LogDigest(logs_file, logger)
+    digest = LogDigest(logs_file, logger, arguments["--num_processes"])
+    if arguments["--follow"]:
+        while True:
+            delta = digest.analyze_new_logs()
+            if delta.new_line_num:
+                # pyre-ignore
+                logger.info(f"Run study changes:\n{delta.to_json(indent=4)}")
+            # Only an interrupt between two reads stops following: one while
+            # parsing would leave the digest with lines parsed twice next time
+            try:
+                time.sleep(arguments["--follow_interval"])
+            except KeyboardInterrupt:
+                logger.info("Stopped following the logs.")
+                break
     run_study = digest.analyze_logs()
     logger.info(f"Parsed log line count: {run_study.total_line_num}")
     if arguments["--validate_one_runner_logs"]:
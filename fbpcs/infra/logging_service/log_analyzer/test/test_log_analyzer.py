@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List, Optional
+from unittest.mock import patch
+
+from fbpcs.infra.logging_service.log_analyzer.log_analyzer import (
+    log_analyzer_main,
+    LogDigest,
+    ParsingState,
+)
+
+TS = "2022-06-06 20:12:{:02d},535Z"
+STATUS_UPDATE = (
+    '[{instance}] {{"input_path": "in.csv", "role": "PARTNER", "status_update_ts": 1654546374, '
+    '"containers": [{{"log_url": "https://log/{n}", "status": "{status}", '
+    '"instance_id": "arn:aws:ecs:task/{n}"}}]}}'
+)
+
+
+def make_logs() -> List[str]:
+    lines = [f"{TS.format(0)} INFO t:MainThread n:__main__ ! Command line: ..."]
+    for i in range(3):
+        instance = f"75409930202685{i}"
+        lines += [
+            f"{TS.format(1)} INFO t:MainThread n:root ! Created instance {instance} for cell 45100{i} and objective 15950{i}",
+            f"{TS.format(2)} INFO t:MainThread n:root ! [{instance}] Valid stage found: PrivateComputationStageFlow.PID_SHARD",
+            f"{TS.format(3)} INFO t:MainThread n:root ! "
+            + STATUS_UPDATE.format(instance=instance, n=i, status="STARTED"),
+            "ERROR:__main__:unrelated failure",
+            f"{TS.format(4)} ERROR t:MainThread n:__main__ ! [{instance}] Error: type: ...",
+            "plain line",
+            f"{TS.format(5)} INFO t:MainThread n:root ! [{instance}] Valid stage found: PrivateComputationStageFlow.PID_PREPARE",
+            f"{TS.format(6)} INFO t:MainThread n:root ! "
+            + STATUS_UPDATE.format(instance=instance, n=10 + i, status="FAILED"),
+        ]
+    lines += [
+        f"{TS.format(7)} INFO t:MainThread n:root ! Instances to run for cell-obj pairs:",
+        "{",
+        '    "7595610074714724": {',
+        '        "25065264566973790": {',
+        # Lines of a multi-line log which look like other logs are part of it
+        '            "note": "Created instance 1 for cell 2 and objective 3",',
+        '            "instance_id": "7540993020268572",',
+        '            "status": "CREATED"',
+        "        }",
+        "    }",
+        "}",
+        f"{TS.format(8)} INFO t:MainThread n:root ! [7540993020268572] Valid stage found: PrivateComputationStageFlow.PC_PRE_VALIDATION",
+        "last line",
+    ]
+    return lines
+
+
+class TestLogDigest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(__name__)
+        fd, path = tempfile.mkstemp()
+        self.logs_file = Path(path)
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(make_logs()) + "\n")
+
+    def tearDown(self) -> None:
+        os.unlink(self.logs_file)
+
+    def parse_every_line(self) -> str:
+        # Parses the logs line by line, like the analyzer did before it scanned chunks
+        digest = LogDigest(self.logs_file, self.logger)
+        parser_state: Optional[ParsingState] = None
+        line_num = 0
+        with open(self.logs_file) as infile:
+            for log_line in infile:
+                line_num += 1
+                parser_state = digest._parse_one_line(
+                    line_num, log_line.rstrip(), parser_state
+                )
+        digest.run_study.total_line_num = line_num
+        digest._aggregate_summary()
+        # pyre-ignore
+        return digest.run_study.to_json(indent=4)
+
+    def test_analyze_logs(self) -> None:
+        run_study = LogDigest(self.logs_file, self.logger).analyze_logs()
+
+        self.assertEqual(37, run_study.total_line_num)
+        self.assertEqual(make_logs()[0], run_study.first_log)
+        self.assertEqual(4, len(run_study.instances))
+        instance = run_study.instances["754099302026850"]
+        self.assertEqual(
+            ["PID_SHARD", "PID_PREPARE"], [s.stage_id for s in instance.stages]
+        )
+        self.assertEqual(-1, instance.instance_failed_container_count)
+        self.assertEqual(1, instance.instance_error_line_count)
+        self.assertEqual(
+            ["PC_PRE_VALIDATION"],
+            [s.stage_id for s in run_study.instances["7540993020268572"].stages],
+        )
+        self.assertEqual(3, run_study.error_line_count)
+        self.assertEqual(
+            "21: ERROR:__main__:unrelated failure", run_study.error_lines[-1]
+        )
+
+    def test_analyze_logs_in_chunks(self) -> None:
+        expected = self.parse_every_line()
+        for chunk_size, num_processes in ((1, 1), (1, 2), (200, 2), (10**6, None)):
+            with self.subTest(chunk_size=chunk_size, num_processes=num_processes):
+                digest = LogDigest(
+                    self.logs_file, self.logger, num_processes, chunk_size
+                )
+                # pyre-ignore
+                self.assertEqual(expected, digest.analyze_logs().to_json(indent=4))
+
+    def test_analyze_empty_logs(self) -> None:
+        self.logs_file.write_text("")
+        run_study = LogDigest(self.logs_file, self.logger).analyze_logs()
+        self.assertEqual(0, run_study.total_line_num)
+        self.assertEqual({}, run_study.instances)
+
+    def test_analyze_new_logs(self) -> None:
+        logs = self.logs_file.read_text()
+        self.logs_file.write_text("")
+        digest = LogDigest(self.logs_file, self.logger, chunk_size=100)
+
+        delta = digest.analyze_new_logs()
+        self.assertEqual(0, delta.new_line_num)
+
+        # Up to the middle of the 3rd line
+        end = logs.index("PID_SHARD")
+        with open(self.logs_file, "a") as f:
+            f.write(logs[:end])
+        delta = digest.analyze_new_logs()
+        self.assertEqual(2, delta.new_line_num)
+        self.assertEqual(2, delta.total_line_num)
+        self.assertEqual(["754099302026850"], delta.new_instances)
+        self.assertEqual([], delta.new_stages)
+        self.assertEqual(
+            [
+                "i=754099302026850/o=159500/c=451000: failed_container_count=0, last_stages=[]"
+            ],
+            delta.changed_summary_instances,
+        )
+
+        # Up to the middle of the multi-line log
+        start, end = end, logs.index('"instance_id": "7540993020268572"')
+        with open(self.logs_file, "a") as f:
+            f.write(logs[start:end])
+        delta = digest.analyze_new_logs()
+        self.assertEqual(30, delta.total_line_num)
+        self.assertEqual(["754099302026851", "754099302026852"], delta.new_instances)
+        self.assertEqual(6, len(delta.new_stages))
+        self.assertEqual("754099302026850: PID_SHARD", delta.new_stages[0])
+        self.assertEqual(6, len(delta.new_error_lines))
+        self.assertTrue(delta.new_error_lines[0].startswith("5: ERROR:__main__:"))
+        self.assertEqual(3, len(delta.changed_summary_instances))
+        self.assertIsNotNone(digest.parser_state)
+
+        with open(self.logs_file, "a") as f:
+            f.write(logs[end:])
+        delta = digest.analyze_new_logs()
+        self.assertEqual(37, delta.total_line_num)
+        self.assertEqual(["7540993020268572"], delta.new_instances)
+        self.assertEqual(["7540993020268572: PC_PRE_VALIDATION"], delta.new_stages)
+        self.assertEqual([], delta.new_error_lines)
+        self.assertIsNone(digest.parser_state)
+
+        # pyre-ignore
+        self.assertEqual(self.parse_every_line(), digest.run_study.to_json(indent=4))
+        delta = digest.analyze_new_logs()
+        self.assertEqual(0, delta.new_line_num)
+        self.assertEqual([], delta.changed_summary_instances)
+
+    def test_analyze_new_logs_in_any_steps(self) -> None:
+        logs = self.logs_file.read_text()
+        expected = self.parse_every_line()
+        for step in (1, 7, 50, 333):
+            with self.subTest(step=step):
+                self.logs_file.write_text("")
+                digest = LogDigest(self.logs_file, self.logger, chunk_size=100)
+                for start in range(0, len(logs), step):
+                    with open(self.logs_file, "a") as f:
+                        f.write(logs[start : start + step])
+                    digest.analyze_new_logs()
+                # pyre-ignore
+                self.assertEqual(expected, digest.run_study.to_json(indent=4))
+
+    def test_analyze_logs_after_new_logs(self) -> None:
+        logs = self.logs_file.read_text().rstrip("\n")
+        expected = self.parse_every_line()
+        digest = LogDigest(self.logs_file, self.logger)
+        # The last line is incomplete until analyze_logs
+        self.logs_file.write_text(logs)
+        self.assertEqual(36, digest.analyze_new_logs().total_line_num)
+        # pyre-ignore
+        self.assertEqual(expected, digest.analyze_logs().to_json(indent=4))
+
+    def test_analyze_truncated_logs(self) -> None:
+        digest = LogDigest(self.logs_file, self.logger)
+        digest.analyze_new_logs()
+        self.logs_file.write_text("")
+        with self.assertRaises(RuntimeError):
+            digest.analyze_new_logs()
+
+    @patch("fbpcs.infra.logging_service.log_analyzer.log_analyzer.time.sleep")
+    def test_follow_stops_when_interrupted_between_reads(self, mock_sleep) -> None:
+        logs = self.logs_file.read_text()
+        expected = self.parse_every_line()
+        # The last lines are appended while following
+        self.logs_file.write_text(logs[: len(logs) // 2])
+
+        def append_then_interrupt(seconds: float) -> None:
+            if mock_sleep.call_count > 1:
+                raise KeyboardInterrupt
+            self.logs_file.write_text(logs)
+
+        mock_sleep.side_effect = append_then_interrupt
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out = Path(tmp_dir) / "digest.json"
+            log_analyzer_main(
+                [str(self.logs_file), "--follow", "--num_processes=1", f"--out={out}"]
+            )
+            self.assertEqual(expected, out.read_text())
+        self.assertEqual(2, mock_sleep.call_count)
+
+    @patch("fbpcs.infra.logging_service.log_analyzer.log_analyzer.time.sleep")
+    @patch.object(LogDigest, "analyze_new_logs", side_effect=KeyboardInterrupt)
+    def test_follow_does_not_catch_an_interrupt_while_parsing(
+        self, mock_analyze_new_logs, mock_sleep
+    ) -> None:
+        with self.assertRaises(KeyboardInterrupt):
+            log_analyzer_main([str(self.logs_file), "--follow"])
+        mock_sleep.assert_not_called()
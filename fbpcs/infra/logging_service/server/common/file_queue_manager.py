@@ -0,0 +1,185 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import dataclasses
+import json
+import os
+import shutil
+
+from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
+from fbpcs.infra.logging_service.server.common.memory_queue_manager import (
+    DEFAULT_MAX_QUEUE_SIZE,
+    MemoryQueueManager,
+)
+
+# The file is rewritten without the removed entities once there are at least this
+# many of them, and at least as many as the remaining ones
+DEFAULT_COMPACTION_THRESHOLD = 10000
+
+
+# Metadata queue in memory, backed by an append-only file so that the queued
+# entities are uploaded after a restart.
+# Every added entity is appended to the file as a JSON line, and the count of
+# removed entities at the start of the file is kept in a file next to it. The
+# file is emptied when the queue becomes empty, and compacted when the removed
+# entities pile up. After a crash, an entity can be uploaded twice, but an added
+# entity is never lost.
+# At most max_size entities are loaded in memory after a restart. The others stay
+# in the file, and are loaded as the queue is emptied.
+class FileQueueManager(MemoryQueueManager):
+    REMOVED_COUNT_SUFFIX = ".removed"
+    COMPACTION_SUFFIX = ".compact"
+
+    def __init__(
+        self,
+        file_path: str,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        fsync: bool = False,
+        compaction_threshold: int = DEFAULT_COMPACTION_THRESHOLD,
+    ) -> None:
+        super().__init__(max_size)
+        self.file_path = file_path
+        self.removed_count_path: str = file_path + self.REMOVED_COUNT_SUFFIX
+        # Also flush the writes from the OS cache to the disk, which survives a power loss
+        self.fsync = fsync
+        self.compaction_threshold = compaction_threshold
+        self.removed_count = 0
+        # Entities in the file after the ones in the queue, which did not fit in it.
+        # While there are any the queue is full, so no entity is added after them.
+        self.unloaded_count = 0
+        # Offset of the first of them in the file
+        self.unloaded_offset = 0
+        self._load()
+        self.file = open(self.file_path, "a")
+        self.logger.info(
+            f"queue.load: file_path={file_path}, loaded={len(self.queue)}, unloaded={self.unloaded_count}."
+        )
+
+    def close(
+        self,
+    ) -> None:
+        self.file.close()
+
+    def _load(
+        self,
+    ) -> None:
+        if os.path.exists(self.removed_count_path):
+            with open(self.removed_count_path) as f:
+                self.removed_count = int(f.read())
+        if not os.path.exists(self.file_path):
+            return
+
+        with open(self.file_path, "rb+") as f:
+            offset = 0
+            for line_num, line in enumerate(f):
+                if not line.endswith(b"\n"):
+                    # The last entity was being appended during a crash, it was
+                    # never acknowledged
+                    f.truncate(offset)
+                    break
+                if line_num >= self.removed_count:
+                    if len(self.queue) < self.max_size:
+                        self.queue.append(MetadataEntity(**json.loads(line)))
+                    else:
+                        if not self.unloaded_count:
+                            self.unloaded_offset = offset
+                        self.unloaded_count += 1
+                offset += len(line)
+
+    def _load_unloaded(
+        self,
+    ) -> None:
+        """
+        Fills the queue up to max_size with the entities which were not loaded yet
+        """
+        with open(self.file_path, "rb") as f:
+            f.seek(self.unloaded_offset)
+            while self.unloaded_count and len(self.queue) < self.max_size:
+                line = f.readline()
+                self.queue.append(MetadataEntity(**json.loads(line)))
+                self.unloaded_offset += len(line)
+                self.unloaded_count -= 1
+
+    def _append_to_storage(
+        self,
+        entity: MetadataEntity,
+    ) -> None:
+        self.file.write(self._to_line(entity))
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def _remove_from_storage(
+        self,
+        count: int,
+    ) -> None:
+        if self.unloaded_count:
+            self._load_unloaded()
+        if self.queue:
+            self.removed_count += count
+            if self.removed_count >= max(
+                self.compaction_threshold, len(self.queue) + self.unloaded_count
+            ):
+                self._compact()
+            else:
+                self._write_removed_count()
+            return
+
+        # Reset the count before emptying the file: a crash in between uploads
+        # the removed entities again instead of skipping new ones.
+        self.removed_count = 0
+        self._write_removed_count()
+        self.file.truncate(0)
+
+    def _compact(
+        self,
+    ) -> None:
+        """
+        Replaces the file with one holding only the entities which were not removed
+        """
+        temp_path = self.file_path + self.COMPACTION_SUFFIX
+        with open(temp_path, "wb") as f:
+            for entity in self.queue:
+                f.write(self._to_line(entity).encode())
+            unloaded_offset = f.tell()
+            if self.unloaded_count:
+                with open(self.file_path, "rb") as old_file:
+                    old_file.seek(self.unloaded_offset)
+                    shutil.copyfileobj(old_file, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Reset the count before replacing the file: a crash in between uploads
+        # the removed entities again instead of skipping the remaining ones.
+        removed_count = self.removed_count
+        self.removed_count = 0
+        self._write_removed_count()
+        self.file.close()
+        os.replace(temp_path, self.file_path)
+        self.file = open(self.file_path, "a")
+        self.unloaded_offset = unloaded_offset
+        self.logger.info(
+            f"queue.compact: file_path={self.file_path}, removed={removed_count}."
+        )
+
+    def _to_line(
+        self,
+        entity: MetadataEntity,
+    ) -> str:
+        return json.dumps(dataclasses.asdict(entity)) + "\n"
+
+    def _write_removed_count(
+        self,
+    ) -> None:
+        temp_path = self.removed_count_path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(self.removed_count))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.removed_count_path)
@@ -6,7 +6,7 @@
 # pyre-strict
 
 import abc
-from typing import Dict
+from typing import Dict, List
 
 from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
 
@@ -20,6 +20,17 @@ class LoggingClient(abc.ABC):
     ) -> None:
         pass
 
+    def put_metadata_batch(
+        self,
+        entities: List[MetadataEntity],
+    ) -> None:
+        """
+        Puts the entities in order. Clients of a backend which takes a batch of
+        entities in one request override it.
+        """
+        for entity in entities:
+            self.put_metadata(entity)
+
     @abc.abstractmethod
     def get_metadata(
         self,
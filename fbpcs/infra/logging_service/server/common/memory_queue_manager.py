@@ -12,23 +12,36 @@ from typing import List
 from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
 from fbpcs.infra.logging_service.server.common.queue_manager import QueueManager
 
+# add_metadata waits while the queue holds this many entities, until they are uploaded
+DEFAULT_MAX_QUEUE_SIZE = 100000
+
 
 # Metadata queue in memory
 class MemoryQueueManager(QueueManager):
     def __init__(
         self,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
     ) -> None:
         self.logger: logging.Logger = logging.getLogger()
         self.queue: List[MetadataEntity] = []
+        self.max_size = max_size
         self.lock = threading.Lock()
+        # Count of remove_metadata calls, to wake up wait_for_metadata
+        self.remove_count = 0
+        # Notified when entities are added or removed
+        self.changed = threading.Condition(self.lock)
 
     def add_metadata(
         self,
         entity: MetadataEntity,
     ) -> None:
         self.logger.info(f"queue.add_metadata: entity={entity}.")
-        with self.lock:
+        with self.changed:
+            # Backpressure on the producers when the uploads fall behind
+            self.changed.wait_for(lambda: len(self.queue) < self.max_size)
+            self._append_to_storage(entity)
             self.queue.append(entity)
+            self.changed.notify_all()
 
     def peek_metadata(
         self,
@@ -47,5 +60,39 @@ class MemoryQueueManager(QueueManager):
         count: int,
     ) -> None:
         self.logger.info(f"queue.remove_metadata: count={count}.")
-        with self.lock:
+        with self.changed:
             del self.queue[:count]
+            self._remove_from_storage(count)
+            self.remove_count += 1
+            self.changed.notify_all()
+
+    def wait_for_metadata(
+        self,
+        count: int,
+        timeout: float,
+    ) -> bool:
+        with self.changed:
+            remove_count = self.remove_count
+            self.changed.wait_for(
+                lambda: len(self.queue) >= count or self.remove_count != remove_count,
+                timeout,
+            )
+            return len(self.queue) >= count
+
+    def _append_to_storage(
+        self,
+        entity: MetadataEntity,
+    ) -> None:
+        """
+        Called with the lock held before an entity is added, by queues which persist it
+        """
+        pass
+
+    def _remove_from_storage(
+        self,
+        count: int,
+    ) -> None:
+        """
+        Called with the lock held after the first count entities are removed
+        """
+        pass
@@ -5,9 +5,12 @@
 
 # pyre-strict
 
+import collections
 import logging
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, List, Optional, Tuple
 
 from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
 from fbpcs.infra.logging_service.server.common.logging_client import LoggingClient
@@ -15,17 +18,41 @@ from fbpcs.infra.logging_service.server.common.queue_manager import QueueManager
 
 
 # Manager for log metadata, e.g. uploading to backend.
+# The entities are uploaded in batches, with a few batches uploading at the same
+# time. An entity is removed from the queue once it and the entities before it
+# are uploaded, so the queue order is kept and a failed batch is uploaded again.
 class MetadataManager:
-    SLEEP_INTERVAL_SECOND = 1
-    UPLOAD_BATCH_SIZE = 5
+    # Entities in a batch
+    UPLOAD_BATCH_SIZE = 100
+    # A batch is uploaded once full, or after waiting this long for entities
+    MAX_BATCH_DELAY_SECOND = 1.0
+    # Batches uploading at the same time
+    MAX_CONCURRENT_UPLOADS = 4
+    # Wait before uploading a failed batch again
+    RETRY_INTERVAL_SECOND = 1.0
 
     def __init__(
-        self, queue_manager: QueueManager, logging_client: LoggingClient
+        self,
+        queue_manager: QueueManager,
+        logging_client: LoggingClient,
+        upload_batch_size: int = UPLOAD_BATCH_SIZE,
+        max_batch_delay_second: float = MAX_BATCH_DELAY_SECOND,
+        max_concurrent_uploads: int = MAX_CONCURRENT_UPLOADS,
     ) -> None:
         self.logger: logging.Logger = logging.getLogger()
         self.queue_manager = queue_manager
         self.logging_client = logging_client
-        self._start_upload()
+        self.upload_batch_size = upload_batch_size
+        self.max_batch_delay_second = max_batch_delay_second
+        self.max_concurrent_uploads = max_concurrent_uploads
+        self._stopping = threading.Event()
+        # Batches being uploaded, in queue order, with their entity count
+        self._uploads: Deque[Tuple[Future[None], int]] = collections.deque()
+        # Count of entities at the head of the queue in the uploads
+        self._dispatched_count = 0
+        self._upload_failed = False
+        self._uploads_lock = threading.Lock()
+        self._upload_thread: threading.Thread = self._start_upload()
 
     def put_metadata(
         self,
@@ -37,28 +64,118 @@ class MetadataManager:
         queue_entity = MetadataEntity(partner_id, entity_key, entity_value)
         self.queue_manager.add_metadata(queue_entity)
 
+    def stop(
+        self,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Stops uploading once the queued entities are uploaded, or a batch fails
+        to upload. The entities which are not uploaded stay in the queue.
+        Returns whether the upload stopped within the timeout.
+        """
+        self._stopping.set()
+        self._upload_thread.join(timeout)
+        return not self._upload_thread.is_alive()
+
     def _start_upload(
         self,
-    ) -> None:
-        threading.Thread(target=self._process_upload_queue_thread, name=None).start()
+    ) -> threading.Thread:
+        thread = threading.Thread(target=self._process_upload_queue_thread, name=None)
+        thread.start()
+        return thread
 
     def _process_upload_queue_thread(
         self,
     ) -> None:
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent_uploads,
+            thread_name_prefix="metadata_upload",
+        ) as executor:
+            while True:
+                with self._uploads_lock:
+                    if self._upload_failed:
+                        return
+                    running = [f for f, _ in self._uploads if not f.done()]
+                if len(running) >= self.max_concurrent_uploads:
+                    wait(
+                        running,
+                        timeout=self.max_batch_delay_second,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    continue
+
+                stopping = self._stopping.is_set()
+                self._wait_for_batch(0 if stopping else self.max_batch_delay_second)
+                with self._uploads_lock:
+                    # Uploads may have been removed from the queue while waiting
+                    dispatched_count = self._dispatched_count
+                    entities = self.queue_manager.peek_metadata(
+                        dispatched_count + self.upload_batch_size
+                    )[dispatched_count:]
+                    if entities:
+                        future = executor.submit(self._upload_batch, entities)
+                        self._uploads.append((future, len(entities)))
+                        self._dispatched_count += len(entities)
+                    idle = not self._uploads
+
+                if entities:
+                    future.add_done_callback(lambda _: self._remove_uploaded())
+                elif running:
+                    wait(
+                        running,
+                        timeout=self.max_batch_delay_second,
+                        return_when=FIRST_COMPLETED,
+                    )
+                elif stopping and idle:
+                    return
+
+    def _wait_for_batch(
+        self,
+        timeout: float,
+    ) -> None:
+        # Waits until the queue holds a full batch after the dispatched entities
+        deadline = time.monotonic() + timeout
         while True:
-            entities = self.queue_manager.peek_metadata(self.UPLOAD_BATCH_SIZE)
-            if entities:
-                count_put_success = 0
-                for entity in entities:
-                    try:
-                        self.logging_client.put_metadata(entity)
-                        count_put_success += 1
-                    except Exception as ex:
-                        self.logger.error(
-                            f"process_upload_queue: error in logging_client.put_metadata: {str(ex)}."
-                        )
-                        break
+            with self._uploads_lock:
+                batch_end = self._dispatched_count + self.upload_batch_size
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                return
+            # The wait returns early when uploaded entities are removed from
+            # the queue, and the batch end moves
+            if self.queue_manager.wait_for_metadata(batch_end, timeout):
+                return
 
-                self.queue_manager.remove_metadata(count_put_success)
+    def _remove_uploaded(
+        self,
+    ) -> None:
+        # Called when a batch is uploaded, removes the uploaded batches at the
+        # head of the queue
+        with self._uploads_lock:
+            while self._uploads and self._uploads[0][0].done():
+                future, count = self._uploads[0]
+                if future.exception():
+                    # Only when stopping, the entities stay in the queue
+                    self._upload_failed = True
+                    return
+                self._uploads.popleft()
+                self.queue_manager.remove_metadata(count)
+                self._dispatched_count -= count
 
-            time.sleep(self.SLEEP_INTERVAL_SECOND)
+    def _upload_batch(
+        self,
+        entities: List[MetadataEntity],
+    ) -> None:
+        # Putting an entity again overwrites it with the same value, so a failed
+        # batch is uploaded again as a whole
+        while True:
+            try:
+                self.logging_client.put_metadata_batch(entities)
+                return
+            except Exception as ex:
+                self.logger.error(
+                    f"process_upload_queue: error in logging_client.put_metadata_batch: {str(ex)}."
+                )
+                if self._stopping.is_set():
+                    raise
+            time.sleep(self.RETRY_INTERVAL_SECOND)
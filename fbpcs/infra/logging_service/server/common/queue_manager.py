@@ -6,6 +6,7 @@
 # pyre-strict
 
 import abc
+import time
 from typing import List
 
 from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
@@ -33,3 +34,17 @@ class QueueManager(abc.ABC):
         count: int,
     ) -> None:
         pass
+
+    def wait_for_metadata(
+        self,
+        count: int,
+        timeout: float,
+    ) -> bool:
+        """
+        Waits until the queue holds at least count entities, or for timeout seconds.
+        It may return early when entities are removed, as the count is from the
+        head of the queue. Returns whether the queue holds count entities.
+        Queues which can't be waited on sleep for the timeout.
+        """
+        time.sleep(timeout)
+        return False
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Load test of the logging service server uploading metadata to a local backend
+
+Starts the thrift server in this process with a LocalLoggingClient backend,
+where every request sleeps for a fixed latency, and puts metadata from a few
+thrift clients at the same time. Reports the rate of the puts and the time
+until the queue is uploaded. The one entity per request row uploads like the
+server did before it batched.
+
+Usage: python -m fbpcs.infra.logging_service.server.common.test.benchmark_metadata_upload
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import thriftpy2
+from fbpcs.infra.logging_service.server import server
+from fbpcs.infra.logging_service.server.common.file_queue_manager import (
+    FileQueueManager,
+)
+from fbpcs.infra.logging_service.server.common.memory_queue_manager import (
+    MemoryQueueManager,
+)
+from fbpcs.infra.logging_service.server.common.metadata_manager import MetadataManager
+from fbpcs.infra.logging_service.server.common.test.local_logging_client import (
+    LocalLoggingClient,
+)
+from thriftpy2.protocol import TBinaryProtocolFactory
+from thriftpy2.rpc import make_client
+from thriftpy2.server import TThreadedServer
+from thriftpy2.thrift import TProcessor
+from thriftpy2.transport import TBufferedTransportFactory, TServerSocket
+
+LATENCY = 0.02
+PRODUCERS = 8
+PUTS_PER_PRODUCER = 250
+
+THRIFT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(server.__file__)), "thrift/logging_service.thrift"
+)
+logging_service_thrift = thriftpy2.load(
+    THRIFT_PATH, module_name="logging_service_thrift"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def produce(port: int, producer: int) -> None:
+    client = make_client(
+        logging_service_thrift.LoggingService,
+        "127.0.0.1",
+        port,
+        trans_factory=TBufferedTransportFactory(),
+    )
+    for i in range(PUTS_PER_PRODUCER):
+        client.putMetadata(
+            logging_service_thrift.PutMetadataRequest(
+                "partner", f"producer{producer}/key{i}", "value"
+            )
+        )
+    client.close()
+
+
+def run(
+    upload_batch_size: int,
+    max_concurrent_uploads: int,
+    queue_file: Optional[str] = None,
+) -> None:
+    if queue_file:
+        queue_manager: MemoryQueueManager = FileQueueManager(queue_file)
+    else:
+        queue_manager = MemoryQueueManager()
+    logging_client = LocalLoggingClient(LATENCY)
+    metadata_manager = MetadataManager(
+        queue_manager,
+        logging_client,
+        upload_batch_size=upload_batch_size,
+        max_concurrent_uploads=max_concurrent_uploads,
+    )
+    handler = server.LoggingServiceHandler(
+        metadata_manager, logging_client, logging_service_thrift
+    )
+    port = free_port()
+    thrift_server = TThreadedServer(
+        TProcessor(logging_service_thrift.LoggingService, handler),
+        TServerSocket(host="127.0.0.1", port=port),
+        iprot_factory=TBinaryProtocolFactory(),
+        itrans_factory=TBufferedTransportFactory(),
+    )
+    threading.Thread(target=thrift_server.serve, daemon=True).start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    producers = [
+        threading.Thread(target=produce, args=(port, producer))
+        for producer in range(PRODUCERS)
+    ]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    put_elapsed = time.monotonic() - start
+    puts = PRODUCERS * PUTS_PER_PRODUCER
+    while queue_manager.queue or len(logging_client.entities) < puts:
+        time.sleep(0.001)
+    upload_elapsed = time.monotonic() - start
+    metadata_manager.stop()
+    thrift_server.close()
+
+    name = f"batch {upload_batch_size}, {max_concurrent_uploads} in flight"
+    if queue_file:
+        name += ", file"
+    print(
+        f"{name:>28} {puts / put_elapsed:>8.0f} {upload_elapsed:>9.2f} "
+        f"{len(logging_client.batch_sizes):>9}"
+    )
+
+
+def main() -> None:
+    print(f"{'upload':>28} {'puts/s':>8} {'upload s':>9} {'requests':>9}")
+    run(upload_batch_size=1, max_concurrent_uploads=1)
+    run(upload_batch_size=MetadataManager.UPLOAD_BATCH_SIZE, max_concurrent_uploads=1)
+    run(
+        upload_batch_size=MetadataManager.UPLOAD_BATCH_SIZE,
+        max_concurrent_uploads=MetadataManager.MAX_CONCURRENT_UPLOADS,
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run(
+            upload_batch_size=MetadataManager.UPLOAD_BATCH_SIZE,
+            max_concurrent_uploads=MetadataManager.MAX_CONCURRENT_UPLOADS,
+            queue_file=os.path.join(temp_dir, "queue.jsonl"),
+        )
+
+
+if __name__ == "__main__":
+    main()
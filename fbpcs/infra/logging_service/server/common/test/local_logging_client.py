@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
+from fbpcs.infra.logging_service.server.common.logging_client import LoggingClient
+
+
+class LocalLoggingClient(LoggingClient):
+    """In memory stand-in for the backend of the logging service
+
+    Every request sleeps for latency seconds. It counts the requests and how
+    many of them ran at the same time. The first failure_count requests fail.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_count: int = 0) -> None:
+        self.latency = latency
+        self.failure_count = failure_count
+        self.entities: Dict[Tuple[str, str], str] = {}
+        # Entity keys in the order they were put, including the ones put again
+        self.put_keys: List[str] = []
+        self.batch_sizes: List[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def put_metadata(self, entity: MetadataEntity) -> None:
+        self.put_metadata_batch([entity])
+
+    def put_metadata_batch(self, entities: List[MetadataEntity]) -> None:
+        self._request()
+        with self._lock:
+            self.batch_sizes.append(len(entities))
+            for entity in entities:
+                self.entities[
+                    (entity.partner_id, entity.entity_key)
+                ] = entity.entity_value
+                self.put_keys.append(entity.entity_key)
+
+    def get_metadata(self, partner_id: str, entity_key: str) -> str:
+        self._request()
+        return self.entities.get((partner_id, entity_key), "")
+
+    def list_metadata(
+        self,
+        partner_id: str,
+        entity_key_start: str,
+        entity_key_end: str,
+        result_limit: int,
+    ) -> Dict[str, str]:
+        self._request()
+        keys = sorted(
+            key
+            for partner, key in self.entities
+            if partner == partner_id and entity_key_start <= key < entity_key_end
+        )
+        return {key: self.entities[(partner_id, key)] for key in keys[:result_limit]}
+
+    def _request(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failed = self.failure_count > 0
+            self.failure_count -= failed
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        if failed:
+            raise RuntimeError("backend unavailable")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Callable
+from unittest.mock import patch
+
+from fbpcs.infra.logging_service.server.common.data_model import MetadataEntity
+from fbpcs.infra.logging_service.server.common.file_queue_manager import (
+    FileQueueManager,
+)
+from fbpcs.infra.logging_service.server.common.memory_queue_manager import (
+    MemoryQueueManager,
+)
+from fbpcs.infra.logging_service.server.common.metadata_manager import MetadataManager
+from fbpcs.infra.logging_service.server.common.test.local_logging_client import (
+    LocalLoggingClient,
+)
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def make_entity(i: int) -> MetadataEntity:
+    return MetadataEntity("partner", f"key{i:03}", f"value{i}")
+
+
+class TestMetadataManager(unittest.TestCase):
+    def setUp(self) -> None:
+        self.queue_manager = MemoryQueueManager()
+
+    def test_upload_full_batches(self) -> None:
+        client = LocalLoggingClient()
+        manager = MetadataManager(
+            self.queue_manager, client, upload_batch_size=10, max_batch_delay_second=1
+        )
+        for i in range(30):
+            manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+
+        self.assertTrue(manager.stop(timeout=5))
+        self.assertEqual([10, 10, 10], client.batch_sizes)
+        self.assertEqual(
+            {("partner", f"key{i:03}"): f"value{i}" for i in range(30)},
+            client.entities,
+        )
+        self.assertEqual([], self.queue_manager.queue)
+
+    def test_upload_partial_batch_after_delay(self) -> None:
+        client = LocalLoggingClient()
+        manager = MetadataManager(
+            self.queue_manager,
+            client,
+            upload_batch_size=100,
+            max_batch_delay_second=0.05,
+        )
+        for i in range(3):
+            manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+
+        self.assertTrue(wait_until(lambda: not self.queue_manager.queue))
+        self.assertEqual([3], client.batch_sizes)
+        self.assertTrue(manager.stop(timeout=5))
+
+    def test_concurrent_uploads(self) -> None:
+        client = LocalLoggingClient(latency=0.05)
+        manager = MetadataManager(
+            self.queue_manager,
+            client,
+            upload_batch_size=1,
+            max_batch_delay_second=0.01,
+            max_concurrent_uploads=4,
+        )
+        for i in range(12):
+            manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+
+        self.assertTrue(manager.stop(timeout=5))
+        self.assertEqual(4, client.max_in_flight)
+        self.assertEqual(12, len(client.entities))
+        self.assertEqual([], self.queue_manager.queue)
+
+    def test_entities_removed_in_queue_order(self) -> None:
+        client = LocalLoggingClient()
+        first_batch_uploaded = threading.Event()
+        put_metadata_batch = client.put_metadata_batch
+
+        def put_first_batch_last(entities: list) -> None:
+            if entities[0].entity_key == "key000":
+                first_batch_uploaded.wait()
+            put_metadata_batch(entities)
+
+        manager = MetadataManager(
+            self.queue_manager,
+            client,
+            upload_batch_size=2,
+            max_batch_delay_second=0.01,
+        )
+        with patch.object(client, "put_metadata_batch", put_first_batch_last):
+            for i in range(6):
+                manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+            self.assertTrue(wait_until(lambda: len(client.put_keys) == 4))
+            # The later batches are uploaded, but wait in the queue for the first one
+            self.assertEqual(6, len(self.queue_manager.queue))
+
+            first_batch_uploaded.set()
+            self.assertTrue(manager.stop(timeout=5))
+        self.assertEqual([], self.queue_manager.queue)
+
+    @patch.object(MetadataManager, "RETRY_INTERVAL_SECOND", 0.01)
+    def test_failed_batch_uploaded_again(self) -> None:
+        client = LocalLoggingClient(failure_count=2)
+        manager = MetadataManager(
+            self.queue_manager, client, upload_batch_size=5, max_batch_delay_second=0.01
+        )
+        for i in range(5):
+            manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+
+        self.assertTrue(wait_until(lambda: not self.queue_manager.queue))
+        self.assertTrue(manager.stop(timeout=5))
+        self.assertEqual([5], client.batch_sizes)
+        self.assertEqual(5, len(client.entities))
+
+    @patch.object(MetadataManager, "RETRY_INTERVAL_SECOND", 0.01)
+    def test_stop_keeps_entities_not_uploaded(self) -> None:
+        client = LocalLoggingClient(failure_count=1000000)
+        manager = MetadataManager(
+            self.queue_manager, client, upload_batch_size=2, max_batch_delay_second=0.01
+        )
+        for i in range(5):
+            manager.put_metadata("partner", f"key{i:03}", f"value{i}")
+
+        self.assertTrue(manager.stop(timeout=5))
+        self.assertEqual({}, client.entities)
+        self.assertEqual([make_entity(i) for i in range(5)], self.queue_manager.queue)
+
+
+class TestMemoryQueueManager(unittest.TestCase):
+    def test_add_waits_while_full(self) -> None:
+        queue_manager = MemoryQueueManager(max_size=2)
+        queue_manager.add_metadata(make_entity(0))
+        queue_manager.add_metadata(make_entity(1))
+
+        producer = threading.Thread(
+            target=queue_manager.add_metadata, args=(make_entity(2),)
+        )
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+
+        queue_manager.remove_metadata(1)
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([make_entity(1), make_entity(2)], queue_manager.queue)
+
+    def test_wait_for_metadata(self) -> None:
+        queue_manager = MemoryQueueManager()
+        start = time.monotonic()
+        self.assertFalse(queue_manager.wait_for_metadata(1, 0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        threading.Timer(0.01, queue_manager.add_metadata, (make_entity(0),)).start()
+        self.assertTrue(queue_manager.wait_for_metadata(1, 5))
+        self.assertEqual([make_entity(0)], queue_manager.peek_metadata(10))
+
+
+class TestFileQueueManager(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "queue.jsonl")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_reload_queue(self) -> None:
+        queue_manager = FileQueueManager(self.file_path)
+        for i in range(5):
+            queue_manager.add_metadata(make_entity(i))
+        queue_manager.remove_metadata(2)
+        queue_manager.close()
+
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(i) for i in range(2, 5)], queue_manager.queue)
+        queue_manager.add_metadata(make_entity(5))
+        queue_manager.remove_metadata(1)
+        queue_manager.close()
+
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(i) for i in range(3, 6)], queue_manager.queue)
+        queue_manager.close()
+
+    def test_file_emptied_with_queue(self) -> None:
+        queue_manager = FileQueueManager(self.file_path, fsync=True)
+        for i in range(3):
+            queue_manager.add_metadata(make_entity(i))
+        queue_manager.remove_metadata(3)
+        queue_manager.add_metadata(make_entity(3))
+        queue_manager.close()
+
+        with open(self.file_path) as f:
+            self.assertEqual(1, len(f.readlines()))
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(3)], queue_manager.queue)
+        queue_manager.close()
+
+    def test_torn_last_line_dropped(self) -> None:
+        queue_manager = FileQueueManager(self.file_path)
+        queue_manager.add_metadata(make_entity(0))
+        queue_manager.close()
+        with open(self.file_path, "a") as f:
+            f.write('{"partner_id": "part')
+
+        queue_manager = FileQueueManager(self.file_path)
+        queue_manager.add_metadata(make_entity(1))
+        queue_manager.close()
+
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(0), make_entity(1)], queue_manager.queue)
+        queue_manager.close()
+
+    def test_file_compacted(self) -> None:
+        queue_manager = FileQueueManager(self.file_path, compaction_threshold=3)
+        for i in range(10):
+            queue_manager.add_metadata(make_entity(i))
+        queue_manager.remove_metadata(2)
+        with open(self.file_path) as f:
+            self.assertEqual(10, len(f.readlines()))
+        # As many removed entities as remaining ones
+        queue_manager.remove_metadata(3)
+        queue_manager.add_metadata(make_entity(10))
+        queue_manager.close()
+
+        with open(self.file_path) as f:
+            self.assertEqual(6, len(f.readlines()))
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(i) for i in range(5, 11)], queue_manager.queue)
+        queue_manager.close()
+
+    def test_load_at_most_max_size(self) -> None:
+        queue_manager = FileQueueManager(self.file_path)
+        for i in range(10):
+            queue_manager.add_metadata(make_entity(i))
+        queue_manager.remove_metadata(1)
+        queue_manager.close()
+
+        queue_manager = FileQueueManager(
+            self.file_path, max_size=3, compaction_threshold=1
+        )
+        self.assertEqual([make_entity(i) for i in range(1, 4)], queue_manager.queue)
+        queue_manager.remove_metadata(2)
+        self.assertEqual([make_entity(i) for i in range(3, 6)], queue_manager.queue)
+        # Compacted with entities which are not loaded yet
+        queue_manager.remove_metadata(2)
+        with open(self.file_path) as f:
+            self.assertEqual(5, len(f.readlines()))
+        removed = []
+        while queue_manager.queue:
+            removed.append(queue_manager.queue[0])
+            queue_manager.remove_metadata(1)
+        self.assertEqual([make_entity(i) for i in range(5, 10)], removed)
+        queue_manager.add_metadata(make_entity(10))
+        queue_manager.close()
+
+        queue_manager = FileQueueManager(self.file_path)
+        self.assertEqual([make_entity(10)], queue_manager.queue)
+        queue_manager.close()
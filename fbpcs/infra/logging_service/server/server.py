@@ -15,6 +15,7 @@ Usage:
 Options:
     --ipv6                  Server socket listens at IPv6/INET6 family instead of IPv4/INET family
     --port=<port>           Port number to listen at. [default: 9090]
+    --queue_file=<path>     Keep the metadata queue in this append-only file, so that it is uploaded after a restart
     -h --help               Show this help
 """
 
@@ -26,6 +27,9 @@ from types import ModuleType
 import schema
 import thriftpy2
 from docopt import docopt
+from fbpcs.infra.logging_service.server.common.file_queue_manager import (
+    FileQueueManager,
+)
 from fbpcs.infra.logging_service.server.common.logging_client import LoggingClient
 from fbpcs.infra.logging_service.server.common.memory_queue_manager import (
     MemoryQueueManager,
@@ -34,6 +38,7 @@ from fbpcs.infra.logging_service.server.common.meta_logging_client import (
     MetaLoggingClient,
 )
 from fbpcs.infra.logging_service.server.common.metadata_manager import MetadataManager
+from fbpcs.infra.logging_service.server.common.queue_manager import QueueManager
 from fbpcs.infra.logging_service.server.common.utils import Utils
 from thriftpy2.protocol import TBinaryProtocolFactory
 from thriftpy2.server import TThreadedServer
@@ -109,6 +114,7 @@ def main() -> None:
         {
             "--ipv6": bool,
             "--port": schema.Use(int),
+            "--queue_file": schema.Or(None, str),
             "--help": bool,
         }
     )
@@ -134,7 +140,11 @@ def main() -> None:
 
     server_port = arguments["--port"]
 
-    queue_manager = MemoryQueueManager()
+    queue_file = arguments["--queue_file"]
+    if queue_file:
+        queue_manager: QueueManager = FileQueueManager(queue_file)
+    else:
+        queue_manager = MemoryQueueManager()
     logging_client = MetaLoggingClient()
     metadata_manager = MetadataManager(queue_manager, logging_client)
     handler = LoggingServiceHandler(
@@ -157,7 +167,10 @@ def main() -> None:
     logger.info(
         f"Logging service server listens host={any_host_interface}[{socket_family_name}], port={server_port}."
     )
-    server.serve()
+    try:
+        server.serve()
+    finally:
+        metadata_manager.stop()
     logger.info("done.")
 
 
@@ -5,6 +5,7 @@
 
 # pyre-strict
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 from fbpcp.error.pcp import PcpError
@@ -19,6 +20,7 @@ from fbpcs.pc_pre_validation.binary_path import (
     S3BinaryPath,
 )
 from fbpcs.pc_pre_validation.constants import (
+    BINARY_FILE_VALIDATOR_MAX_CONCURRENCY,
     BINARY_FILE_VALIDATOR_NAME,
     BINARY_INFOS,
     DEFAULT_BINARY_VERSION,
@@ -28,6 +30,7 @@ from fbpcs.pc_pre_validation.constants import (
 from fbpcs.pc_pre_validation.enums import ValidationResult
 from fbpcs.pc_pre_validation.validation_report import ValidationReport
 from fbpcs.pc_pre_validation.validator import Validator
+from fbpcs.pc_pre_validation.verified_binary_cache import VerifiedBinaryCache
 
 
 class BinaryFileValidator(Validator):
@@ -38,8 +41,13 @@ class BinaryFileValidator(Validator):
         binary_version: Optional[str] = None,
         access_key_id: Optional[str] = None,
         access_key_data: Optional[str] = None,
+        verified_binary_cache: Optional[VerifiedBinaryCache] = None,
+        max_concurrency: int = BINARY_FILE_VALIDATOR_MAX_CONCURRENCY,
     ) -> None:
         self._storage_service = S3StorageService(region, access_key_id, access_key_data)
+        self._access_key_id = access_key_id
+        self._verified_binary_cache = verified_binary_cache
+        self._max_concurrency = max_concurrency
         self._name: str = BINARY_FILE_VALIDATOR_NAME
         self._binary_infos = binary_infos
         self._binary_version: str = binary_version or DEFAULT_BINARY_VERSION
@@ -92,29 +100,60 @@ class BinaryFileValidator(Validator):
         return details
 
     def _validate_s3_binaries(self) -> Dict[str, str]:
-        """Validate the existence of s3 binaries
+        """Validate the existence of s3 binaries, checking up to max_concurrency of them at a time
 
         Returns:
             A dictionary, representing the names of inaccessible binaries and the error reasons.
         """
-        details: Dict[str, str] = {}
+        s3_binary_paths = [
+            S3BinaryPath(self._repo_path, binary_info, self._binary_version)
+            for binary_info in self._binary_infos
+        ]
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            # map yields in order, so an unexpected error is raised for the
+            # first binary that had one
+            errors = list(executor.map(self._check_s3_binary, s3_binary_paths))
+
+        return {
+            str(s3_binary_path): error
+            for s3_binary_path, error in zip(s3_binary_paths, errors)
+            if error is not None
+        }
+
+    def _check_s3_binary(self, s3_binary_path: S3BinaryPath) -> Optional[str]:
+        """Check the existence of one s3 binary, skipping it if it was verified recently
 
-        for binary_info in self._binary_infos:
-            s3_binary_path: str = str(
-                S3BinaryPath(self._repo_path, binary_info, self._binary_version)
-            )
-            try:
-                if not self._storage_service.file_exists(s3_binary_path):
-                    details[s3_binary_path] = "binary does not exist"
-            except PcpError as pcp_error:
-                # s3 throws the following error when an access is denied,
-                #    An error occurred (403) when calling the HeadObject operation: Forbidden
-                if "Forbidden" in str(pcp_error):
-                    details[s3_binary_path] = str(pcp_error)
-                else:
-                    # rethrow unexpected error so validation runner will skip this validation with a WARNING message
-                    raise pcp_error
-        return details
+        Returns:
+            None if the binary can be accessed, the error reason otherwise.
+        """
+        cache = self._verified_binary_cache
+        cache_key = (
+            s3_binary_path.repo_path,
+            s3_binary_path.version,
+            f"{s3_binary_path.package}/{s3_binary_path.binary}",
+            self._access_key_id,
+        )
+        if cache and cache.is_verified(*cache_key):
+            return None
+        if self.is_cancelled:
+            # the report of a cancelled validation is not used
+            return None
+
+        try:
+            if not self._storage_service.file_exists(str(s3_binary_path)):
+                return "binary does not exist"
+        except PcpError as pcp_error:
+            # s3 throws the following error when an access is denied,
+            #    An error occurred (403) when calling the HeadObject operation: Forbidden
+            if "Forbidden" in str(pcp_error):
+                return str(pcp_error)
+            else:
+                # rethrow unexpected error so validation runner will skip this validation with a WARNING message
+                raise pcp_error
+
+        if cache:
+            cache.add_verified(*cache_key)
+        return None
 
     def _format_validation_report(self, details: Dict[str, str]) -> ValidationReport:
         """Create a validation report.
@@ -7,16 +7,20 @@
 
 
 import re
-from typing import Dict, List, Pattern
+from typing import Dict, FrozenSet, List, Pattern
 
 from fbpcs.pc_pre_validation.binary_path import BinaryInfo
+from fbpcs.private_computation.entity.pcs_tier import PCSTier
 
 INPUT_DATA_VALIDATOR_NAME = "Input Data Validator"
 BINARY_FILE_VALIDATOR_NAME = "Binary File Validator"
 
-INPUT_DATA_TMP_FILE_PATH = "/tmp"
-# 3GB
-INPUT_DATA_MAX_FILE_SIZE_IN_BYTES: int = 3 * 1024 * 1024 * 1024
+# time budget of each validator. PCPreValidationStageService stops the
+# container after 20 minutes, this leaves time to print the report.
+VALIDATOR_TIMEOUT_IN_SECONDS: float = 18 * 60
+
+# size of the ranged reads of the input file, each chunk is validated by a worker
+INPUT_DATA_CHUNK_SIZE_IN_BYTES: int = 32 * 1024 * 1024
 
 ID_FIELD_PREFIX = "id_"
 CONVERSION_VALUE_FIELD = "conversion_value"
@@ -85,3 +89,13 @@ BINARY_INFOS: List[BinaryInfo] = [
     BinaryInfo("private_lift/lift"),
 ]
 ONEDOCKER_EXE_PATH = "ONEDOCKER_EXE_PATH"
+# at most this many binaries are checked at the same time
+BINARY_FILE_VALIDATOR_MAX_CONCURRENCY = 8
+# folder of the verified binary cache, which should outlive the container, e.g.
+# a mounted volume. The binaries are checked every time when it is not set.
+BINARY_FILE_VALIDATOR_CACHE_DIR_ENV = "PC_PRE_VALIDATION_BINARY_CACHE_DIR"
+# the tags of the tiers move to new binaries, so they are never cached
+BINARY_FILE_VALIDATOR_UNCACHED_VERSIONS: FrozenSet[str] = frozenset(
+    tier.value for tier in PCSTier if tier is not PCSTier.UNKNOWN
+)
+BINARY_FILE_VALIDATOR_CACHE_TTL_IN_SECONDS: float = 60 * 60
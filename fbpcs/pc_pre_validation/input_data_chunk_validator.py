@@ -0,0 +1,171 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+
+"""
+Validates line aligned chunks of an input data file.
+
+The functions in this module only take and return picklable values, so that the
+chunks of a large file can be validated in worker processes.
+
+Most rows of an input file are valid. Each line is first matched against a
+single pattern combining the validation regexes of all of the columns. Only the
+lines that do not match it are split into fields and counted one by one, with
+the same rules as a csv.DictReader over the header and the line.
+"""
+
+import collections
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Counter, Optional, Pattern, Sequence, Tuple
+
+from fbpcs.pc_pre_validation.constants import (
+    ID_FIELD_PREFIX,
+    VALID_LINE_ENDING_REGEX,
+    VALIDATION_REGEXES,
+)
+
+# a value with at least one character that is not whitespace
+NON_EMPTY_VALUE_PATTERN = r'[^,"\r\x00]*[^\s,"\x00][^,"\r\x00]*'
+# characters that need the csv module to split a line into fields
+CSV_SPECIAL_CHARACTERS: Tuple[str, ...] = ('"', "\r", "\x00")
+
+
+@dataclass(frozen=True)
+class InputDataHeader:
+    field_names: Tuple[str, ...]
+    # the (field, column index) pairs of a csv.DictReader row. When a field
+    # name is repeated, the last column wins.
+    columns: Tuple[Tuple[str, int], ...]
+    # matches the lines that have no validation issue, None to check every line
+    row_pattern: Optional[Pattern[str]]
+
+    @classmethod
+    def from_header_line(cls, header_line: str) -> "InputDataHeader":
+        field_names = next(csv.reader(io.StringIO(header_line, newline=None)), [])
+        columns = {name: index for index, name in enumerate(field_names)}
+        return cls(
+            field_names=tuple(field_names),
+            columns=tuple(columns.items()),
+            row_pattern=_build_row_pattern(field_names),
+        )
+
+    @property
+    def header_row(self) -> str:
+        return ",".join(self.field_names)
+
+
+@dataclass
+class InputDataChunkResult:
+    rows_processed_count: int = 0
+    empty_counter: Counter[str] = field(default_factory=collections.Counter)
+    format_error_counter: Counter[str] = field(default_factory=collections.Counter)
+    # set when a line has an unsupported line ending. rows_processed_count is
+    # then the number of rows before that line.
+    has_invalid_line_ending: bool = False
+
+
+def validate_input_data_chunk(
+    chunk: bytes, header: InputDataHeader
+) -> InputDataChunkResult:
+    """Counts the validation issues of the rows in a chunk
+
+    Args:
+        - chunk: complete lines of the file, only the last chunk of a file may
+            not end with a new line
+        - header: the header of the file
+
+    Returns:
+        The number of rows in the chunk and their validation issues
+    """
+    result = InputDataChunkResult()
+    lines = chunk.decode("utf-8").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+
+    row_pattern = header.row_pattern
+    if row_pattern is None:
+        unmatched_indexes = range(len(lines))
+    else:
+        row_match = row_pattern.match
+        unmatched_indexes = [
+            index for index, line in enumerate(lines) if not row_match(line)
+        ]
+
+    for index in unmatched_indexes:
+        line = lines[index]
+        if not VALID_LINE_ENDING_REGEX.match(line):
+            result.rows_processed_count = index
+            result.has_invalid_line_ending = True
+            return result
+        _count_row_issues(result, header, line)
+    result.rows_processed_count = len(lines)
+    return result
+
+
+def _count_row_issues(
+    result: InputDataChunkResult, header: InputDataHeader, line: str
+) -> None:
+    if any(c in line for c in CSV_SPECIAL_CHARACTERS) or line.count(",") + 1 != len(
+        header.field_names
+    ):
+        for row in csv.DictReader([header.header_row, line]):
+            for field_name, value in row.items():
+                _count_field_issues(result, field_name, value)
+        return
+
+    values = line.split(",")
+    for field_name, index in header.columns:
+        _count_field_issues(result, field_name, values[index])
+
+
+def _count_field_issues(
+    result: InputDataChunkResult, field_name: str, value: str
+) -> None:
+    if field_name.startswith(ID_FIELD_PREFIX):
+        field_name = ID_FIELD_PREFIX
+
+    if value.strip() == "":
+        result.empty_counter[field_name] += 1
+    elif field_name in VALIDATION_REGEXES and not VALIDATION_REGEXES[field_name].match(
+        value
+    ):
+        result.format_error_counter[field_name] += 1
+
+
+def _build_row_pattern(field_names: Sequence[str]) -> Optional[Pattern[str]]:
+    """Builds a pattern matching the lines where every field is valid
+
+    Returns None if the header can't be checked with a single pattern.
+    """
+    if not field_names:
+        return None
+
+    column_patterns = []
+    for field_name in field_names:
+        if any(c in field_name for c in (",", "\n") + CSV_SPECIAL_CHARACTERS):
+            return None
+        if field_name.startswith(ID_FIELD_PREFIX):
+            field_name = ID_FIELD_PREFIX
+        regex = VALIDATION_REGEXES.get(field_name)
+        if regex is None:
+            column_patterns.append(NON_EMPTY_VALUE_PATTERN)
+            continue
+        pattern = regex.pattern
+        if not (pattern.startswith("^") and pattern.endswith("$")):
+            return None
+        # the value must also match NON_EMPTY_VALUE_PATTERN, which keeps the
+        # column from spanning a comma
+        column_patterns.append(
+            rf"(?=(?:{NON_EMPTY_VALUE_PATTERN})(?:,|\Z))(?:{pattern[1:-1]})"
+        )
+
+    # the last value must end with a character that is not whitespace, like
+    # VALID_LINE_ENDING_REGEX checks
+    return re.compile(",".join(column_patterns) + r"(?<!\s)\Z")
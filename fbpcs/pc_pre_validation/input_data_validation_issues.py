@@ -49,11 +49,11 @@ class InputDataValidationIssues:
 
         return warnings
 
-    def count_empty_field(self, field: str) -> None:
-        self.empty_counter[field] += 1
+    def count_empty_field(self, field: str, count: int = 1) -> None:
+        self.empty_counter[field] += count
 
-    def count_format_error_field(self, field: str) -> None:
-        self.format_error_counter[field] += 1
+    def count_format_error_field(self, field: str, count: int = 1) -> None:
+        self.format_error_counter[field] += count
 
     def set_max_issue_count_til_error(
         self, max_issue_count_til_error: Dict[str, Dict[str, int]]
@@ -10,37 +10,47 @@
 This is the main class that runs the input data validations.
 
 This class handles the overall logic to:
-* Copy the file to local storage
-* Run the validations
+* Stream the file from storage with ranged reads
+* Run the validations on line aligned chunks, in worker processes for large files
 * Generate a validation report
 
 Error handling:
 * If an unhandled error occurs, it will be returned in the report
 """
 
-import csv
-import time
-from typing import Optional, Sequence
+import functools
+import itertools
+from contextlib import closing
+from typing import Iterator, Optional, Sequence
 
 from fbpcp.service.storage_s3 import S3StorageService
+from fbpcp.util.s3path import S3Path
 from fbpcs.pc_pre_validation.constants import (
     ID_FIELD_PREFIX,
-    INPUT_DATA_MAX_FILE_SIZE_IN_BYTES,
-    INPUT_DATA_TMP_FILE_PATH,
+    INPUT_DATA_CHUNK_SIZE_IN_BYTES,
     INPUT_DATA_VALIDATOR_NAME,
     PA_FIELDS,
     PL_FIELDS,
     VALID_LINE_ENDING_REGEX,
-    VALIDATION_REGEXES,
 )
 from fbpcs.pc_pre_validation.enums import ValidationResult
 from fbpcs.pc_pre_validation.exceptions import InputDataValidationException
+from fbpcs.pc_pre_validation.input_data_chunk_validator import (
+    InputDataHeader,
+    validate_input_data_chunk,
+)
 from fbpcs.pc_pre_validation.input_data_validation_issues import (
     InputDataValidationIssues,
 )
 from fbpcs.pc_pre_validation.validation_report import ValidationReport
 from fbpcs.pc_pre_validation.validator import Validator
 from fbpcs.private_computation.entity.cloud_provider import CloudProvider
+from fbpcs.utils.buffered_s3_file_handler import get_s3_client
+from fbpcs.utils.process_map import ordered_process_map
+
+UNSUPPORTED_LINE_ENDING_MESSAGE = (
+    "Detected an unexpected line ending. The only supported line ending is '\\n'"
+)
 
 
 class InputDataValidator(Validator):
@@ -55,7 +65,6 @@ class InputDataValidator(Validator):
         end_timestamp: Optional[str] = None,
     ) -> None:
         self._input_file_path = input_file_path
-        self._local_file_path: str = self._get_local_filepath()
         self._cloud_provider = cloud_provider
         self._storage_service = S3StorageService(region, access_key_id, access_key_data)
         self._name: str = INPUT_DATA_VALIDATOR_NAME
@@ -65,53 +74,45 @@ class InputDataValidator(Validator):
     def name(self) -> str:
         return self._name
 
-    def _get_local_filepath(self) -> str:
-        now = time.time()
-        filename = self._input_file_path.split("/")[-1]
-        return f"{INPUT_DATA_TMP_FILE_PATH}/{filename}-{now}"
-
     def __validate__(self) -> ValidationReport:
         rows_processed_count = 0
         validation_issues = InputDataValidationIssues()
 
         try:
             file_size = self._get_file_size()
-            if file_size > INPUT_DATA_MAX_FILE_SIZE_IN_BYTES:
-                max_size_mb = int(INPUT_DATA_MAX_FILE_SIZE_IN_BYTES / (1024 * 1024))
-                warning_message = " ".join(
-                    [
-                        f"WARNING: File: {self._input_file_path} is too large to download.",
-                        f"The maximum file size is {max_size_mb} MB.",
-                        "Skipped input_data validation.",
-                    ]
+            chunks = self._read_input_file_chunks(file_size)
+
+            first_chunk = next(chunks, b"")
+            header_end = first_chunk.find(b"\n") + 1 or len(first_chunk)
+            header_line = first_chunk[:header_end].decode("utf-8")
+            header = InputDataHeader.from_header_line(header_line)
+            self._set_num_id_columns(header.field_names)
+            self._validate_header(header.field_names)
+            self._validate_line_ending(header_line)
+
+            # the chunks are validated in worker processes, and a few of them
+            # are read ahead
+            data_chunks = itertools.chain([first_chunk[header_end:]], chunks)
+            validate_chunk = functools.partial(validate_input_data_chunk, header=header)
+            with closing(
+                ordered_process_map(
+                    validate_chunk, (chunk for chunk in data_chunks if chunk)
                 )
-                return self._format_validation_report(
-                    warning_message,
-                    rows_processed_count,
-                    validation_issues,
-                )
-
-            self._download_input_file()
-            header_row = ""
-            with open(self._local_file_path) as local_file:
-                csv_reader = csv.DictReader(local_file)
-                field_names = csv_reader.fieldnames or []
-                header_row = ",".join(field_names)
-                self._set_num_id_columns(field_names)
-                self._validate_header(field_names)
-
-            with open(self._local_file_path, "rb") as local_file:
-                header_line = local_file.readline().decode("utf-8")
-                self._validate_line_ending(header_line)
-
-                while raw_line := local_file.readline():
-                    line = raw_line.decode("utf-8")
-                    self._validate_line_ending(line)
-                    csv_row_reader = csv.DictReader([header_row, line])
-                    for row in csv_row_reader:
-                        for field, value in row.items():
-                            self._validate_row(validation_issues, field, value)
-                    rows_processed_count += 1
+            ) as results:
+                for _, result in results:
+                    if self.is_cancelled:
+                        # closing the results stops reading the file and
+                        # cancels the chunks that weren't validated yet
+                        raise InputDataValidationException("Validation was cancelled")
+                    rows_processed_count += result.rows_processed_count
+                    if result.has_invalid_line_ending:
+                        raise InputDataValidationException(
+                            UNSUPPORTED_LINE_ENDING_MESSAGE
+                        )
+                    for field, count in result.empty_counter.items():
+                        validation_issues.count_empty_field(field, count)
+                    for field, count in result.format_error_counter.items():
+                        validation_issues.count_format_error_field(field, count)
 
         except InputDataValidationException as e:
             return self._format_validation_report(
@@ -151,14 +152,33 @@ class InputDataValidator(Validator):
                 f"Failed to get the input file size. Please check the file path and its permission.\n\t{e}"
             )
 
-    def _download_input_file(self) -> None:
+    def _read_input_file_range(self, start: int, end: int) -> bytes:
         try:
-            self._storage_service.copy(self._input_file_path, self._local_file_path)
+            s3_path = S3Path(self._input_file_path)
+            response = get_s3_client(self._storage_service).get_object(
+                Bucket=s3_path.bucket, Key=s3_path.key, Range=f"bytes={start}-{end}"
+            )
+            return response["Body"].read()
         except Exception as e:
             raise InputDataValidationException(
                 f"Failed to download the input file. Please check the file path and its permission.\n\t{e}"
             )
 
+    def _read_input_file_chunks(self, file_size: int) -> Iterator[bytes]:
+        """Reads the file in ranges and yields them cut at the last new line"""
+        remainder = b""
+        for start in range(0, file_size, INPUT_DATA_CHUNK_SIZE_IN_BYTES):
+            if self.is_cancelled:
+                return
+            end = min(start + INPUT_DATA_CHUNK_SIZE_IN_BYTES, file_size) - 1
+            data = remainder + self._read_input_file_range(start, end)
+            cut = data.rfind(b"\n") + 1
+            if cut:
+                yield data[:cut]
+            remainder = data[cut:]
+        if remainder:
+            yield remainder
+
     def _validate_header(self, header_row: Sequence[str]) -> None:
         if not header_row:
             raise InputDataValidationException("The header row was empty.")
@@ -184,20 +204,7 @@ class InputDataValidator(Validator):
 
     def _validate_line_ending(self, line: str) -> None:
         if not VALID_LINE_ENDING_REGEX.match(line):
-            raise InputDataValidationException(
-                "Detected an unexpected line ending. The only supported line ending is '\\n'"
-            )
-
-    def _validate_row(
-        self, validation_issues: InputDataValidationIssues, field: str, value: str
-    ) -> None:
-        if field.startswith(ID_FIELD_PREFIX):
-            field = ID_FIELD_PREFIX
-
-        if value.strip() == "":
-            validation_issues.count_empty_field(field)
-        elif field in VALIDATION_REGEXES and not VALIDATION_REGEXES[field].match(value):
-            validation_issues.count_format_error_field(field)
+            raise InputDataValidationException(UNSUPPORTED_LINE_ENDING_MESSAGE)
 
     def _format_validation_report(
         self,
@@ -21,6 +21,7 @@ Usage:
         [--start-timestamp=<start-timestamp>]
         [--end-timestamp=<end-timestamp>]
         [--binary-version=<binary-version>]
+        [--fail-fast]
 """
 
 
@@ -32,6 +33,7 @@ from fbpcs.pc_pre_validation.enums import ValidationResult
 from fbpcs.pc_pre_validation.input_data_validator import InputDataValidator
 from fbpcs.pc_pre_validation.validator import Validator
 from fbpcs.pc_pre_validation.validators_runner import run_validators
+from fbpcs.pc_pre_validation.verified_binary_cache import VerifiedBinaryCache
 from fbpcs.private_computation.entity.cloud_provider import CloudProvider
 from schema import Optional, Or, Schema, Use
 
@@ -43,6 +45,7 @@ ACCESS_KEY_DATA = "--access-key-data"
 START_TIMESTAMP = "--start-timestamp"
 END_TIMESTAMP = "--end-timestamp"
 BINARY_VERSION = "--binary-version"
+FAIL_FAST = "--fail-fast"
 
 
 def main(argv: OptionalType[List[str]] = None) -> None:
@@ -59,6 +62,7 @@ def main(argv: OptionalType[List[str]] = None) -> None:
             Optional(START_TIMESTAMP): optional_string,
             Optional(END_TIMESTAMP): optional_string,
             Optional(BINARY_VERSION): optional_string,
+            Optional(FAIL_FAST): bool,
         }
     )
     arguments = s.validate(docopt(__doc__, argv))
@@ -85,11 +89,14 @@ def main(argv: OptionalType[List[str]] = None) -> None:
                 access_key_id=arguments[ACCESS_KEY_ID],
                 access_key_data=arguments[ACCESS_KEY_DATA],
                 binary_version=arguments[BINARY_VERSION],
+                verified_binary_cache=VerifiedBinaryCache.from_env(),
             ),
         ),
     ]
 
-    (aggregated_result, aggregated_report) = run_validators(validators)
+    (aggregated_result, aggregated_report) = run_validators(
+        validators, fail_fast=arguments.get(FAIL_FAST, False)
+    )
     overall_result_str = f"Overall Validation Result: {aggregated_result.value}"
 
     if aggregated_result == ValidationResult.FAILED:
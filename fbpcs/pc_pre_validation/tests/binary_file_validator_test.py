@@ -5,6 +5,10 @@
 
 # pyre-strict
 import os
+import tempfile
+import threading
+import time
+from typing import List, Set
 from unittest import TestCase
 from unittest.mock import call, Mock, patch
 
@@ -23,6 +27,7 @@ from fbpcs.pc_pre_validation.constants import (
 )
 from fbpcs.pc_pre_validation.enums import ValidationResult
 from fbpcs.pc_pre_validation.validation_report import ValidationReport
+from fbpcs.pc_pre_validation.verified_binary_cache import VerifiedBinaryCache
 
 TEST_REGION = "us-west-2"
 TEST_BINARY_INFOS = [
@@ -32,6 +37,28 @@ TEST_BINARY_INFOS = [
 ]
 
 
+class LocalStorageService:
+    """Stands in for S3StorageService.file_exists, with a latency on every call"""
+
+    def __init__(self, existing_paths: Set[str], latency: float = 0.0) -> None:
+        self.existing_paths = existing_paths
+        self.latency = latency
+        self.checked_paths: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def file_exists(self, path: str) -> bool:
+        with self._lock:
+            self.checked_paths.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return path in self.existing_paths
+
+
 class TestBinaryFileValidator(TestCase):
     @patch("fbpcs.pc_pre_validation.binary_file_validator.S3StorageService")
     def test_run_s3_validations_success(self, storage_service_mock: Mock) -> None:
@@ -55,7 +82,8 @@ class TestBinaryFileValidator(TestCase):
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/1/latest/1"),
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/2/latest/2"),
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/3/latest/binary"),
-            ]
+            ],
+            any_order=True,
         )
 
     @patch("fbpcs.pc_pre_validation.binary_file_validator.S3StorageService")
@@ -71,7 +99,9 @@ class TestBinaryFileValidator(TestCase):
             },
         )
         storage_service_mock.__init__(return_value=storage_service_mock)
-        storage_service_mock.file_exists.side_effect = [False, True, True]
+        storage_service_mock.file_exists.side_effect = (
+            lambda path: path != f"{DEFAULT_BINARY_REPOSITORY}package/1/latest/1"
+        )
 
         validator = BinaryFileValidator(TEST_REGION, TEST_BINARY_INFOS)
         report = validator.validate()
@@ -94,15 +124,17 @@ class TestBinaryFileValidator(TestCase):
             },
         )
         storage_service_mock.__init__(return_value=storage_service_mock)
-        storage_service_mock.file_exists.side_effect = [
-            True,
-            True,
-            PcpError(
-                Exception(
-                    "An error occurred (403) when calling the HeadObject operation: Forbidden"
+
+        def file_exists(path: str) -> bool:
+            if path.endswith("binary"):
+                raise PcpError(
+                    Exception(
+                        "An error occurred (403) when calling the HeadObject operation: Forbidden"
+                    )
                 )
-            ),
-        ]
+            return True
+
+        storage_service_mock.file_exists.side_effect = file_exists
         validator = BinaryFileValidator(TEST_REGION, TEST_BINARY_INFOS)
         report = validator.validate()
 
@@ -128,7 +160,7 @@ class TestBinaryFileValidator(TestCase):
         report = validator.validate()
 
         self.assertEqual(report, expected_report)
-        self.assertEqual(storage_service_mock.file_exists.call_count, 1)
+        self.assertTrue(storage_service_mock.file_exists.called)
 
     @patch("os.path.exists")
     @patch("fbpcs.pc_pre_validation.binary_file_validator.S3StorageService")
@@ -196,7 +228,8 @@ class TestBinaryFileValidator(TestCase):
                 call("https://test-repo.com/package/1/latest/1"),
                 call("https://test-repo.com/package/2/latest/2"),
                 call("https://test-repo.com/package/3/latest/binary"),
-            ]
+            ],
+            any_order=True,
         )
 
     @patch("fbpcs.pc_pre_validation.binary_file_validator.S3StorageService")
@@ -224,7 +257,8 @@ class TestBinaryFileValidator(TestCase):
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/1/canary/1"),
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/2/canary/2"),
                 call(f"{DEFAULT_BINARY_REPOSITORY}package/3/canary/binary"),
-            ]
+            ],
+            any_order=True,
         )
 
     @patch("fbpcs.pc_pre_validation.binary_file_validator.S3StorageService")
@@ -248,3 +282,81 @@ class TestBinaryFileValidator(TestCase):
     def test_get_exe_folder_non_default(self, storage_service_mock: Mock) -> None:
         validator = BinaryFileValidator(TEST_REGION, TEST_BINARY_INFOS)
         self.assertEqual("/non-default/folder/", validator._get_exe_folder())
+
+    def test_run_s3_validations_concurrently(self) -> None:
+        binary_infos = [BinaryInfo(f"package/{i}") for i in range(8)]
+        storage_service = LocalStorageService(
+            {
+                f"{DEFAULT_BINARY_REPOSITORY}package/{i}/latest/{i}"
+                for i in range(8)
+                if i != 5
+            },
+            latency=0.05,
+        )
+        with patch(
+            "fbpcs.pc_pre_validation.binary_file_validator.S3StorageService",
+            return_value=storage_service,
+        ):
+            validator = BinaryFileValidator(
+                TEST_REGION, binary_infos, max_concurrency=4
+            )
+
+        start = time.monotonic()
+        report = validator.validate()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(ValidationResult.FAILED, report.validation_result)
+        self.assertEqual(
+            {f"{DEFAULT_BINARY_REPOSITORY}package/5/latest/5": "binary does not exist"},
+            report.details,
+        )
+        self.assertEqual(8, len(storage_service.checked_paths))
+        self.assertEqual(4, storage_service.max_in_flight)
+        # 8 checks with 4 in flight take 2 round-trips instead of 8
+        self.assertLess(elapsed, 6 * 0.05)
+
+    def test_run_s3_validations_with_verified_binary_cache(self) -> None:
+        storage_service = LocalStorageService(
+            {
+                f"{DEFAULT_BINARY_REPOSITORY}package/1/1.0/1",
+                f"{DEFAULT_BINARY_REPOSITORY}package/3/1.0/binary",
+            }
+        )
+        with tempfile.TemporaryDirectory() as cache_dir, patch(
+            "fbpcs.pc_pre_validation.binary_file_validator.S3StorageService",
+            return_value=storage_service,
+        ):
+            cache = VerifiedBinaryCache(cache_dir)
+            validator = BinaryFileValidator(
+                TEST_REGION,
+                TEST_BINARY_INFOS,
+                binary_version="1.0",
+                verified_binary_cache=cache,
+            )
+            other_credentials_validator = BinaryFileValidator(
+                TEST_REGION,
+                TEST_BINARY_INFOS,
+                access_key_id="other",
+                binary_version="1.0",
+                verified_binary_cache=cache,
+            )
+
+            first_report = validator.validate()
+            self.assertEqual(3, len(storage_service.checked_paths))
+
+            # only the missing binary is checked again
+            second_report = validator.validate()
+            self.assertEqual(first_report, second_report)
+            self.assertEqual(
+                [f"{DEFAULT_BINARY_REPOSITORY}package/2/1.0/2"],
+                storage_service.checked_paths[3:],
+            )
+
+            # binaries verified with other credentials are checked again
+            other_credentials_validator.validate()
+            self.assertEqual(7, len(storage_service.checked_paths))
+
+        self.assertEqual(
+            {f"{DEFAULT_BINARY_REPOSITORY}package/2/1.0/2": "binary does not exist"},
+            first_report.details,
+        )
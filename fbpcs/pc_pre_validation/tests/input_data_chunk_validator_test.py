@@ -0,0 +1,139 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+import csv
+from collections import Counter
+from typing import List, Tuple
+from unittest import TestCase
+
+from fbpcs.pc_pre_validation.constants import (
+    ID_FIELD_PREFIX,
+    VALID_LINE_ENDING_REGEX,
+    VALIDATION_REGEXES,
+)
+from fbpcs.pc_pre_validation.input_data_chunk_validator import (
+    InputDataHeader,
+    validate_input_data_chunk,
+)
+
+
+def validate_lines_one_by_one(
+    header_line: str, lines: List[str]
+) -> Tuple[int, Counter, Counter]:
+    """The row by row validation the chunk validator must agree with"""
+    empty_counter = Counter()
+    format_error_counter = Counter()
+    header_row = ",".join(InputDataHeader.from_header_line(header_line).field_names)
+    rows = 0
+    for line in lines:
+        if not VALID_LINE_ENDING_REGEX.match(line):
+            break
+        for row in csv.DictReader([header_row, line]):
+            for field, value in row.items():
+                if field.startswith(ID_FIELD_PREFIX):
+                    field = ID_FIELD_PREFIX
+                if value.strip() == "":
+                    empty_counter[field] += 1
+                elif field in VALIDATION_REGEXES and not VALIDATION_REGEXES[
+                    field
+                ].match(value):
+                    format_error_counter[field] += 1
+        rows += 1
+    return rows, empty_counter, format_error_counter
+
+
+class TestInputDataChunkValidator(TestCase):
+    def assert_same_as_one_by_one(self, header_line: str, lines: List[str]) -> None:
+        header = InputDataHeader.from_header_line(header_line)
+        result = validate_input_data_chunk(
+            "".join(line + "\n" for line in lines).encode("utf-8"), header
+        )
+        rows, empty_counter, format_error_counter = validate_lines_one_by_one(
+            header_line, lines
+        )
+        self.assertEqual(rows, result.rows_processed_count)
+        self.assertEqual(rows < len(lines), result.has_invalid_line_ending)
+        if not result.has_invalid_line_ending:
+            self.assertEqual(empty_counter, result.empty_counter)
+            self.assertEqual(format_error_counter, result.format_error_counter)
+
+    def test_header(self) -> None:
+        header = InputDataHeader.from_header_line(
+            "id_email,id_phone,value,id_email,event_timestamp\n"
+        )
+        self.assertEqual(
+            ("id_email", "id_phone", "value", "id_email", "event_timestamp"),
+            header.field_names,
+        )
+        # like a dict, a repeated field keeps the last column
+        self.assertEqual(
+            (("id_email", 3), ("id_phone", 1), ("value", 2), ("event_timestamp", 4)),
+            header.columns,
+        )
+        self.assertIsNotNone(header.row_pattern)
+        self.assertIsNone(
+            InputDataHeader.from_header_line('"id_,x",value\n').row_pattern
+        )
+
+    def test_row_pattern(self) -> None:
+        header = InputDataHeader.from_header_line("id_,value,event_timestamp,extra\n")
+        row_pattern = header.row_pattern
+        assert row_pattern is not None
+        self.assertTrue(row_pattern.match("abcd/1234+WXYZ=,100,1645157987,x"))
+        self.assertTrue(row_pattern.match("abcd/1234+WXYZ=,100,1645157987, x y"))
+        for line in (
+            "abcd/1234+WXYZ=,100,1645157987,",
+            "abcd/1234+WXYZ=,100,1645157987,x ",
+            "abcd/1234+WXYZ=,100,1645157987, ",
+            "abcd/1234+WXYZ=,100,164515798,x",
+            "abcd/1234+WXYZ=,,1645157987,x",
+            "abcd/1234+WXYZ=,100,1645157987,x,y",
+            'abcd/1234+WXYZ=,100,1645157987,"x"',
+            "abcd/1234+WXYZ=,100,1645157987,x\r",
+        ):
+            with self.subTest(line):
+                self.assertIsNone(row_pattern.match(line))
+
+    def test_same_as_one_by_one(self) -> None:
+        lines = [
+            "abcd/1234+WXYZ=,100,1645157987",
+            ",100,1645157987",
+            "abcd/1234+WXYZ=,,",
+            " , ,1645157987",
+            "ab...,test,ts2",
+            '"abcd/1234+WXYZ=","1,00",1645157987',
+            '"",100,"1645157987"',
+            "abcd/1234+WXYZ=, 100,1645157987",
+            "é,100,1645157987",
+        ]
+        self.assert_same_as_one_by_one("id_,value,event_timestamp\n", lines)
+        self.assert_same_as_one_by_one(
+            "id_,value,id_,event_timestamp,other\n",
+            [f"{'x' if i % 2 else ''},{line},x" for i, line in enumerate(lines)],
+        )
+
+    def test_missing_fields_raise_like_csv(self) -> None:
+        header = InputDataHeader.from_header_line("id_,value,event_timestamp\n")
+        with self.assertRaises(AttributeError):
+            validate_input_data_chunk(b"abcd/1234+WXYZ=,100\n", header)
+
+    def test_invalid_line_ending(self) -> None:
+        lines = [
+            "abcd/1234+WXYZ=,100,1645157987",
+            "abcd/1234+WXYZ=,100,1645157987",
+            "abcd/1234+WXYZ=,100,1645157987 ",
+            "abcd/1234+WXYZ=,100,1645157987",
+        ]
+        self.assert_same_as_one_by_one("id_,value,event_timestamp\n", lines)
+        self.assert_same_as_one_by_one("id_,value,event_timestamp\n", ["", "a,1,2"])
+
+    def test_last_line_without_new_line(self) -> None:
+        header = InputDataHeader.from_header_line("id_,value,event_timestamp\n")
+        result = validate_input_data_chunk(
+            b"abcd/1234+WXYZ=,100,1645157987\nabcd/1234+WXYZ=,,1645157987", header
+        )
+        self.assertEqual(2, result.rows_processed_count)
+        self.assertEqual(Counter({"value": 1}), result.empty_counter)
@@ -4,17 +4,17 @@
 # LICENSE file in the root directory of this source tree.
 
 # pyre-strict
+import io
 import os
 import random
+import tempfile
 import time
-from typing import Iterable
+from typing import Any, Dict, Iterable
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock, patch
 
 from fbpcs.pc_pre_validation.constants import (
     ID_FIELD_PREFIX,
-    INPUT_DATA_MAX_FILE_SIZE_IN_BYTES,
-    INPUT_DATA_TMP_FILE_PATH,
     INPUT_DATA_VALIDATOR_NAME,
     PA_FIELDS,
     PL_FIELDS,
@@ -26,12 +26,19 @@ from fbpcs.private_computation.entity.cloud_provider import CloudProvider
 
 # Name the file randomly in order to avoid failures when the tests run concurrently
 TEST_FILENAME = f"test-input-data-validation-{random.randint(0, 1000000)}.csv"
-TEST_FILE_SIZE = 1234
 TEST_CLOUD_PROVIDER: CloudProvider = CloudProvider.AWS
-TEST_INPUT_FILE_PATH = f"s3://test-bucket/{TEST_FILENAME}"
+TEST_INPUT_FILE_PATH = f"https://test-bucket.s3.us-west-2.amazonaws.com/{TEST_FILENAME}"
 TEST_REGION = "us-west-2"
 TEST_TIMESTAMP: float = time.time()
-TEST_TEMP_FILEPATH = f"{INPUT_DATA_TMP_FILE_PATH}/{TEST_FILENAME}-{TEST_TIMESTAMP}"
+# the content of the input file on S3
+TEST_TEMP_FILEPATH = f"{tempfile.gettempdir()}/{TEST_FILENAME}-{TEST_TIMESTAMP}"
+
+
+def read_test_file_range(Bucket: str, Key: str, Range: str) -> Dict[str, Any]:
+    start, end = (int(i) for i in Range[len("bytes=") :].split("-"))
+    with open(TEST_TEMP_FILEPATH, "rb") as test_file:
+        test_file.seek(start)
+        return {"Body": io.BytesIO(test_file.read(end - start + 1))}
 
 
 class TestInputDataValidator(TestCase):
@@ -43,7 +50,11 @@ class TestInputDataValidator(TestCase):
         storage_service_mock = patched_storage_service.start()
         storage_service_mock.__init__(return_value=storage_service_mock)
         self.storage_service_mock = storage_service_mock
-        storage_service_mock.get_file_size.return_value = TEST_FILE_SIZE
+        storage_service_mock.get_file_size.side_effect = lambda _: os.path.getsize(
+            TEST_TEMP_FILEPATH
+        )
+        self.get_object_mock = storage_service_mock.s3_gateway.client.get_object
+        self.get_object_mock.side_effect = read_test_file_range
         with open(TEST_TEMP_FILEPATH, "a") as file:
             file.write("")
 
@@ -75,8 +86,9 @@ class TestInputDataValidator(TestCase):
         self.assertEqual(validator._input_file_path, TEST_INPUT_FILE_PATH)
         self.assertEqual(validator._cloud_provider, TEST_CLOUD_PROVIDER)
 
-    def test_run_validations_copy_failure(self) -> None:
-        exception_message = "failed to copy"
+    def test_run_validations_download_failure(self) -> None:
+        exception_message = "failed to download"
+        self.write_lines_to_file([b"id_,value,event_timestamp\n"])
         expected_report = ValidationReport(
             validation_result=ValidationResult.FAILED,
             validator_name=INPUT_DATA_VALIDATOR_NAME,
@@ -85,7 +97,7 @@ class TestInputDataValidator(TestCase):
                 "rows_processed_count": 0,
             },
         )
-        self.storage_service_mock.copy.side_effect = Exception(exception_message)
+        self.get_object_mock.side_effect = Exception(exception_message)
 
         validator = InputDataValidator(
             TEST_INPUT_FILE_PATH, TEST_CLOUD_PROVIDER, TEST_REGION
@@ -94,9 +106,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_success_for_pl_fields(self, time_mock: Mock) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_success_for_pl_fields(self) -> None:
         lines = [
             b"id_,value,event_timestamp\n",
             b"abcd/1234+WXYZ=,100,1645157987\n",
@@ -120,11 +130,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_success_for_multikey_pl_fields(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_success_for_multikey_pl_fields(self) -> None:
         lines = [
             b"id_madid,id_email,id_phone,value,event_timestamp\n",
             b"abcd/1234+WXYZ=,dabcd/1234+WXYZ=,4abcd/1234+WXYZ=,100,1645157987\n",
@@ -153,9 +159,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_success_for_pa_fields(self, time_mock: Mock) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_success_for_pa_fields(self) -> None:
         cloud_provider = CloudProvider.AWS
         lines = [
             b"id_,conversion_value,conversion_timestamp,conversion_metadata\n",
@@ -186,11 +190,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_success_for_multikey_pa_fields(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_success_for_multikey_pa_fields(self) -> None:
         cloud_provider = CloudProvider.AWS
         lines = [
             b"id_madid,id_email,id_phone,conversion_value,conversion_timestamp,conversion_metadata\n",
@@ -224,12 +224,8 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_errors_when_pa_pl_data_fields_not_found(
-        self, time_mock: Mock
-    ) -> None:
+    def test_run_validations_errors_when_pa_pl_data_fields_not_found(self) -> None:
         exception_message = f"Failed to parse the header row. The header row fields must have either: {PL_FIELDS} or: {PA_FIELDS}"
-        time_mock.time.return_value = TEST_TIMESTAMP
         lines = [
             b"id_,header,row\n",
             b"1,2,3\n",
@@ -251,12 +247,8 @@ class TestInputDataValidator(TestCase):
         report = validator.validate()
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_errors_when_pid_data_fields_not_found(
-        self, time_mock: Mock
-    ) -> None:
+    def test_run_validations_errors_when_pid_data_fields_not_found(self) -> None:
         exception_message = f"Failed to parse the header row. The header row fields must have columns with prefix {ID_FIELD_PREFIX}"
-        time_mock.time.return_value = TEST_TIMESTAMP
         lines = [
             b"noid_,conversion_value,conversion_timestamp,conversion_metadata\n",
             b"abcd/1234+WXYZ=,,1645157987,0\n",
@@ -279,11 +271,7 @@ class TestInputDataValidator(TestCase):
         report = validator.validate()
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_errors_when_there_is_no_header_row(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_errors_when_there_is_no_header_row(self) -> None:
         expected_report = ValidationReport(
             validation_result=ValidationResult.FAILED,
             validator_name=INPUT_DATA_VALIDATOR_NAME,
@@ -300,12 +288,8 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_errors_when_the_line_ending_is_unsupported(
-        self, time_mock: Mock
-    ) -> None:
+    def test_run_validations_errors_when_the_line_ending_is_unsupported(self) -> None:
         exception_message = "Detected an unexpected line ending. The only supported line ending is '\\n'"
-        time_mock.time.return_value = TEST_TIMESTAMP
         lines = [
             b"id_,value,event_timestamp\n",
             b"abcd/1234+WXYZ=,100,1645157987\r\n",
@@ -328,11 +312,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_reports_for_pl_when_row_values_are_empty(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_reports_for_pl_when_row_values_are_empty(self) -> None:
         lines = [
             b"id_,value,event_timestamp\n",
             b",100,1645157987\n",
@@ -372,11 +352,7 @@ class TestInputDataValidator(TestCase):
         report = validator.validate()
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_reports_for_pa_when_row_values_are_empty(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_reports_for_pa_when_row_values_are_empty(self) -> None:
         lines = [
             b"id_,conversion_value,conversion_timestamp,conversion_metadata\n",
             b"abcd/1234+WXYZ=,100,1645157987,\n",
@@ -417,11 +393,7 @@ class TestInputDataValidator(TestCase):
 
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_reports_for_pl_when_row_values_are_not_valid(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_reports_for_pl_when_row_values_are_not_valid(self) -> None:
         lines = [
             b"id_,value,event_timestamp\n",
             b"ab...,100,1645157987\n",
@@ -461,9 +433,7 @@ class TestInputDataValidator(TestCase):
         report = validator.validate()
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_reports_for_pl_when_no_ids(self, time_mock: Mock) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_reports_for_pl_when_no_ids(self) -> None:
         lines = [
             b"id_madid,id_email,value,event_timestamp\n",
             b",,100,1645157987\n",
@@ -491,11 +461,7 @@ class TestInputDataValidator(TestCase):
         report = validator.validate()
         self.assertEqual(report, expected_report)
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_reports_for_pa_when_row_values_are_not_valid(
-        self, time_mock: Mock
-    ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
+    def test_run_validations_reports_for_pa_when_row_values_are_not_valid(self) -> None:
         lines = [
             b"id_,conversion_value,conversion_timestamp,conversion_metadata\n",
             b"abcd/1234+WXYZ=,$100,1645157987,\n",
@@ -540,13 +506,10 @@ class TestInputDataValidator(TestCase):
     @patch(
         "fbpcs.pc_pre_validation.input_data_validator.InputDataValidationIssues.count_empty_field"
     )
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
     def test_run_validations_an_unhandled_exception_propagates_to_the_caller(
         self,
-        time_mock: Mock,
         count_empty_field_mock: Mock,
     ) -> None:
-        time_mock.time.return_value = TEST_TIMESTAMP
         expected_exception_message = "bug in the logic"
         lines = [
             b"id_,value,event_timestamp\n",
@@ -566,40 +529,80 @@ class TestInputDataValidator(TestCase):
             f"WARNING: {INPUT_DATA_VALIDATOR_NAME} threw an unexpected error: {expected_exception_message}",
         )
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
-    def test_run_validations_it_skips_input_data_processing_when_the_file_is_too_large(
-        self, time_mock: Mock
-    ) -> None:
-        file_size = 3567123432
-        time_mock.time.return_value = TEST_TIMESTAMP
-        self.storage_service_mock.get_file_size.return_value = file_size
+    def test_run_validations_streams_the_file_in_chunks(self) -> None:
+        lines = [b"id_,value,event_timestamp\n"]
+        for i in range(300):
+            if i % 7 == 0:
+                lines.append(b",100,1645157987\n")
+            elif i % 11 == 0:
+                lines.append(b"abcd/1234+WXYZ=,$1,16451579\n")
+            else:
+                lines.append(b"abcd/1234+WXYZ=,100,1645157987\n")
+        self.write_lines_to_file(lines)
         expected_report = ValidationReport(
-            validation_result=ValidationResult.SUCCESS,
+            validation_result=ValidationResult.FAILED,
             validator_name=INPUT_DATA_VALIDATOR_NAME,
-            message=" ".join(
-                [
-                    f"WARNING: File: {TEST_INPUT_FILE_PATH} is too large to download.",
-                    f"The maximum file size is {int(INPUT_DATA_MAX_FILE_SIZE_IN_BYTES / (1024 * 1024))} MB.",
-                    "Skipped input_data validation. completed validation successfully",
-                ]
-            ),
+            message=f"File: {TEST_INPUT_FILE_PATH} failed validation, with errors on 'event_timestamp'.",
             details={
-                "rows_processed_count": 0,
+                "rows_processed_count": 300,
+                "validation_errors": {
+                    "event_timestamp": {
+                        "bad_format_count": 24,
+                    },
+                },
+                "validation_warnings": {
+                    "id_": {
+                        "empty_count": 43,
+                    },
+                    "value": {
+                        "bad_format_count": 24,
+                    },
+                },
             },
         )
 
+        # small chunks, to validate them in worker processes
+        with patch(
+            "fbpcs.pc_pre_validation.input_data_validator.INPUT_DATA_CHUNK_SIZE_IN_BYTES",
+            100,
+        ):
+            validator = InputDataValidator(
+                TEST_INPUT_FILE_PATH, TEST_CLOUD_PROVIDER, TEST_REGION
+            )
+            report = validator.validate()
+
+        self.assertEqual(report, expected_report)
+        self.assertGreater(self.get_object_mock.call_count, 2)
+        self.get_object_mock.assert_any_call(
+            Bucket="test-bucket", Key=TEST_FILENAME, Range="bytes=0-99"
+        )
+        self.storage_service_mock.copy.assert_not_called()
+        # the report does not depend on the chunk size
         validator = InputDataValidator(
             TEST_INPUT_FILE_PATH, TEST_CLOUD_PROVIDER, TEST_REGION
         )
-        report = validator.validate()
+        self.assertEqual(validator.validate(), expected_report)
 
-        self.storage_service_mock.get_file_size.assert_called_with(TEST_INPUT_FILE_PATH)
-        self.storage_service_mock.copy.assert_not_called()
-        self.assertEqual(report, expected_report)
+    def test_run_validations_line_ending_error_in_a_later_chunk(self) -> None:
+        lines = [b"id_,value,event_timestamp\n"]
+        lines += [b"abcd/1234+WXYZ=,100,1645157987\n"] * 50
+        lines += [b"abcd/1234+WXYZ=,100,1645157987\r\n"] * 2
+        self.write_lines_to_file(lines)
+
+        with patch(
+            "fbpcs.pc_pre_validation.input_data_validator.INPUT_DATA_CHUNK_SIZE_IN_BYTES",
+            64,
+        ):
+            validator = InputDataValidator(
+                TEST_INPUT_FILE_PATH, TEST_CLOUD_PROVIDER, TEST_REGION
+            )
+            report = validator.validate()
+
+        self.assertEqual(report.validation_result, ValidationResult.FAILED)
+        self.assertEqual(report.details, {"rows_processed_count": 50})
 
-    @patch("fbpcs.pc_pre_validation.input_data_validator.time")
     def test_run_validations_validation_fails_when_fetching_the_file_size_errors(
-        self, time_mock: Mock
+        self,
     ) -> None:
         exception_message = "failed to get the file size"
         expected_report = ValidationReport(
@@ -5,15 +5,19 @@
 
 # pyre-strict
 
+import os
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
 from fbpcs.pc_pre_validation import pc_pre_validation_cli as validation_cli
+from fbpcs.pc_pre_validation.constants import BINARY_FILE_VALIDATOR_CACHE_DIR_ENV
 from fbpcs.pc_pre_validation.enums import ValidationResult
+from fbpcs.pc_pre_validation.verified_binary_cache import VerifiedBinaryCache
 from fbpcs.private_computation.entity.cloud_provider import CloudProvider
 
 
 class TestPCPreValidationCLI(TestCase):
+    @patch.dict(os.environ, {}, clear=True)
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.print")
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.InputDataValidator")
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.BinaryFileValidator")
@@ -54,11 +58,14 @@ class TestPCPreValidationCLI(TestCase):
             access_key_id=None,
             access_key_data=None,
             binary_version=None,
+            verified_binary_cache=None,
         )
         run_validators_mock.assert_called_with(
-            [input_data_validator_mock(), binary_file_validator_mock()]
+            [input_data_validator_mock(), binary_file_validator_mock()],
+            fail_fast=False,
         )
 
+    @patch.dict(os.environ, {BINARY_FILE_VALIDATOR_CACHE_DIR_ENV: "/cache"})
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.print")
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.InputDataValidator")
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.BinaryFileValidator")
@@ -91,6 +98,7 @@ class TestPCPreValidationCLI(TestCase):
             f"--access-key-id={expected_access_key_id}",
             f"--access-key-data={expected_access_key_data}",
             f"--binary-version={expected_binary_version}",
+            "--fail-fast",
         ]
 
         validation_cli.main(argv)
@@ -109,9 +117,11 @@ class TestPCPreValidationCLI(TestCase):
             access_key_id=expected_access_key_id,
             access_key_data=expected_access_key_data,
             binary_version=expected_binary_version,
+            verified_binary_cache=VerifiedBinaryCache("/cache"),
         )
         run_validators_mock.assert_called_with(
-            [input_data_validator_mock(), binary_file_validator_mock()]
+            [input_data_validator_mock(), binary_file_validator_mock()],
+            fail_fast=True,
         )
 
     @patch("fbpcs.pc_pre_validation.pc_pre_validation_cli.print")
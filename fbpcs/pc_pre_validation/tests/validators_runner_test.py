@@ -5,6 +5,9 @@
 
 # pyre-strict
 
+import threading
+import time
+from typing import List
 from unittest import TestCase
 
 from fbpcs.pc_pre_validation.enums import ValidationResult
@@ -34,6 +37,30 @@ class TestExceptionValidator(Validator):
         raise Exception("test error message")
 
 
+class TestSlowValidator(TestDummyValidator):
+    def __init__(self, dummy_report: ValidationReport, seconds: float) -> None:
+        super().__init__(dummy_report)
+        self.seconds = seconds
+        self.done = threading.Event()
+
+    def __validate__(self) -> ValidationReport:
+        time.sleep(self.seconds)
+        self.done.set()
+        return self.dummy_report
+
+
+class TestCancellableValidator(TestDummyValidator):
+    def __init__(self, dummy_report: ValidationReport) -> None:
+        super().__init__(dummy_report)
+        self.stopped = threading.Event()
+
+    def __validate__(self) -> ValidationReport:
+        while not self.is_cancelled:
+            time.sleep(0.01)
+        self.stopped.set()
+        return self.dummy_report
+
+
 TEST_SUCCESSFUL_REPORT_1 = ValidationReport(
     validation_result=ValidationResult.SUCCESS,
     validator_name="validator 1",
@@ -63,6 +90,20 @@ TEST_FAILED_REPORT_1 = ValidationReport(
 
 
 class TestValidationReport(TestCase):
+    def assert_aggregated_report(
+        self,
+        expected_reports: str,
+        expected_validator_names: List[str],
+        actual_report: str,
+    ) -> None:
+        reports, durations = actual_report.split("\n\nValidator durations:\n")
+        self.assertEqual(expected_reports, reports)
+        self.assertEqual(
+            expected_validator_names,
+            [line.split(": ")[0] for line in durations.split("\n")],
+        )
+        self.assertRegex(durations, r"^(.+: \d+\.\d\ds( \(unfinished\))?\n?)+$")
+
     def test_all_validators_succeed(self) -> None:
         expected_aggregated_result = ValidationResult.SUCCESS
         expected_aggregated_report = (
@@ -77,7 +118,9 @@ class TestValidationReport(TestCase):
         )
 
         self.assertEqual(expected_aggregated_result, actual_result)
-        self.assertEqual(expected_aggregated_report, actual_report)
+        self.assert_aggregated_report(
+            expected_aggregated_report, ["validator 1", "validator 2"], actual_report
+        )
 
     def test_a_validator_fails(self) -> None:
         expected_aggregated_result = ValidationResult.FAILED
@@ -93,7 +136,9 @@ class TestValidationReport(TestCase):
         )
 
         self.assertEqual(expected_aggregated_result, actual_result)
-        self.assertEqual(expected_aggregated_report, actual_report)
+        self.assert_aggregated_report(
+            expected_aggregated_report, ["validator 1", "validator 3"], actual_report
+        )
 
     def test_a_validator_throws_exception(self) -> None:
         expected_report_thrown_by_validator = ValidationReport(
@@ -114,4 +159,109 @@ class TestValidationReport(TestCase):
         )
 
         self.assertEqual(expected_aggregated_result, actual_result)
-        self.assertEqual(expected_aggregated_report, actual_report)
+        self.assert_aggregated_report(
+            expected_aggregated_report,
+            ["validator 1", "TestExceptionValidator"],
+            actual_report,
+        )
+
+    def test_validators_run_concurrently(self) -> None:
+        validators = [
+            TestSlowValidator(TEST_SUCCESSFUL_REPORT_1, 0.3),
+            TestSlowValidator(TEST_SUCCESSFUL_REPORT_2, 0.3),
+        ]
+
+        start = time.monotonic()
+        (actual_result, actual_report) = run_validators(validators)
+
+        self.assertLess(time.monotonic() - start, 0.55)
+        self.assertEqual(ValidationResult.SUCCESS, actual_result)
+        self.assert_aggregated_report(
+            f"{TEST_SUCCESSFUL_REPORT_1}\n\n{TEST_SUCCESSFUL_REPORT_2}",
+            ["validator 1", "validator 2"],
+            actual_report,
+        )
+
+    def test_a_validator_times_out(self) -> None:
+        slow_validator = TestSlowValidator(TEST_FAILED_REPORT_1, 2)
+        expected_timeout_report = ValidationReport(
+            validation_result=ValidationResult.SUCCESS,
+            validator_name="validator 3",
+            message="WARNING: validator 3 did not finish within 0.1 seconds. Skipped its validation.",
+        )
+
+        (actual_result, actual_report) = run_validators(
+            [TestDummyValidator(TEST_SUCCESSFUL_REPORT_1), slow_validator],
+            timeout=0.1,
+        )
+
+        self.assertFalse(slow_validator.done.is_set())
+        self.assertEqual(ValidationResult.SUCCESS, actual_result)
+        self.assert_aggregated_report(
+            f"{TEST_SUCCESSFUL_REPORT_1}\n\n{expected_timeout_report}",
+            ["validator 1", "validator 3"],
+            actual_report,
+        )
+        self.assertIn("validator 3: 0.1", actual_report)
+        self.assertIn("(unfinished)", actual_report)
+
+    def test_a_timed_out_validator_is_cancelled(self) -> None:
+        cancellable_validator = TestCancellableValidator(TEST_SUCCESSFUL_REPORT_2)
+
+        (actual_result, actual_report) = run_validators(
+            [cancellable_validator, TestDummyValidator(TEST_SUCCESSFUL_REPORT_1)],
+            timeout=0.1,
+        )
+
+        self.assertEqual(ValidationResult.SUCCESS, actual_result)
+        self.assertIn("did not finish within 0.1 seconds", actual_report)
+        self.assertTrue(cancellable_validator.is_cancelled)
+        self.assertTrue(cancellable_validator.stopped.wait(5))
+
+    def test_fail_fast_cancels_the_other_validators(self) -> None:
+        slow_validator = TestSlowValidator(TEST_SUCCESSFUL_REPORT_2, 2)
+        expected_cancelled_report = ValidationReport(
+            validation_result=ValidationResult.SUCCESS,
+            validator_name="validator 2",
+            message="WARNING: validator 2 was cancelled after validator 3 failed.",
+        )
+
+        (actual_result, actual_report) = run_validators(
+            [slow_validator, TestDummyValidator(TEST_FAILED_REPORT_1)],
+            fail_fast=True,
+        )
+
+        self.assertFalse(slow_validator.done.is_set())
+        self.assertEqual(ValidationResult.FAILED, actual_result)
+        self.assert_aggregated_report(
+            f"{expected_cancelled_report}\n\n{TEST_FAILED_REPORT_1}",
+            ["validator 2", "validator 3"],
+            actual_report,
+        )
+
+    def test_fail_fast_stops_a_cancellable_validator(self) -> None:
+        cancellable_validator = TestCancellableValidator(TEST_SUCCESSFUL_REPORT_2)
+
+        (actual_result, _) = run_validators(
+            [cancellable_validator, TestDummyValidator(TEST_FAILED_REPORT_1)],
+            fail_fast=True,
+        )
+
+        self.assertEqual(ValidationResult.FAILED, actual_result)
+        self.assertTrue(cancellable_validator.is_cancelled)
+        self.assertTrue(cancellable_validator.stopped.wait(5))
+
+    def test_no_fail_fast_waits_for_every_validator(self) -> None:
+        slow_validator = TestSlowValidator(TEST_SUCCESSFUL_REPORT_2, 0.2)
+
+        (actual_result, actual_report) = run_validators(
+            [slow_validator, TestDummyValidator(TEST_FAILED_REPORT_1)]
+        )
+
+        self.assertTrue(slow_validator.done.is_set())
+        self.assertEqual(ValidationResult.FAILED, actual_result)
+        self.assert_aggregated_report(
+            f"{TEST_SUCCESSFUL_REPORT_2}\n\n{TEST_FAILED_REPORT_1}",
+            ["validator 2", "validator 3"],
+            actual_report,
+        )
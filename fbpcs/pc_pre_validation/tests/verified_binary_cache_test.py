@@ -0,0 +1,100 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+import os
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from fbpcs.pc_pre_validation.constants import BINARY_FILE_VALIDATOR_CACHE_DIR_ENV
+from fbpcs.pc_pre_validation.verified_binary_cache import VerifiedBinaryCache
+
+TEST_REPO_PATH = "https://test-repo.s3.us-west-2.amazonaws.com/"
+TEST_BINARY_PATH = "data_processing/sharder/sharder"
+TEST_VERSION = "1.0"
+
+
+class TestVerifiedBinaryCache(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.cache = VerifiedBinaryCache(self.cache_dir, ttl_in_seconds=60)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_add_verified(self) -> None:
+        self.assertFalse(
+            self.cache.is_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        )
+
+        self.cache.add_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+
+        self.assertTrue(
+            self.cache.is_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        )
+        self.assertFalse(
+            self.cache.is_verified(TEST_REPO_PATH, "2.0", TEST_BINARY_PATH)
+        )
+        self.assertFalse(
+            self.cache.is_verified(
+                TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH, "key"
+            )
+        )
+        # a cache with the same folder shares the entries
+        self.assertTrue(
+            VerifiedBinaryCache(self.cache_dir).is_verified(
+                TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH
+            )
+        )
+
+    def test_entries_expire(self) -> None:
+        self.cache.add_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        (entry,) = os.listdir(self.cache_dir)
+        verified_at = time.time() - 61
+        os.utime(os.path.join(self.cache_dir, entry), (verified_at, verified_at))
+
+        self.assertFalse(
+            self.cache.is_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        )
+
+        # verifying the binary again refreshes the entry
+        self.cache.add_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        self.assertTrue(
+            self.cache.is_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        )
+
+    def test_unwritable_cache_dir(self) -> None:
+        not_a_dir = os.path.join(self.temp_dir.name, "file")
+        with open(not_a_dir, "w"):
+            pass
+        cache = VerifiedBinaryCache(not_a_dir)
+
+        cache.add_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+
+        self.assertFalse(
+            cache.is_verified(TEST_REPO_PATH, TEST_VERSION, TEST_BINARY_PATH)
+        )
+
+    def test_tier_tags_are_not_cached(self) -> None:
+        for version in ("latest", "rc", "canary"):
+            self.cache.add_verified(TEST_REPO_PATH, version, TEST_BINARY_PATH)
+
+            self.assertFalse(
+                self.cache.is_verified(TEST_REPO_PATH, version, TEST_BINARY_PATH)
+            )
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_from_env(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(VerifiedBinaryCache.from_env())
+        with patch.dict(
+            os.environ, {BINARY_FILE_VALIDATOR_CACHE_DIR_ENV: self.cache_dir}
+        ):
+            self.assertEqual(
+                VerifiedBinaryCache(self.cache_dir), VerifiedBinaryCache.from_env()
+            )
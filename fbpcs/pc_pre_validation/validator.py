@@ -13,6 +13,21 @@ from fbpcs.pc_pre_validation.validation_report import ValidationReport
 
 
 class Validator(abc.ABC):
+    # Set by cancel(). Validators check it between units of work, so that a
+    # cancelled validation stops using the network and CPU soon after.
+    _cancelled: bool = False
+
+    def cancel(self) -> None:
+        """Asks a running validation to stop early.
+
+        The report a cancelled validation returns is not used.
+        """
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
     def validate(self) -> ValidationReport:
         """A wrapper for __validator__().
 
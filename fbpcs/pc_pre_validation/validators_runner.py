@@ -6,18 +6,107 @@
 
 # pyre-strict
 
-from typing import List, Tuple
+"""
+Runs the validators concurrently and aggregates their reports.
 
+The validators are I/O bound (S3 reads, downloads), so each one runs in its own
+thread and the run takes about as long as the slowest validator. The threads
+are daemon threads: a validator that is past its time budget does not keep the
+process alive. The validators still running when the runner stops waiting,
+because their time budget is spent or, in fail fast mode, because one of them
+failed, are cancelled: they stop at their next cancellation check, e.g. between
+two chunks of the input file.
+"""
+
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from fbpcs.pc_pre_validation.constants import VALIDATOR_TIMEOUT_IN_SECONDS
 from fbpcs.pc_pre_validation.enums import ValidationResult
 from fbpcs.pc_pre_validation.validation_report import ValidationReport
 from fbpcs.pc_pre_validation.validator import Validator
 
 
-def run_validators(validators: List[Validator]) -> Tuple[ValidationResult, str]:
-    # run each validator once
-    validation_reports: List[ValidationReport] = [
-        validator.validate() for validator in validators
-    ]
+def run_validators(
+    validators: List[Validator],
+    timeout: Optional[float] = VALIDATOR_TIMEOUT_IN_SECONDS,
+    fail_fast: bool = False,
+) -> Tuple[ValidationResult, str]:
+    """Runs the validators concurrently and aggregates their reports
+
+    Args:
+        - validators: the validators to run, the aggregated report keeps their order
+        - timeout: time budget of each validator in seconds, None for no limit.
+            A validator still running after its budget gets a warning report.
+        - fail_fast: cancel the other validators once one of them fails
+
+    Returns:
+        SUCCESS only if all validators succeed, and the report of every
+        validator followed by how long each one ran
+    """
+    reports: List[Optional[ValidationReport]] = [None] * len(validators)
+    durations: List[Optional[float]] = [None] * len(validators)
+    finished: "queue.Queue[int]" = queue.Queue()
+
+    def run(index: int) -> None:
+        validator_start = time.monotonic()
+        try:
+            # validate() turns unexpected errors into reports
+            reports[index] = validators[index].validate()
+        finally:
+            durations[index] = time.monotonic() - validator_start
+            finished.put(index)
+
+    start = time.monotonic()
+    for index, validator in enumerate(validators):
+        threading.Thread(
+            target=run, args=(index,), name=validator.name, daemon=True
+        ).start()
+
+    pending = set(range(len(validators)))
+    failed_validator_name = None
+    while pending and failed_validator_name is None:
+        remaining = None if timeout is None else start + timeout - time.monotonic()
+        try:
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            index = finished.get(timeout=remaining)
+        except queue.Empty:
+            break
+        pending.remove(index)
+        report = reports[index]
+        if fail_fast and report and report.validation_result is ValidationResult.FAILED:
+            failed_validator_name = report.validator_name
+
+    elapsed = time.monotonic() - start
+    # their reports are not used, so don't let them keep reading the input
+    for index in pending:
+        validators[index].cancel()
+
+    validation_reports: List[ValidationReport] = []
+    for index, validator in enumerate(validators):
+        report = reports[index]
+        # A validator that finished after the runner stopped waiting still
+        # counts as unfinished, so the result doesn't depend on that race
+        if index in pending:
+            if failed_validator_name is not None:
+                message = f"WARNING: {validator.name} was cancelled after {failed_validator_name} failed."
+            else:
+                message = f"WARNING: {validator.name} did not finish within {timeout} seconds. Skipped its validation."
+        elif report is None:
+            message = f"WARNING: {validator.name} stopped without a report."
+        else:
+            validation_reports.append(report)
+            continue
+        validation_reports.append(
+            ValidationReport(
+                validation_result=ValidationResult.SUCCESS,
+                validator_name=validator.name,
+                message=message,
+            )
+        )
 
     # aggregated result is SUCCESS only if all validators succeed.
     validator_results = [
@@ -29,5 +118,14 @@ def run_validators(validators: List[Validator]) -> Tuple[ValidationResult, str]:
     )
 
     aggregated_report = "\n\n".join([str(report) for report in validation_reports])
+    if validators:
+        duration_lines = []
+        for index, validator in enumerate(validators):
+            duration = durations[index]
+            if index in pending or duration is None:
+                duration_lines.append(f"{validator.name}: {elapsed:.2f}s (unfinished)")
+            else:
+                duration_lines.append(f"{validator.name}: {duration:.2f}s")
+        aggregated_report += "\n\nValidator durations:\n" + "\n".join(duration_lines)
 
     return (aggregated_result, aggregated_report)
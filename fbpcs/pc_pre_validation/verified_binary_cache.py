@@ -0,0 +1,112 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""
+A local cache of the binaries the BinaryFileValidator found in the repository.
+
+The binaries of a version don't change, so once a binary was found with a set of
+credentials, the validations of the other instances of a study don't need to
+check it again. Each verified binary is an empty file named after the sha256 of
+its (repository, version, binary, access key id) tuple, and the modification time
+of that file is when the binary was verified. Writing an entry is atomic and
+needs no lock, so concurrent validations can share the cache folder.
+
+Only binaries that were found are cached: a missing or forbidden binary is
+checked again by the next validation. The tags of the tiers, like latest, point
+to new binaries on every release, so binaries of those versions are never cached.
+
+The validations run in short-lived containers, so the cache folder has to be a
+persistent location shared by the containers, like a mounted volume. It is set
+with the PC_PRE_VALIDATION_BINARY_CACHE_DIR environment variable, and without
+it the binaries are checked by every validation.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fbpcs.pc_pre_validation.constants import (
+    BINARY_FILE_VALIDATOR_CACHE_DIR_ENV,
+    BINARY_FILE_VALIDATOR_CACHE_TTL_IN_SECONDS,
+    BINARY_FILE_VALIDATOR_UNCACHED_VERSIONS,
+)
+
+
+@dataclass(frozen=True)
+class VerifiedBinaryCache:
+    cache_dir: str
+    ttl_in_seconds: float = BINARY_FILE_VALIDATOR_CACHE_TTL_IN_SECONDS
+
+    @classmethod
+    def from_env(cls) -> Optional["VerifiedBinaryCache"]:
+        """Returns the cache in the folder set by PC_PRE_VALIDATION_BINARY_CACHE_DIR, None if it is not set"""
+        cache_dir = os.getenv(BINARY_FILE_VALIDATOR_CACHE_DIR_ENV)
+        return cls(cache_dir) if cache_dir else None
+
+    def is_verified(
+        self,
+        repo_path: str,
+        version: str,
+        binary_path: str,
+        access_key_id: Optional[str] = None,
+    ) -> bool:
+        """Checks if the binary was verified less than ttl_in_seconds ago
+
+        Args:
+            - repo_path: the binary repository
+            - version: the binary version
+            - binary_path: the path of the binary in the repository
+            - access_key_id: the credentials the binary was checked with, None for the default ones
+
+        Returns:
+            True if the binary doesn't need to be checked again
+        """
+        if version in BINARY_FILE_VALIDATOR_UNCACHED_VERSIONS:
+            return False
+        entry_path = self._entry_path(repo_path, version, binary_path, access_key_id)
+        try:
+            verified_at = os.path.getmtime(entry_path)
+        except OSError:
+            return False
+        return 0 <= time.time() - verified_at < self.ttl_in_seconds
+
+    def add_verified(
+        self,
+        repo_path: str,
+        version: str,
+        binary_path: str,
+        access_key_id: Optional[str] = None,
+    ) -> None:
+        """Records that the binary exists and can be accessed
+
+        A cache folder that can't be written only disables the cache, and the
+        tags of the tiers are not recorded.
+        """
+        if version in BINARY_FILE_VALIDATOR_UNCACHED_VERSIONS:
+            return
+        entry_path = self._entry_path(repo_path, version, binary_path, access_key_id)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(entry_path, "a"):
+                pass
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+    def _entry_path(
+        self,
+        repo_path: str,
+        version: str,
+        binary_path: str,
+        access_key_id: Optional[str],
+    ) -> str:
+        key = "\n".join((repo_path, version, binary_path, access_key_id or ""))
+        return os.path.join(
+            self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
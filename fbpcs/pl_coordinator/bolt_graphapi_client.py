@@ -15,6 +15,7 @@ from fbpcs.bolt.bolt_client import BoltClient, BoltState
 from fbpcs.bolt.bolt_job import BoltCreateInstanceArgs
 from fbpcs.bolt.constants import FBPCS_GRAPH_API_TOKEN
 from fbpcs.pl_coordinator.exceptions import GraphAPITokenNotFound
+from fbpcs.pl_coordinator.graphapi_session import GraphAPISession
 from fbpcs.private_computation.entity.private_computation_status import (
     PrivateComputationInstanceStatus,
 )
@@ -115,19 +116,37 @@ BoltGraphAPICreateInstanceArgs = TypeVar(
 
 class BoltGraphAPIClient(BoltClient[BoltGraphAPICreateInstanceArgs]):
     def __init__(
-        self, config: Dict[str, Any], logger: Optional[logging.Logger] = None
+        self,
+        config: Dict[str, Any],
+        logger: Optional[logging.Logger] = None,
+        session: Optional[GraphAPISession] = None,
     ) -> None:
         """Bolt GraphAPI Client
 
         Args:
             - config: the graphapi section of the larger config dictionary: config["graphapi"]
             - logger: logger
+            - session: pooled session the requests are sent through. A new one is created if not given,
+                and it is closed by close(). A given session is left open for its owner.
         """
         self.logger: logging.Logger = (
             logging.getLogger(__name__) if logger is None else logger
         )
         self.access_token = self._get_graph_api_token(config)
         self.params = {"access_token": self.access_token}
+        self._owns_session: bool = session is None
+        self.session: GraphAPISession = session or GraphAPISession(logger=self.logger)
+
+    def close(self) -> None:
+        """Closes the connection pool and the request threads of the session, if the client created it"""
+        if self._owns_session:
+            self.session.close()
+
+    async def __aenter__(self) -> "BoltGraphAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
 
     async def create_instance(
         self,
@@ -138,19 +157,19 @@ class BoltGraphAPIClient(BoltClient[BoltGraphAPICreateInstanceArgs]):
             params["breakdown_key"] = json.dumps(instance_args.breakdown_key)
             if instance_args.run_id is not None:
                 params["run_id"] = instance_args.run_id
-            r = requests.post(
+            r = await self.session.post_async(
                 f"{URL}/{instance_args.study_id}/instances", params=params
             )
             self._check_err(r, "creating fb pl instance")
-            return r.json().id
+            return r.json()["id"]
         elif isinstance(instance_args, BoltPAGraphAPICreateInstanceArgs):
             params["attribution_rule"] = instance_args.attribution_rule
             params["timestamp"] = instance_args.timestamp
-            r = requests.post(
+            r = await self.session.post_async(
                 f"{URL}/{instance_args.dataset_id}/instance", params=params
             )
             self._check_err(r, "creating fb pa instance")
-            return r.json().id
+            return r.json()["id"]
         raise TypeError(
             f"Instance args must be of type {BoltPLGraphAPICreateInstanceArgs} or {BoltPAGraphAPICreateInstanceArgs}"
         )
@@ -169,7 +188,7 @@ class BoltGraphAPIClient(BoltClient[BoltGraphAPICreateInstanceArgs]):
     ) -> None:
         params = self.params.copy()
         params["operation"] = "NEXT"
-        r = requests.post(f"{URL}/{instance_id}", params=params)
+        r = await self.session.post_async(f"{URL}/{instance_id}", params=params)
         if stage:
             msg = f"running stage {stage}"
         else:
@@ -220,7 +239,7 @@ class BoltGraphAPIClient(BoltClient[BoltGraphAPICreateInstanceArgs]):
             return False
 
     async def get_instance(self, instance_id: str) -> requests.Response:
-        r = requests.get(f"{URL}/{instance_id}", self.params)
+        r = await self.session.get_async(f"{URL}/{instance_id}", params=self.params)
         self._check_err(r, "getting fb instance")
         return r
 
@@ -34,3 +34,9 @@ PROCESS_WAIT = 1  # interval between starting processes.
 INSTANCE_SLA = 86400  # 16 hr instance sla, 2 tries per stage, total 24 hrs (since the Ent expires after 24 hours)
 
 FBPCS_GRAPH_API_TOKEN = "FBPCS_GRAPH_API_TOKEN"
+
+GRAPHAPI_MAX_CONNECTIONS = 16
+GRAPHAPI_REQUEST_TIMEOUT_SEC = 60
+GRAPHAPI_MAX_RETRIES = 3
+GRAPHAPI_BACKOFF_SEC = 1
+GRAPHAPI_MAX_RETRY_AFTER_SEC = 120
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from fbpcs.pl_coordinator.constants import (
+    GRAPHAPI_BACKOFF_SEC,
+    GRAPHAPI_MAX_CONNECTIONS,
+    GRAPHAPI_MAX_RETRIES,
+    GRAPHAPI_MAX_RETRY_AFTER_SEC,
+    GRAPHAPI_REQUEST_TIMEOUT_SEC,
+)
+
+THROTTLED_STATUS_CODE = 429
+SERVER_ERROR_STATUS_CODES = (500, 502, 503, 504)
+
+
+class GraphAPISession:
+    """Keep-alive connection pool for GraphAPI requests
+
+    Every request has a timeout. Throttled (429) requests are retried for any
+    method, honoring the Retry-After header. Server errors and connection
+    failures are only retried for GET, since a POST may already have been
+    processed.
+
+    The async variants run requests on a thread pool sized to the connection
+    pool, so they don't block the event loop and at most max_connections
+    requests are in flight at once. Waiting between retries doesn't hold a
+    thread.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = GRAPHAPI_MAX_CONNECTIONS,
+        timeout: float = GRAPHAPI_REQUEST_TIMEOUT_SEC,
+        max_retries: int = GRAPHAPI_MAX_RETRIES,
+        backoff: float = GRAPHAPI_BACKOFF_SEC,
+        max_retry_after: float = GRAPHAPI_MAX_RETRY_AFTER_SEC,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.logger: logging.Logger = (
+            logging.getLogger(__name__) if logger is None else logger
+        )
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="graphapi"
+        )
+
+    def get(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        return self.request("GET", url, params)
+
+    def post(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        return self.request("POST", url, params)
+
+    async def get_async(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        return await self.request_async("GET", url, params)
+
+    async def post_async(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        return await self.request_async("POST", url, params)
+
+    def request(
+        self, method: str, url: str, params: Dict[str, Any]
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                r = self._send(method, url, params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self._can_retry_error(method, attempt):
+                    raise
+                delay = self._get_retry_delay(attempt, None)
+                self.logger.warning(f"{method} {url} failed: {e}. Retrying in {delay}s")
+            else:
+                if not self._can_retry_response(method, r, attempt):
+                    return r
+                delay = self._get_retry_delay(attempt, r)
+                self.logger.warning(
+                    f"{method} {url} returned {r.status_code}. Retrying in {delay}s"
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    async def request_async(
+        self, method: str, url: str, params: Dict[str, Any]
+    ) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            try:
+                r = await loop.run_in_executor(
+                    self.executor, functools.partial(self._send, method, url, params)
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self._can_retry_error(method, attempt):
+                    raise
+                delay = self._get_retry_delay(attempt, None)
+                self.logger.warning(f"{method} {url} failed: {e}. Retrying in {delay}s")
+            else:
+                if not self._can_retry_response(method, r, attempt):
+                    return r
+                delay = self._get_retry_delay(attempt, r)
+                self.logger.warning(
+                    f"{method} {url} returned {r.status_code}. Retrying in {delay}s"
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    def _send(self, method: str, url: str, params: Dict[str, Any]) -> requests.Response:
+        return self.session.request(method, url, params=params, timeout=self.timeout)
+
+    def _can_retry_error(self, method: str, attempt: int) -> bool:
+        return method == "GET" and attempt < self.max_retries
+
+    def _can_retry_response(
+        self, method: str, r: requests.Response, attempt: int
+    ) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if r.status_code == THROTTLED_STATUS_CODE:
+            return True
+        return method == "GET" and r.status_code in SERVER_ERROR_STATUS_CODES
+
+    def _get_retry_delay(self, attempt: int, r: Optional[requests.Response]) -> float:
+        retry_after = r.headers.get("Retry-After") if r is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = self.backoff * 2**attempt
+            return min(max(delay, 0), self.max_retry_after)
+        return self.backoff * 2**attempt
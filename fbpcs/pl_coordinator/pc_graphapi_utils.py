@@ -12,6 +12,7 @@ from typing import Any, Dict, List, Optional
 import requests
 from fbpcs.pl_coordinator.constants import FBPCS_GRAPH_API_TOKEN
 from fbpcs.pl_coordinator.exceptions import GraphAPITokenNotFound
+from fbpcs.pl_coordinator.graphapi_session import GraphAPISession
 from fbpcs.private_computation.entity.private_computation_status import (
     PrivateComputationInstanceStatus,
 )
@@ -92,10 +93,28 @@ class PCGraphAPIClient:
     __init__ contains info about all the api end points used by Private Lift
     """
 
-    def __init__(self, config: Dict[str, Any], logger: logging.Logger) -> None:
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        logger: logging.Logger,
+        session: Optional[GraphAPISession] = None,
+    ) -> None:
         self.logger = logger
         self.access_token = self._get_graph_api_token(config)
         self.params = {"access_token": self.access_token}
+        self._owns_session: bool = session is None
+        self.session: GraphAPISession = session or GraphAPISession(logger=logger)
+
+    def close(self) -> None:
+        """Closes the connection pool and the request threads of the session, if the client created it"""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "PCGraphAPIClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _get_graph_api_token(self, config: Dict[str, Any]) -> str:
         f"""Get graph API token from config.yml or the {FBPCS_GRAPH_API_TOKEN} env var
@@ -132,12 +151,12 @@ class PCGraphAPIClient:
     def get_debug_token_data(self) -> requests.Response:
         params = self.params.copy()
         params["input_token"] = self.access_token
-        r = requests.get(f"{URL}/debug_token", params=params)
+        r = self.session.get(f"{URL}/debug_token", params=params)
         self._check_err(r, "getting debug token data")
         return r
 
     def get_instance(self, instance_id: str) -> requests.Response:
-        r = requests.get(
+        r = self.session.get(
             f"{URL}/{instance_id}",
             params=self.params,
         )
@@ -155,7 +174,7 @@ class PCGraphAPIClient:
         params["breakdown_key"] = json.dumps(breakdown_key)
         if run_id is not None:
             params["run_id"] = run_id
-        r = requests.post(f"{URL}/{study_id}/instances", params=params)
+        r = self.session.post(f"{URL}/{study_id}/instances", params=params)
         self._check_err(r, "creating fb instance")
         return r
 
@@ -168,14 +187,14 @@ class PCGraphAPIClient:
         params = self.params.copy()
         params["attribution_rule"] = attribution_rule
         params["timestamp"] = timestamp
-        r = requests.post(f"{URL}/{dataset_id}/instance", params=params)
+        r = self.session.post(f"{URL}/{dataset_id}/instance", params=params)
         self._check_err(r, "creating fb pa instance")
         return r
 
     def invoke_operation(self, instance_id: str, operation: str) -> None:
         params = self.params.copy()
         params["operation"] = operation
-        r = requests.post(
+        r = self.session.post(
             f"{URL}/{instance_id}",
             params=params,
         )
@@ -184,7 +203,7 @@ class PCGraphAPIClient:
     def get_study_data(self, study_id: str, fields: List[str]) -> requests.Response:
         params = self.params.copy()
         params["fields"] = ",".join(fields)
-        r = requests.get(f"{URL}/{study_id}", params=params)
+        r = self.session.get(f"{URL}/{study_id}", params=params)
         self._check_err(r, "getting study data")
         return r
 
@@ -193,13 +212,13 @@ class PCGraphAPIClient:
     ) -> requests.Response:
         params = self.params.copy()
         params["fields"] = ",".join(fields)
-        r = requests.get(f"{URL}/{dataset_id}", params=params)
+        r = self.session.get(f"{URL}/{dataset_id}", params=params)
         self._check_err(r, "getting dataset information")
         return r
 
     def get_existing_pa_instances(self, dataset_id: str) -> requests.Response:
         params = self.params.copy()
-        r = requests.get(f"{URL}/{dataset_id}/instances", params=params)
+        r = self.session.get(f"{URL}/{dataset_id}/instances", params=params)
         self._check_err(r, "getting attribution instances tied to the dataset")
         return r
 
@@ -97,117 +97,119 @@ def run_study(
     _validate_input(objective_ids, input_paths)
 
     # obtain study information
-    client = PCGraphAPIClient(config, logger)
-    study_data = _get_study_data(study_id, client)
+    with PCGraphAPIClient(config, logger) as client:
+        study_data = _get_study_data(study_id, client)
 
-    # Verify study can run private lift:
-    _verify_study_type(study_data)
+        # Verify study can run private lift:
+        _verify_study_type(study_data)
 
-    # verify mpc objectives
-    _verify_mpc_objs(study_data, objective_ids)
+        # verify mpc objectives
+        _verify_mpc_objs(study_data, objective_ids)
 
-    # verify study opp_data_information is non-empty
-    if OPP_DATA_INFORMATION not in study_data:
-        raise PCStudyValidationException(
-            f"Study {study_id} has no opportunity datasets.",
-            f"Check {study_id} study data to include {OPP_DATA_INFORMATION}",
-        )
-
-    ## Step 2. Preparation. Find which cell-obj pairs should have new instances created for and which should use existing
-    ## valid ones. If a valid instance exists for a particular cell-obj pair, use it. Otherwise, try to create one.
+        # verify study opp_data_information is non-empty
+        if OPP_DATA_INFORMATION not in study_data:
+            raise PCStudyValidationException(
+                f"Study {study_id} has no opportunity datasets.",
+                f"Check {study_id} study data to include {OPP_DATA_INFORMATION}",
+            )
 
-    cell_obj_instance = _get_cell_obj_instance(
-        study_data,
-        objective_ids,
-        input_paths,
-    )
-    _print_json(
-        "Existing valid instances for cell-obj pairs", cell_obj_instance, logger
-    )
-    # create new instances
-    _create_new_instances(cell_obj_instance, study_id, client, logger, run_id)
-    _print_json("Instances to run for cell-obj pairs", cell_obj_instance, logger)
-    # create a dict with {instance_id, input_path} pairs
-    instances_input_path = _instance_to_input_path(cell_obj_instance)
-    _print_json(
-        "Instances will be calculated with corresponding input paths",
-        instances_input_path,
-        logger,
-    )
+        ## Step 2. Preparation. Find which cell-obj pairs should have new instances created for and which should use existing
+        ## valid ones. If a valid instance exists for a particular cell-obj pair, use it. Otherwise, try to create one.
 
-    # check that the version in config.yml is same as from graph api
-    _check_versions(cell_obj_instance, config, client)
-    # override stage flow based on pcs feature gate. Please contact PSI team to have a similar adoption
-    stage_flow_override = stage_flow
-    # get the enabled features
-    pcs_features = _get_pcs_features(cell_obj_instance, client)
-    pcs_feature_enums = set()
-    if pcs_features:
-        logger.info(f"Enabled features: {pcs_features}")
-        pcs_feature_enums = {PCSFeature.from_str(feature) for feature in pcs_features}
-        stage_flow_override = get_stage_flow(
-            game_type=PrivateComputationGameType.LIFT,
-            pcs_feature_enums=pcs_feature_enums,
-            stage_flow_cls=stage_flow,
+        cell_obj_instance = _get_cell_obj_instance(
+            study_data,
+            objective_ids,
+            input_paths,
         )
-
-    ## Step 3. Run Instances. Run maximum number of instances in parallel
-
-    # using bolt runner
-    # create the jobs
-    all_instance_ids = []
-    job_list = []
-    for instance_id in instances_input_path.keys():
-        all_instance_ids.append(instance_id)
-        data = instances_input_path[instance_id]
-        input_path = data["input_path"]
-        num_shards = data["num_shards"]
-        cell_id = data["cell_id"]
-        obj_id = data["objective_id"]
-        publisher_args = BoltPlayerArgs(
-            create_instance_args=BoltPLGraphAPICreateInstanceArgs(
-                instance_id=instance_id,
-                study_id=study_id,
-                breakdown_key={
-                    "cell_id": cell_id,
-                    "objective_id": obj_id,
-                },
-                run_id=run_id,
-            )
+        _print_json(
+            "Existing valid instances for cell-obj pairs", cell_obj_instance, logger
         )
-        partner_args = BoltPlayerArgs(
-            create_instance_args=BoltPCSCreateInstanceArgs(
-                instance_id=instance_id,
-                role=PrivateComputationRole.PARTNER,
+        # create new instances
+        _create_new_instances(cell_obj_instance, study_id, client, logger, run_id)
+        _print_json("Instances to run for cell-obj pairs", cell_obj_instance, logger)
+        # create a dict with {instance_id, input_path} pairs
+        instances_input_path = _instance_to_input_path(cell_obj_instance)
+        _print_json(
+            "Instances will be calculated with corresponding input paths",
+            instances_input_path,
+            logger,
+        )
+
+        # check that the version in config.yml is same as from graph api
+        _check_versions(cell_obj_instance, config, client)
+        # override stage flow based on pcs feature gate. Please contact PSI team to have a similar adoption
+        stage_flow_override = stage_flow
+        # get the enabled features
+        pcs_features = _get_pcs_features(cell_obj_instance, client)
+        pcs_feature_enums = set()
+        if pcs_features:
+            logger.info(f"Enabled features: {pcs_features}")
+            pcs_feature_enums = {
+                PCSFeature.from_str(feature) for feature in pcs_features
+            }
+            stage_flow_override = get_stage_flow(
                 game_type=PrivateComputationGameType.LIFT,
-                input_path=input_path,
-                output_dir=output_dir if output_dir else "",
-                num_pid_containers=int(num_shards),
-                num_mpc_containers=int(num_shards),
-                stage_flow_cls=stage_flow_override,
-                result_visibility=result_visibility or ResultVisibility.PUBLIC,
-                pcs_features=pcs_features,
-                run_id=run_id,
+                pcs_feature_enums=pcs_feature_enums,
+                stage_flow_cls=stage_flow,
             )
-        )
-        job = BoltJob(
-            job_name=f"Job [cell_id: {cell_id}][obj_id: {obj_id}]",
-            publisher_bolt_args=publisher_args,
-            partner_bolt_args=partner_args,
-            num_tries=num_tries,
-            final_stage=stage_flow_override.get_last_stage().previous_stage,
-            poll_interval=60,
-        )
-        job_list.append(job)
 
-    asyncio.run(run_bolt(config, logger, job_list))
+        ## Step 3. Run Instances. Run maximum number of instances in parallel
+
+        # using bolt runner
+        # create the jobs
+        all_instance_ids = []
+        job_list = []
+        for instance_id in instances_input_path.keys():
+            all_instance_ids.append(instance_id)
+            data = instances_input_path[instance_id]
+            input_path = data["input_path"]
+            num_shards = data["num_shards"]
+            cell_id = data["cell_id"]
+            obj_id = data["objective_id"]
+            publisher_args = BoltPlayerArgs(
+                create_instance_args=BoltPLGraphAPICreateInstanceArgs(
+                    instance_id=instance_id,
+                    study_id=study_id,
+                    breakdown_key={
+                        "cell_id": cell_id,
+                        "objective_id": obj_id,
+                    },
+                    run_id=run_id,
+                )
+            )
+            partner_args = BoltPlayerArgs(
+                create_instance_args=BoltPCSCreateInstanceArgs(
+                    instance_id=instance_id,
+                    role=PrivateComputationRole.PARTNER,
+                    game_type=PrivateComputationGameType.LIFT,
+                    input_path=input_path,
+                    output_dir=output_dir if output_dir else "",
+                    num_pid_containers=int(num_shards),
+                    num_mpc_containers=int(num_shards),
+                    stage_flow_cls=stage_flow_override,
+                    result_visibility=result_visibility or ResultVisibility.PUBLIC,
+                    pcs_features=pcs_features,
+                    run_id=run_id,
+                )
+            )
+            job = BoltJob(
+                job_name=f"Job [cell_id: {cell_id}][obj_id: {obj_id}]",
+                publisher_bolt_args=publisher_args,
+                partner_bolt_args=partner_args,
+                num_tries=num_tries,
+                final_stage=stage_flow_override.get_last_stage().previous_stage,
+                poll_interval=60,
+            )
+            job_list.append(job)
 
-    ## Step 4: Print out the initial and end states
-    new_cell_obj_instances = _get_cell_obj_instance(
-        _get_study_data(study_id, client),
-        objective_ids,
-        input_paths,
-    )
+        asyncio.run(run_bolt(config, logger, job_list))
+
+        ## Step 4: Print out the initial and end states
+        new_cell_obj_instances = _get_cell_obj_instance(
+            _get_study_data(study_id, client),
+            objective_ids,
+            input_paths,
+        )
     _print_json(
         "Pre-run statuses for instance of each cell-objective pair",
         cell_obj_instance,
@@ -246,24 +248,28 @@ async def run_bolt(
         logger: logger client
         job_list: The BoltJobs to execute
     """
-    # create the runner
-    runner = BoltRunner(
-        publisher_client=BoltGraphAPIClient(config=config["graphapi"], logger=logger),
-        partner_client=BoltPCSClient(
-            _build_private_computation_service(
-                config["private_computation"],
-                config["mpc"],
-                config["pid"],
-                config.get("post_processing_handlers", {}),
-                config.get("pid_post_processing_handlers", {}),
-            )
-        ),
-        logger=logger,
-        max_parallel_runs=MAX_NUM_INSTANCES,
-    )
+    # the publisher client's connection pool is closed once all jobs are done
+    async with BoltGraphAPIClient(
+        config=config["graphapi"], logger=logger
+    ) as publisher_client:
+        # create the runner
+        runner = BoltRunner(
+            publisher_client=publisher_client,
+            partner_client=BoltPCSClient(
+                _build_private_computation_service(
+                    config["private_computation"],
+                    config["mpc"],
+                    config["pid"],
+                    config.get("post_processing_handlers", {}),
+                    config.get("pid_post_processing_handlers", {}),
+                )
+            ),
+            logger=logger,
+            max_parallel_runs=MAX_NUM_INSTANCES,
+        )
 
-    # run all jobs
-    await runner.run_async(job_list)
+        # run all jobs
+        await runner.run_async(job_list)
 
 
 def _validate_input(objective_ids: List[str], input_paths: List[str]) -> None:
@@ -35,7 +35,12 @@ class TestBoltGraphAPIClient(unittest.IsolatedAsyncioTestCase):
     def setUp(self, mock_logger) -> None:
         self.mock_logger = mock_logger
         config = {"access_token": ACCESS_TOKEN}
-        self.test_client = BoltGraphAPIClient(config, mock_logger)
+        self.mock_session = MagicMock()
+        self.mock_session.post_async = AsyncMock(return_value=MagicMock())
+        self.mock_session.get_async = AsyncMock()
+        self.test_client = BoltGraphAPIClient(
+            config, mock_logger, session=self.mock_session
+        )
         self.test_client._check_err = MagicMock()
 
     def test_get_graph_api_token_from_dict(self) -> None:
@@ -75,8 +80,22 @@ class TestBoltGraphAPIClient(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(GraphAPITokenNotFound):
             BoltGraphAPIClient(config, self.mock_logger).access_token
 
-    @patch("fbpcs.pl_coordinator.bolt_graphapi_client.requests.post")
-    async def test_bolt_create_lift_instance(self, mock_post) -> None:
+    def test_close_leaves_a_given_session_open(self) -> None:
+        self.test_client.close()
+        self.mock_session.close.assert_not_called()
+
+    @patch("fbpcs.pl_coordinator.bolt_graphapi_client.GraphAPISession")
+    async def test_async_with_closes_the_created_session(
+        self, mock_session_cls
+    ) -> None:
+        config = {"access_token": ACCESS_TOKEN}
+        async with BoltGraphAPIClient(config, self.mock_logger) as client:
+            self.assertIs(mock_session_cls.return_value, client.session)
+            mock_session_cls.return_value.close.assert_not_called()
+        mock_session_cls.return_value.close.assert_called_once()
+
+    async def test_bolt_create_lift_instance(self) -> None:
+        mock_post = self.mock_session.post_async
         test_pl_args = BoltPLGraphAPICreateInstanceArgs(
             instance_id="test_pl",
             study_id="study_id",
@@ -96,8 +115,8 @@ class TestBoltGraphAPIClient(unittest.IsolatedAsyncioTestCase):
             },
         )
 
-    @patch("fbpcs.pl_coordinator.bolt_graphapi_client.requests.post")
-    async def test_bolt_create_attribution_instance(self, mock_post) -> None:
+    async def test_bolt_create_attribution_instance(self) -> None:
+        mock_post = self.mock_session.post_async
         test_pa_args = BoltPAGraphAPICreateInstanceArgs(
             instance_id="test_pa",
             dataset_id="dataset_id",
@@ -115,8 +134,8 @@ class TestBoltGraphAPIClient(unittest.IsolatedAsyncioTestCase):
             },
         )
 
-    @patch("fbpcs.pl_coordinator.bolt_graphapi_client.requests.post")
-    async def test_bolt_run_stage(self, mock_post) -> None:
+    async def test_bolt_run_stage(self) -> None:
+        mock_post = self.mock_session.post_async
         expected_params = {
             "access_token": ACCESS_TOKEN,
             "operation": "NEXT",
@@ -141,6 +160,12 @@ class TestBoltGraphAPIClient(unittest.IsolatedAsyncioTestCase):
         )
         self.assertEqual(state.server_ips, "1.1.1.1")
 
+    async def test_get_instance(self) -> None:
+        await self.test_client.get_instance("id")
+        self.mock_session.get_async.assert_called_once_with(
+            f"{URL}/id", params={"access_token": ACCESS_TOKEN}
+        )
+
     async def test_validate_results_without_path(self) -> None:
         valid = await self.test_client.validate_results("id")
         self.assertEqual(valid, True)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Set, Tuple
+
+import requests
+
+from fbpcs.pl_coordinator.graphapi_session import GraphAPISession
+
+
+class StandInGraphAPIHandler(BaseHTTPRequestHandler):
+    """Local GraphAPI stand-in
+
+    Paths:
+        /slow: answers after server.latency seconds
+        /throttled: answers 429 with Retry-After: 0 until the second request
+        /error: always answers 500
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: Any
+
+    def do_GET(self) -> None:
+        self._handle()
+
+    def do_POST(self) -> None:
+        self._handle()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _handle(self) -> None:
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+            hits = self.server.hits[self.path]
+            self.server.connections.add(self.client_address)
+        if self.path == "/slow":
+            time.sleep(self.server.latency)
+            self._respond(200)
+        elif self.path == "/throttled" and hits < 2:
+            self._respond(429, headers=[("Retry-After", "0")])
+        elif self.path == "/error":
+            self._respond(500)
+        else:
+            self._respond(200)
+
+    def _respond(self, code: int, headers: List[Tuple[str, str]] = ()) -> None:
+        body = json.dumps({"id": "id", "status": "CREATED"}).encode()
+        self.send_response(code)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestGraphAPISession(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInGraphAPIHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.hits = Counter()
+        self.server.connections: Set[Tuple[str, int]] = set()
+        self.server.latency = 0.2
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.session = GraphAPISession(max_connections=10, backoff=0)
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_async_requests_run_concurrently(self) -> None:
+        num_requests = 20
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[
+                self.session.get_async(f"{self.url}/slow", params={})
+                for _ in range(num_requests)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        # serial requests would take num_requests * latency = 4s; with 10
+        # connections it takes about 2 * latency
+        self.assertLess(elapsed, num_requests * self.server.latency / 3)
+
+    async def test_async_requests_do_not_block_event_loop(self) -> None:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await self.session.get_async(f"{self.url}/slow", params={})
+        ticker.cancel()
+        self.assertGreater(ticks, 5)
+
+    def test_connections_are_reused(self) -> None:
+        for _ in range(10):
+            self.session.get(f"{self.url}/fast", params={})
+        self.assertEqual(len(self.server.connections), 1)
+
+    async def test_throttled_requests_are_retried(self) -> None:
+        for method in ("GET", "POST"):
+            with self.subTest(method=method):
+                self.server.hits.clear()
+                r = await self.session.request_async(
+                    method, f"{self.url}/throttled", params={}
+                )
+                self.assertEqual(r.status_code, 200)
+                self.assertEqual(self.server.hits["/throttled"], 2)
+
+    def test_server_errors_are_only_retried_for_get(self) -> None:
+        for method, expected_hits in (
+            ("GET", self.session.max_retries + 1),
+            ("POST", 1),
+        ):
+            with self.subTest(method=method):
+                self.server.hits.clear()
+                r = self.session.request(method, f"{self.url}/error", params={})
+                self.assertEqual(r.status_code, 500)
+                self.assertEqual(self.server.hits["/error"], expected_hits)
+
+    def test_timeout(self) -> None:
+        session = GraphAPISession(timeout=0.05, max_retries=0)
+        with self.assertRaises(requests.Timeout):
+            session.get(f"{self.url}/slow", params={})
+        session.close()
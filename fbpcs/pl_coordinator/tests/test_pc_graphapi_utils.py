@@ -5,7 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from fbpcs.pl_coordinator.exceptions import GraphAPITokenNotFound
 from fbpcs.pl_coordinator.pc_graphapi_utils import (
@@ -58,3 +58,17 @@ class TestPCGraphAPIUtils(TestCase):
         config = {"graphapi": {"random_field": "not_a_token"}}
         with self.assertRaises(GraphAPITokenNotFound):
             PCGraphAPIClient(config, self.mock_logger).access_token
+
+    @patch("fbpcs.pl_coordinator.pc_graphapi_utils.GraphAPISession")
+    def test_with_closes_the_created_session(self, mock_session_cls) -> None:
+        config = {"graphapi": {"access_token": "from_dict"}}
+        with PCGraphAPIClient(config, self.mock_logger) as client:
+            self.assertIs(mock_session_cls.return_value, client.session)
+            mock_session_cls.return_value.close.assert_not_called()
+        mock_session_cls.return_value.close.assert_called_once()
+
+    def test_close_leaves_a_given_session_open(self) -> None:
+        config = {"graphapi": {"access_token": "from_dict"}}
+        session = MagicMock()
+        PCGraphAPIClient(config, self.mock_logger, session=session).close()
+        session.close.assert_not_called()
@@ -17,6 +17,8 @@ from dataclasses_json import dataclass_json
 class PCValidatorConfig:
     region: str
     pc_pre_validator_enabled: bool = True
+    # Cancel the other validators once one of them fails
+    pc_pre_validator_fail_fast: bool = False
 
     def __str__(self) -> str:
         # pyre-ignore
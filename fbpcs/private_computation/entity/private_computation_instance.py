@@ -15,6 +15,7 @@ from typing import Any, Dict, List, Optional, TYPE_CHECKING, Union
 
 import marshmallow
 
+from dataclasses_json.core import _ExtendedEncoder
 from dataclasses_json.mm import SchemaType
 
 if TYPE_CHECKING:
@@ -27,6 +28,8 @@ if TYPE_CHECKING:
 from pathlib import Path
 
 from fbpcp.entity.mpc_instance import MPCInstanceStatus
+from fbpcs.common.entity import dataclasses_codec
+from fbpcs.common.entity.exceptions import InstanceCodecError
 from fbpcs.common.entity.instance_base import InstanceBase
 from fbpcs.common.entity.pcs_mpc_instance import PCSMPCInstance
 from fbpcs.common.entity.stage_state_instance import (
@@ -70,6 +73,20 @@ class PrivateComputationInstance(InstanceBase):
     product_config: ProductConfig
 
     def dumps_schema(self) -> str:
+        try:
+            json_object = dataclasses_codec.dump(self)
+            json_object["product_config"] = dataclasses_codec.dump(self.product_config)
+        except InstanceCodecError as e:
+            logging.debug(f"Falling back to the marshmallow schema: {e}")
+            return self._dumps_schema_with_marshmallow()
+
+        # this is a helper field used in InstanceBase setter
+        json_object.pop("initialized", None)
+
+        # the encoder dataclasses_json uses in schema().dumps
+        return json.dumps(json_object, cls=_ExtendedEncoder)
+
+    def _dumps_schema_with_marshmallow(self) -> str:
         json_object = json.loads(super().dumps_schema())
 
         # this is a helper field used in InstanceBase setter
@@ -83,7 +100,27 @@ class PrivateComputationInstance(InstanceBase):
     @classmethod
     def loads_schema(cls, json_schema_str: str) -> "PrivateComputationInstance":
         json_object = json.loads(json_schema_str)
+        try:
+            return PrivateComputationInstance(
+                infra_config=dataclasses_codec.load(
+                    InfraConfig, json_object["infra_config"], exclude_unknown=True
+                ),
+                product_config=dataclasses_codec.load(
+                    cls._product_config_cls(json_object),
+                    json_object["product_config"],
+                    exclude_unknown=True,
+                ),
+            )
+        except InstanceCodecError as e:
+            # e.g. instances written by older versions, which the marshmallow
+            # schema knows how to clean up
+            logging.debug(f"Falling back to the marshmallow schema: {e}")
+            return cls._loads_schema_with_marshmallow(json_object)
 
+    @classmethod
+    def _loads_schema_with_marshmallow(
+        cls, json_object: Dict[str, Any]
+    ) -> "PrivateComputationInstance":
         # create infra config
         infra_config: InfraConfig = InfraConfig.schema().loads(
             json.dumps(json_object["infra_config"]),
@@ -119,10 +156,17 @@ class PrivateComputationInstance(InstanceBase):
         """
         return the corresponding SchemaType object based on the product_config type
         """
+        return cls._product_config_cls(json_object).schema()
+
+    @classmethod
+    def _product_config_cls(cls, json_object: Dict[str, Any]) -> "Type[ProductConfig]":
+        """
+        return the ProductConfig subclass based on the product_config type
+        """
         if json_object["infra_config"]["game_type"] == "ATTRIBUTION":
-            return AttributionConfig.schema()
+            return AttributionConfig
         elif json_object["infra_config"]["game_type"] == "LIFT":
-            return LiftConfig.schema()
+            return LiftConfig
         raise RuntimeError(f"Invalid product config: {json_object}")
 
     @classmethod
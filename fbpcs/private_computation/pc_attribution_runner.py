@@ -92,70 +92,71 @@ def run_attribution(
 
     ## Step 1: Validation. Function arguments and  for private attribution run.
     # obtain the values in the dataset info vector.
-    client = PCGraphAPIClient(config, logger)
-    datasets_info = _get_attribution_dataset_info(client, dataset_id, logger)
-    datasets = datasets_info[DATASETS_INFORMATION]
-    matched_data = {}
-    attribution_rule_str = attribution_rule.name
-    attribution_rule_val = attribution_rule.value
-    instance_id = None
-    pacific_timezone = pytz.timezone("US/Pacific")
-    # Validate if input is datetime or timestamp
-    is_date_format = _iso_date_validator(timestamp)
-    if is_date_format:
-        dt = pacific_timezone.localize(datetime.strptime(timestamp, "%Y-%m-%d"))
-    else:
-        dt = datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
-
-    # Compute the argument after the timestamp has been input
-    dt_arg = int(datetime.timestamp(dt))
-
-    # Verify that input has matching dataset info:
-    # a. attribution rule
-    # b. timestamp
-    if len(datasets) == 0:
-        raise ValueError("Dataset for given parameters and dataset invalid")
-    for data in datasets:
-        if data["key"] == attribution_rule_str:
-            matched_attr = data["value"]
-
-    for m_data in matched_attr:
-        m_time = dateutil.parser.parse(m_data[TIMESTAMP])
-        if m_time == dt:
-            matched_data = m_data
-            break
-    if len(matched_data) == 0:
-        raise ValueError("No dataset matching to the information provided")
-    # Step 2: Validate what instances need to be created vs what already exist
-    # Conditions for retry:
-    # 1. Not in a terminal status
-    # 2. Instance has been created > 1d ago
-    dataset_instance_data = _get_existing_pa_instances(client, dataset_id)
-    existing_instances = dataset_instance_data["data"]
-    for inst in existing_instances:
-        inst_time = dateutil.parser.parse(inst[TIMESTAMP])
-        creation_time = dateutil.parser.parse(inst[CREATED_TIME])
-        exp_time = datetime.now(tz=timezone.utc) - timedelta(days=1)
-        expired = exp_time > creation_time
-        if (
-            inst[ATTRIBUTION_RULE] == attribution_rule_val
-            and inst_time == dt
-            and inst[STATUS] not in TERMINAL_STATUSES
-            and not expired
-        ):
-            instance_id = inst["id"]
-            break
-
-    if instance_id is None:
-        instance_id = _create_new_instance(
-            dataset_id,
-            int(dt_arg),
-            attribution_rule_val,
-            client,
-            logger,
-        )
-    instance_data = _get_pa_instance_info(client, instance_id, logger)
-    _check_version(instance_data, config)
+    # the client is only needed to find or create the instance
+    with PCGraphAPIClient(config, logger) as client:
+        datasets_info = _get_attribution_dataset_info(client, dataset_id, logger)
+        datasets = datasets_info[DATASETS_INFORMATION]
+        matched_data = {}
+        attribution_rule_str = attribution_rule.name
+        attribution_rule_val = attribution_rule.value
+        instance_id = None
+        pacific_timezone = pytz.timezone("US/Pacific")
+        # Validate if input is datetime or timestamp
+        is_date_format = _iso_date_validator(timestamp)
+        if is_date_format:
+            dt = pacific_timezone.localize(datetime.strptime(timestamp, "%Y-%m-%d"))
+        else:
+            dt = datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+        # Compute the argument after the timestamp has been input
+        dt_arg = int(datetime.timestamp(dt))
+
+        # Verify that input has matching dataset info:
+        # a. attribution rule
+        # b. timestamp
+        if len(datasets) == 0:
+            raise ValueError("Dataset for given parameters and dataset invalid")
+        for data in datasets:
+            if data["key"] == attribution_rule_str:
+                matched_attr = data["value"]
+
+        for m_data in matched_attr:
+            m_time = dateutil.parser.parse(m_data[TIMESTAMP])
+            if m_time == dt:
+                matched_data = m_data
+                break
+        if len(matched_data) == 0:
+            raise ValueError("No dataset matching to the information provided")
+        # Step 2: Validate what instances need to be created vs what already exist
+        # Conditions for retry:
+        # 1. Not in a terminal status
+        # 2. Instance has been created > 1d ago
+        dataset_instance_data = _get_existing_pa_instances(client, dataset_id)
+        existing_instances = dataset_instance_data["data"]
+        for inst in existing_instances:
+            inst_time = dateutil.parser.parse(inst[TIMESTAMP])
+            creation_time = dateutil.parser.parse(inst[CREATED_TIME])
+            exp_time = datetime.now(tz=timezone.utc) - timedelta(days=1)
+            expired = exp_time > creation_time
+            if (
+                inst[ATTRIBUTION_RULE] == attribution_rule_val
+                and inst_time == dt
+                and inst[STATUS] not in TERMINAL_STATUSES
+                and not expired
+            ):
+                instance_id = inst["id"]
+                break
+
+        if instance_id is None:
+            instance_id = _create_new_instance(
+                dataset_id,
+                int(dt_arg),
+                attribution_rule_val,
+                client,
+                logger,
+            )
+        instance_data = _get_pa_instance_info(client, instance_id, logger)
+        _check_version(instance_data, config)
     # override stage flow based on pcs feature gate. Please contact PSI team to have a similar adoption
     stage_flow_override = stage_flow
     # get the enabled features
@@ -208,8 +209,9 @@ def run_attribution(
         final_stage=stage_flow_override.get_last_stage().previous_stage,
         poll_interval=60,
     )
+    publisher_client = BoltGraphAPIClient(config=config["graphapi"], logger=logger)
     runner = BoltRunner(
-        publisher_client=BoltGraphAPIClient(config=config["graphapi"], logger=logger),
+        publisher_client=publisher_client,
         partner_client=BoltPCSClient(
             _build_private_computation_service(
                 config["private_computation"],
@@ -226,7 +228,10 @@ def run_attribution(
     # Step 4. Run instances async
 
     logger.info(f"Started running instance {instance_id}.")
-    all_run_success = asyncio.run(runner.run_async([job]))
+    try:
+        all_run_success = asyncio.run(runner.run_async([job]))
+    finally:
+        publisher_client.close()
     logger.info(f"Finished running instance {instance_id}.")
     if not all(all_run_success):
         sys.exit(1)
@@ -287,14 +292,13 @@ def _get_pcs_features(instance: Dict[str, Any]) -> Optional[List[str]]:
 def get_attribution_dataset_info(
     config: Dict[str, Any], dataset_id: str, logger: logging.Logger
 ) -> str:
-    client = PCGraphAPIClient(config, logger)
-
-    return json.loads(
-        client.get_attribution_dataset_info(
-            dataset_id,
-            [DATASETS_INFORMATION],
-        ).text
-    )
+    with PCGraphAPIClient(config, logger) as client:
+        return json.loads(
+            client.get_attribution_dataset_info(
+                dataset_id,
+                [DATASETS_INFORMATION],
+            ).text
+        )
 
 
 def _get_pa_instance_info(
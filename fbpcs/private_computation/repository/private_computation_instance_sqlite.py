@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fbpcs.common.repository.instance_local import LocalInstanceRepository
+from fbpcs.common.repository.instance_sqlite import SqliteInstanceRepository
+from fbpcs.private_computation.entity.private_computation_instance import (
+    PrivateComputationInstance,
+)
+from fbpcs.private_computation.entity.private_computation_status import (
+    PrivateComputationInstanceStatus,
+)
+from fbpcs.private_computation.repository.private_computation_instance import (
+    PrivateComputationInstanceRepository,
+)
+
+
+class SqlitePrivateComputationInstanceRepository(PrivateComputationInstanceRepository):
+    """Private computation instance repository backed by a SQLite database
+
+    Each instance object returned by read (or passed to create or update) is
+    tracked with the version it was read or written at. Updating it is checked
+    against that version, so an update based on a stale read (e.g. another
+    coroutine or process updated the instance in between) raises
+    InstanceVersionConflictError instead of silently overwriting the other
+    update. Instance objects the repository hasn't seen are updated unchecked.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.repo = SqliteInstanceRepository(db_path)
+        # Versions keyed by the id() of the instance objects, since instances
+        # are unhashable dataclasses. An entry is dropped when its instance is
+        # garbage collected, before its id() can be reused.
+        self._versions: Dict[int, int] = {}
+        self.logger: logging.Logger = logging.getLogger(__name__)
+
+    def create(self, instance: PrivateComputationInstance) -> None:
+        version = self.repo.create(
+            instance, status=self._get_status(instance), stage=self._get_stage(instance)
+        )
+        self._set_version(instance, version)
+
+    def read(self, instance_id: str) -> PrivateComputationInstance:
+        data, version = self.repo.read_with_version(instance_id)
+        instance = PrivateComputationInstance.loads_schema(data)
+        self._set_version(instance, version)
+        return instance
+
+    def update(self, instance: PrivateComputationInstance) -> None:
+        version = self.repo.update(
+            instance,
+            status=self._get_status(instance),
+            stage=self._get_stage(instance),
+            expected_version=self._versions.get(id(instance)),
+        )
+        self._set_version(instance, version)
+
+    def delete(self, instance_id: str) -> None:
+        self.repo.delete(instance_id)
+
+    def list_instance_ids(
+        self,
+        status: Optional[PrivateComputationInstanceStatus] = None,
+        stage: Optional[str] = None,
+    ) -> List[str]:
+        """Lists instance ids by status and/or current stage name, using the indexes"""
+        return self.repo.list_instance_ids(
+            status=status.value if status is not None else None, stage=stage
+        )
+
+    def import_local_instances(self, base_dir: str) -> int:
+        """Copies the instances of a LocalPrivateComputationInstanceRepository directory
+
+        Instances that already exist in the database are left untouched, so
+        the import can be rerun after an interruption.
+
+        Returns:
+            The number of instances imported
+        """
+        local_repo = LocalInstanceRepository(base_dir)
+        imported = 0
+        for path in sorted(Path(base_dir).iterdir()):
+            if not path.is_file() or self.repo.exists(path.name):
+                continue
+            try:
+                instance = PrivateComputationInstance.loads_schema(
+                    local_repo.read(path.name)
+                )
+            except Exception as e:
+                self.logger.warning(f"Skipping {path}, not a valid instance: {e}")
+                continue
+            self.create(instance)
+            imported += 1
+        return imported
+
+    def _set_version(self, instance: PrivateComputationInstance, version: int) -> None:
+        key = id(instance)
+        if key not in self._versions:
+            weakref.finalize(instance, self._versions.pop, key, None)
+        self._versions[key] = version
+
+    @staticmethod
+    def _get_status(instance: PrivateComputationInstance) -> str:
+        return instance.infra_config.status.value
+
+    @staticmethod
+    def _get_stage(instance: PrivateComputationInstance) -> Optional[str]:
+        try:
+            return instance.current_stage.name
+        except ValueError:
+            # statuses like UNKNOWN don't belong to a stage
+            return None
@@ -108,6 +108,7 @@ class PCPreValidationStageService(PrivateComputationStageService):
             pc_instance.product_config.common.input_path,
             region,
             binary_config,
+            fail_fast=self._pc_validator_config.pc_pre_validator_fail_fast,
         )
         env_vars = {}
         if binary_config.repository_path:
@@ -44,7 +44,12 @@ class PreValidateService:
             env_vars[ONEDOCKER_REPOSITORY_PATH] = binary_config.repository_path
 
         cmd_args = [
-            get_cmd_args(input_path, region, binary_config)
+            get_cmd_args(
+                input_path,
+                region,
+                binary_config,
+                fail_fast=pc_service.pc_validator_config.pc_pre_validator_fail_fast,
+            )
             for input_path in input_paths
         ]
 
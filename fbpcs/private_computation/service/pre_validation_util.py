@@ -10,14 +10,18 @@ from fbpcs.onedocker_binary_config import OneDockerBinaryConfig
 
 
 def get_cmd_args(
-    input_path: str, region: str, binary_config: OneDockerBinaryConfig
+    input_path: str,
+    region: str,
+    binary_config: OneDockerBinaryConfig,
+    fail_fast: bool = False,
 ) -> str:
-    return " ".join(
-        [
-            f"--input-file-path={input_path}",
-            "--cloud-provider=AWS",
-            f"--region={region}",
-            # pc_pre_validation assumes all other binaries runs on the same version tag as its own
-            f"--binary-version={binary_config.binary_version}",
-        ]
-    )
+    args = [
+        f"--input-file-path={input_path}",
+        "--cloud-provider=AWS",
+        f"--region={region}",
+        # pc_pre_validation assumes all other binaries runs on the same version tag as its own
+        f"--binary-version={binary_config.binary_version}",
+    ]
+    if fail_fast:
+        args.append("--fail-fast")
+    return " ".join(args)
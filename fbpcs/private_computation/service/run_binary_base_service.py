@@ -13,6 +13,10 @@ from typing import Dict, List, Optional
 from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
 from fbpcp.error.pcp import ThrottlingError
 from fbpcp.service.onedocker import OneDockerService
+from fbpcs.common.service.container_refresh import (
+    CONTAINER_END_STATES,
+    get_containers_batched_async,
+)
 from fbpcs.experimental.cloud_logs.log_retriever import CloudProvider, LogRetriever
 
 from fbpcs.private_computation.service.constants import DEFAULT_CONTAINER_TIMEOUT_IN_SEC
@@ -87,27 +91,43 @@ class RunBinaryBaseService:
         containers: List[ContainerInstance],
         poll: int = DEFAULT_WAIT_FOR_CONTAINER_POLL,
     ) -> List[ContainerInstance]:
+        """Polls all of the running containers together until they stop
+
+        Every poll looks up the containers that are still running with batched
+        get_containers calls. Returns as soon as every container completed, or
+        as soon as one of them failed or could not be found.
+        """
         updated_containers = containers.copy()
-        end_states = {
-            ContainerInstanceStatus.COMPLETED,
-            ContainerInstanceStatus.FAILED,
-        }
+        pending = []
         for i, container in enumerate(updated_containers):
-            instance_id = container.instance_id
-            onedocker_svc.logger.info(
-                f"Waiting for container {instance_id} to complete"
-            )
-            status = container.status
-            while status not in end_states:
-                await asyncio.sleep(poll)
-                container = onedocker_svc.get_containers([instance_id])[0]
-                if not container:
-                    break
-                status = container.status
-                updated_containers[i] = container
-            if status is not ContainerInstanceStatus.COMPLETED:
+            if container.status is ContainerInstanceStatus.FAILED:
                 onedocker_svc.logger.warning(
-                    f"Container {instance_id} failed with status {status}"
+                    f"Container {container.instance_id} failed with status {container.status}"
                 )
                 return updated_containers
+            if container.status not in CONTAINER_END_STATES:
+                onedocker_svc.logger.info(
+                    f"Waiting for container {container.instance_id} to complete"
+                )
+                pending.append(i)
+
+        while pending:
+            await asyncio.sleep(poll)
+            latest = await get_containers_batched_async(
+                onedocker_svc,
+                [updated_containers[i].instance_id for i in pending],
+            )
+            still_pending = []
+            for i, container in zip(pending, latest):
+                if container is not None:
+                    updated_containers[i] = container
+                status = updated_containers[i].status
+                if container is None or status is ContainerInstanceStatus.FAILED:
+                    onedocker_svc.logger.warning(
+                        f"Container {updated_containers[i].instance_id} failed with status {status}"
+                    )
+                    return updated_containers
+                if status not in CONTAINER_END_STATES:
+                    still_pending.append(i)
+            pending = still_pending
         return updated_containers
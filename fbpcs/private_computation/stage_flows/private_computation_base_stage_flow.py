@@ -65,9 +65,9 @@ class PrivateComputationBaseStageFlow(StageFlow):
         Raises:
             PCStageFlowNotFoundException: raises when no subclass with the name 'name' is found
         """
-        for subclass in cls.__subclasses__():
-            if name == subclass.__name__:
-                return subclass
+        subclass = cls._stage_flow_subclasses.get(name)
+        if subclass is not None:
+            return subclass
         raise PCStageFlowNotFoundException(
             f"Could not find subclass with {name=}. Make sure it has been imported in stage_flows/__init__.py"
         )
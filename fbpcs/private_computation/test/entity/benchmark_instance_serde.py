@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Microbenchmark of PrivateComputationInstance serialization
+
+Compares the compiled codec used by dumps_schema/loads_schema with the
+marshmallow schema path on instances with a growing number of stage
+histories (infra_config.instances and status_updates).
+
+Usage: python -m fbpcs.private_computation.test.entity.benchmark_instance_serde
+"""
+
+import json
+import warnings
+
+from fbpcs.common.tests.benchmark_utils import time_per_call
+from fbpcs.private_computation.entity.infra_config import StatusUpdate
+from fbpcs.private_computation.entity.private_computation_instance import (
+    PrivateComputationInstance,
+)
+from fbpcs.private_computation.entity.private_computation_status import (
+    PrivateComputationInstanceStatus,
+)
+from fbpcs.private_computation.test.entity.generate_instance_json import (
+    gen_dummy_mpc_instance,
+    gen_dummy_pc_instance,
+    gen_dummy_post_processing_instance,
+    gen_dummy_stage_state_instance,
+)
+
+NUM_STAGE_HISTORIES = (1, 10, 100)
+
+
+def gen_pc_instance_with_history(num_stages: int) -> PrivateComputationInstance:
+    """Creates a dummy instance that has run num_stages stages"""
+    pc_instance = gen_dummy_pc_instance()
+    infra_config = pc_instance.infra_config
+    for i in range(num_stages):
+        infra_config.instances.extend(
+            (
+                gen_dummy_stage_state_instance(),
+                gen_dummy_mpc_instance(),
+                gen_dummy_post_processing_instance(),
+            )
+        )
+        infra_config.status_updates.append(
+            StatusUpdate(
+                status=PrivateComputationInstanceStatus.COMPUTATION_COMPLETED,
+                status_update_ts=i,
+                status_update_ts_delta=1,
+            )
+        )
+    return pc_instance
+
+
+def main() -> None:
+    print(
+        f"{'stages':>8} {'op':>6} {'schema ms':>10} {'compiled ms':>12} {'speedup':>8}"
+    )
+    for num_stages in NUM_STAGE_HISTORIES:
+        pc_instance = gen_pc_instance_with_history(num_stages)
+        json_str = pc_instance.dumps_schema()
+        assert json_str == pc_instance._dumps_schema_with_marshmallow()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for op, schema_fn, compiled_fn in (
+                (
+                    "dumps",
+                    pc_instance._dumps_schema_with_marshmallow,
+                    pc_instance.dumps_schema,
+                ),
+                (
+                    "loads",
+                    lambda: PrivateComputationInstance._loads_schema_with_marshmallow(
+                        json.loads(json_str)
+                    ),
+                    lambda: PrivateComputationInstance.loads_schema(json_str),
+                ),
+            ):
+                schema_sec = time_per_call(schema_fn, repeat=3)
+                compiled_sec = time_per_call(compiled_fn, repeat=3)
+                print(
+                    f"{num_stages:>8} {op:>6} {schema_sec * 1000:>10.2f} "
+                    f"{compiled_sec * 1000:>12.2f} {schema_sec / compiled_sec:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,41 @@ from fbpcs.private_computation.entity.infra_config import (
 from fbpcs.private_computation.entity.private_computation_instance import (
     PrivateComputationInstanceStatus,
 )
+from fbpcs.private_computation.stage_flows.exceptions import (
+    PCStageFlowNotFoundException,
+)
+from fbpcs.private_computation.stage_flows.private_computation_base_stage_flow import (
+    PrivateComputationBaseStageFlow,
+)
 
 
 class TestInfraConfig(unittest.TestCase):
+    def _get_infra_config(self, stage_flow_cls_name: str) -> InfraConfig:
+        return InfraConfig(
+            instance_id="test_instance_123",
+            role=PrivateComputationRole.PARTNER,
+            status=PrivateComputationInstanceStatus.CREATED,
+            status_update_ts=123,
+            instances=[],
+            game_type=PrivateComputationGameType.ATTRIBUTION,
+            num_pid_containers=10,
+            num_mpc_containers=20,
+            num_files_per_mpc_container=100,
+            status_updates=[],
+            _stage_flow_cls_name=stage_flow_cls_name,
+        )
+
     def test_stage_flow(self) -> None:
-        pass
+        subclasses = PrivateComputationBaseStageFlow.__subclasses__()
+        self.assertTrue(subclasses)
+        for stage_flow in subclasses:
+            with self.subTest(stage_flow.__name__):
+                config = self._get_infra_config(stage_flow.__name__)
+                self.assertIs(stage_flow, config.stage_flow)
+
+        config = self._get_infra_config("PrivateComputationBaseStageFlow")
+        with self.assertRaises(PCStageFlowNotFoundException):
+            config.stage_flow
 
     def test_is_stage_flow_completed(self) -> None:
         pass
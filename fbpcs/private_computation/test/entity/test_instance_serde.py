@@ -6,11 +6,15 @@
 
 # pyre-strict
 
+import json
 import unittest
+from dataclasses import replace
+from unittest.mock import patch
 
 from fbpcs.common.entity.pcs_mpc_instance import PCSMPCInstance
 from fbpcs.common.entity.stage_state_instance import StageStateInstance
 
+from fbpcs.private_computation.entity.pcs_feature import PCSFeature
 from fbpcs.private_computation.entity.private_computation_instance import (
     PrivateComputationInstance,
 )
@@ -94,3 +98,35 @@ class TestInstanceSerde(unittest.TestCase):
         # this tests that new fields can be serialized
         pc_instance = gen_dummy_pc_instance()
         pc_instance.dumps_schema()
+
+    def test_pc_serialization_matches_schema(self) -> None:
+        # dumps_schema/loads_schema use a compiled codec, which must produce
+        # exactly what the marshmallow schema does
+        pc_instance = gen_dummy_pc_instance()
+        pc_instance.infra_config = replace(
+            pc_instance.infra_config, pcs_features={PCSFeature.PCS_DUMMY}
+        )
+
+        json_str = pc_instance.dumps_schema()
+        self.assertEqual(json_str, pc_instance._dumps_schema_with_marshmallow())
+
+        loaded = PrivateComputationInstance.loads_schema(json_str)
+        self.assertEqual(
+            loaded,
+            PrivateComputationInstance._loads_schema_with_marshmallow(
+                json.loads(json_str)
+            ),
+        )
+        self.assertEqual(loaded.dumps_schema(), json_str)
+
+    def test_pc_deserialization_falls_back_to_schema(self) -> None:
+        # old instances (e.g. with a PIDInstance) are handled by the schema
+        with open(LIFT_PC_PATH) as f:
+            instance_json = f.read().strip()
+        with patch.object(
+            PrivateComputationInstance,
+            "_loads_schema_with_marshmallow",
+            wraps=PrivateComputationInstance._loads_schema_with_marshmallow,
+        ) as loads_with_marshmallow:
+            PrivateComputationInstance.loads_schema(instance_json)
+        loads_with_marshmallow.assert_called_once()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, PropertyMock
+
+from fbpcs.common.repository.exceptions import InstanceVersionConflictError
+from fbpcs.private_computation.entity.infra_config import (
+    InfraConfig,
+    PrivateComputationGameType,
+)
+from fbpcs.private_computation.entity.private_computation_instance import (
+    PrivateComputationInstance,
+    PrivateComputationInstanceStatus,
+    PrivateComputationRole,
+)
+from fbpcs.private_computation.entity.product_config import (
+    CommonProductConfig,
+    LiftConfig,
+)
+from fbpcs.private_computation.repository.private_computation_instance_local import (
+    LocalPrivateComputationInstanceRepository,
+)
+from fbpcs.private_computation.repository.private_computation_instance_sqlite import (
+    SqlitePrivateComputationInstanceRepository,
+)
+
+
+class TestSqlitePrivateComputationInstanceRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "instances.db")
+        self.repo = SqlitePrivateComputationInstanceRepository(self.db_path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_create_read_update_delete(self) -> None:
+        instance = self._get_pc_instance("id1")
+        self.repo.create(instance)
+        self.assertEqual(self.repo.read("id1"), instance)
+
+        instance.update_status(
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED, self.repo.logger
+        )
+        self.repo.update(instance)
+        self.assertEqual(
+            self.repo.read("id1").infra_config.status,
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED,
+        )
+
+        self.repo.delete("id1")
+        with self.assertRaises(RuntimeError):
+            self.repo.read("id1")
+
+    def test_lost_update_is_detected(self) -> None:
+        self.repo.create(self._get_pc_instance("id1"))
+        other_repo = SqlitePrivateComputationInstanceRepository(self.db_path)
+
+        instance = self.repo.read("id1")
+        other_instance = other_repo.read("id1")
+        other_instance.infra_config.status = (
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED
+        )
+        other_repo.update(other_instance)
+
+        instance.infra_config.status = PrivateComputationInstanceStatus.CREATION_FAILED
+        with self.assertRaises(InstanceVersionConflictError):
+            self.repo.update(instance)
+
+        # after reading the latest version, the update goes through
+        instance = self.repo.read("id1")
+        self.repo.update(instance)
+
+    def test_lost_update_between_stale_reads_is_detected(self) -> None:
+        self.repo.create(self._get_pc_instance("id1"))
+
+        # two reads through the same repository, like concurrent coroutines
+        # sharing it
+        instance_a = self.repo.read("id1")
+        instance_b = self.repo.read("id1")
+        instance_b.infra_config.status = (
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED
+        )
+        self.repo.update(instance_b)
+
+        instance_a.infra_config.status = (
+            PrivateComputationInstanceStatus.CREATION_FAILED
+        )
+        with self.assertRaises(InstanceVersionConflictError):
+            self.repo.update(instance_a)
+        self.assertEqual(
+            self.repo.read("id1").infra_config.status,
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED,
+        )
+
+        # the instance that was written can keep being updated
+        instance_b.infra_config.status = (
+            PrivateComputationInstanceStatus.ID_MATCHING_COMPLETED
+        )
+        self.repo.update(instance_b)
+
+    def test_list_instance_ids(self) -> None:
+        self.repo.create(self._get_pc_instance("created"))
+        started = self._get_pc_instance("started")
+        started.infra_config.status = (
+            PrivateComputationInstanceStatus.ID_MATCHING_STARTED
+        )
+        self.repo.create(started)
+
+        self.assertEqual(
+            self.repo.list_instance_ids(
+                status=PrivateComputationInstanceStatus.ID_MATCHING_STARTED
+            ),
+            ["started"],
+        )
+        self.assertEqual(
+            self.repo.list_instance_ids(stage=started.current_stage.name),
+            ["started"],
+        )
+
+    def test_status_without_a_stage(self) -> None:
+        instance = self._get_pc_instance("unknown")
+        instance.infra_config.status = PrivateComputationInstanceStatus.UNKNOWN
+        self.repo.create(instance)
+
+        self.assertEqual(self.repo.read("unknown"), instance)
+        self.assertEqual(
+            self.repo.list_instance_ids(
+                status=PrivateComputationInstanceStatus.UNKNOWN
+            ),
+            ["unknown"],
+        )
+
+    def test_stage_errors_are_not_hidden(self) -> None:
+        with patch.object(
+            PrivateComputationInstance,
+            "current_stage",
+            new_callable=PropertyMock,
+            side_effect=TypeError("bug"),
+        ), self.assertRaises(TypeError):
+            self.repo.create(self._get_pc_instance("id1"))
+
+    def test_import_local_instances(self) -> None:
+        local_dir = os.path.join(self.tmp_dir.name, "local")
+        os.mkdir(local_dir)
+        local_repo = LocalPrivateComputationInstanceRepository(local_dir)
+        instances = [self._get_pc_instance(f"id{i}") for i in range(3)]
+        for instance in instances:
+            local_repo.create(instance)
+        with open(os.path.join(local_dir, "not_an_instance"), "w") as f:
+            f.write("{}")
+
+        self.assertEqual(self.repo.import_local_instances(local_dir), 3)
+        for instance in instances:
+            self.assertEqual(self.repo.read(instance.get_instance_id()), instance)
+        # rerunning the import skips existing instances
+        self.assertEqual(self.repo.import_local_instances(local_dir), 0)
+
+    def _get_pc_instance(self, instance_id: str) -> PrivateComputationInstance:
+        infra_config: InfraConfig = InfraConfig(
+            instance_id=instance_id,
+            role=PrivateComputationRole.PUBLISHER,
+            status=PrivateComputationInstanceStatus.CREATED,
+            status_update_ts=1600000000,
+            instances=[],
+            game_type=PrivateComputationGameType.LIFT,
+            num_pid_containers=4,
+            num_mpc_containers=4,
+            num_files_per_mpc_container=40,
+            mpc_compute_concurrency=1,
+            status_updates=[],
+        )
+        return PrivateComputationInstance(
+            infra_config=infra_config,
+            product_config=LiftConfig(
+                common=CommonProductConfig(input_path="in", output_dir="out"),
+            ),
+        )
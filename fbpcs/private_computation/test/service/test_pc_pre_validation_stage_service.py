@@ -147,6 +147,39 @@ class TestPCPreValidationStageService(IsolatedAsyncioTestCase):
             pc_instance.infra_config.instances, [mock_stage_state_instance()]
         )
 
+    @patch.object(RunBinaryBaseService, "start_containers")
+    async def test_run_async_passes_fail_fast_to_the_pre_validator(
+        self, mock_run_binary_base_service_start_containers
+    ) -> None:
+        mock_run_binary_base_service_start_containers.return_value = [MagicMock()]
+        region = "us-west-1"
+        expected_cmd_args = " ".join(
+            [
+                f"--input-file-path={self._pc_instance.product_config.common.input_path}",
+                "--cloud-provider=AWS",
+                f"--region={region}",
+                "--binary-version=latest",
+                "--fail-fast",
+            ]
+        )
+        pc_validator_config = PCValidatorConfig(
+            region=region,
+            pc_pre_validator_enabled=True,
+            pc_pre_validator_fail_fast=True,
+        )
+        stage_service = PCPreValidationStageService(
+            pc_validator_config, MagicMock(), self.onedocker_binary_config_map
+        )
+
+        await stage_service.run_async(self._pc_instance)
+
+        self.assertEqual(
+            [expected_cmd_args],
+            mock_run_binary_base_service_start_containers.call_args.kwargs[
+                "cmd_args_list"
+            ],
+        )
+
     @patch(
         "fbpcs.private_computation.service.pc_pre_validation_stage_service.get_pc_status_from_stage_state"
     )
@@ -9,6 +9,7 @@ from unittest.mock import patch
 
 from fbpcp.entity.container_instance import ContainerInstance, ContainerInstanceStatus
 from fbpcp.service.onedocker import OneDockerService
+from fbpcs.common.service.test.fake_container_service import FakeContainerService
 from fbpcs.private_computation.service.run_binary_base_service import (
     RunBinaryBaseService,
 )
@@ -45,10 +46,10 @@ class TestWaitForContainersAsync(IsolatedAsyncioTestCase):
             ContainerInstanceStatus.COMPLETED,
         )
 
+        # all of the running containers are polled together
         get_containers.side_effect = [
-            [container_1_start],
+            [container_1_start, container_2_complete],
             [container_1_complete],
-            [container_2_complete],
         ]
 
         containers = [
@@ -62,6 +63,15 @@ class TestWaitForContainersAsync(IsolatedAsyncioTestCase):
 
         self.assertEqual(updated_containers[0], container_1_complete)
         self.assertEqual(updated_containers[1], container_2_complete)
+        self.assertEqual(
+            [
+                mock.call(
+                    [container_1_start.instance_id, container_2_start.instance_id]
+                ),
+                mock.call([container_1_start.instance_id]),
+            ],
+            get_containers.call_args_list,
+        )
 
     @mock.patch("fbpcp.service.onedocker.OneDockerService.get_containers")
     async def test_wait_for_containers_fail(self, get_containers) -> None:
@@ -89,8 +99,7 @@ class TestWaitForContainersAsync(IsolatedAsyncioTestCase):
         )
 
         get_containers.side_effect = [
-            [container_1_start],
-            [container_1_complete],
+            [container_1_complete, container_2_start],
             [container_2_fail],
         ]
 
@@ -105,3 +114,36 @@ class TestWaitForContainersAsync(IsolatedAsyncioTestCase):
 
         self.assertEqual(updated_containers[0], container_1_complete)
         self.assertEqual(updated_containers[1], container_2_fail)
+
+    async def test_wait_for_containers_stops_on_first_failure(self) -> None:
+        container_svc = FakeContainerService(lookups_to_stop=3)
+        onedocker_svc = OneDockerService(container_svc, "task_def")
+        containers = [container_svc.add_container(f"container_{i}") for i in range(4)]
+        container_svc.final_statuses["container_2"] = ContainerInstanceStatus.FAILED
+        # container_2 fails on the first poll, the others would take 3 polls
+        container_svc.lookups["container_2"] = 2
+
+        updated_containers = await RunBinaryBaseService.wait_for_containers_async(
+            onedocker_svc, containers, poll=0
+        )
+
+        self.assertEqual(1, len(container_svc.get_instances_calls))
+        self.assertEqual(ContainerInstanceStatus.FAILED, updated_containers[2].status)
+
+    async def test_wait_for_containers_with_latency(self) -> None:
+        container_svc = FakeContainerService(latency=0.01, lookups_to_stop=2)
+        onedocker_svc = OneDockerService(container_svc, "task_def")
+        containers = [container_svc.add_container(f"container_{i}") for i in range(50)]
+
+        updated_containers = await RunBinaryBaseService.wait_for_containers_async(
+            onedocker_svc, containers, poll=0
+        )
+
+        # one get_containers call per poll instead of one per container
+        self.assertEqual(2, len(container_svc.get_instances_calls))
+        self.assertTrue(
+            all(
+                container.status is ContainerInstanceStatus.COMPLETED
+                for container in updated_containers
+            )
+        )
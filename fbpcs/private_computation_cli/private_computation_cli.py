@@ -315,9 +315,9 @@ def main(argv: Optional[List[str]] = None) -> None:
 
     # validate token before run study/attribution
     if arguments["run_attribution"] or arguments["run_study"]:
-        graph_client = PCGraphAPIClient(config=config, logger=logger)
-        token_validator = TokenValidator(client=graph_client)
-        token_validator.validate_common_rules()
+        with PCGraphAPIClient(config=config, logger=logger) as graph_client:
+            token_validator = TokenValidator(client=graph_client)
+            token_validator.validate_common_rules()
 
     if arguments["create_instance"]:
         logger.info(f"Create instance: {instance_id}")
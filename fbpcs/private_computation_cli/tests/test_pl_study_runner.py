@@ -81,6 +81,7 @@ class TestPlStudyRunner(TestCase):
         self.mock_graph_api_client = mock_graph_api_client
         self.client_mock = MagicMock()
         self.client_mock.get_study_data.return_value = self.response_mock
+        self.client_mock.__enter__.return_value = self.client_mock
         PCGraphAPIClientMock.return_value = self.client_mock
         self.mock_logger = mock_logger
         self.num_shards = 2
@@ -23,17 +23,28 @@ Options:
     --md5_id                      Use md5 hashes for ID column instead of integers
     --num_conversions=<n>         Number of event timestamps and values per partner row [default: 4]
     -f --from_header=<hdr>        Comma-separated list of header columns, used instead of input file if input file is not supplied
+    --seed=<s>                    Seed of the random number generator. The same options and seed generate the same data
+    --num_shards=<n>              Number of output files, written to <output_path>_0 to <output_path>_<n-1> (requires --num_records) [default: 1]
+    --num_processes=<n>           Number of processes generating the rows (default: number of CPUs)
+
+Rows are generated column by column in chunks of up to 100000 rows, in parallel
+processes, and written as soon as they are generated.
 """
 
+import contextlib
 import enum
+import functools
 import hashlib
+import itertools
 import os
 import pathlib
 import random
-from typing import Any, Dict, List, Union
+from dataclasses import dataclass
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Union
 
 import docopt
 import schema
+from fbpcs.utils.process_map import ordered_process_map
 
 
 class InputColumn(enum.Enum):
@@ -65,6 +76,35 @@ class InputColumn(enum.Enum):
         return s.startswith("feature_")
 
 
+# number of rows generated at once
+CHUNK_SIZE = 100000
+# number of values in an opportunity_timestamps row
+NUM_OPPORTUNITY_TIMESTAMPS = 5
+
+
+@dataclass(frozen=True)
+class FakeDataOptions:
+    header: Tuple[InputColumn, ...]
+    opportunity_rate: float
+    test_rate: float
+    purchase_rate: float
+    incrementality_rate: float
+    min_ts: int
+    max_ts: int
+    num_conversions: int
+    md5_id: bool = False
+    seed: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class FakeDataChunk:
+    start_row: int
+    num_rows: int
+    # the lines of the input file overriding the faked values of these rows
+    input_lines: Tuple[str, ...] = ()
+    shard: int = 0
+
+
 def _get_md5_hash_of_int(i: int) -> str:
     return hashlib.md5(bytes(str(i), encoding="utf-8")).hexdigest()
 
@@ -88,6 +128,103 @@ def _gen_adjusted_purchase_rate(
     return adj_purchase_rate
 
 
+def _faked_columns(
+    start_row: int, num_rows: int, options: FakeDataOptions, rng: random.Random
+) -> Dict[InputColumn, List[Any]]:
+    """Fakes the columns of the header for the rows [start_row, start_row + num_rows)
+
+    Returns:
+        The values of each column in the header, one per row
+    """
+    header = set(options.header)
+    rows = range(start_row, start_row + num_rows)
+    rnd = rng.random
+    min_ts = options.min_ts
+    ts_span = options.max_ts - options.min_ts + 1
+    num_conversions = options.num_conversions
+
+    opportunity_rate = options.opportunity_rate
+    test_rate = options.test_rate
+    has_opp = [1 if rnd() < opportunity_rate else 0 for _ in rows]
+    is_test = [1 if opp and rnd() < test_rate else 0 for opp in has_opp]
+    test_purchase_rate = control_purchase_rate = 0.0
+    if any(is_test):
+        test_purchase_rate = _gen_adjusted_purchase_rate(
+            True, options.purchase_rate, options.incrementality_rate
+        )
+    if not all(is_test):
+        control_purchase_rate = _gen_adjusted_purchase_rate(
+            False, options.purchase_rate, options.incrementality_rate
+        )
+    has_purchase = [
+        1 if rnd() < (test_purchase_rate if test else control_purchase_rate) else 0
+        for test in is_test
+    ]
+
+    columns: Dict[InputColumn, List[Any]] = {
+        InputColumn.opportunity: has_opp,
+        InputColumn.test_flag: is_test,
+        InputColumn.purchase_flag: has_purchase,
+    }
+    if InputColumn.id_ in header:
+        columns[InputColumn.id_] = (
+            [_get_md5_hash_of_int(row_num) for row_num in rows]
+            if options.md5_id
+            else list(rows)
+        )
+    if InputColumn.row_count in header:
+        columns[InputColumn.row_count] = list(rows)
+    if InputColumn.opportunity_timestamp in header:
+        columns[InputColumn.opportunity_timestamp] = [
+            min_ts + int(rnd() * ts_span) if opp else 0 for opp in has_opp
+        ]
+    if InputColumn.opportunity_timestamps in header:
+        columns[InputColumn.opportunity_timestamps] = [
+            [min_ts + int(rnd() * ts_span) for _ in range(NUM_OPPORTUNITY_TIMESTAMPS)]
+            if opp
+            else [0] * NUM_OPPORTUNITY_TIMESTAMPS
+            for opp in has_opp
+        ]
+    if InputColumn.event_timestamp in header:
+        columns[InputColumn.event_timestamp] = [
+            min_ts + int(rnd() * ts_span) if purchase else 0
+            for purchase in has_purchase
+        ]
+    # event_timestamps can be an array of all zeros, valid timestamps preceded
+    # by zeroes, or all non-zeroes
+    if InputColumn.event_timestamps in header:
+        columns[InputColumn.event_timestamps] = [
+            [0] * (num_conversions - row_num % num_conversions - 1)
+            + sorted(
+                min_ts + int(rnd() * ts_span)
+                for _ in range(row_num % num_conversions + 1)
+            )
+            if purchase
+            else [0] * num_conversions
+            for row_num, purchase in zip(rows, has_purchase)
+        ]
+    if InputColumn.value in header or InputColumn.value_squared in header:
+        value = [1 + int(rnd() * 100) if purchase else 0 for purchase in has_purchase]
+        columns[InputColumn.value] = value
+        columns[InputColumn.value_squared] = [v * v for v in value]
+    # values can be an array of all zeros, non-zeroes preceded
+    # by zeroes, or all non-zeroes. The number of non-zeroes would
+    # match that of the event_timestamps column.
+    if InputColumn.values in header:
+        columns[InputColumn.values] = [
+            [0] * (num_conversions - row_num % num_conversions - 1)
+            + [
+                1 + int(rnd() * 100) if purchase else 0
+                for _ in range(row_num % num_conversions + 1)
+            ]
+            for row_num, purchase in zip(rows, has_purchase)
+        ]
+    # For now, assume feature columns are all binary
+    if InputColumn.features in header:
+        columns[InputColumn.features] = [rng.getrandbits(1) for _ in rows]
+    return columns
+
+
 def _faked_data(
     row_num: int,
     header: List[InputColumn],
@@ -100,52 +237,19 @@ def _faked_data(
     num_conversions: int,
     md5_id: bool = False,
 ) -> List[Union[str, Any]]:
-    has_opp = 1 if random.random() < opportunity_rate else 0
-    is_test = 1 if has_opp and random.random() < test_rate else 0
-
-    purchase_rate = _gen_adjusted_purchase_rate(
-        bool(is_test), purchase_rate, incrementality_rate
+    options = FakeDataOptions(
+        header=tuple(header),
+        opportunity_rate=opportunity_rate,
+        test_rate=test_rate,
+        purchase_rate=purchase_rate,
+        incrementality_rate=incrementality_rate,
+        min_ts=min_ts,
+        max_ts=max_ts,
+        num_conversions=num_conversions,
+        md5_id=md5_id,
     )
-
-    has_purchase = 1 if random.random() < purchase_rate else 0
-    value = has_purchase * random.randint(1, 100)
-    rand_data = {
-        InputColumn.id_: _get_md5_hash_of_int(row_num) if md5_id else row_num,
-        InputColumn.row_count: row_num,
-        InputColumn.opportunity: has_opp,
-        InputColumn.test_flag: is_test,
-        InputColumn.opportunity_timestamp: has_opp * random.randint(min_ts, max_ts),
-        # opportunity_timestamps is an array of values for each data row
-        # For testing we can assume an array of size 5
-        InputColumn.opportunity_timestamps: [
-            has_opp * random.randint(min_ts, max_ts) for _ in range(5)
-        ],
-        InputColumn.event_timestamp: has_purchase * random.randint(min_ts, max_ts),
-        # event_timestamps can be an array of all zeros, valid timestamps preceded
-        # by zeroes, or all non-zeroes
-        InputColumn.event_timestamps: sorted(
-            [
-                has_purchase * random.randint(min_ts, max_ts)
-                for _ in range(row_num % num_conversions + 1)
-            ]
-            + [0] * (num_conversions - row_num % num_conversions - 1)
-        ),
-        InputColumn.value: value,
-        # values can be an array of all zeros, non-zeroes preceded
-        # by zeroes, or all non-zeroes. The number of non-zeroes would
-        # match that of the event_timestamps column.
-        InputColumn.values: [
-            has_purchase * random.randint(1, 100)
-            if i >= (num_conversions - row_num % num_conversions - 1)
-            else 0
-            for i in range(num_conversions)
-        ],
-        InputColumn.value_squared: value * value,
-        InputColumn.purchase_flag: has_purchase,
-        # For now, assume feature columns are all binary
-        InputColumn.features: random.randint(0, 1),
-    }
-    return [rand_data[column] for column in header]
+    columns = _faked_columns(row_num, 1, options, random.Random())
+    return [columns[column][0] for column in header]
 
 
 def _generate_line(
@@ -161,98 +265,149 @@ def _generate_line(
     num_conversions: int,
     md5_id: bool = False,
 ) -> List[str]:
-    # first try to read data from the input file
-    column_overrides = {}
-    if line != "":
-        values = line.split(",")
-        column_overrides = {col: val for col, val in zip(header, values)}
     # Get some fake data
-    values = _faked_data(
-        row_num=row_num,
-        header=header,
-        opportunity_rate=opportunity_rate,
-        test_rate=test_rate,
-        purchase_rate=purchase_rate,
-        incrementality_rate=incrementality_rate,
-        min_ts=min_ts,
-        max_ts=max_ts,
-        num_conversions=num_conversions,
-        md5_id=md5_id,
+    values = [
+        str(x)
+        for x in _faked_data(
+            row_num=row_num,
+            header=header,
+            opportunity_rate=opportunity_rate,
+            test_rate=test_rate,
+            purchase_rate=purchase_rate,
+            incrementality_rate=incrementality_rate,
+            min_ts=min_ts,
+            max_ts=max_ts,
+            num_conversions=num_conversions,
+            md5_id=md5_id,
+        )
+    ]
+    # Override with input data
+    if line != "":
+        for i, value in enumerate(line.split(",")[: len(values)]):
+            values[i] = value
+    return values
+
+
+def _generate_chunk(chunk: FakeDataChunk, options: FakeDataOptions) -> str:
+    """Generates the lines of a chunk of rows
+
+    The random number generator of a chunk is seeded with the seed and the
+    first row of the chunk, so a chunk gets the same data in any process.
+    """
+    rng = (
+        random.Random()
+        if options.seed is None
+        else random.Random(f"{options.seed}:{chunk.start_row}")
     )
+    columns = _faked_columns(chunk.start_row, chunk.num_rows, options, rng)
+    str_columns = [[str(x) for x in columns[column]] for column in options.header]
+
     # Override with input data
-    for column, value in column_overrides.items():
-        values[header.index(column)] = value
-    return [str(x) for x in values]
+    for row, line in enumerate(chunk.input_lines):
+        if line != "":
+            for i, value in enumerate(line.split(",")[: len(str_columns)]):
+                str_columns[i][row] = value
+
+    if not chunk.num_rows:
+        return ""
+    return "\n".join(map(",".join, zip(*str_columns))) + "\n"
+
+
+def _read_chunks(
+    f_in: Optional[IO[str]], num_records: Optional[int], num_shards: int
+) -> Iterator[FakeDataChunk]:
+    """Splits the rows into chunks of up to CHUNK_SIZE rows
+
+    Without num_records, there is one row per line of the input file, up to
+    the first empty line. Otherwise the rows are split evenly between the
+    shards and the lines of the input file override the first rows.
+    """
+    if num_records is None:
+        if f_in is None:
+            raise ValueError("num_records is required without an input file")
+        for start_row in itertools.count(0, CHUNK_SIZE):
+            input_lines = []
+            while len(input_lines) < CHUNK_SIZE:
+                line = f_in.readline().strip()
+                if line == "":
+                    break
+                input_lines.append(line)
+            if input_lines:
+                yield FakeDataChunk(start_row, len(input_lines), tuple(input_lines))
+            if len(input_lines) < CHUNK_SIZE:
+                return
+
+    for shard in range(num_shards):
+        shard_start = num_records * shard // num_shards
+        shard_end = num_records * (shard + 1) // num_shards
+        for start_row in range(shard_start, shard_end, CHUNK_SIZE):
+            num_rows = min(CHUNK_SIZE, shard_end - start_row)
+            input_lines = (
+                tuple(f_in.readline().strip() for _ in range(num_rows))
+                if f_in is not None
+                else ()
+            )
+            yield FakeDataChunk(start_row, num_rows, input_lines, shard)
 
 
-def _make_input_csv(args: Dict[str, Any]) -> None:
+def _generate_chunks(
+    chunks: Iterator[FakeDataChunk],
+    options: FakeDataOptions,
+    num_processes: Optional[int] = None,
+) -> Iterator[Tuple[FakeDataChunk, str]]:
+    """Generates the chunks in worker processes and yields each chunk with its lines, in order"""
+    return ordered_process_map(
+        functools.partial(_generate_chunk, options=options), chunks, num_processes
+    )
 
-    if args.get("<input_path>") is None:
-        header_line = args.get("--from_header").split(",")
-        header = [InputColumn.from_str(s) for s in header_line]
-
-        with open(args["<output_path>"], "w") as f_out:
-            f_out.write(args.get("--from_header") + "\n")
-
-            for i in range(args["--num_records"]):
-                out_line = _generate_line(
-                    i,
-                    "",
-                    header,
-                    args["--opportunity_rate"],
-                    args["--test_rate"],
-                    args["--purchase_rate"],
-                    args["--incrementality_rate"],
-                    args["--min_ts"],
-                    args["--max_ts"],
-                    args["--num_conversions"],
-                    args["--md5_id"],
-                )
-                f_out.write(",".join(out_line) + "\n")
-    else:
-        with open(args["<input_path>"]) as f_in, open(
-            args["<output_path>"], "w"
+
+def _write_shards(
+    output_path: pathlib.Path,
+    header_line: List[str],
+    num_shards: int,
+    generated_chunks: Iterator[Tuple[FakeDataChunk, str]],
+) -> None:
+    """Writes the generated chunks to their shard, a shard without rows only has the header"""
+    generated = next(generated_chunks, None)
+    for shard in range(num_shards):
+        with open(
+            f"{output_path}_{shard}" if num_shards > 1 else output_path, "w"
         ) as f_out:
-            header_line = f_in.readline().strip().split(",")
-            header = [InputColumn.from_str(s) for s in header_line]
             f_out.write(",".join(header_line) + "\n")
+            while generated is not None and generated[0].shard == shard:
+                f_out.write(generated[1])
+                generated = next(generated_chunks, None)
 
-            if args.get("--num_records") is not None:
-                for i in range(args["--num_records"]):
-                    line = f_in.readline().strip()
-                    out_line = _generate_line(
-                        i,
-                        line,
-                        header,
-                        args["--opportunity_rate"],
-                        args["--test_rate"],
-                        args["--purchase_rate"],
-                        args["--incrementality_rate"],
-                        args["--min_ts"],
-                        args["--max_ts"],
-                        args["--num_conversions"],
-                        args["--md5_id"],
-                    )
-                    f_out.write(",".join(out_line) + "\n")
-            else:
-                i = 0
-                line = f_in.readline().strip()
-                while line != "":
-                    out_line = _generate_line(
-                        i,
-                        line,
-                        header,
-                        args["--opportunity_rate"],
-                        args["--test_rate"],
-                        args["--purchase_rate"],
-                        args["--incrementality_rate"],
-                        args["--min_ts"],
-                        args["--max_ts"],
-                        args["--num_conversions"],
-                    )
-                    f_out.write(",".join(out_line) + "\n")
-                    line = f_in.readline().strip()
-                    i += 1
+
+def _make_input_csv(args: Dict[str, Any]) -> None:
+    with contextlib.ExitStack() as stack:
+        f_in = None
+        if args.get("<input_path>") is None:
+            header_line = args["--from_header"].split(",")
+        else:
+            f_in = stack.enter_context(open(args["<input_path>"]))
+            header_line = f_in.readline().strip().split(",")
+
+        options = FakeDataOptions(
+            header=tuple(InputColumn.from_str(s) for s in header_line),
+            opportunity_rate=args["--opportunity_rate"],
+            test_rate=args["--test_rate"],
+            purchase_rate=args["--purchase_rate"],
+            incrementality_rate=args["--incrementality_rate"],
+            min_ts=args["--min_ts"],
+            max_ts=args["--max_ts"],
+            num_conversions=args["--num_conversions"],
+            md5_id=args["--md5_id"],
+            seed=args.get("--seed"),
+        )
+        num_shards = args.get("--num_shards") or 1
+        chunks = _read_chunks(f_in, args.get("--num_records"), num_shards)
+        _write_shards(
+            args["<output_path>"],
+            header_line,
+            num_shards,
+            _generate_chunks(chunks, options, args.get("--num_processes")),
+        )
 
 
 def main() -> None:
@@ -273,6 +428,11 @@ def main() -> None:
             "--md5_id": bool,
             "--help": bool,
             schema.Optional("--from_header"): schema.Or(None, schema.Use(str)),
+            schema.Optional("--seed"): schema.Or(None, schema.Use(int)),
+            "--num_shards": schema.And(schema.Use(int), lambda n: n > 0),
+            schema.Optional("--num_processes"): schema.Or(
+                None, schema.And(schema.Use(int), lambda n: n > 0)
+            ),
         }
     )
     args = args_schema.validate(docopt.docopt(__doc__))
@@ -292,6 +452,11 @@ def main() -> None:
             "Missing argument, please specify --num_records with --from_header option"
         )
 
+    if args["--num_shards"] > 1 and args.get("--num_records") is None:
+        raise RuntimeError(
+            "Missing argument, please specify --num_records with --num_shards option"
+        )
+
     _make_input_csv(args)
 
 
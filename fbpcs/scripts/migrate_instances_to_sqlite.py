@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+CLI tool to copy private computation instances from a directory of JSON files
+(LocalPrivateComputationInstanceRepository) into a SQLite database
+(SqlitePrivateComputationInstanceRepository). Instances already in the database
+are skipped, so the tool can be rerun safely.
+
+Usage:
+    migrate_instances_to_sqlite <base_dir> <db_path> [options]
+
+Options:
+    -h --help                   Show this help
+"""
+
+import os
+import pathlib
+from typing import Any, Dict
+
+import docopt
+import schema
+from fbpcs.private_computation.repository.private_computation_instance_sqlite import (
+    SqlitePrivateComputationInstanceRepository,
+)
+
+
+def migrate_instances_to_sqlite(args: Dict[str, Any]) -> None:
+    repo = SqlitePrivateComputationInstanceRepository(str(args["<db_path>"]))
+    imported = repo.import_local_instances(str(args["<base_dir>"]))
+    print(f"Imported {imported} instances into {args['<db_path>']}")
+
+
+def main() -> None:
+    args_schema = schema.Schema(
+        {
+            "<base_dir>": schema.And(schema.Use(pathlib.Path), os.path.isdir),
+            "<db_path>": schema.Use(pathlib.Path),
+            "--help": bool,
+        }
+    )
+    args = args_schema.validate(docopt.docopt(__doc__))
+    migrate_instances_to_sqlite(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,18 @@
 # LICENSE file in the root directory of this source tree.
 
 import pathlib
+import random
+import tempfile
 import unittest
-from unittest.mock import call, mock_open, patch
+from unittest.mock import call, MagicMock, mock_open, patch
 
 from fbpcs.scripts import gen_fake_data
 
 
 class TestGenFakeData(unittest.TestCase):
+    def _written(self, m: MagicMock) -> str:
+        return "".join(c.args[0] for c in m().write.call_args_list)
+
     def test_gen_adjusted_purchase_rate(self) -> None:
         # test user - Within bounds
         res = gen_fake_data._gen_adjusted_purchase_rate(
@@ -342,15 +347,9 @@ class TestGenFakeData(unittest.TestCase):
         # Check that readline was called once more than the end of the input
         self.assertEqual(len(input_lines) + 1, m().readline.call_count)
         # We've hard-coded opportunity rate above to zero
-        m().write.assert_has_calls(
-            [
-                call("id_,opportunity,test_flag\n"),
-                call("1,0,0\n"),
-                call("2,0,0\n"),
-                call("3,0,0\n"),
-                call("4,0,0\n"),
-                call("5,0,0\n"),
-            ]
+        self.assertEqual(
+            "id_,opportunity,test_flag\n1,0,0\n2,0,0\n3,0,0\n4,0,0\n5,0,0\n",
+            self._written(m),
         )
 
         # Now test with some data given and --num_records set higher
@@ -362,18 +361,12 @@ class TestGenFakeData(unittest.TestCase):
         # pyre-fixme[58]: `+` is not supported for operand types `Union[float,
         #  pathlib.Path]` and `int`.
         self.assertEqual(args["--num_records"] + 1, m().readline.call_count)
-        m().write.assert_has_calls(
-            [
-                call("id_,opportunity,test_flag\n"),
-                call("1,0,0\n"),
-                call("2,0,0\n"),
-                call("3,0,0\n"),
-                call("4,0,0\n"),
-                call("5,0,0\n"),
-            ]
-        )
-        # Check for additional writes (remember our lines are 0-indexed)
-        m().write.assert_has_calls([call(f"{i},0,0\n") for i in range(5, 10)])
+        # Check for additional rows (remember our lines are 0-indexed)
+        self.assertEqual(
+            "id_,opportunity,test_flag\n1,0,0\n2,0,0\n3,0,0\n4,0,0\n5,0,0\n"
+            + "".join(f"{i},0,0\n" for i in range(5, 10)),
+            self._written(m),
+        )
 
         # Finally, test with --num_records set and no input data
         input_text = "id_,opportunity,test_flag"
@@ -388,7 +381,7 @@ class TestGenFakeData(unittest.TestCase):
         #  `Union[float, Path]`.
         for i in range(args["--num_records"]):
             calls.append(call(f"{i},0,0\n"))
-        m().write.assert_has_calls(calls)
+        self.assertEqual("".join(c.args[0] for c in calls), self._written(m))
 
         # Test with --from_header and --num_records set
         m.reset_mock()
@@ -406,4 +399,129 @@ class TestGenFakeData(unittest.TestCase):
         #  `Union[float, Path]`.
         for i in range(args["--num_records"]):
             calls.append(call(f"{i},0,0\n"))
-        m().write.assert_has_calls(calls)
+        self.assertEqual("".join(c.args[0] for c in calls), self._written(m))
+
+    def test_faked_columns(self) -> None:
+        header = (
+            gen_fake_data.InputColumn.id_,
+            gen_fake_data.InputColumn.opportunity,
+            gen_fake_data.InputColumn.test_flag,
+            gen_fake_data.InputColumn.opportunity_timestamps,
+            gen_fake_data.InputColumn.event_timestamps,
+            gen_fake_data.InputColumn.values,
+            gen_fake_data.InputColumn.value_squared,
+        )
+        options = gen_fake_data.FakeDataOptions(
+            header=header,
+            opportunity_rate=0.5,
+            test_rate=0.5,
+            purchase_rate=1.0,
+            incrementality_rate=0.0,
+            min_ts=100,
+            max_ts=200,
+            num_conversions=3,
+        )
+        columns = gen_fake_data._faked_columns(10, 1000, options, random.Random(0))
+
+        self.assertEqual(list(range(10, 1010)), columns[gen_fake_data.InputColumn.id_])
+        for row, (opp, test, opp_timestamps, event_timestamps, values) in enumerate(
+            zip(*(columns[column] for column in header[1:6]))
+        ):
+            row_num = row + 10
+            self.assertLessEqual(test, opp)
+            self.assertEqual(opp, int(all(opp_timestamps)))
+            self.assertTrue(all(100 <= ts <= 200 for ts in opp_timestamps if ts))
+            # the last row_num % 3 + 1 conversions are purchases
+            self.assertEqual(row_num % 3 + 1, sum(1 for ts in event_timestamps if ts))
+            self.assertEqual(sorted(event_timestamps), event_timestamps)
+            self.assertEqual(
+                [bool(ts) for ts in event_timestamps], [bool(v) for v in values]
+            )
+            self.assertTrue(all(1 <= v <= 100 for v in values if v))
+        # the opportunity rate is about right
+        self.assertLess(400, sum(columns[gen_fake_data.InputColumn.opportunity]))
+        self.assertGreater(600, sum(columns[gen_fake_data.InputColumn.opportunity]))
+        self.assertEqual(
+            [v * v for v in columns[gen_fake_data.InputColumn.value]],
+            columns[gen_fake_data.InputColumn.value_squared],
+        )
+
+    def test_generate_chunk(self) -> None:
+        options = gen_fake_data.FakeDataOptions(
+            header=(
+                gen_fake_data.InputColumn.id_,
+                gen_fake_data.InputColumn.opportunity_timestamp,
+                gen_fake_data.InputColumn.features,
+                gen_fake_data.InputColumn.features,
+            ),
+            opportunity_rate=1.0,
+            test_rate=0.5,
+            purchase_rate=0.2,
+            incrementality_rate=0.0,
+            min_ts=0,
+            max_ts=1000,
+            num_conversions=4,
+            seed=42,
+        )
+        chunk = gen_fake_data.FakeDataChunk(5, 3, ("a,1", "", "b,2,0,1,extra"))
+
+        lines = gen_fake_data._generate_chunk(chunk, options).splitlines()
+
+        self.assertEqual(3, len(lines))
+        self.assertEqual(["a", "1"], lines[0].split(",")[:2])
+        self.assertEqual("6", lines[1].split(",")[0])
+        self.assertEqual(["b", "2", "0", "1"], lines[2].split(","))
+        # the same seed gives the same data
+        self.assertEqual(
+            lines, gen_fake_data._generate_chunk(chunk, options).splitlines()
+        )
+        self.assertEqual(
+            "",
+            gen_fake_data._generate_chunk(gen_fake_data.FakeDataChunk(0, 0), options),
+        )
+
+    @patch("fbpcs.scripts.gen_fake_data.CHUNK_SIZE", 4)
+    def test_make_input_csv_sharded(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = pathlib.Path(temp_dir) / "out.csv"
+            args = {
+                "<input_path>": None,
+                "<output_path>": output_path,
+                "--from_header": "id_,opportunity,event_timestamps,value",
+                "--num_records": 26,
+                "--opportunity_rate": 0.8,
+                "--test_rate": 0.5,
+                "--purchase_rate": 0.5,
+                "--incrementality_rate": 0.0,
+                "--min_ts": 555,
+                "--max_ts": 655,
+                "--md5_id": True,
+                "--num_conversions": 4,
+                "--seed": 7,
+                "--num_shards": 3,
+                "--num_processes": 2,
+            }
+
+            gen_fake_data._make_input_csv(args)
+            shards = []
+            for shard in range(3):
+                with open(f"{output_path}_{shard}") as f:
+                    shards.append(f.read())
+
+            # other processes generate the same data
+            args["--num_processes"] = 1
+            gen_fake_data._make_input_csv(args)
+            for shard in range(3):
+                with open(f"{output_path}_{shard}") as f:
+                    self.assertEqual(shards[shard], f.read())
+
+        rows = []
+        for shard in shards:
+            lines = shard.splitlines()
+            self.assertEqual("id_,opportunity,event_timestamps,value", lines[0])
+            rows.append(lines[1:])
+        self.assertEqual([8, 9, 9], [len(shard_rows) for shard_rows in rows])
+        self.assertEqual(
+            [gen_fake_data._get_md5_hash_of_int(i) for i in range(26)],
+            [row.split(",")[0] for shard_rows in rows for row in shard_rows],
+        )
@@ -7,8 +7,8 @@
 
 from dataclasses import dataclass
 from enum import Enum, EnumMeta
-from functools import cached_property
-from typing import Any, Dict, Generic, Optional, Tuple, Type, TypeVar
+from typing import Any, Dict, Generic, MutableMapping, Optional, Tuple, Type, TypeVar
+from weakref import WeakValueDictionary
 
 from fbpcs.stage_flow.exceptions import StageFlowStageNotFoundError
 from fbpcs.utils.color import colored
@@ -44,7 +44,13 @@ class StageFlowData(Generic[Status]):
 class StageFlowMeta(EnumMeta):
     """
     Metaclass intended to be used by the StageFlow enum. It overrides the
-    repr dunder method to provide a pretty representation of a stage flow
+    repr dunder method to provide a pretty representation of a stage flow.
+
+    The ordering of the stages never changes after the class is created, so
+    the metaclass also precomputes the tables used to move between stages:
+    the ordered members, the position of each member along with its next and
+    previous stages, and a name -> class map of the direct subclasses of every
+    stage flow.
     """
 
     def __init__(
@@ -53,6 +59,24 @@ class StageFlowMeta(EnumMeta):
         super().__init__(name, bases, namespace)
         self._stage_flow_pretty: str = " -> ".join(self._member_names_)
 
+        members = tuple(self._member_map_[n] for n in self._member_names_)
+        self._stage_flow_members: Tuple[Any, ...] = members
+        for index, member in enumerate(members):
+            member._stage_flow_index = index
+            member._stage_flow_previous_stage = members[index - 1] if index else None
+            member._stage_flow_next_stage = (
+                members[index + 1] if index + 1 < len(members) else None
+            )
+
+        # mirrors __subclasses__(): the table only keeps weak references and
+        # the first subclass defined with a name wins
+        self._stage_flow_subclasses: MutableMapping[
+            str, Type[Any]
+        ] = WeakValueDictionary()
+        for base in bases:
+            if isinstance(base, StageFlowMeta):
+                base._stage_flow_subclasses.setdefault(name, self)
+
     def __repr__(self) -> str:
         """Used to pretty print stage flows, e.g. stage1 -> stage2 -> stage3"""
         return self._stage_flow_pretty
@@ -118,6 +142,8 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
         _stage_flow_started_statuses: set containing all started statuses defined in the flow
         _stage_flow_completed_statuses: set containing all completed statuses defined in the flow
         _stage_flow_failed_statuses: set containing all failed statuses defined in the flow
+        _stage_flow_members: tuple of the stages in the flow, in order
+        _stage_flow_subclasses: map from name to the direct subclasses of the flow
     """
 
     def __init_subclass__(cls: Type[C]) -> None:
@@ -152,8 +178,7 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
     def __repr__(self) -> str:
         """Used to pretty print stage flows, e.g. stage1 -> [**stage2**] -> stage3"""
         names = self.__class__._member_names_.copy()
-        pos = names.index(self.name)
-        names[pos] = colored(
+        names[self._stage_flow_index] = colored(
             f"[**{self.name}**]",
             "green",
             attrs=[
@@ -175,9 +200,9 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
         Raises:
             ValueError: when status cannot be mapped to any stage in the StageFlow
         """
-        if status not in cls._value2member_map_:
+        stage = cls._value2member_map_.get(status)
+        if stage is None:
             raise ValueError(f"{status} is not a possible status for {cls.__name__}")
-        stage = cls._value2member_map_[status]
         # To appease pyre
         assert isinstance(stage, cls)
         return stage
@@ -211,7 +236,7 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
 
     @classmethod
     def get_first_stage(cls: Type[C]) -> C:
-        return list(cls)[0]
+        return cls._stage_flow_members[0]
 
     @classmethod
     def get_stage_from_str(cls: Type[C], stage_name: str) -> C:
@@ -230,7 +255,7 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
 
     @classmethod
     def get_last_stage(cls: Type[C]) -> C:
-        return list(cls)[-1]
+        return cls._stage_flow_members[-1]
 
     @classmethod
     def is_initialized_status(cls: Type[C], status: Status) -> bool:
@@ -248,18 +273,10 @@ class StageFlow(Enum, metaclass=StageFlowMeta):
     def is_failed_status(cls: Type[C], status: Status) -> bool:
         return status in cls._stage_flow_failed_statuses
 
-    @cached_property
+    @property
     def next_stage(self: C) -> Optional[C]:
-        members = list(self.__class__)
-        index = members.index(self) + 1
-        if index >= len(members):
-            return None
-        return members[index]
+        return self._stage_flow_next_stage
 
-    @cached_property
+    @property
     def previous_stage(self: C) -> Optional[C]:
-        members = list(self.__class__)
-        index = members.index(self) - 1
-        if index < 0:
-            return None
-        return members[index]
+        return self._stage_flow_previous_stage
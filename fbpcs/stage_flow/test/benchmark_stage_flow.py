@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Microbenchmark of the stage flow lookups over every private computation flow
+
+Usage: python -m fbpcs.stage_flow.test.benchmark_stage_flow
+"""
+
+from typing import Callable, List, Tuple, Type
+
+from fbpcs.common.tests.benchmark_utils import time_per_call
+from fbpcs.private_computation.stage_flows.private_computation_base_stage_flow import (
+    PrivateComputationBaseStageFlow,
+)
+
+
+def walk_stages(stage_flow: Type[PrivateComputationBaseStageFlow]) -> None:
+    stage = stage_flow.get_first_stage()
+    while stage is not None:
+        stage_flow.get_next_runnable_stage_from_status(stage.completed_status)
+        stage = stage.next_stage
+
+
+def main() -> None:
+    stage_flows: List[
+        Type[PrivateComputationBaseStageFlow]
+    ] = PrivateComputationBaseStageFlow.__subclasses__()
+    print(f"{'stage flow':>50} {'stages':>7} {'op':>16} {'ns':>8}")
+    for stage_flow in stage_flows:
+        name = stage_flow.get_cls_name()
+        benchmarks: Tuple[Tuple[str, Callable[[], object]], ...] = (
+            (
+                "cls_name_to_cls",
+                lambda: PrivateComputationBaseStageFlow.cls_name_to_cls(name),
+            ),
+            ("get_first_stage", stage_flow.get_first_stage),
+            ("get_last_stage", stage_flow.get_last_stage),
+            ("walk all stages", lambda: walk_stages(stage_flow)),
+        )
+        for op, fn in benchmarks:
+            print(
+                f"{name:>50} {len(stage_flow):>7} {op:>16} "
+                f"{time_per_call(fn) * 1e9:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,12 @@
 from unittest import TestCase
 
 from fbpcs.stage_flow.exceptions import StageFlowStageNotFoundError
-from fbpcs.stage_flow.test.dummy_stage_flow import DummyStageFlow, DummyStageFlowStatus
+from fbpcs.stage_flow.stage_flow import StageFlow
+from fbpcs.stage_flow.test.dummy_stage_flow import (
+    DummyStageFlow,
+    DummyStageFlowData,
+    DummyStageFlowStatus,
+)
 
 
 class TestStageFlow(TestCase):
@@ -33,6 +38,51 @@ class TestStageFlow(TestCase):
         self.assertEqual(DummyStageFlow.STAGE_1, stage.previous_stage.previous_stage)
         self.assertEqual(None, stage.previous_stage.previous_stage.previous_stage)
 
+    def test_lookup_tables_match_member_order(self) -> None:
+        members = list(DummyStageFlow)
+        self.assertEqual(tuple(members), DummyStageFlow._stage_flow_members)
+        for index, stage in enumerate(members):
+            self.assertEqual(index, stage._stage_flow_index)
+            self.assertIs(
+                members[index + 1] if index + 1 < len(members) else None,
+                stage.next_stage,
+            )
+            self.assertIs(members[index - 1] if index else None, stage.previous_stage)
+            for status in (
+                stage.value.initialized_status,
+                stage.value.started_status,
+                stage.value.completed_status,
+                stage.value.failed_status,
+            ):
+                self.assertIs(stage, DummyStageFlow.get_stage_from_status(status))
+
+    def test_subclass_lookup_table(self) -> None:
+        class DummyBaseStageFlow(StageFlow):
+            pass
+
+        class DummySubStageFlow(DummyBaseStageFlow):
+            STAGE_1 = DummyStageFlowData(
+                initialized_status=DummyStageFlowStatus.STAGE_1_INITIALIZED,
+                started_status=DummyStageFlowStatus.STAGE_1_STARTED,
+                completed_status=DummyStageFlowStatus.STAGE_1_COMPLETED,
+                failed_status=DummyStageFlowStatus.STAGE_1_FAILED,
+            )
+
+        # only the direct subclasses are in the table, like __subclasses__()
+        self.assertEqual(
+            {"DummySubStageFlow": DummySubStageFlow},
+            dict(DummyBaseStageFlow._stage_flow_subclasses),
+        )
+        self.assertNotIn("DummySubStageFlow", StageFlow._stage_flow_subclasses)
+        self.assertEqual({}, dict(DummySubStageFlow._stage_flow_subclasses))
+        self.assertIs(DummySubStageFlow.STAGE_1, DummySubStageFlow.get_first_stage())
+        self.assertIs(DummySubStageFlow.STAGE_1, DummySubStageFlow.get_last_stage())
+        self.assertIsNone(DummySubStageFlow.STAGE_1.next_stage)
+
+    def test_get_stage_from_unknown_status(self) -> None:
+        with self.assertRaises(ValueError):
+            DummyStageFlow.get_stage_from_status("not a status")
+
     def test_is_started_status(self) -> None:
         start_statuses = [
             DummyStageFlowStatus.STAGE_1_STARTED,
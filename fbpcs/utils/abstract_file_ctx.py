@@ -9,27 +9,88 @@
 import contextlib
 import os
 import pathlib
+import threading
+from typing import Dict, Optional, Tuple
 
+from botocore.client import Config
 from fbpcp.service.storage_s3 import S3StorageService
 from fbpcs.utils.buffered_s3_file_handler import BufferedS3Reader, BufferedS3Writer
 
 
 S3_PATH_DRIVE = "https:"
+# enough connections for the chunks and parts the buffered S3 handlers of a
+# few files transfer at the same time
+S3_MAX_POOL_CONNECTIONS = 32
+
+# (region, access key id, access key data) -> storage service
+_storage_services: Dict[
+    Tuple[Optional[str], Optional[str], Optional[str]], S3StorageService
+] = {}
+_storage_services_lock = threading.Lock()
+
+
+def get_s3_storage_service(
+    region: Optional[str] = None,
+    access_key_id: Optional[str] = None,
+    access_key_data: Optional[str] = None,
+) -> S3StorageService:
+    """Get the storage service of a region and credentials, creating it on first use
+
+    The storage services are shared by the whole process: the boto3 client of a
+    storage service is thread safe and keeps a pool of open connections, so
+    opening a file does not resolve credentials or connect to S3 again.
+
+    Args:
+        - region: the AWS region, None for the S3StorageService default
+        - access_key_id: the AWS access key id, None for the default credentials
+        - access_key_data: the AWS secret access key, None for the default credentials
+
+    Returns:
+        The storage service of the region and credentials
+    """
+    key = (region, access_key_id, access_key_data)
+    storage_service = _storage_services.get(key)
+    if storage_service is not None:
+        return storage_service
+
+    with _storage_services_lock:
+        storage_service = _storage_services.get(key)
+        if storage_service is None:
+            config = {"config": Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS)}
+            if region:
+                storage_service = S3StorageService(
+                    region=region,
+                    access_key_id=access_key_id,
+                    access_key_data=access_key_data,
+                    config=config,
+                )
+            else:
+                storage_service = S3StorageService(
+                    access_key_id=access_key_id,
+                    access_key_data=access_key_data,
+                    config=config,
+                )
+            _storage_services[key] = storage_service
+        return storage_service
+
+
+def clear_s3_storage_services() -> None:
+    """Forget the shared storage services, e.g. after the credentials were rotated"""
+    with _storage_services_lock:
+        _storage_services.clear()
+
+
+def _get_env_s3_storage_service() -> S3StorageService:
+    return get_s3_storage_service(
+        region=os.environ.get("PL_AWS_REGION"),
+        access_key_id=os.environ.get("PL_AWS_KEY_ID"),
+        access_key_data=os.environ.get("PL_AWS_KEY_DATA"),
+    )
 
 
 def abstract_file_reader_path(path: pathlib.Path) -> pathlib.Path:
     if path.parts[0].lower() == S3_PATH_DRIVE:
-        region = os.environ.get("PL_AWS_REGION")
-        key_id = os.environ.get("PL_AWS_KEY_ID")
-        key_data = os.environ.get("PL_AWS_KEY_DATA")
-        if region:
-            storage_service = S3StorageService(
-                region=region, access_key_id=key_id, access_key_data=key_data
-            )
-        else:
-            storage_service = S3StorageService(
-                access_key_id=key_id, access_key_data=key_data
-            )
+        storage_service = _get_env_s3_storage_service()
         with BufferedS3Reader(path, storage_service) as reader:
             return reader.copy_to_local()
     else:
@@ -38,17 +99,7 @@ def abstract_file_reader_path(path: pathlib.Path) -> pathlib.Path:
 
 def abstract_file_writer_ctx(path: pathlib.Path) -> contextlib.AbstractContextManager:
     if path.parts[0].lower() == S3_PATH_DRIVE:
-        region = os.environ.get("PL_AWS_REGION")
-        key_id = os.environ.get("PL_AWS_KEY_ID")
-        key_data = os.environ.get("PL_AWS_KEY_DATA")
-        if region:
-            storage_service = S3StorageService(
-                region=region, access_key_id=key_id, access_key_data=key_data
-            )
-        else:
-            storage_service = S3StorageService(
-                access_key_id=key_id, access_key_data=key_data
-            )
+        storage_service = _get_env_s3_storage_service()
         return BufferedS3Writer(path, storage_service)
     else:
         return open(path, "w")
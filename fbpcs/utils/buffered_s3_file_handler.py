@@ -6,26 +6,68 @@
 
 from __future__ import annotations
 
+import codecs
+import collections
 import contextlib
 import pathlib
 import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from types import TracebackType
-from typing import Optional, Type
+from typing import Any, Deque, Dict, Iterator, List, Optional, Type
 
 from fbpcp.service.storage_s3 import S3StorageService
+from fbpcp.util.s3path import S3Path
+
+DEFAULT_CHUNK_SIZE_IN_BYTES = 8 * 1024 * 1024
+DEFAULT_READ_AHEAD_CHUNKS = 2
+# S3 needs every part of a multipart upload but the last one to be at least 5MiB
+DEFAULT_PART_SIZE_IN_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_PARTS_IN_FLIGHT = 4
+
+
+def get_s3_client(storage_service: S3StorageService) -> Any:
+    """Returns the boto3 S3 client of the storage service
+
+    S3StorageService has no ranged reads or multipart uploads, so they are sent
+    through the client of its s3_gateway, which is internal to fbpcp.
+    """
+    return storage_service.s3_gateway.client
 
 
 class BufferedS3Reader(contextlib.AbstractContextManager):
+    """Reads an S3 object with ranged GETs
+
+    The object is never held in memory as a whole. iter_chunks() yields it chunk
+    by chunk while the next read_ahead chunks are downloaded in the background,
+    and read() downloads the chunk around the cursor. Offsets are in bytes.
+    """
+
     def __init__(
-        self, s3_path: pathlib.Path, storage_service: S3StorageService
+        self,
+        s3_path: pathlib.Path,
+        storage_service: S3StorageService,
+        chunk_size: int = DEFAULT_CHUNK_SIZE_IN_BYTES,
+        read_ahead: int = DEFAULT_READ_AHEAD_CHUNKS,
     ) -> None:
+        if chunk_size <= 0 or read_ahead < 0:
+            raise ValueError(
+                "BufferedS3Reader: chunk_size must be positive and read_ahead can't be negative"
+            )
         self.s3_path = s3_path
         self.storage_service = storage_service
-        self.data: Optional[str] = None
+        self.chunk_size = chunk_size
+        self.read_ahead = read_ahead
+        self.size: Optional[int] = None
         self.cursor = 0
+        # the last chunk downloaded by read()
+        self._chunk_start = 0
+        self._chunk = b""
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(
+            "utf-8"
+        )()
 
     def __enter__(self) -> BufferedS3Reader:
-        self.data = self.storage_service.read(str(self.s3_path))
+        self.size = self.storage_service.get_file_size(str(self.s3_path))
         return self
 
     def __exit__(
@@ -34,40 +76,122 @@ class BufferedS3Reader(contextlib.AbstractContextManager):
         __exc_value: Optional[BaseException],
         __traceback: Optional[TracebackType],
     ) -> Optional[bool]:
-        pass
+        self._chunk = b""
 
     def seek(self, idx: int) -> None:
-        data = self.data
-        if data is None:
-            raise ValueError("BufferedS3Reader: data is None")
-        self.cursor = min(idx, len(data))
-
-    def read(self, chars: int = 0) -> str:
-        data = self.data
-        if data is None:
-            raise ValueError("BufferedS3Reader: data is None")
-        if chars > 0:
-            res = data[self.cursor : self.cursor + chars]
-            self.cursor += chars
-        else:
-            res = data[self.cursor :]
-            self.cursor = len(data)
-        return res
+        self.cursor = min(idx, self._get_size())
+        self._decoder.reset()
+
+    def read(self, size: int = 0) -> str:
+        """Reads up to size bytes from the cursor, or the rest of the object if size <= 0
+
+        A multi-byte character cut by the end of a read is returned by the next one.
+        """
+        object_size = self._get_size()
+        end = object_size if size <= 0 else min(self.cursor + size, object_size)
+        data = self._read_bytes(self.cursor, end)
+        self.cursor = end
+        return self._decoder.decode(data, final=end == object_size)
+
+    def read_range(self, start: int, end: int) -> bytes:
+        """Downloads the bytes [start, end) of the object"""
+        if start >= end:
+            return b""
+        s3_path = S3Path(str(self.s3_path))
+        response = get_s3_client(self.storage_service).get_object(
+            Bucket=s3_path.bucket, Key=s3_path.key, Range=f"bytes={start}-{end - 1}"
+        )
+        return response["Body"].read()
+
+    def iter_chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yields the bytes [start, end) of the object in chunks of chunk_size
+
+        At most read_ahead chunks are downloaded ahead of the one being consumed.
+        """
+        size = self._get_size()
+        end = size if end is None else min(end, size)
+        ranges = (
+            (chunk_start, min(chunk_start + self.chunk_size, end))
+            for chunk_start in range(start, end, self.chunk_size)
+        )
+        if not self.read_ahead:
+            for chunk_start, chunk_end in ranges:
+                yield self.read_range(chunk_start, chunk_end)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.read_ahead) as executor:
+            pending: Deque[Future[bytes]] = collections.deque()
+            try:
+                for chunk_start, chunk_end in ranges:
+                    pending.append(
+                        executor.submit(self.read_range, chunk_start, chunk_end)
+                    )
+                    if len(pending) > self.read_ahead:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
 
     def copy_to_local(self) -> pathlib.Path:
-        with tempfile.NamedTemporaryFile("w", delete=False) as f:
-            f.write(str(self.data))
+        with tempfile.NamedTemporaryFile("wb", delete=False) as f:
+            for chunk in self.iter_chunks():
+                f.write(chunk)
             return pathlib.Path(f.name)
 
+    def _get_size(self) -> int:
+        size = self.size
+        if size is None:
+            raise ValueError("BufferedS3Reader: the object was not opened")
+        return size
+
+    def _read_bytes(self, start: int, end: int) -> bytes:
+        chunk_end = self._chunk_start + len(self._chunk)
+        if self._chunk_start <= start and end <= chunk_end:
+            return self._chunk[start - self._chunk_start : end - self._chunk_start]
+        if end - start > self.chunk_size:
+            return b"".join(self.iter_chunks(start, end))
+        self._chunk_start = start
+        self._chunk = self.read_range(
+            start, min(start + self.chunk_size, self._get_size())
+        )
+        return self._chunk[: end - start]
+
 
 class BufferedS3Writer(contextlib.AbstractContextManager):
+    """Writes an S3 object, uploading it in parts while it is being written
+
+    The written data is buffered until it fills a part of part_size bytes. The
+    first full part starts a multipart upload, and the parts are uploaded in the
+    background with at most max_parts_in_flight of them in memory. An object
+    smaller than a part is written with a single PUT on exit.
+
+    If the with block raises, nothing is written and a started multipart upload
+    is aborted.
+    """
+
     def __init__(
-        self, s3_path: pathlib.Path, storage_service: S3StorageService
+        self,
+        s3_path: pathlib.Path,
+        storage_service: S3StorageService,
+        part_size: int = DEFAULT_PART_SIZE_IN_BYTES,
+        max_parts_in_flight: int = DEFAULT_MAX_PARTS_IN_FLIGHT,
     ) -> None:
+        if part_size <= 0 or max_parts_in_flight <= 0:
+            raise ValueError(
+                "BufferedS3Writer: part_size and max_parts_in_flight must be positive"
+            )
         self.s3_path = s3_path
         self.storage_service = storage_service
+        self.part_size = part_size
+        self.max_parts_in_flight = max_parts_in_flight
         self.written = False
-        self.buffer = ""
+        self.buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._parts: List[Future[Dict[str, Any]]] = []
+        self._parts_in_flight: Deque[Future[Dict[str, Any]]] = collections.deque()
 
     def __enter__(self) -> BufferedS3Writer:
         return self
@@ -78,12 +202,104 @@ class BufferedS3Writer(contextlib.AbstractContextManager):
         __exc_value: Optional[BaseException],
         __traceback: Optional[TracebackType],
     ) -> Optional[bool]:
-        if not self.written:
-            self.storage_service.write(str(self.s3_path), self.buffer)
-            self.written = True
+        if self.written:
+            return
+        self.written = True
+
+        if self._upload_id is None:
+            if __exc_type is None:
+                self.storage_service.write(
+                    str(self.s3_path), self.buffer.decode("utf-8")
+                )
+            self.buffer = bytearray()
+            return
+
+        completed = False
+        try:
+            if __exc_type is None:
+                self._complete_multipart_upload()
+                completed = True
+        finally:
+            if not completed:
+                self._abort_multipart_upload()
+            self.buffer = bytearray()
 
     def __del__(self) -> None:
+        # __init__ raised before the writer was set up
+        if "written" not in self.__dict__:
+            return
         self.__exit__(None, None, None)
 
     def write(self, data: str) -> None:
-        self.buffer += data
+        if self.written:
+            raise ValueError("BufferedS3Writer: the object was already written")
+        buffer = self.buffer
+        buffer += data.encode("utf-8")
+        if len(buffer) < self.part_size:
+            return
+
+        offset = 0
+        with memoryview(buffer) as view:
+            while len(buffer) - offset >= self.part_size:
+                self._upload_part(bytes(view[offset : offset + self.part_size]))
+                offset += self.part_size
+        del buffer[:offset]
+
+    def _upload_part(self, part: bytes) -> None:
+        s3_path = S3Path(str(self.s3_path))
+        client = get_s3_client(self.storage_service)
+        executor = self._executor
+        if self._upload_id is None or executor is None:
+            self._upload_id = client.create_multipart_upload(
+                Bucket=s3_path.bucket, Key=s3_path.key
+            )["UploadId"]
+            executor = self._executor = ThreadPoolExecutor(
+                max_workers=self.max_parts_in_flight
+            )
+
+        # bounds the memory to max_parts_in_flight parts
+        while len(self._parts_in_flight) >= self.max_parts_in_flight:
+            self._parts_in_flight.popleft().result()
+
+        future = executor.submit(
+            client.upload_part,
+            Bucket=s3_path.bucket,
+            Key=s3_path.key,
+            UploadId=self._upload_id,
+            PartNumber=len(self._parts) + 1,
+            Body=part,
+        )
+        self._parts.append(future)
+        self._parts_in_flight.append(future)
+
+    def _complete_multipart_upload(self) -> None:
+        if self.buffer:
+            self._upload_part(bytes(self.buffer))
+        parts = [
+            {"ETag": future.result()["ETag"], "PartNumber": part_number}
+            for part_number, future in enumerate(self._parts, 1)
+        ]
+        s3_path = S3Path(str(self.s3_path))
+        get_s3_client(self.storage_service).complete_multipart_upload(
+            Bucket=s3_path.bucket,
+            Key=s3_path.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        self._shutdown_executor()
+
+    def _abort_multipart_upload(self) -> None:
+        for future in self._parts:
+            future.cancel()
+        self._shutdown_executor()
+        s3_path = S3Path(str(self.s3_path))
+        get_s3_client(self.storage_service).abort_multipart_upload(
+            Bucket=s3_path.bucket, Key=s3_path.key, UploadId=self._upload_id
+        )
+
+    def _shutdown_executor(self) -> None:
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=True)
+            self._executor = None
+        self._parts_in_flight.clear()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import collections
+import itertools
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# items submitted to the pool per worker process before a result is waited for
+MAX_IN_FLIGHT_PER_WORKER = 2
+
+
+def ordered_process_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[T, R]]:
+    """Applies fn to the items in worker processes and yields (item, result) in order
+
+    The items are consumed lazily: at most MAX_IN_FLIGHT_PER_WORKER items per
+    worker are submitted ahead of the yielded result, which bounds the memory
+    used by large items like file chunks. A single item, or a single worker, is
+    processed in this process without starting a pool. Closing the iterator
+    cancels the items that were not started yet.
+
+    Args:
+        - fn: a picklable function, e.g. a module level function or a functools.partial of one
+        - items: the picklable arguments of fn
+        - max_workers: the number of worker processes, the number of CPUs if None
+    """
+    items = iter(items)
+    first_items = list(itertools.islice(items, 2))
+    if len(first_items) < 2 or max_workers == 1:
+        for item in itertools.chain(first_items, items):
+            yield item, fn(item)
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = MAX_IN_FLIGHT_PER_WORKER * max_workers
+    pending: Deque[Tuple[T, Future[R]]] = collections.deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in itertools.chain(first_items, items):
+                pending.append((item, executor.submit(fn, item)))
+                if len(pending) >= max_in_flight:
+                    done_item, future = pending.popleft()
+                    yield done_item, future.result()
+            while pending:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Per-open latency of abstract_file_writer_ctx on an S3 path
+
+Compares opening a file with the shared storage service to creating a new
+S3StorageService for every open, like abstract_file_ctx did before. Nothing
+is sent to S3: the writers are discarded without writing.
+
+Usage: python -m fbpcs.utils.tests.benchmark_abstract_file_ctx
+"""
+
+import os
+import pathlib
+
+from fbpcp.service.storage_s3 import S3StorageService
+from fbpcs.common.tests.benchmark_utils import time_per_call
+from fbpcs.utils import abstract_file_ctx
+from fbpcs.utils.buffered_s3_file_handler import BufferedS3Writer
+
+S3_PATH = pathlib.Path("https://bucket.s3.us-west-2.amazonaws.com/benchmark")
+
+
+def open_with_new_storage_service() -> None:
+    storage_service = S3StorageService(
+        region=os.environ["PL_AWS_REGION"],
+        access_key_id=os.environ["PL_AWS_KEY_ID"],
+        access_key_data=os.environ["PL_AWS_KEY_DATA"],
+    )
+    writer = BufferedS3Writer(S3_PATH, storage_service)
+    writer.written = True
+
+
+def open_with_shared_storage_service() -> None:
+    writer = abstract_file_ctx.abstract_file_writer_ctx(S3_PATH)
+    # pyre-fixme[16]: `AbstractContextManager` has no attribute `written`.
+    writer.written = True
+
+
+def main() -> None:
+    os.environ["PL_AWS_REGION"] = "us-west-2"
+    os.environ["PL_AWS_KEY_ID"] = "benchmark_key_id"
+    os.environ["PL_AWS_KEY_DATA"] = "benchmark_key_data"
+
+    print(f"{'open':>28} {'us':>10}")
+    for name, fn in (
+        ("new S3StorageService", open_with_new_storage_service),
+        ("shared storage service", open_with_shared_storage_service),
+    ):
+        print(f"{name:>28} {time_per_call(fn) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Throughput and peak memory of the buffered S3 handlers against a local S3 stand-in
+
+Every request to the stand-in sleeps for a fixed latency, and the stand-in
+drops the uploaded data so that the peak memory is the one of the handlers. The
+whole object rows write and read the object with a single request, like the
+handlers did before they streamed.
+
+Usage: python -m fbpcs.utils.tests.benchmark_buffered_s3_file_handler
+"""
+
+import os
+import pathlib
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from fbpcs.utils.buffered_s3_file_handler import BufferedS3Reader, BufferedS3Writer
+from fbpcs.utils.tests.local_s3_storage_service import LocalS3StorageService
+
+S3_PATH = pathlib.Path("https://bucket.s3.us-west-2.amazonaws.com/benchmark")
+LATENCY = 0.02
+LINE = "x" * 1023 + "\n"
+MB = 1024 * 1024
+
+
+def measure(fn: Callable[[], None]) -> Tuple[float, float]:
+    """Returns the run time and the peak traced memory of fn in MB"""
+    tracemalloc.start()
+    start = time.monotonic()
+    fn()
+    elapsed = time.monotonic() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / MB
+
+
+def write_whole_object(storage_service: LocalS3StorageService, size: int) -> None:
+    data = ""
+    for _ in range(size // len(LINE)):
+        data += LINE
+    storage_service.write(str(S3_PATH), data)
+
+
+def write_streaming(storage_service: LocalS3StorageService, size: int) -> None:
+    with BufferedS3Writer(S3_PATH, storage_service) as writer:
+        for _ in range(size // len(LINE)):
+            writer.write(LINE)
+
+
+def read_whole_object(storage_service: LocalS3StorageService) -> None:
+    storage_service.read(str(S3_PATH))
+
+
+def read_streaming(storage_service: LocalS3StorageService) -> None:
+    with BufferedS3Reader(S3_PATH, storage_service) as reader:
+        path = reader.copy_to_local()
+    os.unlink(path)
+
+
+def main() -> None:
+    print(f"{'size MB':>8} {'op':>22} {'MB/s':>8} {'peak MB':>8}")
+    for size_mb in (16, 64, 256):
+        size = size_mb * MB
+        storage_service = LocalS3StorageService(LATENCY, keep_uploads=False)
+        storage_service.client.objects[("bucket", "benchmark")] = b"x" * size
+        benchmarks: Tuple[Tuple[str, Callable[[], None]], ...] = (
+            ("read whole object", lambda: read_whole_object(storage_service)),
+            ("BufferedS3Reader copy", lambda: read_streaming(storage_service)),
+            ("write whole object", lambda: write_whole_object(storage_service, size)),
+            ("BufferedS3Writer", lambda: write_streaming(storage_service, size)),
+        )
+        for op, fn in benchmarks:
+            elapsed, peak = measure(fn)
+            print(f"{size_mb:>8} {op:>22} {size_mb / elapsed:>8.0f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import io
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from fbpcp.util.s3path import S3Path
+
+RANGE_REGEX = re.compile(r"^bytes=(\d+)-(\d+)$")
+
+
+class LocalS3Client:
+    """In memory stand-in for the boto3 S3 client calls of the buffered S3 handlers
+
+    Every request sleeps for latency seconds. It counts the requests and how
+    many of them ran at the same time. With keep_uploads=False the uploaded data
+    is dropped, so only the memory of the caller is measured.
+    """
+
+    def __init__(self, latency: float = 0.0, keep_uploads: bool = True) -> None:
+        self.latency = latency
+        self.keep_uploads = keep_uploads
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.aborted_uploads: List[str] = []
+        self.requests: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._upload_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._request("head_object")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def get_object(self, Bucket: str, Key: str, Range: str = "") -> Dict[str, Any]:
+        self._request("get_object")
+        data = self.objects[(Bucket, Key)]
+        match = RANGE_REGEX.match(Range)
+        if match:
+            data = data[int(match.group(1)) : int(match.group(2)) + 1]
+        return {"Body": io.BytesIO(data)}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> Dict[str, Any]:
+        self._request("put_object")
+        self.objects[(Bucket, Key)] = Body if self.keep_uploads else b""
+        return {}
+
+    def create_multipart_upload(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._request("create_multipart_upload")
+        upload_id = f"upload_{next(self._upload_ids)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(
+        self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes
+    ) -> Dict[str, Any]:
+        self._request("upload_part")
+        self.uploads[UploadId][PartNumber] = Body if self.keep_uploads else b""
+        return {"ETag": f"etag_{PartNumber}"}
+
+    def complete_multipart_upload(
+        self,
+        Bucket: str,
+        Key: str,
+        UploadId: str,
+        MultipartUpload: Dict[str, List[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        self._request("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(
+            parts[part["PartNumber"]] for part in MultipartUpload["Parts"]
+        )
+        return {}
+
+    def abort_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str
+    ) -> Dict[str, Any]:
+        self._request("abort_multipart_upload")
+        self.uploads.pop(UploadId)
+        self.aborted_uploads.append(UploadId)
+        return {}
+
+    def _request(self, name: str) -> None:
+        with self._lock:
+            self.requests.append(name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+
+class LocalS3Gateway:
+    def __init__(self, client: LocalS3Client) -> None:
+        self.client = client
+
+
+class LocalS3StorageService:
+    """Stands in for S3StorageService with the objects in a LocalS3Client"""
+
+    def __init__(self, latency: float = 0.0, keep_uploads: bool = True) -> None:
+        self.s3_gateway = LocalS3Gateway(LocalS3Client(latency, keep_uploads))
+
+    @property
+    def client(self) -> LocalS3Client:
+        return self.s3_gateway.client
+
+    def read(self, filename: str) -> str:
+        s3_path = S3Path(filename)
+        response = self.client.get_object(Bucket=s3_path.bucket, Key=s3_path.key)
+        return response["Body"].read().decode()
+
+    def write(self, filename: str, data: str) -> None:
+        s3_path = S3Path(filename)
+        self.client.put_object(
+            Bucket=s3_path.bucket, Key=s3_path.key, Body=data.encode()
+        )
+
+    def get_file_size(self, filename: str) -> int:
+        s3_path = S3Path(filename)
+        return self.client.head_object(Bucket=s3_path.bucket, Key=s3_path.key)[
+            "ContentLength"
+        ]
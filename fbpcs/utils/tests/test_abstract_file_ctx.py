@@ -6,8 +6,10 @@
 
 import os
 import pathlib
+import threading
+import time
 import unittest
-from unittest.mock import mock_open, patch
+from unittest.mock import MagicMock, mock_open, patch
 
 from fbpcs.utils import abstract_file_ctx
 
@@ -17,6 +19,10 @@ class TestAbstractFileCtx(unittest.TestCase):
         os.environ["PL_AWS_REGION"] = "us-west-1"
         os.environ["PL_AWS_KEY_ID"] = "key"
         os.environ["PL_AWS_KEY_DATA"] = "key_data"
+        abstract_file_ctx.clear_s3_storage_services()
+
+    def tearDown(self) -> None:
+        abstract_file_ctx.clear_s3_storage_services()
 
     @patch("fbpcs.utils.abstract_file_ctx.BufferedS3Reader")
     def test_abstract_file_reader_path(self, mock_s3_reader) -> None:
@@ -52,3 +58,57 @@ class TestAbstractFileCtx(unittest.TestCase):
         # Easiest way to test for equality is to do a quick write
         res.write("xyz")
         mock_s3_writer().write.assert_called_once_with("xyz")
+
+    @patch("fbpcs.utils.abstract_file_ctx.S3StorageService")
+    @patch("fbpcs.utils.abstract_file_ctx.BufferedS3Writer")
+    def test_storage_service_is_reused(
+        self, mock_s3_writer, mock_storage_service
+    ) -> None:
+        mock_storage_service.side_effect = lambda **kwargs: MagicMock()
+        s3_path = pathlib.Path("https://bucket-name.s3.Region.amazonaws.com/key-name")
+        abstract_file_ctx.abstract_file_writer_ctx(s3_path)
+        abstract_file_ctx.abstract_file_writer_ctx(s3_path)
+
+        first_storage_service = mock_s3_writer.call_args_list[0][0][1]
+        self.assertIs(first_storage_service, mock_s3_writer.call_args_list[1][0][1])
+        self.assertEqual(1, mock_storage_service.call_count)
+        self.assertEqual("us-west-1", mock_storage_service.call_args.kwargs["region"])
+        self.assertEqual("key", mock_storage_service.call_args.kwargs["access_key_id"])
+
+        # other credentials get another storage service
+        os.environ["PL_AWS_KEY_ID"] = "other_key"
+        abstract_file_ctx.abstract_file_writer_ctx(s3_path)
+        self.assertIsNot(first_storage_service, mock_s3_writer.call_args[0][1])
+
+        # a cleared registry creates the storage service again
+        os.environ["PL_AWS_KEY_ID"] = "key"
+        abstract_file_ctx.clear_s3_storage_services()
+        abstract_file_ctx.abstract_file_writer_ctx(s3_path)
+        self.assertIsNot(first_storage_service, mock_s3_writer.call_args[0][1])
+        self.assertEqual(3, mock_storage_service.call_count)
+
+    @patch("fbpcs.utils.abstract_file_ctx.S3StorageService")
+    def test_get_s3_storage_service_thread_safe(self, mock_storage_service) -> None:
+        def create_storage_service(**kwargs) -> MagicMock:
+            # widens the window in which other threads could create another one
+            time.sleep(0.05)
+            return MagicMock()
+
+        mock_storage_service.side_effect = create_storage_service
+        storage_services = []
+
+        def get_storage_service() -> None:
+            storage_services.append(
+                abstract_file_ctx.get_s3_storage_service("us-west-2", "key", "data")
+            )
+
+        threads = [threading.Thread(target=get_storage_service) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, mock_storage_service.call_count)
+        self.assertEqual(8, len(storage_services))
+        self.assertTrue(all(s is storage_services[0] for s in storage_services))
+        self.assertEqual("us-west-2", mock_storage_service.call_args.kwargs["region"])
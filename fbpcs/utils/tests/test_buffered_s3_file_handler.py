@@ -6,63 +6,125 @@
 
 import os
 import pathlib
+import time
 import unittest
 from unittest.mock import Mock
 
 from fbpcs.utils.buffered_s3_file_handler import BufferedS3Reader, BufferedS3Writer
+from fbpcs.utils.tests.local_s3_storage_service import LocalS3StorageService
+
+OBJECT = ("bucket", "object")
 
 
 class TestBufferedS3Reader(unittest.TestCase):
     def setUp(self) -> None:
         self.s3_path = pathlib.Path("https://bucket.s3.Region.amazonaws.com/object")
-        self.storage_service = Mock()
+        self.storage_service = LocalS3StorageService()
+        self.data = bytes(range(10)) * 10
+        self.storage_service.client.objects[OBJECT] = self.data
 
     def test_context_manager(self) -> None:
-        pass
-
-    def test_seek(self) -> None:
         reader = BufferedS3Reader(self.s3_path, self.storage_service)
-        reader.data = "x" * 100
-        self.assertEqual(0, reader.cursor)
-
-        reader.seek(50)
-        self.assertEqual(50, reader.cursor)
-
-        # Seek past the end of the data
-        reader.seek(150)
-        self.assertEqual(100, reader.cursor)
+        with self.assertRaises(ValueError):
+            reader.read()
 
-    def test_read(self) -> None:
-        reader = BufferedS3Reader(self.s3_path, self.storage_service)
-        reader.data = "x" * 100
+        with reader:
+            self.assertEqual(100, reader.size)
+        self.assertEqual(["head_object"], self.storage_service.client.requests)
 
-        # Simple read
-        res = reader.read(10)
-        self.assertEqual("x" * 10, res)
+    def test_seek(self) -> None:
+        with BufferedS3Reader(self.s3_path, self.storage_service) as reader:
+            self.assertEqual(0, reader.cursor)
 
-        # Read more characters than available
-        reader.seek(0)
-        res = reader.read(1000)
-        self.assertEqual(reader.data, res)
+            reader.seek(50)
+            self.assertEqual(50, reader.cursor)
 
-        # Read all data
-        reader.seek(0)
-        res = reader.read()
-        self.assertEqual(reader.data, res)
+            # Seek past the end of the data
+            reader.seek(150)
+            self.assertEqual(100, reader.cursor)
 
-        # Read all data after a partial read
-        reader.seek(50)
-        res = reader.read()
-        self.assertEqual("x" * 50, res)
+    def test_read(self) -> None:
+        data = self.data.decode()
+        with BufferedS3Reader(
+            self.s3_path, self.storage_service, chunk_size=30
+        ) as reader:
+            # Simple read
+            res = reader.read(10)
+            self.assertEqual(data[:10], res)
+
+            # Read more characters than available
+            reader.seek(0)
+            res = reader.read(1000)
+            self.assertEqual(data, res)
+
+            # Read all data
+            reader.seek(0)
+            res = reader.read()
+            self.assertEqual(data, res)
+
+            # Read all data after a partial read
+            reader.seek(50)
+            res = reader.read()
+            self.assertEqual(data[50:], res)
+
+    def test_read_reuses_the_downloaded_chunk(self) -> None:
+        with BufferedS3Reader(
+            self.s3_path, self.storage_service, chunk_size=30
+        ) as reader:
+            res = "".join(reader.read(5) for _ in range(6))
+        self.assertEqual(self.data[:30].decode(), res)
+        self.assertEqual(
+            ["head_object", "get_object"], self.storage_service.client.requests
+        )
+
+    def test_read_multi_byte_characters(self) -> None:
+        self.storage_service.client.objects[OBJECT] = "aé€".encode()
+        with BufferedS3Reader(self.s3_path, self.storage_service) as reader:
+            self.assertEqual("a", reader.read(2))
+            self.assertEqual("é", reader.read(1))
+            self.assertEqual("€", reader.read())
+
+    def test_iter_chunks(self) -> None:
+        with BufferedS3Reader(
+            self.s3_path, self.storage_service, chunk_size=30, read_ahead=2
+        ) as reader:
+            chunks = list(reader.iter_chunks())
+            self.assertEqual([30, 30, 30, 10], [len(chunk) for chunk in chunks])
+            self.assertEqual(self.data, b"".join(chunks))
+            self.assertEqual(self.data[45:80], b"".join(reader.iter_chunks(45, 80)))
+
+        with BufferedS3Reader(
+            self.s3_path, self.storage_service, chunk_size=30, read_ahead=0
+        ) as reader:
+            self.assertEqual(self.data, b"".join(reader.iter_chunks()))
+
+    def test_iter_chunks_reads_ahead(self) -> None:
+        latency = 0.05
+        storage_service = LocalS3StorageService(latency)
+        storage_service.client.objects[OBJECT] = self.data
+        with BufferedS3Reader(
+            self.s3_path, storage_service, chunk_size=10, read_ahead=4
+        ) as reader:
+            start = time.monotonic()
+            chunks = []
+            for chunk in reader.iter_chunks():
+                chunks.append(chunk)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(self.data, b"".join(chunks))
+        self.assertEqual(4, storage_service.client.max_in_flight)
+        # 10 chunks with 4 in flight take 3 round-trips instead of 10
+        self.assertLess(elapsed, 6 * latency)
 
     def test_copy_to_local(self) -> None:
-        reader = BufferedS3Reader(self.s3_path, self.storage_service)
-        reader.data = "x" * 100
-        temp_path = reader.copy_to_local()
-        with open(temp_path) as f:
+        with BufferedS3Reader(
+            self.s3_path, self.storage_service, chunk_size=30
+        ) as reader:
+            temp_path = reader.copy_to_local()
+        with open(temp_path, "rb") as f:
             content = f.read()
 
-        self.assertEqual(reader.data, content)
+        self.assertEqual(self.data, content)
         # The caller is responsible for cleaning up the temporary file
         os.unlink(temp_path)
 
@@ -87,4 +149,61 @@ class TestBufferedS3Writer(unittest.TestCase):
     def test_write(self) -> None:
         writer = BufferedS3Writer(self.s3_path, self.storage_service)
         writer.write("abc")
-        self.assertEqual("abc", writer.buffer)
+        self.assertEqual(b"abc", writer.buffer)
+
+    def test_multipart_upload(self) -> None:
+        storage_service = LocalS3StorageService()
+        with BufferedS3Writer(
+            self.s3_path, storage_service, part_size=10, max_parts_in_flight=2
+        ) as writer:
+            writer.write("x" * 9)
+            self.assertEqual([], storage_service.client.requests)
+            writer.write("é" * 20)
+            # only the data that doesn't fill a part is buffered
+            self.assertEqual(9, len(writer.buffer))
+
+        self.assertEqual(
+            ("x" * 9 + "é" * 20).encode(), storage_service.client.objects[OBJECT]
+        )
+        self.assertEqual(
+            ["create_multipart_upload"]
+            + ["upload_part"] * 5
+            + ["complete_multipart_upload"],
+            storage_service.client.requests,
+        )
+        self.assertEqual({}, storage_service.client.uploads)
+
+    def test_multipart_upload_bounds_parts_in_flight(self) -> None:
+        storage_service = LocalS3StorageService(latency=0.02)
+        with BufferedS3Writer(
+            self.s3_path, storage_service, part_size=10, max_parts_in_flight=3
+        ) as writer:
+            for _ in range(10):
+                writer.write("y" * 10)
+                self.assertLessEqual(len(writer._parts_in_flight), 3)
+
+        self.assertEqual(b"y" * 100, storage_service.client.objects[OBJECT])
+        self.assertEqual(3, storage_service.client.max_in_flight)
+
+    def test_multipart_upload_aborted_on_error(self) -> None:
+        storage_service = LocalS3StorageService()
+        with self.assertRaises(RuntimeError):
+            with BufferedS3Writer(
+                self.s3_path, storage_service, part_size=10
+            ) as writer:
+                writer.write("z" * 25)
+                raise RuntimeError("failed while writing")
+
+        self.assertNotIn(OBJECT, storage_service.client.objects)
+        self.assertEqual(["upload_0"], storage_service.client.aborted_uploads)
+        self.assertEqual({}, storage_service.client.uploads)
+
+    def test_nothing_written_on_error(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with BufferedS3Writer(self.s3_path, self.storage_service) as writer:
+                writer.write("abc")
+                raise RuntimeError("failed while writing")
+
+        self.storage_service.write.assert_not_called()
+        with self.assertRaises(ValueError):
+            writer.write("abc")
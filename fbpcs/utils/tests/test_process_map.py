@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import os
+from typing import Iterator, List
+from unittest import TestCase
+
+from fbpcs.utils.process_map import MAX_IN_FLIGHT_PER_WORKER, ordered_process_map
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def get_pid(_: int) -> int:
+    return os.getpid()
+
+
+class TestProcessMap(TestCase):
+    def test_yields_the_items_and_results_in_order(self) -> None:
+        items = list(range(50))
+
+        results = list(ordered_process_map(square, items, max_workers=3))
+
+        self.assertEqual([(x, x * x) for x in items], results)
+
+    def test_single_item_runs_in_this_process(self) -> None:
+        # a lambda can't be sent to a worker process
+        self.assertEqual([(3, 4)], list(ordered_process_map(lambda x: x + 1, [3])))
+        self.assertEqual([], list(ordered_process_map(lambda x: x + 1, [])))
+
+    def test_single_worker_runs_in_this_process(self) -> None:
+        results = list(ordered_process_map(get_pid, range(5), max_workers=1))
+
+        self.assertEqual([(x, os.getpid()) for x in range(5)], results)
+
+    def test_items_are_read_lazily(self) -> None:
+        consumed: List[int] = []
+
+        def items() -> Iterator[int]:
+            for x in range(100):
+                consumed.append(x)
+                yield x
+
+        results = ordered_process_map(square, items(), max_workers=2)
+        self.assertEqual((0, 0), next(results))
+        self.assertEqual(2 * MAX_IN_FLIGHT_PER_WORKER, len(consumed))
+
+        results.close()
+        self.assertEqual(2 * MAX_IN_FLIGHT_PER_WORKER, len(consumed))